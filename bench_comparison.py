@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the price comparison pipeline.
+
+Runs PriceComparison.search_all_retailers against FirecrawlStub so throughput
+and tail latency can be measured without network access or Firecrawl credits,
+times page parsing over the saved fixture pages and product matching
+over a large synthetic candidate set. The corpus suite runs extraction,
+deduplication and matching over every saved retailer payload and scores
+the chosen listing against labelled queries (precision@1).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import statistics
+import time
+from datetime import datetime
+
+from firecrawl_stub import FirecrawlStub
+from markdown_tokenizer import extract_markdown_products
+from price_comparison import PriceComparison
+
+DEFAULT_QUERY = 'iPad mini (A17 Pro) 8.3" WiFi 128GB Space Grey'
+OUTPUT_PATH = 'bench_output.txt'
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+async def run_pipeline_benchmark(requests: int, concurrency: int, latency: float, jitter: float,
+                                 failure_rate: float, seed: int, query: str = DEFAULT_QUERY):
+    stub = FirecrawlStub(latency=latency, jitter=jitter, failure_rate=failure_rate, seed=seed)
+    comparison = PriceComparison(firecrawl_client=stub)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    found = []
+
+    async def one_request():
+        async with semaphore:
+            started = time.perf_counter()
+            results = await comparison.search_all_retailers(query, 797.00)
+            latencies.append(time.perf_counter() - started)
+            found.append(len(results))
+
+    started = time.perf_counter()
+    # The pipeline logs heavily; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'elapsed': elapsed,
+        'throughput': requests / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'mean': statistics.mean(latencies) if latencies else 0.0,
+        'avg_results': statistics.mean(found) if found else 0.0,
+        'firecrawl_calls': len(stub.calls),
+    }
+
+def format_pipeline_report(stats, latency, jitter, failure_rate):
+    return "\n".join([
+        "Pipeline (search_all_retailers via FirecrawlStub)",
+        f"  stub latency: {latency * 1000:.0f}ms +{jitter * 1000:.0f}ms jitter, failure rate {failure_rate:.0%}",
+        f"  requests: {stats['requests']} @ concurrency {stats['concurrency']}",
+        f"  elapsed: {stats['elapsed']:.2f}s, throughput: {stats['throughput']:.2f} req/s",
+        f"  latency p50: {stats['p50'] * 1000:.0f}ms, p95: {stats['p95'] * 1000:.0f}ms, "
+        f"p99: {stats['p99'] * 1000:.0f}ms, mean: {stats['mean'] * 1000:.0f}ms",
+        f"  avg retailer results: {stats['avg_results']:.2f}, firecrawl calls: {stats['firecrawl_calls']}",
+    ])
+
+def load_saved_pages(stub: FirecrawlStub):
+    """Saved search pages from the fixture manifest as (label, retailer key, response) tuples"""
+    pages = []
+    for entry in stub.entries:
+        if entry.get('page') == 'product':
+            continue
+        for kind in ('markdown', 'html'):
+            if entry.get(kind):
+                response = {'markdown': '', 'html': ''}
+                response[kind] = stub._read_payload(entry[kind])
+                pages.append((entry[kind], entry['retailer'], response))
+    return pages
+
+def run_parse_benchmark(iterations: int):
+    """Time _extract_products_from_response per saved page"""
+    stub = FirecrawlStub()
+    comparison = PriceComparison()
+    rows = []
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for label, retailer_key, response in load_saved_pages(stub):
+            retailer = comparison.retailers[retailer_key]
+            size = len(response['markdown']) + len(response['html'])
+            products = comparison._extract_products_from_response(response, retailer)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                comparison._extract_products_from_response(response, retailer)
+            per_page = (time.perf_counter() - started) / iterations
+            rows.append({'page': label, 'bytes': size, 'products': len(products), 'per_page': per_page})
+
+    return rows
+
+def run_markdown_recall(fixtures_dir: str = None):
+    """Recall of _extract_from_markdown against the expected products in markdown_corpus.json"""
+    stub = FirecrawlStub(fixtures_dir)
+    comparison = PriceComparison()
+    with open(os.path.join(stub.fixtures_dir, 'markdown_corpus.json'), 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    rows = []
+    for page in corpus['pages']:
+        retailer = comparison.retailers[page['retailer']]
+        with contextlib.redirect_stdout(io.StringIO()):
+            products = comparison._extract_from_markdown(stub._read_payload(page['page']), retailer)
+        found = {(comparison._normalize_text(p['title']), round(float(p['price']), 2)) for p in products}
+        expected = [(comparison._normalize_text(title), round(price, 2)) for title, price in page['expected']]
+        rows.append({'page': page['page'], 'expected': len(expected),
+                     'found': sum(1 for item in expected if item in found)})
+    return rows
+
+def run_large_markdown_benchmark(products: int = 500, iterations: int = 20):
+    """Time a long results page, where the tokenizer stops at the product cap"""
+    blocks = [f"### Example Brand Model {i} Wireless Headphones\n\n${50 + i}.00\n" for i in range(products)]
+    markdown = "# Search results\n\n" + "\n".join(blocks)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        capped = extract_markdown_products(markdown, 'https://example.com')
+    capped_time = (time.perf_counter() - started) / iterations
+    started = time.perf_counter()
+    for _ in range(iterations):
+        extract_markdown_products(markdown, 'https://example.com', max_products=products)
+    full_time = (time.perf_counter() - started) / iterations
+    return {'products': products, 'bytes': len(markdown), 'capped': len(capped),
+            'capped_time': capped_time, 'full_time': full_time}
+
+LARGE_PAGE_CARD = (
+    '<div class="ProductTile"><div class="ProductTile__Body"><a href="/products/example-{i}">'
+    '<h4 class="ProductTile__Title">Example Brand Model {i} Wireless Headphones</h4></a>'
+    '<span class="ProductTile__Price">${price}.00</span></div></div>\n'
+)
+
+def run_html_benchmark(iterations: int, large_cards: int = 5000):
+    """Compare the DOM/CSS selector extractor with the regex scanner on saved and generated pages"""
+    stub = FirecrawlStub()
+    comparison = PriceComparison()
+    pages = [(label, retailer_key, response['html'])
+             for label, retailer_key, response in load_saved_pages(stub) if response['html']]
+    large = '<html><body><main>' + ''.join(
+        LARGE_PAGE_CARD.format(i=i, price=50 + i % 900) for i in range(large_cards)
+    ) + '</main></body></html>'
+    pages.append((f'generated {large_cards} cards', 'jb_hifi', large))
+
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for label, retailer_key, html in pages:
+            retailer = comparison.retailers[retailer_key]
+            row = {'page': label, 'bytes': len(html)}
+            for name, extract in (('dom', comparison._extract_from_html),
+                                  ('regex', comparison._extract_from_html_regex)):
+                products = extract(html, retailer)
+                runs = iterations if len(html) < 100000 else max(1, iterations // 50)
+                started = time.perf_counter()
+                for _ in range(runs):
+                    extract(html, retailer)
+                row[name] = (time.perf_counter() - started) / runs
+                row[f'{name}_products'] = len(products)
+            rows.append(row)
+    return rows
+
+MATCH_BRANDS = ('Apple', 'Samsung', 'Sony', 'TP-Link', 'Logitech', 'Lenovo', 'JBL', 'Bose', 'HP', 'Netgear')
+MATCH_PRODUCTS = ('iPad mini', 'Galaxy Tab S9', 'WH-1000XM5 Wireless Headphones', 'Deco X50 Mesh WiFi System',
+                  'MX Master 3S Mouse', 'IdeaPad Slim 5 Laptop', 'Flip 6 Bluetooth Speaker', 'QuietComfort Earbuds',
+                  'LaserJet Pro Printer', 'Nighthawk AX5400 Router')
+MATCH_VARIANTS = ('64GB', '128GB', '256GB', '512GB', '1TB', 'Space Grey', 'Blue', 'Starlight', 'Black', 'White',
+                  'Wi-Fi', 'Wi-Fi + Cellular', '3 Pack', '2 Pack', '(A17 Pro)', '8.3-inch', '11-inch', 'Gen 2')
+MATCH_QUERIES = (DEFAULT_QUERY, 'Samsung Galaxy Tab S9 256GB Wi-Fi', 'TP-Link Deco X50 Mesh WiFi System 3 Pack',
+                 'Sony WH-1000XM5 Wireless Headphones Black')
+
+def generate_match_candidates(count: int, seed: int = 1234):
+    """Synthetic product listings drawn from a small catalogue vocabulary"""
+    rng = random.Random(seed)
+    products = []
+    for _ in range(count):
+        variants = rng.sample(MATCH_VARIANTS, rng.randint(1, 4))
+        title = ' '.join((rng.choice(MATCH_BRANDS), rng.choice(MATCH_PRODUCTS), *variants))
+        products.append({'title': title, 'price': round(rng.uniform(20, 2500), 2)})
+    return products
+
+def run_match_benchmark(candidates: int = 10000, queries=MATCH_QUERIES, seed: int = 1234):
+    """Time scoring ``candidates`` products per query, both fully ranked and best-match only"""
+    comparison = PriceComparison()
+    products = generate_match_candidates(candidates, seed)
+    rows = []
+    for query in queries:
+        started = time.perf_counter()
+        ranked = comparison._rank_products(products, query)
+        rank_time = time.perf_counter() - started
+        started = time.perf_counter()
+        best = comparison._find_best_product_match(products, query, 0.3)
+        best_time = time.perf_counter() - started
+        rows.append({'query': query, 'candidates': candidates, 'rank_time': rank_time, 'best_time': best_time,
+                     'agrees': bool(ranked) and best is ranked[0][2], 'best': best['title'] if best else None})
+    return rows
+
+def extract_payload_products(comparison: PriceComparison, retailer, kind: str, payload):
+    """Products from one saved payload, parsed the way a live search of that kind would be"""
+    if kind == 'extract':
+        return comparison._format_extract_products(payload.get('products', []), retailer.search_url)
+    if kind == 'direct':
+        return retailer.direct_adapter.parse_products(payload, retailer.base_url)
+    response = {'markdown': '', 'html': ''}
+    response[kind] = payload
+    return comparison._extract_products_from_response(response, retailer)
+
+def load_corpus_payloads(stub: FirecrawlStub):
+    """Every saved search payload as (label, retailer key, kind, payload) tuples"""
+    payloads = []
+    for entry in stub.entries:
+        if entry.get('page') == 'product':
+            continue
+        for kind in ('markdown', 'html', 'extract', 'direct'):
+            if entry.get(kind):
+                payloads.append((entry[kind], entry['retailer'], kind, stub._read_payload(entry[kind])))
+    return payloads
+
+def run_corpus_benchmark(iterations: int = 50, fixtures_dir: str = None):
+    """Time extract -> dedupe -> best match per saved payload and score precision@1 on match_corpus.json"""
+    stub = FirecrawlStub(fixtures_dir)
+    comparison = PriceComparison()
+    with open(os.path.join(stub.fixtures_dir, 'match_corpus.json'), 'r', encoding='utf-8') as f:
+        cases = json.load(f)['cases']
+
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for label, retailer_key, kind, payload in load_corpus_payloads(stub):
+            retailer = comparison.retailers[retailer_key]
+            started = time.perf_counter()
+            for _ in range(iterations):
+                products = extract_payload_products(comparison, retailer, kind, payload)
+            extract_time = (time.perf_counter() - started) / iterations
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                products = comparison._deduplicate_products(list(products))
+            dedupe_time = (time.perf_counter() - started) / iterations
+
+            titles = {comparison._normalize_text(product['title']) for product in products}
+            scored = correct = 0
+            match_time = 0.0
+            misses = []
+            for case in cases:
+                expected = case['expected']
+                if case['retailer'] != retailer_key:
+                    continue
+                if expected is not None and comparison._normalize_text(expected) not in titles:
+                    continue  # This payload does not contain the listing
+                query = comparison._clean_product_name(case['query'])
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    best = comparison._find_best_product_match(products, query, retailer.price_match_threshold)
+                match_time += (time.perf_counter() - started) / iterations
+                chosen = best['title'] if best else None
+                scored += 1
+                if (chosen and expected and comparison._normalize_text(chosen) == comparison._normalize_text(expected)) \
+                        or (chosen is None and expected is None):
+                    correct += 1
+                else:
+                    misses.append((case['query'], expected, chosen))
+            rows.append({'page': label, 'kind': kind, 'products': len(products), 'extract_time': extract_time,
+                         'dedupe_time': dedupe_time, 'match_time': match_time / scored if scored else 0.0,
+                         'cases': scored, 'correct': correct, 'misses': misses})
+    return rows
+
+def generate_dedupe_products(count: int, duplicate_rate: float = 0.3, seed: int = 1234):
+    """Synthetic listings where ``duplicate_rate`` of them repeat an earlier title/price with different formatting"""
+    rng = random.Random(seed)
+    products = []
+    unique = 0
+    for _ in range(count):
+        if products and rng.random() < duplicate_rate:
+            original = rng.choice(products)
+            title = original['title'].upper() if rng.random() < 0.5 else original['title'].replace(' ', '  ') + ' -'
+            products.append({'title': title, 'price': f"${original['price']:.2f}" if isinstance(original['price'], float)
+                             else original['price']})
+        else:
+            unique += 1
+            variants = rng.sample(MATCH_VARIANTS, rng.randint(1, 4))
+            title = ' '.join((rng.choice(MATCH_BRANDS), rng.choice(MATCH_PRODUCTS), *variants, str(unique)))
+            products.append({'title': title, 'price': round(rng.uniform(20, 2500), 2)})
+    return products, unique
+
+def run_dedupe_benchmark(count: int = 20000, seed: int = 1234):
+    """Time _deduplicate_products on a large listing set with reformatted duplicates"""
+    comparison = PriceComparison()
+    products, unique = generate_dedupe_products(count, seed=seed)
+    started = time.perf_counter()
+    deduped = comparison._deduplicate_products([dict(product) for product in products])
+    elapsed = time.perf_counter() - started
+    return {'products': count, 'unique': unique, 'kept': len(deduped), 'time': elapsed}
+
+def format_corpus_report(rows, dedupe):
+    lines = ["Recorded corpus (extract -> dedupe -> best match, per payload)"]
+    for row in rows:
+        accuracy = f"{row['correct']}/{row['cases']}" if row['cases'] else "-"
+        lines.append(f"  {row['page']:<28} {row['kind']:<8} {row['products']:>3} products  "
+                     f"extract {row['extract_time'] * 1e6:>8.1f}us  dedupe {row['dedupe_time'] * 1e6:>6.1f}us  "
+                     f"match {row['match_time'] * 1e6:>7.1f}us  p@1 {accuracy}")
+        for query, expected, chosen in row['misses']:
+            lines.append(f"    MISS {query!r}: expected {expected!r}, got {chosen!r}")
+    for kind in ('markdown', 'html', 'extract', 'direct'):
+        kind_rows = [row for row in rows if row['kind'] == kind and row['cases']]
+        if kind_rows:
+            cases = sum(row['cases'] for row in kind_rows)
+            correct = sum(row['correct'] for row in kind_rows)
+            lines.append(f"  {kind} precision@1: {correct}/{cases} ({correct / cases:.0%})")
+    cases = sum(row['cases'] for row in rows)
+    correct = sum(row['correct'] for row in rows)
+    lines.append(f"  overall precision@1: {correct}/{cases} ({correct / cases:.1%})" if cases
+                 else "  overall precision@1: n/a")
+    pages = sum(1 / (row['extract_time'] + row['dedupe_time']) for row in rows) / len(rows) if rows else 0
+    lines.append(f"  throughput: {pages:.0f} payloads/s extract+dedupe")
+    lines.append(f"  dedupe {dedupe['products']} listings: kept {dedupe['kept']} (expected {dedupe['unique']}) "
+                 f"in {dedupe['time'] * 1000:.1f}ms ({dedupe['products'] / dedupe['time']:.0f} listings/s)")
+    return "\n".join(lines)
+
+def format_match_report(rows):
+    lines = ["Product matching"]
+    for row in rows:
+        lines.append(f"  {row['query'][:44]:<44} {row['candidates']} candidates  "
+                     f"rank all {row['rank_time'] * 1000:>7.1f}ms  best {row['best_time'] * 1000:>6.1f}ms  "
+                     f"{'same top match' if row['agrees'] else 'TOP MATCH DIFFERS'}")
+    return "\n".join(lines)
+
+def format_html_report(rows):
+    lines = ["HTML extraction (DOM/CSS selectors vs regex scanning)"]
+    for row in rows:
+        lines.append(f"  {row['page']:<28} {row['bytes']:>8} bytes  "
+                     f"dom {row['dom'] * 1000:>7.2f}ms ({row['dom_products']} products)  "
+                     f"regex {row['regex'] * 1000:>7.2f}ms ({row['regex_products']} products)")
+    return "\n".join(lines)
+
+def format_parse_report(rows, iterations):
+    lines = [f"Parsing (_extract_products_from_response, {iterations} iterations per page)"]
+    for row in rows:
+        lines.append(f"  {row['page']:<28} {row['bytes']:>7} bytes  {row['products']:>3} products  "
+                     f"{row['per_page'] * 1e6:>8.1f}us/page")
+    if rows:
+        mean = statistics.mean(row['per_page'] for row in rows)
+        lines.append(f"  mean: {mean * 1e6:.1f}us/page ({1 / mean:.0f} pages/s)")
+    return "\n".join(lines)
+
+def format_markdown_report(recall_rows, large):
+    lines = ["Markdown extraction (single-pass tokenizer)"]
+    for row in recall_rows:
+        lines.append(f"  {row['page']:<28} recall {row['found']}/{row['expected']}")
+    total = sum(row['expected'] for row in recall_rows)
+    found = sum(row['found'] for row in recall_rows)
+    lines.append(f"  corpus recall: {found}/{total} ({found / total:.0%})" if total else "  corpus recall: n/a")
+    lines.append(f"  {large['products']}-product page ({large['bytes']} bytes): "
+                 f"{large['capped_time'] * 1e6:.0f}us with early stop at {large['capped']}, "
+                 f"{large['full_time'] * 1e6:.0f}us parsing everything")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=10, help='Number of comparisons to run')
+    parser.add_argument('--concurrency', type=int, default=5, help='Comparisons in flight at once')
+    parser.add_argument('--latency', type=float, default=0.2, help='Stub base latency per call (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.3, help='Stub random extra latency (seconds)')
+    parser.add_argument('--failure-rate', type=float, default=0.1, help='Probability a stub call fails')
+    parser.add_argument('--seed', type=int, default=1234, help='Random seed for reproducible runs')
+    parser.add_argument('--iterations', type=int, default=200, help='Parse iterations per saved page')
+    parser.add_argument('--suite', choices=['all', 'pipeline', 'parse', 'markdown', 'html', 'match', 'corpus'],
+                        default='all',
+                        help='Which benchmarks to run')
+    parser.add_argument('--candidates', type=int, default=10000, help='Products scored per query by the match suite')
+    parser.add_argument('--output', default=OUTPUT_PATH, help='Where to write the report')
+    args = parser.parse_args()
+
+    sections = []
+    if args.suite in ('all', 'pipeline'):
+        stats = asyncio.run(run_pipeline_benchmark(
+            args.requests, args.concurrency, args.latency, args.jitter, args.failure_rate, args.seed
+        ))
+        sections.append(format_pipeline_report(stats, args.latency, args.jitter, args.failure_rate))
+    if args.suite in ('all', 'parse'):
+        sections.append(format_parse_report(run_parse_benchmark(args.iterations), args.iterations))
+    if args.suite in ('all', 'markdown'):
+        sections.append(format_markdown_report(run_markdown_recall(), run_large_markdown_benchmark()))
+    if args.suite in ('all', 'html'):
+        sections.append(format_html_report(run_html_benchmark(args.iterations)))
+    if args.suite in ('all', 'match'):
+        sections.append(format_match_report(run_match_benchmark(args.candidates)))
+    if args.suite in ('all', 'corpus'):
+        sections.append(format_corpus_report(run_corpus_benchmark(), run_dedupe_benchmark()))
+
+    report = (
+        f"Price comparison benchmark - {datetime.now().isoformat(timespec='seconds')}\n\n"
+        + "\n\n".join(sections)
+        + "\n"
+    )
+
+    print(report)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(report)
+    print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
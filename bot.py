@@ -2,46 +2,64 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import asyncio
+import io
 import signal
 import sys
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 
-import json
-from config import BOT_TOKEN, AUSTRALIAN_STATES, STATE_NAMES, USE_EPHEMERAL_MESSAGES, get_relative_timestamp, get_future_relative_time, get_full_timestamp
+from config import (BOT_TOKEN, AUSTRALIAN_STATES, STATE_NAMES, USE_EPHEMERAL_MESSAGES, FIRECRAWL_FIXTURES_DIR,
+                    FIRECRAWL_DAILY_CREDIT_BUDGET, FIRECRAWL_MONTHLY_CREDIT_BUDGET, FIRECRAWL_CREDIT_COSTS,
+                    COMPARE_USER_DAILY_QUOTA, COMPARE_RETAILER_TIMEOUT, COMPARE_DEADLINE, COMPARE_CACHE_TTL,
+                    COMPARE_CACHE_STALE_TTL, COMPARE_MAPPING_MAX_AGE_DAYS, COMPETITOR_TRACKING_ENABLED,
+                    COMPETITOR_TRACKING_INTERVAL_MINUTES, COMPETITOR_TRACKING_BATCH_SIZE, COMPETITOR_TRACKING_BUDGET_SHARE,
+                    COMPETITOR_TRACKING_MAX_CREDITS_PER_RUN, RETAILERS_FILE, RETAILERS_WATCH_INTERVAL, STORE_REFRESH_ENABLED,
+                    STORE_REFRESH_INTERVAL_HOURS, STORES_SNAPSHOT_FILE, BULK_ADD_MAX_PRODUCTS, BULK_ADD_CONCURRENCY,
+                    BULK_ADD_MAX_FILE_BYTES, WATCHLIST_IMPORT_MAX_BYTES, WATCHLIST_IMPORT_MAX_PRODUCTS,
+                    LOOP_LAG_SAMPLE_INTERVAL, LOOP_LAG_TARGET_MS, LOOP_SLOW_CALLBACK_MS,
+                    get_relative_timestamp, get_future_relative_time, get_full_timestamp)
 from colors import *
 from emojis import *
-from database import Database
+from database import Database, PRODUCT_ADDED, PRODUCT_ALREADY_TRACKED
 from officeworks_api import OfficeworksAPI
 from price_checker import PriceChecker
+from competitor_tracker import CompetitorTracker
 from price_comparison import price_comparison
 from firecrawl_integration import firecrawl_integration
+from firecrawl_stub import FirecrawlStub
+from firecrawl_budget import FirecrawlBudget, MODE_NORMAL
+from comparison_cache import ComparisonCache
+from competitor_mappings import CompetitorMappings
+from retailer_strategy import RetailerStrategy
+from retailer_registry import RetailerRegistry
+from retailer_adapters import PooledHTTPClient
+from store_directory import StoreDirectory
+from store_refresh import StoreRefresher, load_store_directory
+from user_product_cache import UserProductCache
+from bulk_add import bulk_add_products, parse_bulk_csv, parse_bulk_text
+from watchlist_io import export_format_for, export_to_file, import_watchlist, read_records
+from product_resolver import ProductResolver
+from loop_monitor import LoopLagMonitor
 
 class StoreSetupError(Exception):
     """Raised when a user's store preferences cannot be saved."""
 
 
-def _build_store_options(stores):
-    """Create Discord select options for the provided stores."""
-    options = []
-    for store in stores[:25]:
-        store_id = store.get('storeId')
-        if not store_id:
-            continue
+class ComparisonQuotaError(Exception):
+    """Raised when a live comparison would exceed the user's daily quota."""
 
-        suburb = store.get('suburb', '')
-        postcode = store.get('postcode', '')
-        suburb_postcode = f"{suburb}, {postcode}".strip(', ')
-        description = f"{suburb_postcode} - ID: {store_id}" if suburb_postcode else f"ID: {store_id}"
 
-        options.append(
-            discord.SelectOption(
-                label=store.get('store', 'Unknown Store'),
-                value=store_id,
-                description=description
-            )
-        )
-    return options
+def store_choices(directory: StoreDirectory, current: str, state: str = None) -> List[app_commands.Choice[str]]:
+    """Autocomplete choices for a store option, ranked by the store search index"""
+    if current.strip():
+        stores = directory.search(current, state)
+    else:
+        stores = directory.in_state(state)[:25] if state else ()
+    choices = []
+    for store in stores:
+        label = f"{store.get('store', 'Unknown Store')} - {store.get('suburb', '')} {store.get('state', '')}"
+        choices.append(app_commands.Choice(name=f"{label} ({store['storeId']})"[:100], value=store['storeId']))
+    return choices
 
 
 class StateSelectionView(discord.ui.View):
@@ -152,7 +170,8 @@ class AnyStoreButton(discord.ui.Button):
         username = interaction.user.display_name
 
         try:
-            embed = self.bot.complete_store_setup(
+            embed = await asyncio.to_thread(
+                self.bot.complete_store_setup,
                 user_id,
                 username,
                 state,
@@ -259,7 +278,7 @@ class StoreSelect(discord.ui.Select):
         self.bot = bot
         self.state = state
         
-        options = _build_store_options(stores)
+        options = bot.store_directory.options_for(stores)
         has_options = bool(options)
         if not has_options:
             options = [
@@ -292,7 +311,9 @@ class StoreSelect(discord.ui.Select):
             selected_store = self.bot.get_store_by_id(selected_store_id)
 
             if selected_store:
-                await self._complete_setup(interaction, self.state, selected_store_id, selected_store)
+                # Nearest-store results can cross a state border, so use the store's own state
+                state = selected_store.get('state', self.state)
+                await self._complete_setup(interaction, state, selected_store_id, selected_store)
             else:
                 await interaction.response.edit_message(
                     content=f"{ERROR} Store not found. Please try again.",
@@ -312,7 +333,8 @@ class StoreSelect(discord.ui.Select):
         username = interaction.user.display_name
 
         try:
-            embed = self.bot.complete_store_setup(
+            embed = await asyncio.to_thread(
+                self.bot.complete_store_setup,
                 user_id,
                 username,
                 state,
@@ -335,10 +357,8 @@ class StoreSearchSelect(discord.ui.Select):
         self.bot = bot
         self.state = state
         
-        # Get stores for this state
-        stores = bot.get_stores_by_state(state)
-        
-        options = _build_store_options(stores)
+        # Options for this state are built once when the stores are loaded
+        options = bot.store_directory.state_options(state)
         has_options = bool(options)
         if not has_options:
             options = [
@@ -391,7 +411,8 @@ class StoreSearchSelect(discord.ui.Select):
         username = interaction.user.display_name
 
         try:
-            embed = self.bot.complete_store_setup(
+            embed = await asyncio.to_thread(
+                self.bot.complete_store_setup,
                 user_id,
                 username,
                 state,
@@ -456,16 +477,13 @@ class StoreSearchModal(discord.ui.Modal, title="Search for a Store"):
         """Handle store search submission"""
         try:
             query = self.search_query.value.strip()
-            stores = self.bot.get_stores_by_state(self.state)
             
-            # Search by store name or ID
-            matching_stores = [
-                store for store in stores
-                if (
-                    query.lower() in store.get('store', '').lower()
-                    or query.upper() in store.get('storeId', '').upper()
-                )
-            ]
+            # An exact store ID goes straight through; otherwise rank by name, suburb, postcode and address
+            exact = self.bot.get_store_by_id(query)
+            if exact and exact.get('state') == self.state:
+                matching_stores = [exact]
+            else:
+                matching_stores = self.bot.store_directory.search(query, self.state)
             
             if not matching_stores:
                 await interaction.response.send_message(
@@ -503,7 +521,8 @@ class StoreSearchModal(discord.ui.Modal, title="Search for a Store"):
         username = interaction.user.display_name
 
         try:
-            embed = self.bot.complete_store_setup(
+            embed = await asyncio.to_thread(
+                self.bot.complete_store_setup,
                 user_id,
                 username,
                 state,
@@ -566,6 +585,172 @@ class BackToStoreSelectionButton(discord.ui.Button):
                 view=None
             )
 
+PRODUCTS_PER_PAGE = 5
+STORES_PER_PAGE = 10
+
+class PageButton(discord.ui.Button):
+    """Previous/next button for a PagedView"""
+    
+    def __init__(self, direction: int):
+        self.direction = direction
+        super().__init__(
+            label="◀ Previous" if direction < 0 else "Next ▶",
+            style=discord.ButtonStyle.secondary
+        )
+    
+    async def callback(self, interaction: discord.Interaction):
+        """Render the neighbouring page in place"""
+        try:
+            embed = await asyncio.to_thread(self.view.turn, self.direction)
+            await interaction.response.edit_message(embed=embed, view=self.view)
+        except Exception as e:
+            print(f"Error changing page: {e}")
+            await interaction.response.send_message(
+                f"{ERROR} Could not load that page. Please try again.",
+                ephemeral=True
+            )
+
+class PagedView(discord.ui.View):
+    """Previous/Next pagination that fetches and renders one page per interaction.
+    
+    Subclasses implement fetch (the items of the neighbouring page in a
+    direction, or the first page for 0) and render (an embed for those
+    items), so only one page is ever loaded or drawn at a time.
+    """
+    
+    def __init__(self, user_id: int, total: int, page_size: int):
+        super().__init__(timeout=300)
+        self.user_id = user_id
+        self.total = total
+        self.page_size = page_size
+        self.page = 0
+        self.previous_button = PageButton(-1)
+        self.next_button = PageButton(1)
+        self.add_item(self.previous_button)
+        self.add_item(self.next_button)
+    
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.total // self.page_size))
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message(
+                f"{ERROR} Only the person who ran this command can change pages.",
+                ephemeral=True
+            )
+            return False
+        return True
+    
+    def first_page(self) -> discord.Embed:
+        return self.turn(0)
+    
+    def turn(self, direction: int) -> discord.Embed:
+        items = self.fetch(direction)
+        if direction and not items:
+            # The list shrank since this page was drawn; start again from the top
+            direction = 0
+            items = self.fetch(0)
+        self.page = 0 if direction == 0 else self.page + direction
+        self.previous_button.disabled = self.page == 0
+        self.next_button.disabled = self.page >= self.page_count - 1 or len(items) < self.page_size
+        return self.render(items)
+    
+    def fetch(self, direction: int) -> list:
+        raise NotImplementedError
+    
+    def render(self, items: list) -> discord.Embed:
+        raise NotImplementedError
+
+class ProductListView(PagedView):
+    """A user's tracked products, one keyset-paginated page at a time"""
+    
+    def __init__(self, bot: 'OfficeworksBot', user_id: int, total: int):
+        super().__init__(user_id, total, PRODUCTS_PER_PAGE)
+        self.bot = bot
+        self.first_id = None
+        self.last_id = None
+    
+    def fetch(self, direction: int) -> list:
+        database = self.bot.database
+        if direction > 0:
+            products = database.get_user_products_page(self.user_id, self.page_size, after_id=self.last_id)
+        elif direction < 0:
+            products = database.get_user_products_page(self.user_id, self.page_size, before_id=self.first_id)
+        else:
+            products = database.get_user_products_page(self.user_id, self.page_size)
+        if products:
+            self.first_id = products[0]['id']
+            self.last_id = products[-1]['id']
+        return products
+    
+    def render(self, products: list) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"{BROWSE} Your Tracked Products",
+            description=f"You're tracking {self.total} product(s)",
+            color=INFO_COLOR
+        )
+        
+        for i, product in enumerate(products, self.page * self.page_size + 1):
+            product_info = f"**{product['product_name'] or 'Unknown Product'}**\n"
+            product_info += f"{STORE_ID} Code: `{product['product_code'].upper()}`\n"
+            
+            # Handle None values for prices
+            current_price = product['current_price'] or 0.0
+            lowest_price = product['lowest_price'] or 0.0
+            product_info += f"{PRICE} Current: ${current_price:.2f}\n"
+            product_info += f"{PRICE_DROP} Lowest: ${lowest_price:.2f}\n"
+            
+            # Handle None value for last_checked
+            if product['last_checked']:
+                product_info += f"{TIME} Last Check: {get_relative_timestamp(product['last_checked'])}"
+            else:
+                product_info += f"{TIME} Last Check: Never"
+            
+            embed.add_field(
+                name=f"{i}. {product['product_code'].upper()}",
+                value=product_info,
+                inline=False
+            )
+        
+        embed.set_footer(text=f"Page {self.page + 1} of {self.page_count} • Use /check to manually check prices")
+        return embed
+
+class StoreListView(PagedView):
+    """A list of stores, rendered one page at a time"""
+    
+    def __init__(self, user_id: int, title: str, stores):
+        super().__init__(user_id, len(stores), STORES_PER_PAGE)
+        self.title = title
+        self.stores = stores  # The directory's tuple is shared, not copied
+    
+    def fetch(self, direction: int) -> list:
+        page = 0 if direction == 0 else self.page + direction
+        start = page * self.page_size
+        return list(self.stores[start:start + self.page_size])
+    
+    def render(self, stores: list) -> discord.Embed:
+        embed = discord.Embed(
+            title=self.title,
+            description=f"Found {self.total} stores",
+            color=INFO_COLOR
+        )
+        
+        for i, store in enumerate(stores, self.page * self.page_size + 1):
+            store_info = f"**{store['store']}**\n"
+            store_info += f"{LOCATION} {store['address']}, {store['suburb']} {store['postcode']}\n"
+            store_info += f"{PHONE} {store['phone']}\n"
+            store_info += f"{STORE_ID} Store ID: `{store['storeId']}`"
+            
+            embed.add_field(
+                name=f"{i}. {store['store']}",
+                value=store_info,
+                inline=False
+            )
+        
+        embed.set_footer(text=f"Page {self.page + 1} of {self.page_count} • Use /setup to configure your preferences")
+        return embed
+
 class PriceCheckView(discord.ui.View):
     """View with Check Competitors button for price check results"""
     
@@ -614,14 +799,16 @@ class CheckCompetitorsButton(discord.ui.Button):
             # Send status message
             status_msg = await interaction.followup.send(
                 f"{PROCESSING} Checking competitor prices for **{self.product_name}**...\n"
-                f"Officeworks price: ${self.officeworks_price:.2f}",
+                f"Officeworks price: ${self.officeworks_price:.2f}"
+                f"{self.bot.get_comparison_budget_note()}",
                 ephemeral=USE_EPHEMERAL_MESSAGES
             )
             
             try:
-                # Perform price comparison
-                comparisons = await price_comparison.search_all_retailers(
-                    self.product_name, self.officeworks_price, max_retailers=3
+                # Perform price comparison, showing results as retailers finish
+                comparisons = await self.bot.run_comparison(
+                    status_msg, self.product_name, self.officeworks_price, max_retailers=3,
+                    product_code=self.product_code, user_id=interaction.user.id, source='check_competitors'
                 )
                 
                 if comparisons:
@@ -694,6 +881,9 @@ class CheckCompetitorsButton(discord.ui.Button):
                     except:
                         pass
                     
+            except ComparisonQuotaError as exc:
+                await status_msg.edit(content=f"{ERROR} {exc}")
+            
             except Exception as e:
                 print(f"Error in competitor price check: {e}")
                 await status_msg.edit(
@@ -736,27 +926,126 @@ class OfficeworksBot(commands.Bot):
         self.database = Database()
         self.api = OfficeworksAPI()
         self.price_checker = PriceChecker(self, self.database, self.api)
+        # Tracked product codes and names per user, for /check and /remove autocomplete
+        self.product_cache = UserProductCache(self.database)
+        self.product_resolver = ProductResolver(self.api, self.database)
+        
+        # Configure price comparison with Firecrawl (or recorded fixtures when offline)
+        if FIRECRAWL_FIXTURES_DIR:
+            print(f"[Firecrawl] Using recorded fixtures from {FIRECRAWL_FIXTURES_DIR}")
+            stub = FirecrawlStub(FIRECRAWL_FIXTURES_DIR)
+            price_comparison.firecrawl_client = stub
+            price_comparison.http_client = stub
+        else:
+            price_comparison.firecrawl_client = firecrawl_integration
+            # Pooled HTTP client for retailers with a direct JSON fast path
+            price_comparison.http_client = PooledHTTPClient()
+        
+        # Track Firecrawl credit spend and enforce budgets/quotas
+        price_comparison.budget = FirecrawlBudget(
+            self.database,
+            daily_budget=FIRECRAWL_DAILY_CREDIT_BUDGET,
+            monthly_budget=FIRECRAWL_MONTHLY_CREDIT_BUDGET,
+            user_daily_quota=COMPARE_USER_DAILY_QUOTA,
+            credit_costs=FIRECRAWL_CREDIT_COSTS
+        )
+        
+        # Learn per retailer whether Extract or scraping works better
+        price_comparison.strategy = RetailerStrategy(self.database)
+        
+        # Retailers are searched in parallel within these limits
+        price_comparison.retailer_timeout = COMPARE_RETAILER_TIMEOUT
+        price_comparison.search_deadline = COMPARE_DEADLINE
+        
+        # Re-price confirmed competitor listings instead of searching for them again
+        price_comparison.mappings = CompetitorMappings(self.database, max_age_days=COMPARE_MAPPING_MAX_AGE_DAYS)
         
-        # Configure price comparison with Firecrawl
-        price_comparison.firecrawl_client = firecrawl_integration
+        # Share recent results between users and collapse identical concurrent searches
+        price_comparison.cache = ComparisonCache(ttl=COMPARE_CACHE_TTL, stale_ttl=COMPARE_CACHE_STALE_TTL)
         
-        # Load stores data
-        self.stores_data = self._load_stores_data()
+        # Retailer definitions live in a data file and are hot-swapped when it changes
+        if RETAILERS_FILE:
+            self.retailer_registry = RetailerRegistry(price_comparison, RETAILERS_FILE)
+            self.retailer_registry.reload()
+        else:
+            self.retailer_registry = RetailerRegistry(price_comparison)
+        self._retailer_watch_task = None
+        
+        # Optional background competitor checks for the most-tracked products
+        self.competitor_tracker = None
+        if COMPETITOR_TRACKING_ENABLED:
+            self.competitor_tracker = CompetitorTracker(
+                self, self.database, price_comparison,
+                interval_minutes=COMPETITOR_TRACKING_INTERVAL_MINUTES,
+                batch_size=COMPETITOR_TRACKING_BATCH_SIZE,
+                budget_share=COMPETITOR_TRACKING_BUDGET_SHARE,
+                max_credits_per_run=COMPETITOR_TRACKING_MAX_CREDITS_PER_RUN
+            )
+        
+        # Load stores data, indexed by ID, state, name and suburb (latest snapshot first)
+        self.store_directory = load_store_directory(STORES_SNAPSHOT_FILE)
+        self.store_refresher = None
+        if STORE_REFRESH_ENABLED:
+            self.store_refresher = StoreRefresher(self, self.api, STORES_SNAPSHOT_FILE, STORE_REFRESH_INTERVAL_HOURS)
+        
+        # Event loop lag sampling, reported by the health check
+        self.loop_monitor = LoopLagMonitor(
+            interval=LOOP_LAG_SAMPLE_INTERVAL,
+            slow_callback=LOOP_SLOW_CALLBACK_MS / 1000,
+            target=LOOP_LAG_TARGET_MS / 1000
+        )
+        self._health_task = None
         
         # Shutdown flag
         self._shutdown_requested = False
 
-    def _load_stores_data(self):
-        """Load stores data from the allstores.md file"""
-        try:
-            with open('responses/allstores.md', 'r', encoding='utf-8') as f:
-                content = f.read()
-                # Parse the JSON content
-                data = json.loads(content)
-                return data
-        except Exception as e:
-            print(f"Warning: Could not load stores data: {e}")
-            return {"states": [], "stores": []}
+    def nearest_stores_response(self, location: str, count: int = 5):
+        """Embed and store picker for the stores nearest a location, or an error message"""
+        resolved = self.store_directory.resolve_location(location)
+        if not resolved:
+            return None, None, (f"Couldn't find '{location}'. Try a postcode (e.g. 3000), a suburb, "
+                                "or coordinates like `-37.81, 144.96`.")
+        nearest = self.store_directory.nearest(resolved.latitude, resolved.longitude, count)
+        if not nearest:
+            return None, None, "Store locations are not available."
+
+        embed = discord.Embed(
+            title=f"{LOCATION} Nearest Officeworks Stores",
+            description=f"Closest to **{resolved.label}**",
+            color=INFO_COLOR
+        )
+        for i, (distance, store) in enumerate(nearest):
+            embed.add_field(
+                name=f"{i+1}. {store['store']} ({distance:.1f} km)",
+                value=f"{store['address']}, {store['suburb']} {store['state']} {store['postcode']}\n"
+                      f"{PHONE} {store['phone']}\n{STORE_ID} Store ID: `{store['storeId']}`",
+                inline=False
+            )
+        embed.set_footer(text="Pick a store below to make it your preferred store")
+        stores = [store for _, store in nearest]
+        return embed, StoreSearchResultsView(self, stores[0]['state'], stores), None
+
+    def store_matches_response(self, query: str, count: int = 5):
+        """Embed and store picker for the best search matches for typed store text, or an error message"""
+        matches = self.store_directory.search(query, limit=count)
+        if not matches:
+            return None, None, (f"No store found matching '{query}'. "
+                                "Run `/setup` without a store to browse by state.")
+
+        embed = discord.Embed(
+            title=f"{SEARCH} Which Store Did You Mean?",
+            description=f"Stores matching **{query}**",
+            color=INFO_COLOR
+        )
+        for i, store in enumerate(matches):
+            embed.add_field(
+                name=f"{i+1}. {store['store']}",
+                value=f"{store['address']}, {store['suburb']} {store['state']} {store['postcode']}\n"
+                      f"{STORE_ID} Store ID: `{store['storeId']}`",
+                inline=False
+            )
+        embed.set_footer(text="Pick a store below to make it your preferred store")
+        return embed, StoreSearchResultsView(self, matches[0]['state'], matches), None
 
     def complete_store_setup(self, user_id: int, username: str, state: str,
                               *, store_info: Optional[dict] = None,
@@ -811,19 +1100,97 @@ class OfficeworksBot(commands.Bot):
         embed.set_footer(text="Use /add to start tracking products")
         return embed
 
+    def start_comparison(self, user_id: int, source: str) -> Optional[str]:
+        """Charge a live comparison to the user's quota, checking and recording it in one transaction.
+
+        Returns an error message when the comparison should not run.
+        """
+        budget = price_comparison.budget
+        if not budget:
+            return None
+
+        allowed, _ = budget.claim_user_comparison(user_id, source)
+        if not allowed:
+            return (f"You've reached your limit of {budget.user_daily_quota} price comparisons for today. "
+                    "Please try again tomorrow.")
+        return None
+
+    def get_comparison_budget_note(self) -> str:
+        """Explain reduced comparison coverage when the Firecrawl budget is nearly spent"""
+        budget = price_comparison.budget
+        if not budget:
+            return ""
+
+        policy = budget.policy()
+        if policy.mode == MODE_NORMAL:
+            return ""
+        if not policy.live_calls:
+            return f"\n{WARNING} Comparison budget used up - live retailer searches are paused."
+        return f"\n{WARNING} Comparison budget nearly used - searching fewer sources to save credits."
+
+    async def run_comparison(self, status_msg, product_name: str, officeworks_price: float,
+                             max_retailers: int = 3,
+                             decorate_embed: Callable[[discord.Embed], None] = None,
+                             product_code: str = None, user_id: int = None, source: str = None) -> List[Dict]:
+        """Search retailers in parallel, editing status_msg with results as each retailer finishes.
+
+        Cached results are returned straight away, and a search already
+        running for the same product is shared rather than repeated. Only a
+        new live search is charged to ``user_id``'s quota; ComparisonQuotaError
+        is raised when it is used up.
+        Returns every comparison found; the caller renders the final message.
+        """
+        retailers, _, _ = price_comparison.plan_retailer_search(max_retailers)
+        cached = price_comparison.get_cached_comparisons(product_name, officeworks_price, retailers, product_code)
+        if cached is not None:
+            return cached
+
+        if user_id is not None and not price_comparison.search_running(product_name, retailers):
+            quota_error = await asyncio.to_thread(self.start_comparison, user_id, source)
+            if quota_error:
+                raise ComparisonQuotaError(quota_error)
+
+        return await price_comparison.search_once(
+            product_name, officeworks_price, retailers,
+            lambda: self._stream_comparison(status_msg, product_name, officeworks_price, retailers,
+                                            decorate_embed, product_code)
+        )
+
+    async def _stream_comparison(self, status_msg, product_name: str, officeworks_price: float,
+                                 retailers: List, decorate_embed: Callable[[discord.Embed], None] = None,
+                                 product_code: str = None) -> List[Dict]:
+        pending = [retailer.name for retailer in retailers]
+        comparisons = []
+
+        async for retailer_name, result in price_comparison.iter_retailer_results(
+            product_name, officeworks_price, len(retailers), retailers=retailers, product_code=product_code
+        ):
+            pending.remove(retailer_name)
+            if result:
+                comparisons.append(result)
+            if not result or not pending:
+                continue
+
+            # Show what we have so far while slower retailers are still searching
+            embed = price_comparison.create_comparison_embed(
+                product_name, officeworks_price, comparisons, pending_retailers=pending
+            )
+            if decorate_embed:
+                decorate_embed(embed)
+            try:
+                await status_msg.edit(content=None, embed=embed)
+            except discord.HTTPException as e:
+                print(f"Error updating comparison progress: {e}")
+
+        return comparisons
+
     def get_stores_by_state(self, state: str):
         """Get all stores for a specific state"""
-        if not self.stores_data or "stores" not in self.stores_data:
-            return []
-        
-        return [store for store in self.stores_data["stores"] if store["state"] == state]
+        return self.store_directory.in_state(state)
     
     def get_store_by_id(self, store_id: str):
         """Get a specific store by its ID"""
-        if not self.stores_data or "stores" not in self.stores_data:
-            return None
-        
-        return next((store for store in self.stores_data["stores"] if store["storeId"] == store_id), None)
+        return self.store_directory.get(store_id)
 
     
     async def setup_hook(self):
@@ -835,8 +1202,19 @@ class OfficeworksBot(commands.Bot):
         await self.add_cog(ProductCommands(self))
         await self.add_cog(UtilityCommands(self))
         
+        # Load tracked products for autocomplete before commands arrive
+        await asyncio.to_thread(self.product_cache.warm)
+        
         # Start price checker
         self.price_checker.start()
+        if self.competitor_tracker:
+            self.competitor_tracker.start()
+        if self.store_refresher:
+            self.store_refresher.start()
+        
+        # Watch the retailer definitions file for edits
+        if RETAILERS_WATCH_INTERVAL > 0:
+            self._retailer_watch_task = asyncio.create_task(self.retailer_registry.watch(RETAILERS_WATCH_INTERVAL))
         
         print("Bot setup complete!")
     
@@ -852,11 +1230,13 @@ class OfficeworksBot(commands.Bot):
         except Exception as e:
             print(f"Failed to sync commands: {e}")
         
-        # Start health check task
-        asyncio.create_task(self._health_check())
+        # Start health check task (on_ready runs again after every reconnect)
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_check())
     
     async def _health_check(self):
         """Periodic health check to ensure bot is running properly"""
+        self.loop_monitor.start()
         while not self._shutdown_requested:
             try:
                 await asyncio.sleep(300)  # Check every 5 minutes
@@ -864,6 +1244,13 @@ class OfficeworksBot(commands.Bot):
                     print(f"{SUCCESS} Health check: Bot is healthy at {datetime.now(timezone.utc).strftime('%H:%M:%S')}")
                 else:
                     print(f"{WARNING}  Health check: Bot is not ready")
+                
+                # Event loop lag over the last 5 minutes
+                window = self.loop_monitor.take_window()
+                buckets = ', '.join(f"{label}: {count}" for label, count in window.buckets())
+                print(f"{TIME} Event loop lag: {window.describe()} ({buckets or 'no samples'})")
+                if not self.loop_monitor.within_target(window):
+                    print(f"{WARNING}  Event loop p99 lag is above the {LOOP_LAG_TARGET_MS:g}ms target")
             except Exception as e:
                 print(f"{ERROR} Health check error: {e}")
                 break
@@ -886,6 +1273,23 @@ class OfficeworksBot(commands.Bot):
             self.price_checker.stop()
             print("Price checker stopped")
         
+        if getattr(self, 'competitor_tracker', None) and self.competitor_tracker.is_running:
+            self.competitor_tracker.stop()
+        
+        if getattr(self, 'store_refresher', None) and self.store_refresher.is_running:
+            self.store_refresher.stop()
+        
+        if getattr(self, '_retailer_watch_task', None):
+            self._retailer_watch_task.cancel()
+        
+        if getattr(self, 'loop_monitor', None):
+            self.loop_monitor.stop()
+        if getattr(self, '_health_task', None):
+            self._health_task.cancel()
+        
+        # Close pooled retailer HTTP connections
+        await price_comparison.close()
+        
         # Close database connections
         if hasattr(self, 'database'):
             # SQLite connections are automatically closed, but we can add cleanup here if needed
@@ -899,9 +1303,46 @@ class SetupCommands(commands.Cog):
         self.bot = bot
     
     @app_commands.command(name="setup", description="Set up your Officeworks store preferences")
-    async def setup(self, interaction: discord.Interaction):
+    @app_commands.describe(
+        store="Start typing a store name, suburb, postcode or ID to pick it directly",
+        near="Or a postcode, suburb or coordinates to choose from the nearest stores"
+    )
+    async def setup(self, interaction: discord.Interaction, store: str = None, near: str = None):
         """Set up your preferred Officeworks store location"""
         try:
+            if near and not store:
+                embed, view, error = self.bot.nearest_stores_response(near)
+                if error:
+                    await interaction.response.send_message(f"{ERROR} {error}", ephemeral=USE_EPHEMERAL_MESSAGES)
+                    return
+                await interaction.response.send_message(embed=embed, view=view, ephemeral=USE_EPHEMERAL_MESSAGES)
+                return
+            
+            if store:
+                # Autocomplete fills in a store ID; typed text is only a search, so the user picks from the matches
+                store_info = self.bot.get_store_by_id(store)
+                if not store_info:
+                    embed, view, error = self.bot.store_matches_response(store)
+                    if error:
+                        await interaction.response.send_message(f"{ERROR} {error}", ephemeral=USE_EPHEMERAL_MESSAGES)
+                        return
+                    await interaction.response.send_message(embed=embed, view=view, ephemeral=USE_EPHEMERAL_MESSAGES)
+                    return
+                try:
+                    embed = await asyncio.to_thread(
+                        self.bot.complete_store_setup,
+                        interaction.user.id,
+                        interaction.user.display_name,
+                        store_info['state'],
+                        store_info=store_info,
+                        store_id=store_info['storeId']
+                    )
+                except StoreSetupError as exc:
+                    await interaction.response.send_message(f"{ERROR} {exc}", ephemeral=USE_EPHEMERAL_MESSAGES)
+                    return
+                await interaction.response.send_message(embed=embed, ephemeral=USE_EPHEMERAL_MESSAGES)
+                return
+            
             # Create state selection view
             view = StateSelectionView(self.bot)
             await interaction.response.send_message(
@@ -917,9 +1358,38 @@ class SetupCommands(commands.Cog):
                 ephemeral=USE_EPHEMERAL_MESSAGES
             )
     
+    @setup.autocomplete('store')
+    async def setup_store_autocomplete(self, interaction: discord.Interaction, current: str):
+        return store_choices(self.bot.store_directory, current)
+    
+    @app_commands.command(name="nearest", description="Find the Officeworks stores closest to you")
+    @app_commands.describe(
+        location="Postcode (e.g. 3000), suburb, or coordinates like -37.81, 144.96",
+        count="How many stores to show (1-10)"
+    )
+    async def nearest_stores(self, interaction: discord.Interaction, location: str,
+                             count: app_commands.Range[int, 1, 10] = 5):
+        """List the stores nearest a postcode, suburb or coordinates"""
+        try:
+            await interaction.response.defer(ephemeral=USE_EPHEMERAL_MESSAGES)
+            embed, view, error = self.bot.nearest_stores_response(location, count)
+            if error:
+                await interaction.followup.send(f"{ERROR} {error}", ephemeral=USE_EPHEMERAL_MESSAGES)
+                return
+            await interaction.followup.send(embed=embed, view=view, ephemeral=USE_EPHEMERAL_MESSAGES)
+        except Exception as e:
+            print(f"Error in nearest command: {e}")
+            await interaction.followup.send(
+                f"{ERROR} An error occurred while finding nearby stores. Please try again.",
+                ephemeral=USE_EPHEMERAL_MESSAGES
+            )
+    
     @app_commands.command(name="stores", description="List available stores in your state")
-    @app_commands.describe(state="Your state (e.g., VIC, NSW, QLD)")
-    async def list_stores(self, interaction: discord.Interaction, state: str):
+    @app_commands.describe(
+        state="Your state (e.g., VIC, NSW, QLD)",
+        search="Optional store name, suburb, postcode or ID to narrow the list"
+    )
+    async def list_stores(self, interaction: discord.Interaction, state: str, search: str = None):
         """List available Officeworks stores in a specific state"""
         try:
             await interaction.response.defer(ephemeral=USE_EPHEMERAL_MESSAGES)
@@ -932,51 +1402,30 @@ class SetupCommands(commands.Cog):
                 )
                 return
             
-            stores = self.bot.get_stores_by_state(state.upper())
+            if search:
+                exact = self.bot.get_store_by_id(search)
+                stores = [exact] if exact and exact['state'] == state.upper() else \
+                    self.bot.store_directory.search(search, state.upper())
+            else:
+                stores = self.bot.get_stores_by_state(state.upper())
             if not stores:
+                matching = f" matching '{search}'" if search else ""
                 await interaction.followup.send(
-                    f"{ERROR} No stores found in {state.upper()}.",
+                    f"{ERROR} No stores found{matching} in {state.upper()}.",
                     ephemeral=USE_EPHEMERAL_MESSAGES
                 )
                 return
             
-            # Create embed with store list
-            embed = discord.Embed(
-                title=f"{STORE} Officeworks Stores in {STATE_NAMES.get(state.upper(), state.upper())}",
-                description=f"Found {len(stores)} stores",
-                color=INFO_COLOR
-            )
-            
-            # Show first 10 stores (Discord embed limit)
-            for i, store in enumerate(stores[:10]):
-                store_info = f"**{store['store']}**\n"
-                store_info += f"{LOCATION} {store['address']}, {store['suburb']} {store['postcode']}\n"
-                store_info += f"{PHONE} {store['phone']}\n"
-                store_info += f"{STORE_ID} Store ID: `{store['storeId']}`"
-                
-                embed.add_field(
-                    name=f"{i+1}. {store['store']}",
-                    value=store_info,
-                    inline=False
-                )
-            
-            if len(stores) > 10:
-                embed.add_field(
-                    name="Note",
-                    value=f"Showing first 10 stores. Total: {len(stores)} stores",
-                    inline=False
-                )
-            
-            embed.set_footer(text="Use /setup to configure your preferences")
-            
-            # Add last updated timestamp
-            embed.add_field(
-                name="Last Updated",
-                value=get_relative_timestamp(datetime.now(timezone.utc)),
-                inline=False
+            view = StoreListView(
+                interaction.user.id,
+                f"{STORE} Officeworks Stores in {STATE_NAMES.get(state.upper(), state.upper())}",
+                stores
             )
-            
-            await interaction.followup.send(embed=embed, ephemeral=USE_EPHEMERAL_MESSAGES)
+            embed = view.first_page()
+            if view.page_count > 1:
+                await interaction.followup.send(embed=embed, view=view, ephemeral=USE_EPHEMERAL_MESSAGES)
+            else:
+                await interaction.followup.send(embed=embed, ephemeral=USE_EPHEMERAL_MESSAGES)
             
         except Exception as e:
             print(f"Error in stores command: {e}")
@@ -985,30 +1434,30 @@ class SetupCommands(commands.Cog):
                 ephemeral=USE_EPHEMERAL_MESSAGES
             )
     
+    @list_stores.autocomplete('search')
+    async def list_stores_search_autocomplete(self, interaction: discord.Interaction, current: str):
+        state = (interaction.namespace.state or '').upper()
+        return store_choices(self.bot.store_directory, current, state if state in AUSTRALIAN_STATES else None)
+    
     @app_commands.command(name="storestats", description="Show store statistics for all states")
     async def store_stats(self, interaction: discord.Interaction):
         """Show statistics about Officeworks stores across all states"""
         try:
             await interaction.response.defer(ephemeral=USE_EPHEMERAL_MESSAGES)
             
-            if not self.bot.stores_data or "stores" not in self.bot.stores_data:
+            directory = self.bot.store_directory
+            if not directory:
                 await interaction.followup.send(
                     f"{ERROR} Store data not available.",
                     ephemeral=USE_EPHEMERAL_MESSAGES
                 )
                 return
             
-            stores = self.bot.stores_data["stores"]
-            
-            # Count stores by state
-            state_counts = {}
-            for store in stores:
-                state = store['state']
-                state_counts[state] = state_counts.get(state, 0) + 1
+            state_counts = directory.state_counts()
             
             embed = discord.Embed(
                 title=f"{STATISTICS} Officeworks Store Statistics",
-                description=f"Total stores: **{len(stores)}**",
+                description=f"Total stores: **{len(directory)}**",
                 color=INFO_COLOR
             )
             
@@ -1057,7 +1506,7 @@ class ProductCommands(commands.Cog):
             user_id = interaction.user.id
             
             # Check if user is set up
-            user = self.bot.database.get_user(user_id)
+            user = await asyncio.to_thread(self.bot.database.get_user, user_id)
             if not user:
                 await interaction.followup.send(
                     f"{ERROR} Please set up your store preferences first using `/setup`",
@@ -1065,64 +1514,74 @@ class ProductCommands(commands.Cog):
                 )
                 return
             
-            # Get product code
-            if url:
-                if not self.bot.api.validate_product_url(url):
-                    await interaction.followup.send(
-                        f"{ERROR} Invalid Officeworks product URL. Please provide a valid URL.",
-                        ephemeral=USE_EPHEMERAL_MESSAGES
-                    )
-                    return
-                
-                product_info = self.bot.api.get_product_by_url(url)
-                if not product_info:
-                    await interaction.followup.send(
-                        f"{ERROR} Could not retrieve product information from the URL.",
-                        ephemeral=USE_EPHEMERAL_MESSAGES
-                    )
-                    return
-                
-                product_code = self.bot.api.extract_product_code(url)
-            elif product_code:
-                product_info = self.bot.api.get_product_info(product_code)
-                if not product_info:
-                    await interaction.followup.send(
-                        f"{ERROR} Invalid product code. Please check and try again.",
-                        ephemeral=USE_EPHEMERAL_MESSAGES
-                    )
-                    return
-            else:
+            if not url and not product_code:
                 await interaction.followup.send(
                     f"{ERROR} Please provide either a URL or product code.",
                     ephemeral=USE_EPHEMERAL_MESSAGES
                 )
                 return
             
-            # Check if product is already tracked
-            user_products = self.bot.database.get_user_products(user_id)
-            if any(p['product_code'].lower() == product_code.lower() for p in user_products):
+            # Parse the code offline; URLs resolved before come from the database
+            resolver = self.bot.product_resolver
+            product_code, known = await asyncio.to_thread(resolver.parse, url, product_code)
+            if not product_code:
+                await interaction.followup.send(
+                    f"{ERROR} Invalid Officeworks product URL. Please provide a valid URL." if url
+                    else f"{ERROR} Invalid product code. Please check and try again.",
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+                return
+            
+            # Already tracked products need no lookup at all
+            await self.bot.product_cache.load_user(user_id)
+            if self.bot.product_cache.has(user_id, product_code):
                 await interaction.followup.send(
                     f"{ERROR} Product **{product_code.upper()}** is already being tracked.",
                     ephemeral=USE_EPHEMERAL_MESSAGES
                 )
                 return
             
-            # Add product to database
-            if self.bot.database.add_product(
+            product_info = await resolver.fetch(product_code)
+            if not product_info and known:
+                # A URL that resolved before is still valid; the next price check fills in the price
+                product_info = {'name': known['product_name'], 'url': known['product_url'], 'price': None}
+            if not product_info:
+                await interaction.followup.send(
+                    f"{ERROR} Could not retrieve product information from the URL." if url
+                    else f"{ERROR} Invalid product code. Please check and try again.",
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+                return
+            if url and not known:
+                await asyncio.to_thread(resolver.remember, url, product_code, product_info)
+            
+            # One atomic insert, reactivation or duplicate check
+            outcome = await asyncio.to_thread(
+                self.bot.database.upsert_product,
                 user_id=user_id,
                 product_code=product_code,
                 product_name=product_info.get('name'),
                 product_url=product_info.get('url'),
                 current_price=product_info.get('price')
-            ):
+            )
+            if outcome == PRODUCT_ALREADY_TRACKED:
+                await interaction.followup.send(
+                    f"{ERROR} Product **{product_code.upper()}** is already being tracked.",
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+            elif outcome:
+                self.bot.product_cache.product_added(user_id, product_code, product_info.get('name'))
+                added = outcome == PRODUCT_ADDED
+                price = product_info.get('price')
                 embed = discord.Embed(
-                    title=f"{SUCCESS} Product Added!",
-                    description=f"**{product_info.get('name', 'Unknown Product')}** has been added to your tracking list.",
+                    title=f"{SUCCESS} Product Added!" if added else f"{SUCCESS} Tracking Again!",
+                    description=f"**{product_info.get('name') or 'Unknown Product'}** has been "
+                                f"{'added to' if added else 'put back on'} your tracking list.",
                     color=SUCCESS_COLOR
                 )
                 
                 embed.add_field(name="Product Code", value=product_code.upper(), inline=True)
-                embed.add_field(name="Current Price", value=f"${product_info.get('price', 0):.2f}", inline=True)
+                embed.add_field(name="Current Price", value=f"${price:.2f}" if price is not None else "Checking soon", inline=True)
                 embed.add_field(name=f"Status", value="{PROCESSING} Monitoring for price drops", inline=True)
                 embed.add_field(name="Added", value=get_full_timestamp(datetime.now(timezone.utc)), inline=False)
                 
@@ -1145,53 +1604,254 @@ class ProductCommands(commands.Cog):
                 ephemeral=USE_EPHEMERAL_MESSAGES
             )
     
-    @app_commands.command(name="list", description="List your tracked products")
-    async def list_products(self, interaction: discord.Interaction):
-        """List all products you're currently tracking"""
+    @app_commands.command(name="addmany", description="Add several products to track at once")
+    @app_commands.describe(
+        products="Officeworks product URLs or codes, separated by spaces, commas or new lines",
+        file="Or attach a text or CSV file of URLs or codes"
+    )
+    async def add_many_products(self, interaction: discord.Interaction, products: str = None,
+                                file: discord.Attachment = None):
+        """Add up to BULK_ADD_MAX_PRODUCTS products in one go"""
         try:
             await interaction.response.defer(ephemeral=USE_EPHEMERAL_MESSAGES)
             
             user_id = interaction.user.id
-            products = self.bot.database.get_user_products(user_id)
             
-            if not products:
+            # Check if user is set up
+            user = await asyncio.to_thread(self.bot.database.get_user, user_id)
+            if not user:
                 await interaction.followup.send(
-                    f"{SORT} You're not tracking any products yet.\n\nUse `/add` to add your first product!",
+                    f"{ERROR} Please set up your store preferences first using `/setup`",
                     ephemeral=USE_EPHEMERAL_MESSAGES
                 )
                 return
             
+            entries = parse_bulk_text(products)
+            if file:
+                if file.size > BULK_ADD_MAX_FILE_BYTES:
+                    await interaction.followup.send(
+                        f"{ERROR} That file is too large. Please attach a file under {BULK_ADD_MAX_FILE_BYTES // 1024} KB.",
+                        ephemeral=USE_EPHEMERAL_MESSAGES
+                    )
+                    return
+                try:
+                    content = (await file.read()).decode('utf-8-sig')
+                except UnicodeDecodeError:
+                    await interaction.followup.send(
+                        f"{ERROR} Could not read that file. Please attach a plain text or CSV file.",
+                        ephemeral=USE_EPHEMERAL_MESSAGES
+                    )
+                    return
+                if file.filename.lower().endswith('.csv'):
+                    entries += parse_bulk_csv(content)
+                else:
+                    entries += parse_bulk_text(content)
+            
+            if not entries:
+                await interaction.followup.send(
+                    f"{ERROR} Please provide product URLs or codes, or attach a file of them.",
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+                return
+            
+            await self.bot.product_cache.load_user(user_id)
+            tracked = {code.lower() for code, _ in self.bot.product_cache.codes(user_id)}
+            result = await bulk_add_products(
+                self.bot.database, self.bot.api, user_id, entries,
+                tracked=tracked, limit=BULK_ADD_MAX_PRODUCTS, concurrency=BULK_ADD_CONCURRENCY
+            )
+            for product in result.added + result.reactivated:
+                self.bot.product_cache.product_added(user_id, product['product_code'], product['product_name'])
+            
+            saved = len(result.added) + len(result.reactivated)
             embed = discord.Embed(
-                title=f"{BROWSE} Your Tracked Products",
-                description=f"You're tracking {len(products)} product(s)",
-                color=INFO_COLOR
+                title=f"{SUCCESS} Products Added" if saved else f"{WARNING} No Products Added",
+                description=f"Added **{saved}** product{'s' if saved != 1 else ''} to your tracking list.",
+                color=SUCCESS_COLOR if saved else WARNING_COLOR
             )
             
-            for i, product in enumerate(products, 1):
-                product_info = f"**{product['product_name'] or 'Unknown Product'}**\n"
-                product_info += f"{STORE_ID} Code: `{product['product_code'].upper()}`\n"
-                
-                # Handle None values for prices
-                current_price = product['current_price'] or 0.0
-                lowest_price = product['lowest_price'] or 0.0
-                product_info += f"{PRICE} Current: ${current_price:.2f}\n"
-                product_info += f"{PRICE_DROP} Lowest: ${lowest_price:.2f}\n"
-                
-                # Handle None value for last_checked
-                if product['last_checked']:
-                    product_info += f"{TIME} Last Check: {get_relative_timestamp(product['last_checked'])}"
-                else:
-                    product_info += f"{TIME} Last Check: Never"
-                
+            def field_value(lines: List[str]) -> str:
+                value = "\n".join(lines)
+                return value if len(value) <= 1024 else value[:1020].rsplit("\n", 1)[0] + "\n..."
+            
+            def product_line(product: Dict) -> str:
+                price = product.get('current_price')
+                price_text = f" - ${price:.2f}" if price is not None else ""
+                return f"**{product['product_code'].upper()}** {product.get('product_name') or 'Unknown Product'}{price_text}"
+            
+            if result.added:
+                embed.add_field(name="Added", value=field_value([product_line(p) for p in result.added]), inline=False)
+            if result.reactivated:
+                embed.add_field(name="Tracking Again", value=field_value([product_line(p) for p in result.reactivated]), inline=False)
+            if result.already_tracked:
+                embed.add_field(name="Already Tracked", value=field_value([code.upper() for code in result.already_tracked]), inline=False)
+            if result.not_found:
+                embed.add_field(name="Not Found", value=field_value([code.upper() for code in result.not_found]), inline=False)
+            if result.invalid:
+                embed.add_field(name="Not a Product URL or Code", value=field_value([f"`{entry[:100]}`" for entry in result.invalid]), inline=False)
+            if result.skipped:
                 embed.add_field(
-                    name=f"{i}. {product['product_code'].upper()}",
-                    value=product_info,
+                    name=f"Skipped (limit of {BULK_ADD_MAX_PRODUCTS} per request)",
+                    value=field_value([code.upper() for code in result.skipped]),
                     inline=False
                 )
             
-            embed.set_footer(text="Use /check to manually check prices")
+            embed.set_footer(text="You'll be notified of any price drops!")
+            await interaction.followup.send(embed=embed, ephemeral=USE_EPHEMERAL_MESSAGES)
+            
+        except Exception as e:
+            print(f"Error in add_many_products command: {e}")
+            await interaction.followup.send(
+                f"{ERROR} An error occurred while adding the products. Please try again.",
+                ephemeral=USE_EPHEMERAL_MESSAGES
+            )
+    
+    @app_commands.command(name="export", description="Download your watchlist, price history and notifications")
+    @app_commands.describe(format="File format (JSON lines keeps every field; CSV opens in a spreadsheet)")
+    @app_commands.choices(format=[
+        app_commands.Choice(name="JSON lines", value="jsonl"),
+        app_commands.Choice(name="CSV", value="csv")
+    ])
+    async def export_products(self, interaction: discord.Interaction, format: str = "jsonl"):
+        """Export everything tracked for the user as a file"""
+        try:
+            await interaction.response.defer(ephemeral=USE_EPHEMERAL_MESSAGES)
+            
+            user_id = interaction.user.id
+            export_file, counts, size = await asyncio.to_thread(export_to_file, self.bot.database, format, user_id)
+            
+            if not counts['product']:
+                export_file.close()
+                await interaction.followup.send(
+                    f"{SORT} You're not tracking any products yet.\n\nUse `/add` to add your first product!",
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+                return
+            
+            limit = interaction.guild.filesize_limit if interaction.guild else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+            if size > limit:
+                export_file.close()
+                await interaction.followup.send(
+                    f"{ERROR} Your export is too large to upload here ({size // 1024} KB). Please ask an admin to export it for you.",
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+                return
+            
+            embed = discord.Embed(
+                title=f"{SUCCESS} Watchlist Exported",
+                description="Use `/import` with this file to restore it later.",
+                color=SUCCESS_COLOR
+            )
+            embed.add_field(name="Products", value=str(counts['product']), inline=True)
+            embed.add_field(name="Price History", value=str(counts['price']), inline=True)
+            embed.add_field(name="Notifications", value=str(counts['notification']), inline=True)
+            
+            filename = f"watchlist-{datetime.now(timezone.utc).strftime('%Y%m%d')}.{format}"
+            with export_file:
+                await interaction.followup.send(
+                    embed=embed,
+                    file=discord.File(export_file, filename=filename),
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+        
+        except Exception as e:
+            print(f"Error in export_products command: {e}")
+            await interaction.followup.send(
+                f"{ERROR} An error occurred while exporting your watchlist. Please try again.",
+                ephemeral=USE_EPHEMERAL_MESSAGES
+            )
+    
+    @app_commands.command(name="import", description="Restore a watchlist from an /export file")
+    @app_commands.describe(file="A JSON lines or CSV file from /export")
+    async def import_products(self, interaction: discord.Interaction, file: discord.Attachment):
+        """Import products, price history and notifications into the user's watchlist"""
+        try:
+            await interaction.response.defer(ephemeral=USE_EPHEMERAL_MESSAGES)
+            
+            user_id = interaction.user.id
+            
+            # Check if user is set up
+            user = await asyncio.to_thread(self.bot.database.get_user, user_id)
+            if not user:
+                await interaction.followup.send(
+                    f"{ERROR} Please set up your store preferences first using `/setup`",
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+                return
+            
+            if file.size > WATCHLIST_IMPORT_MAX_BYTES:
+                await interaction.followup.send(
+                    f"{ERROR} That file is too large. Please attach a file under {WATCHLIST_IMPORT_MAX_BYTES // 1024} KB.",
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+                return
+            try:
+                content = (await file.read()).decode('utf-8-sig')
+            except UnicodeDecodeError:
+                await interaction.followup.send(
+                    f"{ERROR} Could not read that file. Please attach a file from `/export`.",
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+                return
+            
+            records = read_records(io.StringIO(content, newline=''), export_format_for(file.filename))
+            result = await import_watchlist(
+                self.bot.database, self.bot.api, records, user_id=user_id,
+                concurrency=BULK_ADD_CONCURRENCY, max_products=WATCHLIST_IMPORT_MAX_PRODUCTS
+            )
+            self.bot.product_cache.invalidate(user_id)
+            
+            imported = result.products + result.prices + result.notifications
+            embed = discord.Embed(
+                title=f"{SUCCESS} Watchlist Imported" if imported else f"{WARNING} Nothing New to Import",
+                description="Products you already track were left as they are.",
+                color=SUCCESS_COLOR if imported else WARNING_COLOR
+            )
+            embed.add_field(name="Products", value=str(result.products), inline=True)
+            embed.add_field(name="Price History", value=str(result.prices), inline=True)
+            embed.add_field(name="Notifications", value=str(result.notifications), inline=True)
+            if result.not_found:
+                not_found = ", ".join(code.upper() for code in result.not_found)
+                embed.add_field(name="Not Found", value=not_found if len(not_found) <= 1024 else not_found[:1020] + "...", inline=False)
+            if result.invalid:
+                embed.add_field(name="Unreadable Records", value=str(result.invalid), inline=True)
+            if result.skipped:
+                embed.add_field(name=f"Skipped (limit of {WATCHLIST_IMPORT_MAX_PRODUCTS} products)", value=str(result.skipped), inline=True)
+            if result.failed_batches:
+                embed.add_field(name=f"{ERROR} Failed", value="Part of the file could not be saved. Please try again.", inline=False)
             
             await interaction.followup.send(embed=embed, ephemeral=USE_EPHEMERAL_MESSAGES)
+        
+        except Exception as e:
+            print(f"Error in import_products command: {e}")
+            await interaction.followup.send(
+                f"{ERROR} An error occurred while importing your watchlist. Please try again.",
+                ephemeral=USE_EPHEMERAL_MESSAGES
+            )
+
+    @app_commands.command(name="list", description="List your tracked products")
+    async def list_products(self, interaction: discord.Interaction):
+        """List all products you're currently tracking"""
+        try:
+            await interaction.response.defer(ephemeral=USE_EPHEMERAL_MESSAGES)
+            
+            user_id = interaction.user.id
+            total = await asyncio.to_thread(self.bot.database.count_user_products, user_id)
+            
+            if not total:
+                await interaction.followup.send(
+                    f"{SORT} You're not tracking any products yet.\n\nUse `/add` to add your first product!",
+                    ephemeral=USE_EPHEMERAL_MESSAGES
+                )
+                return
+            
+            # Only the first page is loaded; the buttons fetch the others on demand
+            view = ProductListView(self.bot, user_id, total)
+            embed = await asyncio.to_thread(view.first_page)
+            if view.page_count > 1:
+                await interaction.followup.send(embed=embed, view=view, ephemeral=USE_EPHEMERAL_MESSAGES)
+            else:
+                await interaction.followup.send(embed=embed, ephemeral=USE_EPHEMERAL_MESSAGES)
             
         except Exception as e:
             print(f"Error in list_products command: {e}")
@@ -1210,8 +1870,7 @@ class ProductCommands(commands.Cog):
             user_id = interaction.user.id
             
             # Check if product is tracked
-            user_products = self.bot.database.get_user_products(user_id)
-            tracked_product = next((p for p in user_products if p['product_code'].lower() == product_code.lower()), None)
+            tracked_product = await asyncio.to_thread(self.bot.database.get_user_product, user_id, product_code)
             
             if not tracked_product:
                 await interaction.followup.send(
@@ -1288,6 +1947,18 @@ class ProductCommands(commands.Cog):
                 ephemeral=USE_EPHEMERAL_MESSAGES
             )
     
+    @check_price.autocomplete('product_code')
+    async def check_product_autocomplete(self, interaction: discord.Interaction, current: str):
+        return await self.tracked_product_choices(interaction.user.id, current)
+    
+    async def tracked_product_choices(self, user_id: int, current: str) -> List[app_commands.Choice[str]]:
+        """Autocomplete choices from the user's tracked products (served from memory, not SQLite)"""
+        await self.bot.product_cache.load_user(user_id)
+        return [
+            app_commands.Choice(name=f"{code.upper()} - {name or 'Unknown Product'}"[:100], value=code)
+            for code, name in self.bot.product_cache.suggest(user_id, current)
+        ]
+    
     @app_commands.command(name="remove", description="Remove a product from tracking")
     @app_commands.describe(product_code="Product code to remove")
     async def remove_product(self, interaction: discord.Interaction, product_code: str):
@@ -1296,8 +1967,7 @@ class ProductCommands(commands.Cog):
             user_id = interaction.user.id
             
             # Check if product is tracked
-            user_products = self.bot.database.get_user_products(user_id)
-            tracked_product = next((p for p in user_products if p['product_code'].lower() == product_code.lower()), None)
+            tracked_product = await asyncio.to_thread(self.bot.database.get_user_product, user_id, product_code)
             
             if not tracked_product:
                 await interaction.response.send_message(
@@ -1307,7 +1977,8 @@ class ProductCommands(commands.Cog):
                 return
             
             # Remove product
-            if self.bot.database.remove_product(user_id, product_code):
+            if await asyncio.to_thread(self.bot.database.remove_product, user_id, product_code):
+                self.bot.product_cache.product_removed(user_id, product_code)
                 embed = discord.Embed(
                     title=f"{SUCCESS} Product Removed",
                     description=f"**{tracked_product['product_name'] or 'Unknown Product'}** has been removed from tracking.",
@@ -1334,6 +2005,10 @@ class ProductCommands(commands.Cog):
                 ephemeral=USE_EPHEMERAL_MESSAGES
             )
     
+    @remove_product.autocomplete('product_code')
+    async def remove_product_autocomplete(self, interaction: discord.Interaction, current: str):
+        return await self.tracked_product_choices(interaction.user.id, current)
+    
     @app_commands.command(name="compare", description="Compare prices across multiple retailers")
     @app_commands.describe(
         search_query="Product name or description to search for across retailers",
@@ -1345,15 +2020,17 @@ class ProductCommands(commands.Cog):
             await interaction.response.defer(ephemeral=USE_EPHEMERAL_MESSAGES)
             
             # If no Officeworks price provided, try to get it from the API
+            product_code = None
             if officeworks_price is None:
                 try:
                     # Try to extract product code from search query if it looks like one
                     potential_code = search_query.strip().lower()
                     if len(potential_code) <= 15 and not ' ' in potential_code:
-                        product_info = self.bot.api.get_product_info(potential_code)
+                        product_info = await asyncio.to_thread(self.bot.api.get_product_info, potential_code)
                         if product_info and product_info.get('price'):
                             officeworks_price = product_info['price']
                             search_query = product_info.get('name', search_query)
+                            product_code = potential_code
                 except Exception:
                     pass  # Continue with manual search
             
@@ -1366,28 +2043,37 @@ class ProductCommands(commands.Cog):
             
             # Send initial status message
             status_msg = await interaction.followup.send(
-                f"{PROCESSING} Searching retailers for **{search_query}**...\n{price_note}",
+                f"{PROCESSING} Searching retailers for **{search_query}**...\n{price_note}"
+                f"{self.bot.get_comparison_budget_note()}",
                 ephemeral=USE_EPHEMERAL_MESSAGES
             )
             
-            # Perform price comparison across retailers
-            comparisons = await price_comparison.search_all_retailers(
-                search_query, officeworks_price, max_retailers=3
-            )
+            def without_officeworks_price(embed: discord.Embed):
+                # If no officeworks price was provided, update the embed
+                if officeworks_price == 999999.99:
+                    embed.title = f"{COMPARE} Retailer Price Search Results"
+                    embed.description = f"Found prices for **{search_query}** across retailers"
+                    # Remove the Officeworks field since we don't have a real price
+                    if embed.fields and embed.fields[0].name.startswith(f"{STORE}"):
+                        embed.remove_field(0)
+            
+            # Perform price comparison across retailers, showing results as they arrive
+            try:
+                comparisons = await self.bot.run_comparison(
+                    status_msg, search_query, officeworks_price, max_retailers=3,
+                    decorate_embed=without_officeworks_price, product_code=product_code,
+                    user_id=interaction.user.id, source='compare'
+                )
+            except ComparisonQuotaError as exc:
+                await status_msg.edit(content=f"{ERROR} {exc}")
+                return
             
             if comparisons:
                 # Create price comparison embed
                 comparison_embed = price_comparison.create_comparison_embed(
                     search_query, officeworks_price, comparisons
                 )
-                
-                # If no officeworks price was provided, update the embed
-                if officeworks_price == 999999.99:
-                    comparison_embed.title = f"{COMPARE} Retailer Price Search Results"
-                    comparison_embed.description = f"Found prices for **{search_query}** across retailers"
-                    # Remove the Officeworks field since we don't have a real price
-                    if comparison_embed.fields and comparison_embed.fields[0].name.startswith(f"{STORE}"):
-                        comparison_embed.remove_field(0)
+                without_officeworks_price(comparison_embed)
                 
                 # Edit the status message with results
                 await status_msg.edit(content=None, embed=comparison_embed)
@@ -1443,8 +2129,8 @@ class UtilityCommands(commands.Cog):
             await interaction.response.defer(ephemeral=USE_EPHEMERAL_MESSAGES)
             
             user_id = interaction.user.id
-            user = self.bot.database.get_user(user_id)
-            user_products = self.bot.database.get_user_products(user_id)
+            user = await asyncio.to_thread(self.bot.database.get_user, user_id)
+            tracked_count = await asyncio.to_thread(self.bot.database.count_user_products, user_id)
             
             embed = discord.Embed(
                 title=f"{BOT} Bot Status",
@@ -1475,6 +2161,47 @@ class UtilityCommands(commands.Cog):
                     inline=True
                 )
             
+            # Firecrawl credit usage
+            budget = price_comparison.budget
+            if budget:
+                embed.add_field(
+                    name="Comparison Credits",
+                    value=budget.describe_usage(),
+                    inline=False
+                )
+            
+            cache = price_comparison.cache
+            if cache:
+                cache_stats = cache.stats()
+                embed.add_field(
+                    name="Comparison Cache",
+                    value=f"{cache_stats['entries']} cached, {cache_stats['hits'] + cache_stats['stale_hits']} hits, "
+                          f"{cache_stats['shared_searches']} shared searches",
+                    inline=False
+                )
+            
+            tracker = self.bot.competitor_tracker
+            if tracker:
+                embed.add_field(
+                    name="Competitor Tracking",
+                    value=tracker.describe(),
+                    inline=False
+                )
+            
+            if self.bot.store_refresher:
+                embed.add_field(
+                    name="Store List",
+                    value=self.bot.store_refresher.describe(),
+                    inline=False
+                )
+            
+            if self.bot.loop_monitor.is_running:
+                embed.add_field(
+                    name="Event Loop Lag",
+                    value=self.bot.loop_monitor.describe(),
+                    inline=False
+                )
+            
             # User status
             if user:
                 embed.add_field(
@@ -1484,7 +2211,7 @@ class UtilityCommands(commands.Cog):
                 )
                 embed.add_field(
                     name="Tracked Products",
-                    value=len(user_products),
+                    value=tracked_count,
                     inline=True
                 )
                 
@@ -1494,6 +2221,14 @@ class UtilityCommands(commands.Cog):
                         value=user['preferred_store_id'],
                         inline=True
                     )
+                
+                if budget and budget.user_daily_quota:
+                    _, remaining = await asyncio.to_thread(budget.check_user_quota, user_id)
+                    embed.add_field(
+                        name="Comparisons Left Today",
+                        value=f"{remaining}/{budget.user_daily_quota}",
+                        inline=True
+                    )
             else:
                 embed.add_field(
                     name="Your Status",
@@ -1519,6 +2254,29 @@ class UtilityCommands(commands.Cog):
                 ephemeral=USE_EPHEMERAL_MESSAGES
             )
     
+    @app_commands.command(name="reloadretailers", description="Reload retailer definitions from the data file (admin)")
+    @app_commands.default_permissions(administrator=True)
+    async def reload_retailers(self, interaction: discord.Interaction):
+        """Hot-swap the retailer registry without restarting the bot"""
+        try:
+            await interaction.response.defer(ephemeral=True)
+            
+            success, message = await asyncio.to_thread(self.bot.retailer_registry.reload)
+            embed = discord.Embed(
+                title=f"{SUCCESS} Retailers Reloaded" if success else f"{ERROR} Reload Rejected",
+                description=message[:4000] if success else
+                            f"The current retailers are unchanged.\n```{message[:3900]}```",
+                color=SUCCESS_COLOR if success else ERROR_COLOR
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            
+        except Exception as e:
+            print(f"Error in reloadretailers command: {e}")
+            await interaction.followup.send(
+                f"{ERROR} An error occurred while reloading retailers. Please try again.",
+                ephemeral=True
+            )
+    
     @app_commands.command(name="help", description="Show help information")
     async def help_command(self, interaction: discord.Interaction):
         """Show help information for all commands"""
@@ -1534,6 +2292,7 @@ class UtilityCommands(commands.Cog):
                 name=f"{FILTER} Setup Commands",
                 value="`/setup` - Set your preferred store location\n"
                       "`/stores` - List available stores in a state\n"
+                      "`/nearest` - Find the stores closest to a postcode or suburb\n"
                       "`/storestats` - Show store statistics across all states",
                 inline=False
             )
@@ -1542,10 +2301,12 @@ class UtilityCommands(commands.Cog):
             embed.add_field(
                 name=f"{PRODUCT} Product Commands",
                 value="`/add` - Add a product to track\n"
+                      "`/addmany` - Add several products at once (or attach a file)\n"
                       "`/list` - List your tracked products\n"
                       "`/check` - Check product price (with 'Check Competitors' button)\n"
                       "`/remove` - Remove a product from tracking\n"
-                      "`/compare` - Compare prices across retailers",
+                      "`/compare` - Compare prices across retailers\n"
+                      "`/export` / `/import` - Back up or restore your watchlist",
                 inline=False
             )
             
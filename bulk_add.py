@@ -0,0 +1,106 @@
+import asyncio
+import csv
+import io
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from database import PRODUCT_ADDED, PRODUCT_ALREADY_TRACKED, PRODUCT_REACTIVATED, Database
+from officeworks_api import OfficeworksAPI
+
+PRODUCT_URL_PREFIX = 'https://www.officeworks.com.au/shop/officeworks/p/'
+PRODUCT_CODE_PATTERN = re.compile(r'^[A-Za-z0-9]{2,30}$')
+ENTRY_SEPARATOR_PATTERN = re.compile(r'[\s,;]+')
+CSV_CODE_COLUMNS = ('url', 'product_url', 'product_code', 'code')
+
+class BulkAddResult(NamedTuple):
+    """What happened to each entry of a bulk add"""
+    added: List[Dict]
+    reactivated: List[Dict]
+    already_tracked: List[str]
+    not_found: List[str]
+    invalid: List[str]
+    skipped: List[str]  # Valid entries over the per-request limit
+
+def entry_to_code(entry: str, api: OfficeworksAPI) -> Optional[str]:
+    """Product code from an Officeworks product URL or a bare code, without any network call"""
+    entry = entry.strip().strip('<>"\'')
+    if entry.lower().startswith(('http://', 'https://')):
+        url = entry.split('?')[0].split('#')[0]
+        if not url.startswith(PRODUCT_URL_PREFIX):
+            return None
+        code = api.extract_product_code(url)
+        return code if code and PRODUCT_CODE_PATTERN.match(code) else None
+    return entry.lower() if PRODUCT_CODE_PATTERN.match(entry) else None
+
+def parse_bulk_text(text: str) -> List[str]:
+    """Entries separated by whitespace, commas or semicolons"""
+    return [entry for entry in ENTRY_SEPARATOR_PATTERN.split(text or '') if entry]
+
+def parse_bulk_csv(text: str) -> List[str]:
+    """The URL/code column of a CSV file (a url/product_code/code header, else the first column)"""
+    rows = [row for row in csv.reader(io.StringIO(text or '')) if any(cell.strip() for cell in row)]
+    if not rows:
+        return []
+    header = [cell.strip().lower() for cell in rows[0]]
+    column = next((header.index(name) for name in CSV_CODE_COLUMNS if name in header), None)
+    if column is None:
+        column = 0
+    else:
+        rows = rows[1:]
+    return [row[column].strip() for row in rows if len(row) > column and row[column].strip()]
+
+def collect_codes(entries: Iterable[str], api: OfficeworksAPI, limit: int) -> Tuple[List[str], List[str], List[str]]:
+    """(codes to add, invalid entries, codes over the limit), with duplicates dropped in order"""
+    codes, invalid, skipped = [], [], []
+    seen: Set[str] = set()
+    for entry in entries:
+        code = entry_to_code(entry, api)
+        if code is None:
+            invalid.append(entry)
+        elif code not in seen:
+            seen.add(code)
+            (codes if len(codes) < limit else skipped).append(code)
+    return codes, invalid, skipped
+
+async def resolve_products(api: OfficeworksAPI, codes: List[str], concurrency: int = 5) -> Dict[str, Optional[Dict]]:
+    """Fetch product info for each code once, at most ``concurrency`` requests at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve(code: str) -> Optional[Dict]:
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(api.get_product_info, code)
+            except Exception as e:
+                print(f"Error resolving product {code}: {e}")
+                return None
+
+    results = await asyncio.gather(*(resolve(code) for code in codes))
+    return dict(zip(codes, results))
+
+async def bulk_add_products(database: Database, api: OfficeworksAPI, user_id: int, entries: Iterable[str],
+                            tracked: Set[str] = frozenset(), limit: int = 25,
+                            concurrency: int = 5) -> BulkAddResult:
+    """Resolve entries concurrently and add every product found in one transaction.
+
+    Codes in ``tracked`` (lowercase) are reported as already tracked
+    without fetching them.
+    """
+    codes, invalid, skipped = collect_codes(entries, api, limit)
+    already_tracked = [code for code in codes if code in tracked]
+    to_fetch = [code for code in codes if code not in tracked]
+
+    resolved = await resolve_products(api, to_fetch, concurrency)
+    not_found = [code for code in to_fetch if not resolved[code]]
+    products = [{
+        'product_code': code,
+        'product_name': info.get('name'),
+        'product_url': info.get('url'),
+        'current_price': info.get('price'),
+    } for code, info in resolved.items() if info]
+
+    outcomes = await asyncio.to_thread(database.add_products, user_id, products) if products else {}
+    if products and not outcomes:
+        raise RuntimeError("Could not save the products. Please try again.")
+    added = [p for p in products if outcomes.get(p['product_code']) == PRODUCT_ADDED]
+    reactivated = [p for p in products if outcomes.get(p['product_code']) == PRODUCT_REACTIVATED]
+    already_tracked += [p['product_code'] for p in products if outcomes.get(p['product_code']) == PRODUCT_ALREADY_TRACKED]
+    return BulkAddResult(added, reactivated, already_tracked, not_found, invalid, skipped)
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+CacheKey = Tuple[str, Tuple[str, ...]]
+
+class CacheEntry:
+    """Comparison results for one query and retailer set"""
+    def __init__(self, results: List[Dict], stored_at: float, fetched_at: datetime):
+        self.results = results
+        self.stored_at = stored_at  # Monotonic clock, for expiry
+        self.fetched_at = fetched_at  # Wall clock, for display
+
+class ComparisonCache:
+    """In-memory cache of price comparison results shared by every user.
+
+    Entries are fresh for ``ttl`` seconds. For ``stale_ttl`` seconds after
+    that they are still served straight away while a background refresh
+    replaces them (stale-while-revalidate). Concurrent searches for the same
+    key share one in-flight search (single-flight). Expired entries are kept
+    until evicted so they can still be served when live searches are paused
+    by the Firecrawl budget.
+    """
+
+    def __init__(self, ttl: float = 900, stale_ttl: float = 3600, max_entries: int = 256,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self._background = set()  # Keep references so refresh tasks are not garbage collected
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.shared_searches = 0
+
+    @staticmethod
+    def make_key(query: str, retailer_names: Iterable[str]) -> CacheKey:
+        return query.strip().lower(), tuple(sorted(retailer_names))
+
+    def _age(self, entry: CacheEntry) -> float:
+        return self.clock() - entry.stored_at
+
+    def get(self, key: CacheKey) -> Tuple[Optional[CacheEntry], bool]:
+        """Return (entry, fresh) for a key; entry is None on a miss or once past the stale window"""
+        entry = self._entries.get(key)
+        if entry is None or self._age(entry) > self.ttl + self.stale_ttl:
+            self.misses += 1
+            return None, False
+        self._entries.move_to_end(key)
+        fresh = self._age(entry) <= self.ttl
+        if fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry, fresh
+
+    def get_latest(self, query: str) -> Optional[CacheEntry]:
+        """Most recent entry for a query with any retailer set, however old"""
+        query = query.strip().lower()
+        entries = [entry for key, entry in self._entries.items() if key[0] == query]
+        return max(entries, key=lambda entry: entry.stored_at, default=None)
+
+    def put(self, key: CacheKey, results: List[Dict]):
+        # Empty results are not cached: they may be timeouts rather than "not sold here"
+        if not results:
+            return
+        self._entries[key] = CacheEntry(list(results), self.clock(), datetime.now(timezone.utc))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: CacheKey = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def in_flight(self, key: CacheKey) -> bool:
+        return key in self._inflight
+
+    async def run_once(self, key: CacheKey, fetch: Callable[[], Awaitable[List[Dict]]]) -> List[Dict]:
+        """Run ``fetch`` for a key unless the same search is already running, and cache its results.
+
+        Callers arriving while a search is in flight wait for that search
+        instead of starting their own. A caller being cancelled does not
+        cancel the shared search.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared_searches += 1
+        else:
+            task = self._start(key, fetch)
+        return await asyncio.shield(task)
+
+    def _start(self, key: CacheKey, fetch) -> asyncio.Future:
+        task = asyncio.ensure_future(fetch())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    def _finish(self, key: CacheKey, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            # A failed refresh leaves the stale entry in place
+            print(f"[Compare Cache] Search for '{key[0]}' failed: {task.exception()}")
+            return
+        self.put(key, task.result())
+
+    def revalidate(self, key: CacheKey, fetch: Callable[[], Awaitable[List[Dict]]]) -> bool:
+        """Refresh a key in the background; returns False if a search for it is already running"""
+        if key in self._inflight:
+            return False
+        task = self._start(key, fetch)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'shared_searches': self.shared_searches,
+            'in_flight': len(self._inflight),
+        }
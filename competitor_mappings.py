@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+class CompetitorMappings:
+    """Confirmed Officeworks product -> competitor listing links, persisted in the database.
+
+    A confident search match for an Officeworks product code is remembered
+    so later comparisons can re-price that exact listing instead of
+    searching and fuzzy matching again. Mappings older than ``max_age``
+    are treated as missing (the search runs and re-confirms them), a 404
+    drops the mapping straight away, and other failures drop it after
+    ``max_failures`` in a row.
+    """
+
+    def __init__(self, database, min_score: float = 0.6, max_age_days: float = 14, max_failures: int = 3):
+        self.database = database
+        self.min_score = min_score
+        self.max_age = timedelta(days=max_age_days)
+        self.max_failures = max_failures
+
+    @staticmethod
+    def _parse_time(value) -> Optional[datetime]:
+        if isinstance(value, datetime):
+            parsed = value
+        elif value:
+            try:
+                parsed = datetime.fromisoformat(str(value))
+            except ValueError:
+                return None
+        else:
+            return None
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    def get(self, product_code: str, retailer: str) -> Optional[Dict]:
+        """The mapping to re-price, or None when there is none or it is stale"""
+        if not self.database or not product_code:
+            return None
+        mapping = self.database.get_competitor_mapping(product_code, retailer)
+        if not mapping:
+            return None
+        verified_at = self._parse_time(mapping.get('verified_at'))
+        if not verified_at or datetime.now(timezone.utc) - verified_at > self.max_age:
+            print(f"[Mapping] {product_code} at {retailer} is stale, searching again")
+            return None
+        return mapping
+
+    def confirm(self, product_code: str, retailer: str, url: str, matched_title: str,
+                match_score: Optional[float], price: float) -> bool:
+        """Store a search match for a product when it is confident enough"""
+        if not self.database or not product_code or not url or match_score is None:
+            return False
+        if match_score < self.min_score:
+            return False
+        return self.database.save_competitor_mapping(product_code, retailer, url, matched_title, match_score, price)
+
+    def repriced(self, product_code: str, retailer: str, price: float):
+        if self.database:
+            self.database.touch_competitor_mapping(product_code, retailer, price)
+
+    def drop(self, product_code: str, retailer: str, reason: str):
+        if self.database:
+            print(f"[Mapping] Dropping {product_code} at {retailer}: {reason}")
+            self.database.delete_competitor_mapping(product_code, retailer)
+
+    def failed(self, product_code: str, retailer: str, reason: str):
+        """Count a failed re-price, dropping the mapping once it keeps failing"""
+        if not self.database:
+            return
+        failures = self.database.record_competitor_mapping_failure(product_code, retailer)
+        if failures >= self.max_failures:
+            self.drop(product_code, retailer, f"{failures} failed re-prices ({reason})")
+        else:
+            print(f"[Mapping] Re-price of {product_code} at {retailer} failed ({reason}), searching instead")
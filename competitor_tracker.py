@@ -0,0 +1,188 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from database import Database
+from colors import *
+from emojis import *
+import discord
+
+class CompetitorTracker:
+    """Scheduled competitor price checks for the most-tracked products.
+
+    Each run takes a batch of product codes ordered by subscriber count
+    (least recently checked first on ties), compares them one at a time
+    and stores the prices in ``competitor_prices``. Subscribers get a DM
+    when a rival newly undercuts Officeworks. Runs only spend Firecrawl
+    credits while budget usage is below ``budget_share``, leaving the rest
+    for interactive comparisons, and stop once a run has spent
+    ``max_credits_per_run``.
+    """
+
+    def __init__(self, bot: discord.Client, database: Database, comparison, interval_minutes: int = 360,
+                 batch_size: int = 5, budget_share: float = 0.5, max_credits_per_run: int = 25,
+                 recheck_hours: float = 24, delay: float = 10, max_retailers: int = 3):
+        self.bot = bot
+        self.database = database
+        self.comparison = comparison
+        self.interval_minutes = interval_minutes
+        self.batch_size = batch_size
+        self.budget_share = budget_share
+        self.max_credits_per_run = max_credits_per_run
+        self.recheck_after = timedelta(hours=recheck_hours)
+        self.delay = delay  # Seconds between products, on top of the Firecrawl client's own rate limit
+        self.max_retailers = max_retailers
+        self.scheduler = AsyncIOScheduler()
+        self.is_running = False
+        self.last_run: Optional[datetime] = None
+        self.products_checked = 0
+        self.alerts_sent = 0
+
+    def start(self):
+        """Start the competitor tracking scheduler"""
+        if not self.is_running:
+            self.scheduler.add_job(
+                self.refresh_batch,
+                IntervalTrigger(minutes=self.interval_minutes),
+                id='competitor_check',
+                replace_existing=True
+            )
+            self.scheduler.start()
+            self.is_running = True
+            print(f"Competitor tracker started (every {self.interval_minutes} minutes)")
+
+    def stop(self):
+        """Stop the competitor tracking scheduler"""
+        if self.is_running:
+            self.scheduler.shutdown()
+            self.is_running = False
+            print("Competitor tracker stopped")
+
+    def _budget_allows(self, spent: int) -> bool:
+        """Whether the run may check another product without eating into interactive credits"""
+        budget = self.comparison.budget
+        if not budget:
+            return True
+        if spent >= self.max_credits_per_run:
+            print(f"[Competitor Tracker] Run credit cap reached ({spent}/{self.max_credits_per_run})")
+            return False
+        if budget.usage_ratio() >= self.budget_share:
+            print(f"[Competitor Tracker] Budget {budget.usage_ratio():.0%} used, leaving the rest for users")
+            return False
+        return True
+
+    def _credits_spent(self) -> int:
+        budget = self.comparison.budget
+        return budget.monthly_spent if budget else 0
+
+    async def refresh_batch(self) -> int:
+        """Check competitor prices for the next batch of products; returns how many were checked"""
+        checked = 0
+        try:
+            print(f"Starting competitor check at {datetime.now(timezone.utc)}")
+            checked_before = datetime.now(timezone.utc) - self.recheck_after
+            products = await asyncio.to_thread(self.database.get_most_tracked_products, self.batch_size, checked_before)
+            if not products:
+                print("No tracked products due for a competitor check")
+                return 0
+
+            spent_at_start = self._credits_spent()
+            for product in products:
+                if not self._budget_allows(self._credits_spent() - spent_at_start):
+                    break
+                if checked:
+                    await asyncio.sleep(self.delay)
+                await self.check_product(product)
+                checked += 1
+
+            print(f"Competitor check completed: {checked}/{len(products)} products, "
+                  f"{self._credits_spent() - spent_at_start} credits")
+        except Exception as e:
+            print(f"Error in competitor check: {e}")
+        finally:
+            self.last_run = datetime.now(timezone.utc)
+            self.products_checked += checked
+        return checked
+
+    async def check_product(self, product: Dict) -> List[Dict]:
+        """Compare one product, store the prices and alert subscribers about new undercuts"""
+        product_code = product['product_code']
+        officeworks_price = product['current_price']
+        try:
+            print(f"[Competitor Tracker] Checking {product_code} ({product['subscribers']} subscribers)")
+            previous = await asyncio.to_thread(self.database.get_latest_competitor_prices, product_code)
+            results = await self.comparison.refresh_comparisons(
+                product['product_name'], officeworks_price, self.max_retailers, product_code=product_code
+            )
+            # Saved even when nothing matched, so the product waits its turn instead of being picked every run
+            await asyncio.to_thread(self.database.save_competitor_prices, product_code, officeworks_price, results)
+            if not results:
+                return []
+
+            undercuts = [result for result in results if self._is_new_undercut(result, previous.get(result['retailer']))]
+            if undercuts:
+                await self.send_undercut_alerts(product, undercuts)
+            return results
+        except Exception as e:
+            print(f"Error checking competitors for {product_code}: {e}")
+            return []
+
+    @staticmethod
+    def _is_new_undercut(result: Dict, previous: Optional[Dict]) -> bool:
+        """A cheaper rival price that subscribers have not already been told about"""
+        if not result.get('price_match_eligible'):
+            return False
+        if not previous or previous['officeworks_price'] is None:
+            return True
+        was_undercut = previous['price'] < previous['officeworks_price'] - 0.01
+        return not was_undercut or result['price'] < previous['price'] - 0.01
+
+    async def send_undercut_alerts(self, product: Dict, undercuts: List[Dict]):
+        """DM every subscriber of a product about rivals selling it for less"""
+        embed = self._build_undercut_embed(product, undercuts)
+        subscribers = await asyncio.to_thread(self.database.get_product_subscribers, product['product_code'])
+        for subscriber in subscribers:
+            user_id = subscriber['user_id']
+            user = self.bot.get_user(user_id)
+            if not user:
+                print(f"Could not find user {user_id} for competitor alert")
+                continue
+            try:
+                await user.send(embed=embed)
+                self.alerts_sent += 1
+                print(f"Competitor alert for {product['product_code']} sent to user {user_id}")
+            except discord.Forbidden:
+                print(f"Cannot send DM to user {user_id} - DMs may be disabled")
+            except Exception as e:
+                print(f"Error sending competitor alert to user {user_id}: {e}")
+
+    def _build_undercut_embed(self, product: Dict, undercuts: List[Dict]) -> discord.Embed:
+        officeworks_price = product['current_price']
+        embed = discord.Embed(
+            title=f"{PRICE_MATCH} Price Match Opportunity",
+            description=f"**{product['product_name']}** ({product['product_code'].upper()}) is cheaper elsewhere",
+            color=SUCCESS_COLOR,
+            timestamp=datetime.now(timezone.utc)
+        )
+        embed.add_field(name="Officeworks", value=f"${officeworks_price:.2f}", inline=False)
+        for result in sorted(undercuts, key=lambda r: r['price'])[:4]:
+            embed.add_field(
+                name=result['retailer'],
+                value=f"[${result['price']:.2f}]({result['url']})\nSave ${result['potential_savings']:.2f}",
+                inline=True
+            )
+        cheapest = min(undercuts, key=lambda r: r['price'])
+        embed.add_field(
+            name="Price Match",
+            value=f"Show the **{cheapest['retailer']}** price to Officeworks to ask for a price match.",
+            inline=False
+        )
+        embed.set_footer(text="Officeworks Price Tracker • Competitor check")
+        return embed
+
+    def describe(self) -> str:
+        """One-line summary for /status"""
+        last_run = self.last_run.strftime('%Y-%m-%d %H:%M UTC') if self.last_run else "not yet run"
+        return (f"Every {self.interval_minutes} min, {self.batch_size} per run; "
+                f"{self.products_checked} checked, {self.alerts_sent} alerts; last run {last_run}")
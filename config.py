@@ -13,6 +13,54 @@ if not BOT_TOKEN:
 FIRECRAWL_API_KEY = os.getenv('FIRECRAWL_API_KEY')
 # Note: Firecrawl API key is optional - price comparison will work with mock data if not provided
 
+# Serve recorded Firecrawl responses from this directory instead of calling the API
+# (offline development and benchmarking, see firecrawl_stub.py)
+FIRECRAWL_FIXTURES_DIR = os.getenv('FIRECRAWL_FIXTURES_DIR')
+
+# Firecrawl credit budgets (0 disables a limit)
+FIRECRAWL_DAILY_CREDIT_BUDGET = int(os.getenv('FIRECRAWL_DAILY_CREDIT_BUDGET', '200'))
+FIRECRAWL_MONTHLY_CREDIT_BUDGET = int(os.getenv('FIRECRAWL_MONTHLY_CREDIT_BUDGET', '3000'))
+# Credits charged per call type; extract is billed well above a plain scrape
+FIRECRAWL_CREDIT_COSTS = {
+    'scrape': int(os.getenv('FIRECRAWL_SCRAPE_CREDITS', '1')),
+    'extract': int(os.getenv('FIRECRAWL_EXTRACT_CREDITS', '5')),
+}
+# Comparisons (/compare and Check Competitors) each user may run per day
+COMPARE_USER_DAILY_QUOTA = int(os.getenv('COMPARE_USER_DAILY_QUOTA', '20'))
+# Seconds allowed per retailer search, and for a whole comparison across retailers
+COMPARE_RETAILER_TIMEOUT = float(os.getenv('COMPARE_RETAILER_TIMEOUT', '45'))
+COMPARE_DEADLINE = float(os.getenv('COMPARE_DEADLINE', '60'))
+# Seconds comparison results are reused, and how much longer stale results are shown while refreshing
+COMPARE_CACHE_TTL = float(os.getenv('COMPARE_CACHE_TTL', '900'))
+COMPARE_CACHE_STALE_TTL = float(os.getenv('COMPARE_CACHE_STALE_TTL', '3600'))
+# Days a confirmed competitor listing is re-priced directly before it is searched for again
+COMPARE_MAPPING_MAX_AGE_DAYS = float(os.getenv('COMPARE_MAPPING_MAX_AGE_DAYS', '14'))
+# Background competitor checks for the most-tracked products (off by default, spends Firecrawl credits)
+COMPETITOR_TRACKING_ENABLED = os.getenv('COMPETITOR_TRACKING_ENABLED', 'false').lower() == 'true'
+COMPETITOR_TRACKING_INTERVAL_MINUTES = int(os.getenv('COMPETITOR_TRACKING_INTERVAL_MINUTES', '360'))
+COMPETITOR_TRACKING_BATCH_SIZE = int(os.getenv('COMPETITOR_TRACKING_BATCH_SIZE', '5'))
+# Background checks pause once this share of the credit budget is used, and stop a run after this many credits
+COMPETITOR_TRACKING_BUDGET_SHARE = float(os.getenv('COMPETITOR_TRACKING_BUDGET_SHARE', '0.5'))
+COMPETITOR_TRACKING_MAX_CREDITS_PER_RUN = int(os.getenv('COMPETITOR_TRACKING_MAX_CREDITS_PER_RUN', '25'))
+# Retailer definitions (search URLs, selectors, thresholds); reloaded when the file changes
+RETAILERS_FILE = os.getenv('RETAILERS_FILE')
+RETAILERS_WATCH_INTERVAL = float(os.getenv('RETAILERS_WATCH_INTERVAL', '30'))  # Seconds, 0 disables the watcher
+# Store list refresh from the Officeworks API; the snapshot is loaded at startup instead of responses/allstores.md
+STORE_REFRESH_ENABLED = os.getenv('STORE_REFRESH_ENABLED', 'true').lower() == 'true'
+STORE_REFRESH_INTERVAL_HOURS = float(os.getenv('STORE_REFRESH_INTERVAL_HOURS', '24'))
+STORES_SNAPSHOT_FILE = os.getenv('STORES_SNAPSHOT_FILE', 'stores_snapshot.json')
+# /addmany limits: products per request, concurrent product lookups and attachment size in bytes
+BULK_ADD_MAX_PRODUCTS = int(os.getenv('BULK_ADD_MAX_PRODUCTS', '25'))
+BULK_ADD_CONCURRENCY = int(os.getenv('BULK_ADD_CONCURRENCY', '5'))
+BULK_ADD_MAX_FILE_BYTES = int(os.getenv('BULK_ADD_MAX_FILE_BYTES', '65536'))
+# /import limits: attachment size in bytes and distinct products per file
+WATCHLIST_IMPORT_MAX_BYTES = int(os.getenv('WATCHLIST_IMPORT_MAX_BYTES', '1048576'))
+WATCHLIST_IMPORT_MAX_PRODUCTS = int(os.getenv('WATCHLIST_IMPORT_MAX_PRODUCTS', '500'))
+# Event loop lag monitor: sampling interval (seconds), p99 lag target and the stall logged with a stack (ms)
+LOOP_LAG_SAMPLE_INTERVAL = float(os.getenv('LOOP_LAG_SAMPLE_INTERVAL', '0.5'))
+LOOP_LAG_TARGET_MS = float(os.getenv('LOOP_LAG_TARGET_MS', '100'))
+LOOP_SLOW_CALLBACK_MS = float(os.getenv('LOOP_SLOW_CALLBACK_MS', '250'))
+
 # Message Configuration
 USE_EPHEMERAL_MESSAGES = os.getenv('USE_EPHEMERAL_MESSAGES', 'true').lower() == 'true'
 
@@ -1,12 +1,17 @@
 import sqlite3
 import json
 from datetime import datetime, timezone
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 from config import DATABASE_PATH
 
+# Outcomes of adding a product to a user's watchlist
+PRODUCT_ADDED = 'added'
+PRODUCT_REACTIVATED = 'reactivated'
+PRODUCT_ALREADY_TRACKED = 'already_tracked'
+
 class Database:
-    def __init__(self):
-        self.db_path = DATABASE_PATH
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DATABASE_PATH
         print(f"Initializing database at: {self.db_path}")
         self.init_database()
     
@@ -81,6 +86,11 @@ class Database:
                         UNIQUE(user_id, product_code)
                     )
                 ''')
+                # Keyset pagination of a user's active products by id
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_products_user_active
+                    ON products (user_id, is_active, id)
+                ''')
                 print("Products table created/verified")
                 
                 # Price history table - stores price changes
@@ -110,6 +120,113 @@ class Database:
                 ''')
                 print("Notifications table created/verified")
                 
+                # Firecrawl usage table - one row per charged scrape/extract call
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS firecrawl_usage (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        kind TEXT NOT NULL,
+                        credits INTEGER NOT NULL,
+                        retailer TEXT,
+                        created_at TIMESTAMP NOT NULL
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_firecrawl_usage_created_at
+                    ON firecrawl_usage (created_at)
+                ''')
+                print("Firecrawl usage table created/verified")
+                
+                # Comparison requests table - per-user quota tracking for /compare and Check Competitors
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS comparison_requests (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER NOT NULL,
+                        source TEXT NOT NULL,
+                        created_at TIMESTAMP NOT NULL
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_comparison_requests_user
+                    ON comparison_requests (user_id, created_at)
+                ''')
+                print("Comparison requests table created/verified")
+                
+                # Retailer method stats table - learned extract/scrape performance per retailer
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS retailer_method_stats (
+                        retailer TEXT NOT NULL,
+                        method TEXT NOT NULL,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        success_rate REAL NOT NULL DEFAULT 0,
+                        avg_latency REAL NOT NULL DEFAULT 0,
+                        updated_at TIMESTAMP,
+                        PRIMARY KEY (retailer, method)
+                    )
+                ''')
+                print("Retailer method stats table created/verified")
+                
+                # Competitor mappings table - confirmed competitor listing for an Officeworks product
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS competitor_mappings (
+                        product_code TEXT NOT NULL,
+                        retailer TEXT NOT NULL,
+                        url TEXT NOT NULL,
+                        matched_title TEXT NOT NULL,
+                        match_score REAL NOT NULL,
+                        last_price REAL,
+                        failures INTEGER NOT NULL DEFAULT 0,
+                        verified_at TIMESTAMP,
+                        PRIMARY KEY (product_code, retailer)
+                    )
+                ''')
+                print("Competitor mappings table created/verified")
+                
+                # Competitor prices table - background competitor checks for tracked products
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS competitor_prices (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        product_code TEXT NOT NULL,
+                        retailer TEXT NOT NULL,
+                        product_name TEXT,
+                        price REAL NOT NULL,
+                        url TEXT,
+                        officeworks_price REAL,
+                        checked_at TIMESTAMP NOT NULL
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_competitor_prices_code
+                    ON competitor_prices (product_code, checked_at)
+                ''')
+                print("Competitor prices table created/verified")
+                
+                # Competitor checks table - when each product was last compared, even if no rival matched
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS competitor_checks (
+                        product_code TEXT PRIMARY KEY,
+                        results INTEGER NOT NULL DEFAULT 0,
+                        checked_at TIMESTAMP NOT NULL
+                    )
+                ''')
+                cursor.execute('''
+                    INSERT OR IGNORE INTO competitor_checks (product_code, results, checked_at)
+                    SELECT product_code, COUNT(DISTINCT retailer), MAX(checked_at)
+                    FROM competitor_prices GROUP BY product_code
+                ''')
+                print("Competitor checks table created/verified")
+                
+                # Product URLs table - pasted product URLs already resolved to a product code
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS product_urls (
+                        url TEXT PRIMARY KEY,
+                        product_code TEXT NOT NULL,
+                        product_name TEXT,
+                        product_url TEXT,
+                        resolved_at TIMESTAMP NOT NULL
+                    )
+                ''')
+                print("Product URLs table created/verified")
+                
                 conn.commit()
                 print("Database initialization completed successfully")
                 
@@ -194,60 +311,124 @@ class Database:
             traceback.print_exc()
             return None
     
-    def add_product(self, user_id: int, product_code: str, product_name: str = None, 
+    def add_product(self, user_id: int, product_code: str, product_name: str = None,
                    product_url: str = None, current_price: float = None) -> bool:
-        """Add a new product to track"""
+        """Add a new product to track, or reactivate one that was removed"""
+        outcome = self.upsert_product(user_id, product_code, product_name, product_url, current_price)
+        return outcome in (PRODUCT_ADDED, PRODUCT_REACTIVATED)
+    
+    def _upsert_product(self, cursor, user_id: int, product: Dict, current_time: datetime) -> str:
+        """Insert, reactivate or leave one product inside the caller's transaction; returns the outcome"""
+        cursor.execute('''
+            SELECT id, is_active FROM products
+            WHERE user_id = ? AND product_code = ? COLLATE NOCASE
+        ''', (user_id, product['product_code']))
+        row = cursor.fetchone()
+        if row and row[1]:
+            return PRODUCT_ALREADY_TRACKED
+        values = (product.get('product_name'), product.get('product_url'),
+                  product.get('current_price'), product.get('current_price'), current_time)
+        if row:
+            cursor.execute('''
+                UPDATE products
+                SET product_name = ?, product_url = ?, current_price = ?, lowest_price = ?,
+                    last_checked = ?, is_active = 1
+                WHERE id = ?
+            ''', values + (row[0],))
+            return PRODUCT_REACTIVATED
+        cursor.execute('''
+            INSERT INTO products
+            (user_id, product_code, product_name, product_url, current_price, lowest_price, last_checked)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (user_id, product['product_code']) + values)
+        return PRODUCT_ADDED
+    
+    def upsert_product(self, user_id: int, product_code: str, product_name: str = None,
+                       product_url: str = None, current_price: float = None) -> Optional[str]:
+        """Track a product in one atomic step.
+        
+        Returns PRODUCT_ADDED, PRODUCT_REACTIVATED (a removed product tracked
+        again) or PRODUCT_ALREADY_TRACKED, or None on error. The write lock is
+        taken before the lookup, so two adds of the same product cannot race.
+        """
         try:
-            print(f"Adding product {product_code} for user {user_id}")
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
-                
-                # Check if product already exists (regardless of active status)
-                if self.product_exists(user_id, product_code):
-                    print(f"Product {product_code} already exists for user {user_id}, checking if inactive...")
-                    
-                    # Check if the product is inactive and reactivate it
-                    cursor.execute('''
-                        SELECT id, is_active FROM products 
-                        WHERE user_id = ? AND LOWER(product_code) = LOWER(?)
-                    ''', (user_id, product_code))
-                    row = cursor.fetchone()
-                    
-                    if row and not row[1]:  # Product exists but is inactive
-                        product_id = row[0]
-                        current_time = datetime.now(timezone.utc)
-                        
-                        # Reactivate the product and update its information
-                        cursor.execute('''
-                            UPDATE products 
-                            SET product_name = ?, product_url = ?, current_price = ?, lowest_price = ?, 
-                                last_checked = ?, is_active = 1
-                            WHERE id = ?
-                        ''', (product_name, product_url, current_price, current_price, current_time, product_id))
-                        
-                        conn.commit()
-                        print(f"Successfully reactivated product {product_code} for user {user_id}")
-                        return True
-                    else:
-                        print(f"Product {product_code} is already active for user {user_id}")
-                        return False
-                
-                # Product doesn't exist, add new one
-                current_time = datetime.now(timezone.utc)
-                print(f"Inserting new product with timestamp: {current_time}")
-                
-                cursor.execute('''
-                    INSERT INTO products 
-                    (user_id, product_code, product_name, product_url, current_price, lowest_price, last_checked)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (user_id, product_code, product_name, product_url, current_price, current_price, current_time))
+                cursor.execute('BEGIN IMMEDIATE')
+                outcome = self._upsert_product(cursor, user_id, {
+                    'product_code': product_code,
+                    'product_name': product_name,
+                    'product_url': product_url,
+                    'current_price': current_price
+                }, datetime.now(timezone.utc))
                 conn.commit()
-                print(f"Successfully added new product {product_code} for user {user_id}")
-                return True
+                print(f"Product {product_code} for user {user_id}: {outcome}")
+                return outcome
         except Exception as e:
             print(f"Error adding product: {e}")
             import traceback
             traceback.print_exc()
+            return None
+    
+    def add_products(self, user_id: int, products: List[Dict]) -> Dict[str, str]:
+        """Add several products in one transaction.
+        
+        Each product dict has product_code, product_name, product_url and
+        current_price. Returns the outcome for each code: PRODUCT_ADDED,
+        PRODUCT_REACTIVATED (a removed product tracked again) or
+        PRODUCT_ALREADY_TRACKED. Nothing is written if any insert fails.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                current_time = datetime.now(timezone.utc)
+                outcomes = {}
+                for product in products:
+                    outcomes[product['product_code']] = self._upsert_product(cursor, user_id, product, current_time)
+                conn.commit()
+                print(f"Bulk added {len(products)} products for user {user_id}")
+                return outcomes
+        except Exception as e:
+            print(f"Error bulk adding products: {e}")
+            import traceback
+            traceback.print_exc()
+            return {}
+    
+    def get_url_code(self, url: str) -> Optional[Dict]:
+        """Product a pasted URL was resolved to before, or None"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT product_code, product_name, product_url FROM product_urls WHERE url = ?
+                ''', (url,))
+                row = cursor.fetchone()
+                if row:
+                    return {'product_code': row[0], 'product_name': row[1], 'product_url': row[2]}
+                return None
+        except Exception as e:
+            print(f"Error getting URL code: {e}")
+            return None
+    
+    def save_url_code(self, url: str, product_code: str, product_name: str = None, product_url: str = None) -> bool:
+        """Remember the product a pasted URL resolved to"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO product_urls (url, product_code, product_name, product_url, resolved_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (url) DO UPDATE SET
+                        product_code = excluded.product_code,
+                        product_name = excluded.product_name,
+                        product_url = excluded.product_url,
+                        resolved_at = excluded.resolved_at
+                ''', (url, product_code, product_name, product_url, datetime.now(timezone.utc)))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving URL code: {e}")
             return False
     
     def product_exists(self, user_id: int, product_code: str) -> bool:
@@ -311,6 +492,98 @@ class Database:
             traceback.print_exc()
             return []
     
+    def get_user_product(self, user_id: int, product_code: str) -> Optional[Dict]:
+        """Get one active product tracked by a user (product code is case-insensitive)"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT id, product_code, product_name, product_url, current_price, lowest_price, last_checked, is_active
+                    FROM products WHERE user_id = ? AND product_code = ? COLLATE NOCASE AND is_active = 1
+                ''', (user_id, product_code))
+                row = cursor.fetchone()
+                return self._product_from_row(row) if row else None
+        except Exception as e:
+            print(f"Error getting product {product_code} for user {user_id}: {e}")
+            return None
+    
+    @staticmethod
+    def _product_from_row(row) -> Dict:
+        return {
+            'id': row[0],
+            'product_code': row[1],
+            'product_name': row[2],
+            'product_url': row[3],
+            'current_price': row[4],
+            'lowest_price': row[5],
+            'last_checked': row[6],
+            'is_active': row[7]
+        }
+    
+    def get_user_products_page(self, user_id: int, limit: int, after_id: int = None,
+                               before_id: int = None) -> List[Dict]:
+        """One page of a user's active products in the order they were added.
+
+        Keyset pagination: pass the last id of the current page as ``after_id``
+        for the next page, or its first id as ``before_id`` for the previous
+        one, so each page costs the same however long the watchlist is.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                columns = 'id, product_code, product_name, product_url, current_price, lowest_price, last_checked, is_active'
+                if before_id is not None:
+                    cursor.execute(f'''
+                        SELECT {columns} FROM products
+                        WHERE user_id = ? AND is_active = 1 AND id < ?
+                        ORDER BY id DESC LIMIT ?
+                    ''', (user_id, before_id, limit))
+                    rows = cursor.fetchall()[::-1]
+                else:
+                    cursor.execute(f'''
+                        SELECT {columns} FROM products
+                        WHERE user_id = ? AND is_active = 1 AND id > ?
+                        ORDER BY id LIMIT ?
+                    ''', (user_id, after_id if after_id is not None else 0, limit))
+                    rows = cursor.fetchall()
+                return [self._product_from_row(row) for row in rows]
+        except Exception as e:
+            print(f"Error getting products page for user {user_id}: {e}")
+            return []
+    
+    def count_user_products(self, user_id: int) -> int:
+        """Number of active products a user tracks"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT COUNT(*) FROM products WHERE user_id = ? AND is_active = 1
+                ''', (user_id,))
+                return cursor.fetchone()[0]
+        except Exception as e:
+            print(f"Error counting products for user {user_id}: {e}")
+            return 0
+    
+    def get_active_product_names(self, user_id: int = None) -> List[Tuple[int, str, str]]:
+        """(user_id, product_code, product_name) for active products, for one user or everyone"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                if user_id is None:
+                    cursor.execute('''
+                        SELECT user_id, product_code, product_name FROM products
+                        WHERE is_active = 1 ORDER BY user_id, created_at DESC
+                    ''')
+                else:
+                    cursor.execute('''
+                        SELECT user_id, product_code, product_name FROM products
+                        WHERE user_id = ? AND is_active = 1 ORDER BY created_at DESC
+                    ''', (user_id,))
+                return cursor.fetchall()
+        except Exception as e:
+            print(f"Error getting active product names: {e}")
+            return []
+    
     def update_product_price(self, product_id: int, new_price: float) -> bool:
         """Update product price and check for price drops"""
         try:
@@ -415,3 +688,437 @@ class Database:
             import traceback
             traceback.print_exc()
             return False
+    
+    def iter_export_records(self, user_id: int = None) -> Iterator[Dict]:
+        """Yield users, products, price history and notifications as export records.
+
+        Rows are read by iterating the cursors rather than fetchall, so an
+        export of the whole database never holds more than one row at a time.
+        Products are identified by (user_id, product_code) instead of their
+        row id. Pass ``user_id`` to export one user's watchlist.
+        """
+        queries = (
+            ('user', '''
+                SELECT user_id, username, preferred_state, preferred_store_id
+                FROM users WHERE ?1 IS NULL OR user_id = ?1
+                ORDER BY user_id
+            '''),
+            ('product', '''
+                SELECT user_id, product_code, product_name, product_url, current_price, lowest_price,
+                       is_active, last_checked, created_at
+                FROM products WHERE ?1 IS NULL OR user_id = ?1
+                ORDER BY id
+            '''),
+            ('price', '''
+                SELECT p.user_id, p.product_code, h.price, h.timestamp
+                FROM price_history h JOIN products p ON p.id = h.product_id
+                WHERE ?1 IS NULL OR p.user_id = ?1
+                ORDER BY h.id
+            '''),
+            ('notification', '''
+                SELECT n.user_id, p.product_code, n.old_price, n.new_price, n.sent_at
+                FROM notifications n JOIN products p ON p.id = n.product_id
+                WHERE ?1 IS NULL OR n.user_id = ?1
+                ORDER BY n.id
+            '''),
+        )
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for record_type, query in queries:
+                cursor = conn.execute(query, (user_id,))
+                columns = [column[0] for column in cursor.description]
+                for row in cursor:
+                    record = {'type': record_type}
+                    record.update(zip(columns, row))
+                    yield record
+        finally:
+            conn.close()
+    
+    def import_records(self, users: List[Tuple], products: List[Tuple], prices: List[Tuple],
+                       notifications: List[Tuple]) -> Optional[Dict[str, int]]:
+        """Write one batch of imported records in a single transaction with executemany.
+
+        users: (user_id, username, preferred_state, preferred_store_id); existing users are kept.
+        products: (user_id, product_code, product_name, product_url, current_price, lowest_price,
+        is_active, last_checked, created_at); an existing product, matched on code case-insensitively
+        like /add does, is only changed to reactivate it.
+        prices: (user_id, product_code, price, timestamp) and notifications: (user_id, product_code,
+        old_price, new_price, sent_at) attach to the product by code, and are skipped if it does not
+        exist or the same entry is already recorded, so importing a file twice is harmless.
+        Returns the rows written per record type, or None if the batch failed and was rolled back.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO users (user_id, username, preferred_state, preferred_store_id)
+                    VALUES (?, ?, ?, ?)
+                ''', users)
+                user_count = cursor.rowcount if users else 0
+                cursor.executemany('''
+                    INSERT INTO products
+                    (user_id, product_code, product_name, product_url, current_price, lowest_price,
+                     is_active, last_checked, created_at)
+                    SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, COALESCE(?9, CURRENT_TIMESTAMP)
+                    WHERE NOT EXISTS (SELECT 1 FROM products
+                                      WHERE user_id = ?1 AND product_code = ?2 COLLATE NOCASE)
+                ''', products)
+                product_count = cursor.rowcount if products else 0
+                # Existing products are matched case-insensitively, like /add, and only ever reactivated
+                reactivated = [(product[0], product[1]) for product in products if product[6]]
+                cursor.executemany('''
+                    UPDATE products SET is_active = 1
+                    WHERE user_id = ? AND product_code = ? COLLATE NOCASE AND is_active = 0
+                ''', reactivated)
+                product_count += cursor.rowcount if reactivated else 0
+                cursor.executemany('''
+                    INSERT INTO price_history (product_id, price, timestamp)
+                    SELECT p.id, ?3, COALESCE(?4, CURRENT_TIMESTAMP) FROM products p
+                    WHERE p.user_id = ?1 AND p.product_code = ?2 COLLATE NOCASE
+                    AND NOT EXISTS (SELECT 1 FROM price_history h
+                                    WHERE h.product_id = p.id AND h.price = ?3 AND h.timestamp IS ?4)
+                ''', prices)
+                price_count = cursor.rowcount if prices else 0
+                cursor.executemany('''
+                    INSERT INTO notifications (user_id, product_id, old_price, new_price, sent_at)
+                    SELECT ?1, p.id, ?3, ?4, COALESCE(?5, CURRENT_TIMESTAMP) FROM products p
+                    WHERE p.user_id = ?1 AND p.product_code = ?2 COLLATE NOCASE
+                    AND NOT EXISTS (SELECT 1 FROM notifications n
+                                    WHERE n.product_id = p.id AND n.old_price = ?3 AND n.new_price = ?4
+                                    AND n.sent_at IS ?5)
+                ''', notifications)
+                notification_count = cursor.rowcount if notifications else 0
+                conn.commit()
+                return {
+                    'user': user_count,
+                    'product': product_count,
+                    'price': price_count,
+                    'notification': notification_count
+                }
+        except Exception as e:
+            print(f"Error importing records: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+    
+    def record_firecrawl_usage(self, kind: str, credits: int, retailer: str = None) -> bool:
+        """Record credits spent on a Firecrawl call"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO firecrawl_usage (kind, credits, retailer, created_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (kind, credits, retailer, datetime.now(timezone.utc)))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error recording Firecrawl usage: {e}")
+            return False
+    
+    def get_firecrawl_credits_since(self, since: datetime) -> int:
+        """Total Firecrawl credits spent since the given time"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT COALESCE(SUM(credits), 0) FROM firecrawl_usage WHERE created_at >= ?
+                ''', (since,))
+                return cursor.fetchone()[0]
+        except Exception as e:
+            print(f"Error getting Firecrawl usage: {e}")
+            return 0
+    
+    def record_comparison_request(self, user_id: int, source: str) -> bool:
+        """Record a user-initiated price comparison for quota tracking"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO comparison_requests (user_id, source, created_at)
+                    VALUES (?, ?, ?)
+                ''', (user_id, source, datetime.now(timezone.utc)))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error recording comparison request: {e}")
+            return False
+    
+    def claim_comparison_request(self, user_id: int, source: str, since: datetime, limit: int) -> Tuple[bool, int]:
+        """Record a comparison unless the user already has ``limit`` since ``since``.
+        
+        The count and the insert share one write transaction, so concurrent
+        requests cannot both take the last slot. Returns (allowed, remaining).
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.execute('''
+                    SELECT COUNT(*) FROM comparison_requests WHERE user_id = ? AND created_at >= ?
+                ''', (user_id, since))
+                used = cursor.fetchone()[0]
+                if used >= limit:
+                    conn.rollback()
+                    return False, 0
+                cursor.execute('''
+                    INSERT INTO comparison_requests (user_id, source, created_at)
+                    VALUES (?, ?, ?)
+                ''', (user_id, source, datetime.now(timezone.utc)))
+                conn.commit()
+                return True, limit - used - 1
+        except Exception as e:
+            print(f"Error claiming comparison request: {e}")
+            return True, -1
+    
+    def count_user_comparisons_since(self, user_id: int, since: datetime) -> int:
+        """Number of comparisons a user has requested since the given time"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT COUNT(*) FROM comparison_requests WHERE user_id = ? AND created_at >= ?
+                ''', (user_id, since))
+                return cursor.fetchone()[0]
+        except Exception as e:
+            print(f"Error counting comparison requests: {e}")
+            return 0
+    
+    def get_retailer_method_stats(self) -> List[Dict]:
+        """Get learned search method statistics for all retailers"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT retailer, method, attempts, success_rate, avg_latency FROM retailer_method_stats
+                ''')
+                return [{
+                    'retailer': row[0],
+                    'method': row[1],
+                    'attempts': row[2],
+                    'success_rate': row[3],
+                    'avg_latency': row[4]
+                } for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error getting retailer method stats: {e}")
+            return []
+    
+    def save_retailer_method_stats(self, retailer: str, method: str, attempts: int,
+                                   success_rate: float, avg_latency: float) -> bool:
+        """Insert or update learned statistics for a retailer search method"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO retailer_method_stats (retailer, method, attempts, success_rate, avg_latency, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(retailer, method) DO UPDATE SET
+                        attempts = excluded.attempts,
+                        success_rate = excluded.success_rate,
+                        avg_latency = excluded.avg_latency,
+                        updated_at = excluded.updated_at
+                ''', (retailer, method, attempts, success_rate, avg_latency, datetime.now(timezone.utc)))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving retailer method stats: {e}")
+            return False
+    
+    def get_competitor_mapping(self, product_code: str, retailer: str) -> Optional[Dict]:
+        """Get the stored competitor listing for an Officeworks product at one retailer"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT product_code, retailer, url, matched_title, match_score, last_price, failures, verified_at
+                    FROM competitor_mappings WHERE product_code = ? AND retailer = ?
+                ''', (product_code.lower(), retailer))
+                row = cursor.fetchone()
+                if not row:
+                    return None
+                return {
+                    'product_code': row[0],
+                    'retailer': row[1],
+                    'url': row[2],
+                    'matched_title': row[3],
+                    'match_score': row[4],
+                    'last_price': row[5],
+                    'failures': row[6],
+                    'verified_at': row[7]
+                }
+        except Exception as e:
+            print(f"Error getting competitor mapping: {e}")
+            return None
+    
+    def save_competitor_mapping(self, product_code: str, retailer: str, url: str, matched_title: str,
+                                match_score: float, price: float) -> bool:
+        """Insert or replace the confirmed competitor listing for an Officeworks product"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO competitor_mappings
+                        (product_code, retailer, url, matched_title, match_score, last_price, failures, verified_at)
+                    VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+                    ON CONFLICT(product_code, retailer) DO UPDATE SET
+                        url = excluded.url,
+                        matched_title = excluded.matched_title,
+                        match_score = excluded.match_score,
+                        last_price = excluded.last_price,
+                        failures = 0,
+                        verified_at = excluded.verified_at
+                ''', (product_code.lower(), retailer, url, matched_title, match_score, price,
+                      datetime.now(timezone.utc)))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving competitor mapping: {e}")
+            return False
+    
+    def touch_competitor_mapping(self, product_code: str, retailer: str, price: float) -> bool:
+        """Record a successful re-price of a mapped competitor listing"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    UPDATE competitor_mappings SET last_price = ?, failures = 0, verified_at = ?
+                    WHERE product_code = ? AND retailer = ?
+                ''', (price, datetime.now(timezone.utc), product_code.lower(), retailer))
+                conn.commit()
+                return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error updating competitor mapping: {e}")
+            return False
+    
+    def record_competitor_mapping_failure(self, product_code: str, retailer: str) -> int:
+        """Count a failed re-price; returns the number of consecutive failures"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    UPDATE competitor_mappings SET failures = failures + 1
+                    WHERE product_code = ? AND retailer = ?
+                ''', (product_code.lower(), retailer))
+                cursor.execute('''
+                    SELECT failures FROM competitor_mappings WHERE product_code = ? AND retailer = ?
+                ''', (product_code.lower(), retailer))
+                row = cursor.fetchone()
+                conn.commit()
+                return row[0] if row else 0
+        except Exception as e:
+            print(f"Error recording competitor mapping failure: {e}")
+            return 0
+    
+    def delete_competitor_mapping(self, product_code: str, retailer: str) -> bool:
+        """Forget a competitor listing (it moved, disappeared or stopped matching)"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    DELETE FROM competitor_mappings WHERE product_code = ? AND retailer = ?
+                ''', (product_code.lower(), retailer))
+                conn.commit()
+                return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error deleting competitor mapping: {e}")
+            return False
+    
+    def get_most_tracked_products(self, limit: int, checked_before: datetime) -> List[Dict]:
+        """Priced product codes by subscriber count, skipping those with a competitor check since ``checked_before``"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT LOWER(p.product_code) AS code,
+                           MAX(p.product_name),
+                           (SELECT p2.current_price FROM products p2
+                            WHERE LOWER(p2.product_code) = LOWER(p.product_code) AND p2.is_active = 1
+                              AND p2.current_price IS NOT NULL
+                            ORDER BY p2.last_checked DESC LIMIT 1) AS officeworks_price,
+                           COUNT(DISTINCT p.user_id) AS subscribers,
+                           c.last_checked
+                    FROM products p
+                    LEFT JOIN (
+                        SELECT product_code, checked_at AS last_checked FROM competitor_checks
+                    ) c ON c.product_code = LOWER(p.product_code)
+                    WHERE p.is_active = 1 AND p.product_name IS NOT NULL
+                    GROUP BY LOWER(p.product_code)
+                    HAVING officeworks_price IS NOT NULL AND (c.last_checked IS NULL OR c.last_checked < ?)
+                    ORDER BY subscribers DESC, c.last_checked IS NOT NULL, c.last_checked
+                    LIMIT ?
+                ''', (checked_before, limit))
+                return [{
+                    'product_code': row[0],
+                    'product_name': row[1],
+                    'current_price': row[2],
+                    'subscribers': row[3],
+                    'last_competitor_check': row[4]
+                } for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error getting most tracked products: {e}")
+            return []
+    
+    def get_product_subscribers(self, product_code: str) -> List[Dict]:
+        """Users actively tracking a product code"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT id, user_id FROM products
+                    WHERE LOWER(product_code) = LOWER(?) AND is_active = 1
+                ''', (product_code,))
+                return [{'id': row[0], 'user_id': row[1]} for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error getting product subscribers: {e}")
+            return []
+    
+    def save_competitor_prices(self, product_code: str, officeworks_price: float, results: List[Dict]) -> bool:
+        """Record one background competitor check for a product; an empty ``results`` still marks it checked"""
+        try:
+            checked_at = datetime.now(timezone.utc)
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO competitor_checks (product_code, results, checked_at)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (product_code) DO UPDATE SET
+                        results = excluded.results,
+                        checked_at = excluded.checked_at
+                ''', (product_code.lower(), len(results), checked_at))
+                cursor.executemany('''
+                    INSERT INTO competitor_prices
+                        (product_code, retailer, product_name, price, url, officeworks_price, checked_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [(product_code.lower(), result['retailer'], result.get('product_name'), result['price'],
+                       result.get('url'), officeworks_price, checked_at) for result in results])
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error saving competitor prices: {e}")
+            return False
+    
+    def get_latest_competitor_prices(self, product_code: str) -> Dict[str, Dict]:
+        """Most recent background check per retailer for a product, keyed by retailer"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT retailer, product_name, price, url, officeworks_price, checked_at
+                    FROM competitor_prices
+                    WHERE product_code = ?
+                    ORDER BY checked_at
+                ''', (product_code.lower(),))
+                latest = {}
+                for row in cursor.fetchall():
+                    latest[row[0]] = {
+                        'retailer': row[0],
+                        'product_name': row[1],
+                        'price': row[2],
+                        'url': row[3],
+                        'officeworks_price': row[4],
+                        'checked_at': row[5]
+                    }
+                return latest
+        except Exception as e:
+            print(f"Error getting competitor prices: {e}")
+            return {}
@@ -0,0 +1,98 @@
+import re
+from typing import List, NamedTuple, Pattern, Tuple
+
+from html_extractor import CSSSelector, compile_selectors, derive_card_selectors
+
+# Generic HTML patterns applied before the retailer specific selectors
+HTML_PRICE_PATTERNS = (
+    r'class="[^"]*price[^"]*"[^>]*>\s*\$?([\d,.]+)',
+    r'data-price="([\d,.]+)"',
+    r'\$\s*([\d,.]+)'
+)
+HTML_TITLE_PATTERNS = (
+    r'<h[1-6][^>]*>([^<]+)</h[1-6]>',
+    r'class="[^"]*title[^"]*"[^>]*>([^<]+)<',
+    r'class="[^"]*name[^"]*"[^>]*>([^<]+)<'
+)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+PRICE_NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d{2})?)')
+NON_ALPHANUMERIC_PATTERN = re.compile(r'[^a-z0-9]+')
+
+class ExtractionPlan(NamedTuple):
+    """Compiled HTML patterns and CSS selectors for one retailer, built once from its selectors"""
+    price_patterns: Tuple[Pattern, ...]
+    title_patterns: Tuple[Pattern, ...]
+    link_patterns: Tuple[Pattern, ...]
+    css_cards: Tuple[CSSSelector, ...] = ()
+    css_prices: Tuple[CSSSelector, ...] = ()
+    css_titles: Tuple[CSSSelector, ...] = ()
+    css_links: Tuple[CSSSelector, ...] = ()
+
+def selectors_to_regex(selectors: List[str], capture: str) -> List[str]:
+    """Convert CSS-like selectors into lightweight regex patterns."""
+    patterns: List[str] = []
+
+    for selector in selectors or []:
+        selector = selector.strip()
+        if not selector:
+            continue
+
+        if selector.startswith('[') and '=' in selector:
+            attr, _, remainder = selector[1:-1].partition('=')
+            attr = attr.strip()
+            cleaned = remainder.strip()
+            value = cleaned.strip('"').strip("'")
+            if capture == 'price':
+                patterns.append(rf'{attr}\s*=\s*"{re.escape(value)}"[^>]*>[^$]*\$?([\d,.]+)')
+            elif capture == 'link':
+                patterns.append(rf'{attr}\s*=\s*"{re.escape(value)}"[^>]*href="([^"]+)"')
+            else:
+                patterns.append(rf'{attr}\s*=\s*"{re.escape(value)}"[^>]*>([^<]+)<')
+            continue
+
+        # An untagged selector matches any tag; "<[^>]*" alone matches the same
+        # text as "<[^>]*[^>]*" without the quadratic backtracking
+        tag = ''
+        class_name = ''
+        if '.' in selector:
+            parts = selector.split('.')
+            if parts[0]:
+                tag = parts[0]
+            class_name = parts[-1]
+        else:
+            tag = selector
+
+        class_pattern = r''
+        if class_name:
+            class_pattern = rf'class="[^"]*{re.escape(class_name)}[^"]*"'
+
+        if capture == 'price':
+            patterns.append(rf'<{tag}[^>]*{class_pattern}[^>]*>[^$]*\$?([\d,.]+)')
+        elif capture == 'link':
+            patterns.append(rf'<{tag}[^>]*{class_pattern}[^>]*href="([^"]+)"')
+        else:
+            patterns.append(rf'<{tag}[^>]*{class_pattern}[^>]*>([^<]+)<')
+
+    return patterns
+
+def _compile_all(patterns) -> Tuple[Pattern, ...]:
+    return tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
+
+def compile_extraction_plan(price_selectors: List[str], title_selectors: List[str],
+                            link_selectors: List[str], card_selectors: List[str] = None) -> ExtractionPlan:
+    """Compile a retailer's selectors (plus the generic patterns) into an ExtractionPlan.
+
+    Card selectors default to the container part of the link selectors.
+    """
+    if card_selectors is None:
+        card_selectors = derive_card_selectors(link_selectors)
+    return ExtractionPlan(
+        price_patterns=_compile_all(HTML_PRICE_PATTERNS + tuple(selectors_to_regex(price_selectors, 'price'))),
+        title_patterns=_compile_all(HTML_TITLE_PATTERNS + tuple(selectors_to_regex(title_selectors, 'text'))),
+        link_patterns=_compile_all(selectors_to_regex(link_selectors, 'link')),
+        css_cards=compile_selectors(card_selectors),
+        css_prices=compile_selectors(price_selectors),
+        css_titles=compile_selectors(title_selectors),
+        css_links=compile_selectors(link_selectors),
+    )
@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+# Degrade modes, from cheapest to most expensive behaviour
+MODE_NORMAL = 'normal'
+MODE_SCRAPE_ONLY = 'scrape_only'
+MODE_REDUCED = 'reduced'
+MODE_CACHE_ONLY = 'cache_only'
+
+class BudgetPolicy:
+    """How much Firecrawl work a single comparison is allowed to do"""
+    def __init__(self, mode: str, allow_extract: bool, max_retailers: Optional[int], live_calls: bool):
+        self.mode = mode
+        self.allow_extract = allow_extract
+        self.max_retailers = max_retailers
+        self.live_calls = live_calls
+
+class FirecrawlBudget:
+    """Credit accounting for Firecrawl calls with daily/monthly budgets and per-user quotas.
+
+    Every successful scrape/extract is charged and persisted to the database.
+    Running totals are kept in memory (seeded from the database at startup)
+    so checking the budget never needs a query on the hot path.
+    """
+
+    def __init__(self, database, daily_budget: int, monthly_budget: int, user_daily_quota: int,
+                 credit_costs: Dict[str, int], scrape_only_at: float = 0.8,
+                 reduced_at: float = 0.9, reduced_max_retailers: int = 1):
+        self.database = database
+        self.daily_budget = daily_budget
+        self.monthly_budget = monthly_budget
+        self.user_daily_quota = user_daily_quota
+        self.credit_costs = credit_costs
+        self.scrape_only_at = scrape_only_at
+        self.reduced_at = reduced_at
+        self.reduced_max_retailers = reduced_max_retailers
+
+        self._day_key = None
+        self._month_key = None
+        self.daily_spent = 0
+        self.monthly_spent = 0
+        self.calls_by_kind: Dict[str, int] = {}
+        self._refresh_totals(force=True)
+
+    @staticmethod
+    def _period_starts(now: datetime) -> Tuple[datetime, datetime]:
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return day_start, day_start.replace(day=1)
+
+    def _refresh_totals(self, force: bool = False):
+        """Load running totals from the database (``force``), or reset them when the day/month rolls over.
+
+        Every charge goes through ``record``, so a new period starts at zero
+        and only startup needs a query; budget checks made on the event loop
+        never touch the database.
+        """
+        now = datetime.now(timezone.utc)
+        day_start, month_start = self._period_starts(now)
+
+        if force or self._month_key != month_start:
+            self._month_key = month_start
+            self.monthly_spent = (self.database.get_firecrawl_credits_since(month_start)
+                                  if force and self.database else 0)
+        if force or self._day_key != day_start:
+            self._day_key = day_start
+            self.daily_spent = self.database.get_firecrawl_credits_since(day_start) if force and self.database else 0
+
+    def cost_of(self, kind: str) -> int:
+        return self.credit_costs.get(kind, 1)
+
+    def usage_ratio(self) -> float:
+        """Fraction of the tighter of the daily/monthly budgets already spent"""
+        self._refresh_totals()
+        ratios = []
+        if self.daily_budget:
+            ratios.append(self.daily_spent / self.daily_budget)
+        if self.monthly_budget:
+            ratios.append(self.monthly_spent / self.monthly_budget)
+        return max(ratios) if ratios else 0.0
+
+    def can_spend(self, kind: str) -> bool:
+        """Whether a call of this kind fits in the remaining budgets"""
+        self._refresh_totals()
+        cost = self.cost_of(kind)
+        if self.daily_budget and self.daily_spent + cost > self.daily_budget:
+            return False
+        if self.monthly_budget and self.monthly_spent + cost > self.monthly_budget:
+            return False
+        return True
+
+    def record(self, kind: str, retailer: str = None) -> int:
+        """Charge one successful Firecrawl call and return its credit cost"""
+        self._refresh_totals()
+        cost = self.cost_of(kind)
+        self.daily_spent += cost
+        self.monthly_spent += cost
+        self.calls_by_kind[kind] = self.calls_by_kind.get(kind, 0) + 1
+        if self.database:
+            self.database.record_firecrawl_usage(kind, cost, retailer)
+        return cost
+
+    def policy(self) -> BudgetPolicy:
+        """Degrade policy for the next comparison based on budget usage"""
+        ratio = self.usage_ratio()
+        if ratio >= 1.0 or not self.can_spend('scrape'):
+            return BudgetPolicy(MODE_CACHE_ONLY, allow_extract=False, max_retailers=0, live_calls=False)
+        if ratio >= self.reduced_at:
+            return BudgetPolicy(MODE_REDUCED, allow_extract=False,
+                                max_retailers=self.reduced_max_retailers, live_calls=True)
+        if ratio >= self.scrape_only_at:
+            return BudgetPolicy(MODE_SCRAPE_ONLY, allow_extract=False, max_retailers=None, live_calls=True)
+        return BudgetPolicy(MODE_NORMAL, allow_extract=True, max_retailers=None, live_calls=True)
+
+    def check_user_quota(self, user_id: int) -> Tuple[bool, int]:
+        """Return (allowed, remaining) for a user's comparisons today"""
+        if not self.user_daily_quota or not self.database:
+            return True, -1
+        day_start, _ = self._period_starts(datetime.now(timezone.utc))
+        used = self.database.count_user_comparisons_since(user_id, day_start)
+        remaining = max(self.user_daily_quota - used, 0)
+        return remaining > 0, remaining
+
+    def claim_user_comparison(self, user_id: int, source: str) -> Tuple[bool, int]:
+        """Check the user's quota and record a comparison in one step; returns (allowed, remaining)"""
+        if not self.database:
+            return True, -1
+        if not self.user_daily_quota:
+            self.database.record_comparison_request(user_id, source)
+            return True, -1
+        day_start, _ = self._period_starts(datetime.now(timezone.utc))
+        return self.database.claim_comparison_request(user_id, source, day_start, self.user_daily_quota)
+
+    def record_user_comparison(self, user_id: int, source: str) -> bool:
+        if not self.database:
+            return False
+        return self.database.record_comparison_request(user_id, source)
+
+    def describe_usage(self) -> str:
+        """One-line usage summary for /status"""
+        policy = self.policy()
+        daily = f"{self.daily_spent}/{self.daily_budget}" if self.daily_budget else f"{self.daily_spent}"
+        monthly = f"{self.monthly_spent}/{self.monthly_budget}" if self.monthly_budget else f"{self.monthly_spent}"
+        return f"Today: {daily} · Month: {monthly} · Mode: {policy.mode.replace('_', ' ')}"
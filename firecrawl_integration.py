@@ -11,6 +11,7 @@ class FirecrawlIntegration:
     def __init__(self):
         self.rate_limit_delay = 2  # Delay between requests to avoid rate limiting
         self.last_request_time = None
+        self._rate_limit_lock = asyncio.Lock()  # Serialises slot reservation across concurrent searches
         self.firecrawl_app = None
         self.default_request_options = self._build_default_request_options()
         self._initialize_firecrawl()
@@ -92,12 +93,18 @@ class FirecrawlIntegration:
             self.firecrawl_app = None
         
     async def _apply_rate_limit(self):
-        """Apply rate limiting between requests"""
-        if self.last_request_time:
-            elapsed = (datetime.now() - self.last_request_time).total_seconds()
-            if elapsed < self.rate_limit_delay:
-                await asyncio.sleep(self.rate_limit_delay - elapsed)
-        self.last_request_time = datetime.now()
+        """Apply rate limiting between requests.
+
+        Concurrent callers queue on a lock so request start times stay at
+        least ``rate_limit_delay`` apart even when retailers are searched in
+        parallel.
+        """
+        async with self._rate_limit_lock:
+            if self.last_request_time:
+                elapsed = (datetime.now() - self.last_request_time).total_seconds()
+                if elapsed < self.rate_limit_delay:
+                    await asyncio.sleep(self.rate_limit_delay - elapsed)
+            self.last_request_time = datetime.now()
     
     def _filter_kwargs_for_signature(self, method, base_kwargs: Dict[str, object]) -> Dict[str, object]:
         """Return kwargs supported by the Firecrawl method signature."""
@@ -231,7 +238,9 @@ class FirecrawlIntegration:
                     print(f"[Firecrawl Extract] Using prompt-based extraction")
                     base_kwargs['prompt'] = prompt
 
-                result, method_used = self._call_firecrawl_method(['extract'], base_kwargs)
+                # The SDK is synchronous; run it off the event loop so other
+                # retailer searches (and the bot) keep running meanwhile
+                result, method_used = await asyncio.to_thread(self._call_firecrawl_method, ['extract'], base_kwargs)
 
                 if method_used:
                     print(f"[Firecrawl Extract] Called method '{method_used}' with enhanced options")
@@ -274,6 +283,16 @@ class FirecrawlIntegration:
             print(f"[Firecrawl Extract] Error extracting {url}: {e}")
             return None
 
+    @staticmethod
+    def _status_code(result) -> Optional[int]:
+        """HTTP status of the scraped page, from the response metadata when the SDK provides it"""
+        metadata = getattr(result, 'metadata', None) if result else None
+        if isinstance(metadata, dict):
+            status = metadata.get('statusCode') or metadata.get('status_code')
+        else:
+            status = getattr(metadata, 'statusCode', None) or getattr(metadata, 'status_code', None)
+        return status if isinstance(status, int) else None
+
     async def scrape_url(self, url: str) -> Optional[Dict]:
         """
         Scrape a single URL using Firecrawl Python SDK
@@ -306,7 +325,9 @@ class FirecrawlIntegration:
                     'urls': [url],
                 }
 
-                result, method_used = self._call_firecrawl_method(['scrape', 'scrape_url'], base_kwargs)
+                # The SDK is synchronous; run it off the event loop so other
+                # retailer searches (and the bot) keep running meanwhile
+                result, method_used = await asyncio.to_thread(self._call_firecrawl_method, ['scrape', 'scrape_url'], base_kwargs)
 
                 if not method_used:
                     print(f"[Firecrawl] Warning: Could not find scrape method on FirecrawlApp")
@@ -325,6 +346,7 @@ class FirecrawlIntegration:
                         'success': True,
                         'markdown': getattr(result, 'markdown', ''),
                         'html': getattr(result, 'html', ''),
+                        'status_code': self._status_code(result),
                         'url': url
                     }
                 else:
@@ -333,6 +355,7 @@ class FirecrawlIntegration:
                     return {
                         'success': False,
                         'error': str(error_msg),
+                        'status_code': self._status_code(result),
                         'url': url
                     }
                     
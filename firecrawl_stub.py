@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'firecrawl')
+
+class FirecrawlStub:
+    """Offline stand-in for FirecrawlIntegration that serves recorded fixtures.
+
+    Drop-in replacement for ``price_comparison.firecrawl_client``: it exposes
+    the same async ``extract_products``/``scrape_url`` methods and returns the
+    same response dictionaries, so the real parsing and matching code runs
+    against recorded pages without touching the network. It can also stand in
+    for ``price_comparison.http_client`` via ``fetch_text``.
+    """
+
+    def __init__(self, fixtures_dir: str = None, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, extract_failure_rate: float = None,
+                 scrape_failure_rate: float = None, seed: Optional[int] = None,
+                 verbose: bool = False):
+        """
+        Args:
+            fixtures_dir: Directory containing ``manifest.json`` and the recorded payloads
+            latency: Base delay (seconds) applied to every call
+            jitter: Extra random delay (seconds) added on top of ``latency``
+            failure_rate: Probability that any call returns an unsuccessful response
+            extract_failure_rate: Override ``failure_rate`` for extract calls
+            scrape_failure_rate: Override ``failure_rate`` for scrape calls
+            seed: Seed for the latency/failure random generator (reproducible runs)
+            verbose: Print a log line per call, like the real integration does
+        """
+        self.fixtures_dir = fixtures_dir or DEFAULT_FIXTURES_DIR
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rates = {
+            'extract': failure_rate if extract_failure_rate is None else extract_failure_rate,
+            'scrape': failure_rate if scrape_failure_rate is None else scrape_failure_rate,
+            'direct': failure_rate,
+        }
+        self.verbose = verbose
+        self.random = random.Random(seed)
+        self.calls: List[Dict] = []
+        self.entries = self._load_manifest()
+        self._payload_cache: Dict[str, object] = {}
+
+    def _load_manifest(self) -> List[Dict]:
+        """Load the URL -> fixture manifest, longest match first"""
+        manifest_path = os.path.join(self.fixtures_dir, 'manifest.json')
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            print(f"[Firecrawl Stub] Could not load fixture manifest {manifest_path}: {e}")
+            return []
+
+        entries = [entry for entry in manifest.get('entries', []) if entry.get('match')]
+        entries.sort(key=lambda entry: len(entry['match']), reverse=True)
+        return entries
+
+    def _find_entry(self, url: str) -> Optional[Dict]:
+        for entry in self.entries:
+            if entry['match'] in url:
+                return entry
+        return None
+
+    def _read_payload(self, filename: Optional[str]):
+        """Read (and memoise) a fixture file; JSON files are decoded"""
+        if not filename:
+            return None
+        if filename not in self._payload_cache:
+            path = os.path.join(self.fixtures_dir, filename)
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            self._payload_cache[filename] = json.loads(content) if filename.endswith('.json') else content
+        return self._payload_cache[filename]
+
+    async def _simulate_call(self, kind: str, url: str) -> bool:
+        """Apply configured latency and decide whether this call should fail"""
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        failed = self.random.random() < self.failure_rates.get(kind, 0.0)
+        self.calls.append({'kind': kind, 'url': url, 'delay': delay, 'failed': failed})
+        if delay:
+            await asyncio.sleep(delay)
+        if self.verbose:
+            print(f"[Firecrawl Stub] {kind} {url} ({delay * 1000:.0f}ms{', injected failure' if failed else ''})")
+        return not failed
+
+    async def extract_products(self, url: str, prompt: str = None, schema: Dict = None) -> Optional[Dict]:
+        """Serve a recorded Extract payload for ``url``"""
+        if not await self._simulate_call('extract', url):
+            return {'success': False, 'error': 'Injected failure', 'url': url}
+
+        entry = self._find_entry(url)
+        data = self._read_payload(entry.get('extract')) if entry else None
+        if data is None:
+            return {'success': False, 'error': 'No extract fixture for URL', 'url': url}
+
+        return {'success': True, 'data': data, 'url': url}
+
+    async def scrape_url(self, url: str) -> Optional[Dict]:
+        """Serve recorded markdown/html for ``url``"""
+        if not await self._simulate_call('scrape', url):
+            return {'success': False, 'error': 'Injected failure', 'url': url}
+
+        entry = self._find_entry(url)
+        if not entry:
+            return {'success': False, 'error': 'No scrape fixture for URL', 'status_code': 404, 'url': url}
+
+        return {
+            'success': True,
+            'status_code': 200,
+            'markdown': self._read_payload(entry.get('markdown')) or '',
+            'html': self._read_payload(entry.get('html')) or '',
+            'url': url
+        }
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        """Serve a recorded raw page body, standing in for the direct adapters' HTTP client"""
+        _, body = await self.fetch(url)
+        return body
+
+    async def fetch(self, url: str) -> Tuple[Optional[int], Optional[str]]:
+        """Serve (status, body) for ``url``.
+
+        Unknown URLs are a 404; known URLs without a recorded direct body
+        behave like a failed request (no status).
+        """
+        if not await self._simulate_call('direct', url):
+            return None, None
+
+        entry = self._find_entry(url)
+        if not entry:
+            return 404, None
+        body = self._read_payload(entry.get('direct'))
+        return (200, body) if body else (None, None)
+
+    async def close(self):
+        pass
+
+    def is_available(self) -> bool:
+        return bool(self.entries)
+
+    async def test_connection(self) -> Dict:
+        if self.is_available():
+            return {'success': True, 'message': f'Serving {len(self.entries)} recorded fixture(s)'}
+        return {
+            'success': False,
+            'error': 'No fixtures loaded',
+            'message': f'Check the manifest in {self.fixtures_dir}'
+        }
@@ -0,0 +1,425 @@
+import re
+from html.parser import HTMLParser
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from markdown_tokenizer import MAX_PRICE, MIN_PRICE
+
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'
+))
+# Elements whose start tag implicitly closes an open sibling of the same kind
+AUTO_CLOSE_ELEMENTS = frozenset(('li', 'p', 'option', 'tr', 'td', 'th', 'dt', 'dd'))
+IGNORED_TEXT_ELEMENTS = frozenset(('script', 'style', 'template', 'noscript'))
+
+# Selectors used inside a card when the retailer specific ones find nothing
+GENERIC_TITLE_SELECTORS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6', '[class*="title" i]', '[class*="name" i]', 'a[href]')
+GENERIC_PRICE_SELECTORS = ('[data-price]', '[class*="price" i]')
+
+PRICE_PATTERN = re.compile(r'\$\s*(\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)')
+BARE_PRICE_PATTERN = re.compile(r'(\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+class Element:
+    """A node in the lightweight DOM built by parse_html"""
+    __slots__ = ('tag', 'attrs', 'classes', 'parent', 'children')
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: 'Element' = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = frozenset((attrs.get('class') or '').split())
+        self.parent = parent
+        self.children: List[Union['Element', str]] = []
+
+    def iter(self) -> Iterator['Element']:
+        """Descendant elements in document order (not including self)"""
+        stack = list(reversed([child for child in self.children if isinstance(child, Element)]))
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(reversed([child for child in element.children if isinstance(child, Element)]))
+
+    def text(self) -> str:
+        """Text content with whitespace collapsed"""
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif node.tag not in IGNORED_TEXT_ELEMENTS:
+                stack.extend(reversed(node.children))
+        return WHITESPACE_PATTERN.sub(' ', ''.join(parts)).strip()
+
+    def __repr__(self):
+        return f"<{self.tag} {self.attrs}>"
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element('#document', {})
+        self.stack = [self.root]
+
+    def element_closed(self, element: Element):
+        """Called once an element and all its children have been parsed"""
+
+    def _pop_to(self, index: int):
+        closed = self.stack[index:]
+        del self.stack[index:]
+        for element in reversed(closed):
+            self.element_closed(element)
+
+    def handle_starttag(self, tag, attrs):
+        parent = self.stack[-1]
+        if tag in AUTO_CLOSE_ELEMENTS and parent.tag == tag:
+            self._pop_to(len(self.stack) - 1)
+            parent = self.stack[-1]
+        element = Element(tag, {name: value or '' for name, value in attrs}, parent)
+        parent.children.append(element)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        parent = self.stack[-1]
+        parent.children.append(Element(tag, {name: value or '' for name, value in attrs}, parent))
+
+    def handle_endtag(self, tag):
+        # Close the nearest matching open element; stray end tags are ignored
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                self._pop_to(index)
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+    def close(self):
+        super().close()
+        self._pop_to(1)
+
+def parse_html(html: str) -> Element:
+    """Parse an HTML document into a tree of Elements, tolerating malformed markup"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+# --- CSS selectors --------------------------------------------------------
+
+COMPOUND_PART_PATTERN = re.compile(r'''
+    \.(?P<cls>[\w-]+)
+  | \#(?P<id>[\w-]+)
+  | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[*^$~]?=)\s*(?P<value>"[^"]*"|'[^']*'|[^\]\s]*)\s*(?P<flag>[iI])?\s*)?\]
+''', re.VERBOSE)
+TAG_NAME_PATTERN = re.compile(r'[a-zA-Z][\w-]*|\*')
+
+class _Compound:
+    """One compound selector such as ``a.product-title[href]``"""
+    __slots__ = ('tag', 'element_id', 'classes', 'attrs')
+
+    def __init__(self, text: str):
+        self.tag = None
+        self.element_id = None
+        classes = []
+        attrs = []
+
+        tag_match = TAG_NAME_PATTERN.match(text)
+        position = 0
+        if tag_match:
+            self.tag = None if tag_match.group(0) == '*' else tag_match.group(0).lower()
+            position = tag_match.end()
+
+        while position < len(text):
+            part = COMPOUND_PART_PATTERN.match(text, position)
+            if not part:
+                raise ValueError(f"Unsupported selector syntax: {text!r}")
+            if part.group('cls'):
+                classes.append(part.group('cls'))
+            elif part.group('id'):
+                self.element_id = part.group('id')
+            else:
+                value = part.group('value')
+                if value and value[0] in '"\'':
+                    value = value[1:-1]
+                if part.group('flag') and value:
+                    value = value.lower()
+                attrs.append((part.group('attr').lower(), part.group('op'), value, bool(part.group('flag'))))
+            position = part.end()
+
+        self.classes = frozenset(classes)
+        self.attrs = tuple(attrs)
+
+    def matches(self, element: Element) -> bool:
+        if self.tag and element.tag != self.tag:
+            return False
+        if self.element_id and element.attrs.get('id') != self.element_id:
+            return False
+        if self.classes and not self.classes <= element.classes:
+            return False
+        for name, op, value, ignore_case in self.attrs:
+            actual = element.attrs.get(name)
+            if actual is None:
+                return False
+            if op is None:
+                continue
+            if ignore_case:
+                actual = actual.lower()
+            if op == '=' and actual != value:
+                return False
+            if op == '*=' and value not in actual:
+                return False
+            if op == '^=' and not actual.startswith(value):
+                return False
+            if op == '$=' and not actual.endswith(value):
+                return False
+            if op == '~=' and value not in actual.split():
+                return False
+        return True
+
+class CSSSelector:
+    """A compiled CSS selector supporting compound, descendant and child (>) selectors.
+
+    Covers the subset retailer configs use: tags, classes, ids and
+    attribute tests ([attr], =, *=, ^=, $=, ~=, with an optional ``i``
+    flag). Comma separated lists are matched as alternatives.
+    """
+
+    def __init__(self, selector: str):
+        self.selector = selector
+        self.alternatives: List[Tuple[List[_Compound], List[str]]] = [
+            self._parse_complex(part) for part in self._split_top_level(selector, ',') if part.strip()
+        ]
+        if not self.alternatives:
+            raise ValueError(f"Empty selector: {selector!r}")
+
+    @staticmethod
+    def _split_top_level(text: str, separator: str) -> List[str]:
+        parts, depth, current = [], 0, []
+        for char in text:
+            if char in '[(':
+                depth += 1
+            elif char in '])':
+                depth -= 1
+            if char == separator and depth == 0:
+                parts.append(''.join(current))
+                current = []
+            else:
+                current.append(char)
+        parts.append(''.join(current))
+        return parts
+
+    def _parse_complex(self, text: str) -> Tuple[List[_Compound], List[str]]:
+        """Split ``a > b c`` into compounds and the combinators between them"""
+        compounds: List[_Compound] = []
+        combinators: List[str] = []
+        token, depth, pending = [], 0, None
+
+        def flush():
+            nonlocal pending
+            if token:
+                if compounds:
+                    combinators.append(pending or ' ')
+                compounds.append(_Compound(''.join(token)))
+                token.clear()
+                pending = None
+
+        for char in text.strip():
+            if char == '[':
+                depth += 1
+            elif char == ']':
+                depth -= 1
+            if depth == 0 and char in ' \t\n>':
+                flush()
+                if char == '>':
+                    pending = '>'
+                continue
+            token.append(char)
+        flush()
+        return compounds, combinators
+
+    def _match_from(self, element: Element, compounds: List[_Compound], combinators: List[str], index: int) -> bool:
+        if not compounds[index].matches(element):
+            return False
+        if index == 0:
+            return True
+        if combinators[index - 1] == '>':
+            parent = element.parent
+            return parent is not None and self._match_from(parent, compounds, combinators, index - 1)
+        ancestor = element.parent
+        while ancestor is not None:
+            if self._match_from(ancestor, compounds, combinators, index - 1):
+                return True
+            ancestor = ancestor.parent
+        return False
+
+    def matches(self, element: Element) -> bool:
+        return any(self._match_from(element, compounds, combinators, len(compounds) - 1)
+                   for compounds, combinators in self.alternatives)
+
+    def select(self, scope: Element) -> Iterator[Element]:
+        """Matching descendants of ``scope`` in document order (ancestors outside scope may match too)"""
+        for element in scope.iter():
+            if self.matches(element):
+                yield element
+
+    def select_one(self, scope: Element) -> Optional[Element]:
+        return next(self.select(scope), None)
+
+def compile_selectors(selectors) -> Tuple[CSSSelector, ...]:
+    """Compile selectors, skipping (and reporting) any outside the supported subset"""
+    compiled = []
+    for selector in selectors or []:
+        try:
+            compiled.append(CSSSelector(selector))
+        except ValueError as e:
+            print(f"[HTML] Skipping selector {selector!r}: {e}")
+    return tuple(compiled)
+
+def derive_card_selectors(link_selectors: List[str]) -> List[str]:
+    """Guess product card selectors from link selectors like ``.product-item a`` (the ``.product-item`` part)"""
+    cards = []
+    for selector in link_selectors or []:
+        parts = selector.split()
+        if len(parts) > 1 and parts[-2] != '>':
+            card = ' '.join(parts[:-1])
+            if card not in cards:
+                cards.append(card)
+    return cards
+
+GENERIC_TITLES = compile_selectors(GENERIC_TITLE_SELECTORS)
+GENERIC_PRICES = compile_selectors(GENERIC_PRICE_SELECTORS)
+
+# --- Product extraction ---------------------------------------------------
+
+def _price_from_element(element: Element) -> Optional[float]:
+    candidates = [element.attrs['data-price']] if element.attrs.get('data-price') else []
+    candidates.append(element.text())
+    for candidate in candidates:
+        match = PRICE_PATTERN.search(candidate) or BARE_PRICE_PATTERN.search(candidate)
+        if match:
+            price = float(match.group(1).replace(',', ''))
+            if MIN_PRICE <= price <= MAX_PRICE:
+                return price
+    return None
+
+def _first_price(elements: List[Element], selectors) -> Optional[float]:
+    # Selectors are tried in configured priority order, so ".special-price .price"
+    # wins over a struck-through ".old-price .price" in the same card
+    for selector in selectors:
+        for element in elements:
+            if selector.matches(element):
+                price = _price_from_element(element)
+                if price is not None:
+                    return price
+    return None
+
+def _first_title(elements: List[Element], selectors) -> str:
+    for selector in selectors:
+        for element in elements:
+            if selector.matches(element):
+                text = element.text()
+                if len(text) > 5:
+                    return text
+    return ''
+
+def _first_link(card: Element, elements: List[Element], selectors) -> str:
+    if card.tag == 'a' and card.attrs.get('href'):
+        return card.attrs['href']
+    for selector in selectors:
+        for element in elements:
+            if not selector.matches(element):
+                continue
+            if element.attrs.get('href'):
+                return element.attrs['href']
+            inner = next((child for child in element.iter() if child.tag == 'a' and child.attrs.get('href')), None)
+            if inner is not None:
+                return inner.attrs['href']
+    anchor = next((element for element in elements if element.tag == 'a' and element.attrs.get('href')), None)
+    return anchor.attrs['href'] if anchor is not None else ''
+
+def _product_from_card(card: Element, plan) -> Optional[Dict]:
+    elements = list(card.iter())
+    price = _first_price(elements, plan.css_prices) or _first_price(elements, GENERIC_PRICES)
+    if price is None:
+        return None
+    title = _first_title(elements, plan.css_titles) or _first_title(elements, GENERIC_TITLES)
+    if not title:
+        return None
+    return {'title': title, 'price': price, 'url': _first_link(card, elements, plan.css_links)}
+
+def _infer_cards(root: Element, plan) -> List[Element]:
+    """Find cards without card selectors.
+
+    A card is the nearest ancestor of a title element that also holds a
+    price, as long as it holds no other title (otherwise it is a listing
+    container, not a card).
+    """
+    cards: List[Element] = []
+    seen = set()
+    for selector in plan.css_titles:
+        for title in selector.select(root):
+            ancestor = title.parent
+            while ancestor is not None and ancestor.tag != '#document':
+                if _first_price(list(ancestor.iter()), plan.css_prices) is not None:
+                    titles = selector.select(ancestor)
+                    next(titles, None)
+                    if next(titles, None) is None and id(ancestor) not in seen:
+                        seen.add(id(ancestor))
+                        cards.append(ancestor)
+                    break
+                ancestor = ancestor.parent
+    return cards
+
+class _CardCollector(_TreeBuilder):
+    """Tree builder that extracts a product from each card as soon as the card is closed.
+
+    The innermost element matching a card selector that yields a product
+    wins, so a container around several cards never becomes a card itself.
+    """
+
+    def __init__(self, plan, max_products: int):
+        super().__init__()
+        self.plan = plan
+        self.max_products = max_products
+        self.products: List[Dict] = []
+        self._holds_card = set()  # ids of open elements that already contain an accepted card
+
+    def element_closed(self, element: Element):
+        if len(self.products) >= self.max_products or id(element) in self._holds_card:
+            return
+        if not any(selector.matches(element) for selector in self.plan.css_cards):
+            return
+        product = _product_from_card(element, self.plan)
+        if product:
+            self.products.append(product)
+            # Everything still open is an ancestor of this card
+            self._holds_card.update(id(ancestor) for ancestor in self.stack)
+
+def extract_products_from_dom(html: str, plan, max_products: int = 15, chunk_size: int = 8192) -> List[Dict]:
+    """Extract (title, price, url) per product card, so fields always come from the same listing.
+
+    The page is parsed incrementally and each card is read as soon as its
+    end tag is seen; parsing stops once ``max_products`` cards are found.
+    Without card selectors (or when none match) cards are inferred from
+    title elements after the whole page is parsed. Returns an empty list
+    when the page has no recognisable cards.
+    """
+    collector = _CardCollector(plan, max_products)
+    if plan.css_cards:
+        for start in range(0, len(html), chunk_size):
+            collector.feed(html[start:start + chunk_size])
+            if len(collector.products) >= max_products:
+                return collector.products
+    else:
+        collector.feed(html)
+    collector.close()
+    if collector.products:
+        return collector.products
+
+    products = []
+    for card in _infer_cards(collector.root, plan):
+        product = _product_from_card(card, plan)
+        if product:
+            products.append(product)
+            if len(products) >= max_products:
+                break
+    return products
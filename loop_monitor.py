@@ -0,0 +1,131 @@
+import asyncio
+import bisect
+import sys
+import threading
+import time
+import traceback
+from typing import List, Optional, Tuple
+
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+class LagHistogram:
+    """Timer drift samples counted per bucket (upper bounds in milliseconds)"""
+
+    def __init__(self, bounds: Tuple[float, ...] = LAG_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last bucket holds samples above every bound
+        self.count = 0
+        self.max_ms = 0.0
+
+    def add(self, lag_ms: float):
+        self.counts[bisect.bisect_left(self.bounds, lag_ms)] += 1
+        self.count += 1
+        self.max_ms = max(self.max_ms, lag_ms)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile sample (the max past the last bound)"""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def buckets(self) -> List[Tuple[str, int]]:
+        """(label, count) for every non-empty bucket"""
+        labels = [f"<={bound:g}ms" for bound in self.bounds] + [f">{self.bounds[-1]:g}ms"]
+        return [(label, count) for label, count in zip(labels, self.counts) if count]
+
+    def describe(self) -> str:
+        if not self.count:
+            return "no samples"
+        return (f"p50 {self.percentile(50):.0f}ms, p99 {self.percentile(99):.0f}ms, max {self.max_ms:.0f}ms "
+                f"over {self.count} samples")
+
+class LoopLagMonitor:
+    """Measures event loop lag and reports callbacks that block the loop.
+
+    A sampler task sleeps for ``interval`` seconds and records how late it
+    wakes up (timer drift) in a histogram. A watchdog thread watches the
+    sampler's heartbeat; if the loop has not run it for ``slow_callback``
+    seconds past its due time, the loop thread's stack is captured and
+    logged once per stall, which points at the blocking call. ``target``
+    is the p99 lag a window of samples should stay under.
+    """
+
+    def __init__(self, interval: float = 0.5, slow_callback: float = 0.25, target: float = 0.1):
+        self.interval = interval
+        self.slow_callback = slow_callback
+        self.target = target
+        self.window = LagHistogram()
+        self.slow_callbacks = 0
+        self.last_stall: Optional[str] = None  # Stack of the most recent stall
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._beat = 0.0
+        self._reported_beat = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start sampling on the running loop; calling it again while running does nothing"""
+        if self.is_running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-lag-watchdog', daemon=True)
+        self._watchdog.start()
+        print(f"Event loop monitor started (sampling every {self.interval:g}s, target p99 {self.target * 1000:.0f}ms)")
+
+    def stop(self):
+        """Stop the sampler task and the watchdog thread"""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopped.is_set():
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(loop.time() - due, 0.0) * 1000
+            self.window.add(lag_ms)
+            self._beat = time.monotonic()
+
+    def _watch(self):
+        check_every = max(self.slow_callback / 4, 0.01)
+        while not self._stopped.wait(check_every):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.slow_callback or beat == self._reported_beat:
+                continue
+            self._reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = ''.join(traceback.format_stack(frame))
+            self.slow_callbacks += 1
+            self.last_stall = stack
+            print(f"Event loop blocked for over {blocked * 1000:.0f}ms; loop thread stack:\n{stack}")
+
+    def take_window(self) -> LagHistogram:
+        """Samples since the last call; a new window starts empty"""
+        window, self.window = self.window, LagHistogram()
+        return window
+
+    def within_target(self, window: LagHistogram) -> bool:
+        return window.percentile(99) <= self.target * 1000
+
+    def describe(self) -> str:
+        """One-line summary of the current window for /status"""
+        return f"{self.window.describe()}; {self.slow_callbacks} slow callbacks"
@@ -0,0 +1,214 @@
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+# Token kinds emitted by tokenize_markdown
+TOKEN_TITLE = 'title'  # Heading, bold text, product link/image text or a product-like plain line
+TOKEN_LINK = 'link'  # Action link ("View product", "Add to cart") that may carry the product URL
+TOKEN_PRICE = 'price'
+TOKEN_ROW = 'row'  # Table row holding a complete product (title and price)
+
+# Every inline construct of interest in one alternation, so each line is scanned once
+INLINE_TOKEN_PATTERN = re.compile(r'''
+    \[!\[(?P<image_alt>[^\[\]\n]*(?:\[[^\[\]\n]*\][^\[\]\n]*)*)\]\([^)\n]*\)\]\((?P<image_url>[^)\s]+)\)
+  | \[(?P<link_text>[^\[\]\n]*(?:\[[^\[\]\n]*\][^\[\]\n]*)*)\]\((?P<link_url>[^)\s]+)\)
+  | \*\*(?P<bold>[^*\n]+)\*\*
+  | (?:(?P<price_label>\b(?:was|now|from|price:?))\s*(?:AUD\s*)?\$?|\bAUD\s*\$?|\$\s*)
+    (?P<amount>\d+(?:,\d{3})*(?:\.\d{2})?)
+  | (?P<suffix_amount>\b\d+(?:,\d{3})*(?:\.\d{2})?)\s*(?:AUD\b|dollars?\b)
+''', re.IGNORECASE | re.VERBOSE)
+
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+')
+TITLE_MARKUP_PATTERN = re.compile(r'[*\[\]]+')
+PRODUCT_INDICATOR_PATTERN = re.compile(
+    r'router|mesh|wifi|wireless|system|pack|kit|laptop|tablet|phone|headphones|camera|monitor'
+)
+NON_ALPHANUMERIC_PATTERN = re.compile(r'[^a-z0-9]+')
+
+# Link texts that are navigation or actions rather than product names
+ACTION_LINK_PREFIXES = ('http', 'www', 'click', 'view', 'see', 'add to', 'skip', 'buy', 'shop', 'learn')
+# URL fragments that never point at a product page
+NON_PRODUCT_URL_PARTS = ('/cart', '/account', '/login', '/wishlist', '/category', 'javascript:')
+
+MIN_PRICE = 5
+MAX_PRICE = 15000
+
+class MarkdownToken(NamedTuple):
+    kind: str
+    text: str = ''
+    url: Optional[str] = None
+    price: Optional[float] = None
+    label: str = ''
+
+def _amount(text: str) -> float:
+    return float(text.replace(',', ''))
+
+def _is_action_text(text: str) -> bool:
+    return len(text) <= 8 or text.lower().startswith(ACTION_LINK_PREFIXES)
+
+def _inline_tokens(line: str) -> List[MarkdownToken]:
+    tokens = []
+    for match in INLINE_TOKEN_PATTERN.finditer(line):
+        if match.group('image_url'):
+            tokens.append(MarkdownToken(TOKEN_TITLE, match.group('image_alt').strip(), url=match.group('image_url')))
+        elif match.group('link_url') is not None:
+            text = match.group('link_text').strip()
+            kind = TOKEN_LINK if _is_action_text(text) else TOKEN_TITLE
+            tokens.append(MarkdownToken(kind, text, url=match.group('link_url')))
+        elif match.group('bold') is not None:
+            text = match.group('bold').strip()
+            if len(text) > 8:
+                tokens.append(MarkdownToken(TOKEN_TITLE, text))
+        else:
+            amount = match.group('amount') or match.group('suffix_amount')
+            label = (match.group('price_label') or '').lower().rstrip(':')
+            tokens.append(MarkdownToken(TOKEN_PRICE, price=_amount(amount), label=label))
+    return tokens
+
+def _table_row_token(line: str) -> Optional[MarkdownToken]:
+    """A table row with a price cell and a product-name cell, or None"""
+    cells = [cell.strip() for cell in line.strip().strip('|').split('|')]
+    price = None
+    title = ''
+    url = None
+    for cell in cells:
+        tokens = _inline_tokens(cell)
+        prices = [token.price for token in tokens if token.kind == TOKEN_PRICE]
+        if prices:
+            if price is None:
+                price = prices[0]
+            continue
+        links = [token for token in tokens if token.kind == TOKEN_TITLE and token.url]
+        text = links[0].text if links else TITLE_MARKUP_PATTERN.sub('', cell).strip()
+        if not title and len(text) > 10:
+            title = text
+            url = links[0].url if links else None
+    if price is None or not title:
+        return None
+    return MarkdownToken(TOKEN_ROW, title, url=url, price=price)
+
+def tokenize_markdown(markdown: str) -> Iterator[MarkdownToken]:
+    """Walk markdown once, yielding title, link, price and table row tokens in document order"""
+    for raw_line in markdown.split('\n'):
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if line[0] == '#' and HEADING_PATTERN.match(line):
+            if len(line) > 15:
+                title = TITLE_MARKUP_PATTERN.sub('', HEADING_PATTERN.sub('', line)).strip()
+                if len(title) > 8:
+                    yield MarkdownToken(TOKEN_TITLE, title)
+            continue
+
+        if line[0] == '|' and line.count('|') >= 3:
+            token = _table_row_token(line)
+            if token:
+                yield token
+            continue
+
+        tokens = _inline_tokens(line)
+        if tokens:
+            yield from tokens
+        elif 20 <= len(line) <= 150 and PRODUCT_INDICATOR_PATTERN.search(line.lower()):
+            # Unformatted line that reads like a product name
+            yield MarkdownToken(TOKEN_TITLE, line)
+
+class MarkdownProductAssembler:
+    """Turns a token stream into products: a title followed by its first current price.
+
+    A link carrying a product URL is attached to the pending title, or to the
+    product just emitted when the link follows its price ("View product").
+    "Was" prices only count when no other price follows the title.
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+        self.seen = set()
+        self.title: Optional[str] = None
+        self.title_key = ''
+        self.url: Optional[str] = None
+        self.was_price: Optional[float] = None
+        self.last_product: Optional[Dict] = None
+
+    def _product_url(self, url: Optional[str]) -> Optional[str]:
+        if not url or url.startswith('#') or any(part in url.lower() for part in NON_PRODUCT_URL_PARTS):
+            return None
+        if url.startswith('//'):
+            return f'https:{url}'
+        if url.startswith('/'):
+            return self.base_url + url
+        if url.startswith('http') and (self.base_url in url or 'product' in url.lower()):
+            return url
+        return None
+
+    def _emit(self, title: str, price: float, url: Optional[str]) -> Optional[Dict]:
+        key = (NON_ALPHANUMERIC_PATTERN.sub(' ', title.lower()).strip(), round(price, 2))
+        if key in self.seen:
+            return None
+        self.seen.add(key)
+        product = {'title': title, 'price': price}
+        if url:
+            product['url'] = url
+        self.last_product = product
+        return product
+
+    def _flush_was_price(self) -> Optional[Dict]:
+        if self.title and self.was_price is not None:
+            return self._emit(self.title, self.was_price, self.url)
+        return None
+
+    def feed(self, token: MarkdownToken) -> Optional[Dict]:
+        """Consume one token, returning a product when one is completed"""
+        if token.kind == TOKEN_ROW:
+            if MIN_PRICE <= token.price <= MAX_PRICE:
+                return self._emit(token.text, token.price, self._product_url(token.url))
+            return None
+
+        if token.kind == TOKEN_TITLE:
+            key = NON_ALPHANUMERIC_PATTERN.sub(' ', token.text.lower()).strip()
+            url = self._product_url(token.url)
+            if self.title and key == self.title_key:
+                # Same product repeated (image alt text then heading); keep what we know
+                self.url = self.url or url
+                return None
+            product = self._flush_was_price()
+            self.title, self.title_key, self.url, self.was_price = token.text, key, url, None
+            self.last_product = None
+            return product
+
+        if token.kind == TOKEN_LINK:
+            url = self._product_url(token.url)
+            if url and self.title:
+                self.url = self.url or url
+            elif url and self.last_product is not None and 'url' not in self.last_product:
+                self.last_product['url'] = url
+            return None
+
+        # Price token
+        if not self.title or not MIN_PRICE <= token.price <= MAX_PRICE:
+            return None
+        if token.label == 'was':
+            if self.was_price is None:
+                self.was_price = token.price
+            return None
+        product = self._emit(self.title, token.price, self.url)
+        self.title, self.title_key, self.url, self.was_price = None, '', None, None
+        return product
+
+    def finish(self) -> Optional[Dict]:
+        return self._flush_was_price()
+
+def extract_markdown_products(markdown: str, base_url: str, max_products: int = 15) -> List[Dict]:
+    """Single pass over a markdown page, stopping once ``max_products`` are found"""
+    assembler = MarkdownProductAssembler(base_url)
+    products: List[Dict] = []
+    for token in tokenize_markdown(markdown):
+        product = assembler.feed(token)
+        if product:
+            products.append(product)
+            if len(products) >= max_products:
+                return products
+    product = assembler.finish()
+    if product:
+        products.append(product)
+    return products
@@ -0,0 +1,180 @@
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from extraction_plan import NON_ALPHANUMERIC_PATTERN
+from product_identifiers import ProductIdentifiers, product_identifiers
+
+NUMBER_PATTERN = re.compile(r'\d+')
+
+# Score weights, in the order the components are summed
+SIMILARITY_WEIGHT = 0.35
+KEY_TERM_WEIGHT = 0.2
+OVERLAP_WEIGHT = 0.25
+PARTIAL_WEIGHT = 0.1
+NUMBER_WEIGHT = 0.05
+METADATA_BONUS = 0.03
+PRICE_BONUS = 0.02
+LENGTH_BONUS = 0.02
+
+# Slack added to upper bounds so float rounding never prunes the true best candidate
+BOUND_EPSILON = 1e-9
+
+def normalize_text(text: str) -> str:
+    if not text:
+        return ""
+    normalized = NON_ALPHANUMERIC_PATTERN.sub(' ', text.lower())
+    return ' '.join(normalized.split())
+
+class MatchCandidate(NamedTuple):
+    """A product with everything the scorer needs, tokenized once"""
+    product: Dict
+    price: float
+    title: str  # normalized title
+    words: frozenset
+    numbers: frozenset
+    brand: str
+    model: str
+    identifiers: ProductIdentifiers  # GTINs, model numbers and capacities for exact matching
+
+def build_candidate(product: Dict, price: float) -> MatchCandidate:
+    title = normalize_text(product.get('title', ''))
+    return MatchCandidate(
+        product=product,
+        price=price,
+        title=title,
+        words=frozenset(title.split()),
+        numbers=frozenset(NUMBER_PATTERN.findall(title)),
+        brand=normalize_text(product.get('brand', '')),
+        model=normalize_text(product.get('model', '')),
+        identifiers=product_identifiers(product),
+    )
+
+class MatchQuery:
+    """A normalized search query, tokenized once and scored against batches of candidates.
+
+    Scores are identical to the original per-product scorer: fuzzy similarity
+    (SequenceMatcher ratio), key term coverage, word overlap, partial word
+    matches, number alignment and small metadata/price/length bonuses. The
+    expensive SequenceMatcher ratio is only computed for candidates whose
+    upper bounds can still beat the best score: first assuming a perfect
+    ratio, then the shared character count (difflib's quick_ratio).
+    """
+
+    def __init__(self, query_normalized: str, key_terms: List[str]):
+        self.text = query_normalized
+        self.key_terms = key_terms
+        self.words = set(query_normalized.split())
+        self.numbers = NUMBER_PATTERN.findall(query_normalized)
+        self.number_set = set(self.numbers)
+        self.char_counts = tuple(Counter(query_normalized).items())
+        # A title word is contained in a query word exactly when it is one of that word's substrings
+        self.partial_words = [
+            (word, frozenset(word[start:end] for start in range(len(word)) for end in range(start + 1, len(word) + 1)))
+            for word in self.words if len(word) >= 3
+        ]
+        self._matcher = SequenceMatcher(None, query_normalized, '')
+        self._ratios: Dict[str, float] = {}
+
+    def similarity(self, title: str) -> float:
+        """SequenceMatcher ratio between the query and a normalized title, memoised per title"""
+        ratio = self._ratios.get(title)
+        if ratio is None:
+            self._matcher.set_seq2(title)
+            ratio = self._matcher.ratio()
+            self._ratios[title] = ratio
+        return ratio
+
+    def similarity_bound(self, candidate: MatchCandidate) -> float:
+        """Upper bound on similarity(): shared characters regardless of order (quick_ratio)"""
+        total = len(self.text) + len(candidate.title)
+        if not total:
+            return 0.0
+        title = candidate.title
+        shared = sum(min(count, title.count(char)) for char, count in self.char_counts)
+        return 2.0 * shared / total
+
+    def _components(self, candidate: MatchCandidate) -> List[float]:
+        """Score components after the similarity term, in summation order"""
+        components = []
+        if self.key_terms:
+            matches = sum(1 for term in self.key_terms if term in candidate.title)
+            components.append((matches / len(self.key_terms)) * KEY_TERM_WEIGHT)
+
+        if self.words:
+            overlap = len(self.words.intersection(candidate.words)) / len(self.words)
+            components.append(overlap * OVERLAP_WEIGHT)
+
+            # Query words never contain spaces, so "query word inside some title word"
+            # is the same as "query word inside the title"
+            partial_matches = sum(
+                1 for word, substrings in self.partial_words
+                if word in candidate.title or not substrings.isdisjoint(candidate.words)
+            )
+            components.append((partial_matches / len(self.words)) * PARTIAL_WEIGHT)
+
+        if self.numbers:
+            number_matches = len(self.number_set.intersection(candidate.numbers))
+            components.append((number_matches / len(self.numbers)) * NUMBER_WEIGHT)
+
+        if candidate.brand and candidate.brand in self.text:
+            components.append(METADATA_BONUS)
+        if candidate.model and candidate.model in self.text:
+            components.append(METADATA_BONUS)
+        if 1 <= candidate.price <= 10000:
+            components.append(PRICE_BONUS)
+        if 3 <= len(candidate.words) <= 15:
+            components.append(LENGTH_BONUS)
+        return components
+
+    def _total(self, similarity: float, components: List[float]) -> float:
+        # Summed in the original order so scores match the per-product scorer bit for bit
+        score = 0.0
+        if self.text:
+            score += similarity * SIMILARITY_WEIGHT
+        for component in components:
+            score += component
+        return min(score, 1.0)
+
+    def score(self, candidate: MatchCandidate) -> float:
+        if not candidate.title:
+            return 0.0
+        return self._total(self.similarity(candidate.title), self._components(candidate))
+
+    def rank(self, candidates: List[MatchCandidate]) -> List[Tuple[float, float, Dict]]:
+        """Score every candidate; returns (score, price, product) best first, ties by lowest price"""
+        scored = []
+        for candidate in candidates:
+            score = self.score(candidate)
+            if score > 0:
+                scored.append((score, candidate.price, candidate.product))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored
+
+    def best(self, candidates: List[MatchCandidate]) -> Optional[Tuple[float, float, Dict]]:
+        """The first entry of rank(), computing the fuzzy ratio only where it can change the winner"""
+        bounded = []
+        for index, candidate in enumerate(candidates):
+            if not candidate.title:
+                continue
+            components = self._components(candidate)
+            bounded.append((self._total(1.0, components) + BOUND_EPSILON, index, candidate, components))
+        bounded.sort(key=lambda item: (-item[0], item[1]))
+
+        best_key = None
+        best = None
+        for bound, index, candidate, components in bounded:
+            if best_key is not None:
+                if bound < best_key[0]:
+                    break
+                if self._total(self.similarity_bound(candidate), components) + BOUND_EPSILON < best_key[0]:
+                    continue
+            score = self._total(self.similarity(candidate.title), components)
+            if score <= 0:
+                continue
+            key = (score, -candidate.price, -index)
+            if best_key is None or key > best_key:
+                best_key = key
+                best = (score, candidate.price, candidate.product)
+        return best
@@ -3,6 +3,8 @@ import re
 from typing import Dict, List, Optional, Tuple
 from config import OFFICEWORKS_API_BASE, OFFICEWORKS_HEADERS
 
+STORE_LIST_PRODUCT_CODE = 'ipdmw128g'  # Stocked nationally, so its availability lists every store
+
 class OfficeworksAPI:
     def __init__(self):
         self.base_url = OFFICEWORKS_API_BASE
@@ -79,19 +81,35 @@ class OfficeworksAPI:
             print(f"Error getting store availability: {e}")
             return None
     
-    def get_stores_in_state(self, state: str) -> List[Dict]:
+    def get_store_records(self, state: str, product_code: str = STORE_LIST_PRODUCT_CODE) -> Optional[List[Dict]]:
         """
-        Get all stores in a specific state
+        Get the raw store records for a state, or None if the request failed
         """
         try:
-            # Use a common product to get store list
-            url = f"{self.base_url}/stock-check/product/ipdmw128g/availability/{state.lower()}"
+            url = f"{self.base_url}/stock-check/product/{product_code}/availability/{state.lower()}"
             response = requests.get(url, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
-                stores = data.get('stores', [])
+                return [store for store in data.get('stores', []) if store.get('storeId')]
+            else:
+                print(f"Store list request for {state} failed with status {response.status_code}")
+                return None
                 
+        except requests.exceptions.RequestException as e:
+            print(f"Request error: {e}")
+            return None
+        except Exception as e:
+            print(f"Error getting store records for {state}: {e}")
+            return None
+    
+    def get_stores_in_state(self, state: str) -> List[Dict]:
+        """
+        Get all stores in a specific state
+        """
+        try:
+            stores = self.get_store_records(state)
+            if stores is not None:
                 # Format store information
                 formatted_stores = []
                 for store in stores:
@@ -109,12 +127,8 @@ class OfficeworksAPI:
                 
                 return formatted_stores
             else:
-                print(f"Store list request failed with status {response.status_code}")
                 return []
                 
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            return []
         except Exception as e:
             print(f"Error getting stores in state: {e}")
             return []
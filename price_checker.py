@@ -42,7 +42,7 @@ class PriceChecker:
             print(f"Starting price check at {datetime.now(timezone.utc)}")
             
             # Get all active products
-            products = self.database.get_all_active_products()
+            products = await asyncio.to_thread(self.database.get_all_active_products)
             if not products:
                 print("No active products to check")
                 return
@@ -71,7 +71,7 @@ class PriceChecker:
             print(f"Checking price for product {product_code}")
             
             # Get current price from API
-            product_info = self.api.get_product_info(product_code)
+            product_info = await asyncio.to_thread(self.api.get_product_info, product_code)
             if not product_info or product_info.get('price') is None:
                 print(f"Could not get price for product {product_code}")
                 return
@@ -79,7 +79,7 @@ class PriceChecker:
             new_price = product_info['price']
             
             # Update price in database
-            if self.database.update_product_price(product_id, new_price):
+            if await asyncio.to_thread(self.database.update_product_price, product_id, new_price):
                 print(f"Updated price for {product_code}: ${current_price} -> ${new_price}")
                 
                 # Check if price dropped
@@ -146,7 +146,7 @@ class PriceChecker:
                 print(f"Price drop notification sent to user {user_id}")
                 
                 # Record notification in database
-                self.database.add_notification(user_id, product_id, old_price, new_price)
+                await asyncio.to_thread(self.database.add_notification, user_id, product_id, old_price, new_price)
                 
             except discord.Forbidden:
                 print(f"Cannot send DM to user {user_id} - DMs may be disabled")
@@ -162,18 +162,15 @@ class PriceChecker:
             print(f"Checking product {product_code} for user {user_id}")
             
             # Get product info from API
-            product_info = self.api.get_product_info(product_code)
+            product_info = await asyncio.to_thread(self.api.get_product_info, product_code)
             if not product_info:
                 print(f"No product info returned from API for {product_code}")
                 return None
             
             print(f"Product info: {product_info}")
             
-            # Get user's tracked products
-            user_products = self.database.get_user_products(user_id)
-            print(f"User products: {user_products}")
-            
-            tracked_product = next((p for p in user_products if p['product_code'].lower() == product_code.lower()), None)
+            # Get the user's tracked product
+            tracked_product = await asyncio.to_thread(self.database.get_user_product, user_id, product_code)
             print(f"Tracked product: {tracked_product}")
             
             if tracked_product:
@@ -183,7 +180,7 @@ class PriceChecker:
                 print(f"Updating price: {old_price} -> {new_price}")
                 
                 try:
-                    if self.database.update_product_price(tracked_product['id'], new_price):
+                    if await asyncio.to_thread(self.database.update_product_price, tracked_product['id'], new_price):
                         return {
                             'product_code': product_code,
                             'name': product_info.get('name', 'Unknown'),
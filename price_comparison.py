@@ -1,286 +1,464 @@
 import asyncio
 import re
-from difflib import SequenceMatcher
-from typing import Dict, List, Optional, Tuple
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 import discord
 from colors import *
 from emojis import *
+from extraction_plan import PRICE_NUMBER_PATTERN, TAG_PATTERN
+from markdown_tokenizer import extract_markdown_products
+from html_extractor import extract_products_from_dom
+from match_engine import MatchCandidate, MatchQuery, build_candidate, normalize_text
+from product_identifiers import MATCH_GTIN, IdentifierIndex, extract_identifiers
+from retailer_registry import (DEFAULT_RETAILERS_PATH, SEARCH_METHOD_DIRECT, SEARCH_METHOD_EXTRACT,
+                               SEARCH_METHOD_SCRAPE, RetailerConfig, load_retailer_definitions)
 
-class RetailerConfig:
-    """Configuration for a specific retailer"""
-    def __init__(self, name: str, base_url: str, search_url: str, price_selectors: List[str], 
-                 title_selectors: List[str], link_selectors: List[str] = None, 
-                 price_match_threshold: float = 0.95):
-        self.name = name
-        self.base_url = base_url
-        self.search_url = search_url
-        self.price_selectors = price_selectors
-        self.title_selectors = title_selectors
-        self.link_selectors = link_selectors or []
-        self.price_match_threshold = price_match_threshold
+# Firecrawl credit kind charged by each search method (direct JSON is free)
+METHOD_CREDIT_KINDS = {SEARCH_METHOD_EXTRACT: 'extract', SEARCH_METHOD_SCRAPE: 'scrape'}
 
 class PriceComparison:
     """Price comparison across multiple retailers using Firecrawl"""
     
-    def __init__(self, firecrawl_client=None):
+    def __init__(self, firecrawl_client=None, budget=None, strategy=None, http_client=None,
+                 retailers_path: str = DEFAULT_RETAILERS_PATH):
         self.firecrawl_client = firecrawl_client
-        self.retailers = self._setup_retailers()
-    
-    def _setup_retailers(self) -> Dict[str, RetailerConfig]:
-        """Setup configuration for different retailers"""
-        return {
-            'jb_hifi': RetailerConfig(
-                name="JB Hi-Fi",
-                base_url="https://www.jbhifi.com.au",
-                search_url="https://www.jbhifi.com.au/search?query={query}",
-                price_selectors=[
-                    '.price-current',
-                    '.price .price-value',
-                    '.pricing .current-price',
-                    '.price-now',
-                    '[data-testid="price"]',
-                    '.ProductPrice__price',
-                    '.ProductPrice__price span',
-                    '.ProductTile__Price',
-                    '[data-component="ProductPrice"]'
-                ],
-                title_selectors=[
-                    '.product-title',
-                    '.product-name',
-                    'h1.title',
-                    '.product-heading',
-                    '[data-testid="product-title"]',
-                    '.ProductTile__Title',
-                    '[data-component="ProductName"]'
-                ],
-                link_selectors=[
-                    '.product-item a',
-                    '.product-card a',
-                    '.product-link',
-                    '.ProductTile__Body a'
-                ],
-                price_match_threshold=0.3  # Lower threshold for better matching
-            ),
-            'harvey_norman': RetailerConfig(
-                name="Harvey Norman",
-                base_url="https://www.harveynorman.com.au",
-                search_url="https://www.harveynorman.com.au/catalogsearch/result/?q={query}",
-                price_selectors=[
-                    '.price-current',
-                    '.current-price',
-                    '.price .now',
-                    '.pricing-price',
-                    '.price-display',
-                    '.special-price .price',
-                    '.regular-price .price',
-                    '.price-box .price',
-                    '.price-container span.price'
-                ],
-                title_selectors=[
-                    '.product-title',
-                    '.product-name',
-                    'h1.heading',
-                    '.product-heading',
-                    '.product-item-name',
-                    'h2.product-name',
-                    '.product-item-link'
-                ],
-                link_selectors=[
-                    '.product-tile a',
-                    '.product-item a',
-                    '.product-item-link'
-                ],
-                price_match_threshold=0.3
-            ),
-            'good_guys': RetailerConfig(
-                name="The Good Guys",
-                base_url="https://www.thegoodguys.com.au",
-                search_url="https://www.thegoodguys.com.au/search?q={query}",
-                price_selectors=[
-                    '.price',
-                    '.product-price',
-                    '.current-price',
-                    '.sale-price',
-                    '.price-current',
-                    '.pricing .price',
-                    '.pricing .price-now',
-                    '.ProductPrice span'
-                ],
-                title_selectors=[
-                    '.product-title',
-                    '.product-name',
-                    'h3.product-title',
-                    'h4.product-title',
-                    '.product-item-name',
-                    '.title',
-                    '.ProductName'
-                ],
-                link_selectors=[
-                    '.product-tile a',
-                    '.product-item a',
-                    '.product-link',
-                    'a.product-title',
-                    '.ProductCard a'
-                ],
-                price_match_threshold=0.3
-            ),
-            'officeworks': RetailerConfig(
-                name="Officeworks",
-                base_url="https://www.officeworks.com.au",
-                search_url="https://www.officeworks.com.au/shop/SearchDisplay?searchTerm={query}",
-                price_selectors=[
-                    '.price-current',
-                    '.product-price .price',
-                    '.current-price',
-                    '.price-display'
-                ],
-                title_selectors=[
-                    '.product-title',
-                    '.product-name',
-                    'h1.title'
-                ],
-                link_selectors=[
-                    '.product-item a',
-                    '.product-card a'
-                ]
-            )
-        }
+        self.http_client = http_client  # Pooled client for direct JSON adapters
+        self.budget = budget  # Optional FirecrawlBudget for credit accounting
+        self.strategy = strategy  # Optional RetailerStrategy for learned method order
+        self.retailer_timeout = 45.0  # Seconds allowed for a single retailer search
+        self.search_deadline = 60.0  # Seconds allowed for a whole comparison
+        self.cache = None  # Optional ComparisonCache shared by /compare and Check Competitors
+        self.mappings = None  # Optional CompetitorMappings for re-pricing known competitor listings
+        self.retailers = load_retailer_definitions(retailers_path)  # Replaced wholesale by RetailerRegistry reloads
+        self._retailer_locks: Dict[str, asyncio.Lock] = {}
+        self._retailer_last_request: Dict[str, float] = {}
     
     async def search_all_retailers(self, product_name: str, officeworks_price: float,
-                                 max_retailers: int = 3) -> List[Dict]:
-        """Search all configured retailers for price comparisons"""
-        if not self.firecrawl_client:
-            return []
-        
+                                 max_retailers: int = 3, product_code: str = None) -> List[Dict]:
+        """Search all configured retailers for price comparisons, using cached results when available
+        
+        With an Officeworks ``product_code``, retailers with a confirmed
+        listing for it are re-priced directly instead of searched.
+        """
+        retailers, _, _ = self.plan_retailer_search(max_retailers)
+        cached = self.get_cached_comparisons(product_name, officeworks_price, retailers, product_code)
+        if cached is not None:
+            return cached
+        return await self.search_once(
+            product_name, officeworks_price, retailers,
+            lambda: self._collect_retailer_results(product_name, officeworks_price, retailers, product_code)
+        )
+    
+    async def refresh_comparisons(self, product_name: str, officeworks_price: float,
+                                  max_retailers: int = 3, product_code: str = None) -> List[Dict]:
+        """Search retailers live even when results are cached, replacing the cached results
+        
+        Used by background tracking so stored prices are never stale cache
+        entries; an identical search already in flight is still shared.
+        """
+        retailers, _, _ = self.plan_retailer_search(max_retailers)
+        return await self.search_once(
+            product_name, officeworks_price, retailers,
+            lambda: self._collect_retailer_results(product_name, officeworks_price, retailers, product_code)
+        )
+    
+    async def _collect_retailer_results(self, product_name: str, officeworks_price: float,
+                                        retailers: List[RetailerConfig], product_code: str = None) -> List[Dict]:
         results = []
-        search_query = self._clean_product_name(product_name)
+        async for _, retailer_result in self.iter_retailer_results(product_name, officeworks_price, len(retailers),
+                                                                   retailers=retailers, product_code=product_code):
+            if retailer_result:
+                results.append(retailer_result)
+        return results
+    
+    def comparison_cache_key(self, product_name: str, retailers: List[RetailerConfig]):
+        """Cache key: the cleaned search query plus the set of retailers searched"""
+        return self.cache.make_key(self._clean_product_name(product_name), [r.name for r in retailers])
+    
+    def get_cached_comparisons(self, product_name: str, officeworks_price: float,
+                               retailers: List[RetailerConfig], product_code: str = None) -> Optional[List[Dict]]:
+        """Cached comparisons rebased to ``officeworks_price``, or None on a miss.
+        
+        Stale results are returned immediately and refreshed in the
+        background. While the Firecrawl budget only allows cached results,
+        the latest results for the query are served however old they are.
+        """
+        if not self.cache:
+            return None
+        
+        key = self.comparison_cache_key(product_name, retailers)
+        entry, fresh = self.cache.get(key)
+        if entry and not fresh and retailers:
+            self.cache.revalidate(
+                key, lambda: self._collect_retailer_results(product_name, officeworks_price, retailers, product_code)
+            )
+        if entry is None and self.budget and not self.budget.policy().live_calls:
+            entry = self.cache.get_latest(key[0])
+        if entry is None:
+            return None
+        
+        print(f"[Compare Cache] Serving {'fresh' if fresh else 'cached'} results for '{key[0]}'")
+        return [self.rebase_comparison(result, officeworks_price, entry.fetched_at) for result in entry.results]
+    
+    def search_running(self, product_name: str, retailers: List[RetailerConfig]) -> bool:
+        """Whether an identical search is already running, so ``search_once`` would share it"""
+        return bool(self.cache and retailers and self.cache.in_flight(self.comparison_cache_key(product_name, retailers)))
+    
+    async def search_once(self, product_name: str, officeworks_price: float, retailers: List[RetailerConfig],
+                          fetch: Callable[[], Awaitable[List[Dict]]]) -> List[Dict]:
+        """Run ``fetch`` unless an identical search is already running, then cache the results.
+        
+        Results shared from another user's search are rebased to ``officeworks_price``.
+        """
+        if not self.cache or not retailers:
+            return await fetch()
+        results = await self.cache.run_once(self.comparison_cache_key(product_name, retailers), fetch)
+        return [self.rebase_comparison(result, officeworks_price) for result in results]
+    
+    def rebase_comparison(self, result: Dict, officeworks_price: float, cached_at: datetime = None) -> Dict:
+        """Copy of a comparison result with savings recalculated against ``officeworks_price``"""
+        rebased = dict(result)
+        rebased.update(self._price_difference_fields(result['price'], officeworks_price))
+        if cached_at:
+            rebased['cached_at'] = cached_at
+        return rebased
+    
+    def plan_retailer_search(self, max_retailers: int = 3) -> Tuple[List[RetailerConfig], bool, bool]:
+        """Pick the retailers and search methods a comparison may use right now.
+        
+        Returns (retailers, allow_extract, allow_firecrawl).
+        """
+        if not self.firecrawl_client and not self.http_client:
+            return [], False, False
+        
+        # Degrade gracefully as the Firecrawl credit budget runs out; direct
+        # JSON adapters cost no credits so they keep running regardless
+        allow_extract = True
+        allow_firecrawl = self.firecrawl_client is not None
+        if self.budget:
+            policy = self.budget.policy()
+            if not policy.live_calls:
+                print(f"[Budget] Firecrawl budget exhausted ({policy.mode}), only direct searches allowed")
+                allow_firecrawl = False
+            elif policy.max_retailers is not None:
+                max_retailers = min(max_retailers, policy.max_retailers)
+            allow_extract = policy.allow_extract
         
         # Search each retailer (excluding Officeworks since we already have that price)
-        retailers_to_search = [r for name, r in self.retailers.items() if name != 'officeworks']
+        retailers_to_search = [r for r in self.retailers.values() if r.compare]
+        
+        if not allow_firecrawl:
+            retailers_to_search = [r for r in retailers_to_search if r.direct_adapter and self.http_client]
         
         # Limit the number of retailers to search to avoid API limits
-        retailers_to_search = retailers_to_search[:max_retailers]
+        return retailers_to_search[:max_retailers], allow_extract, allow_firecrawl
+    
+    async def iter_retailer_results(self, product_name: str, officeworks_price: float,
+                                    max_retailers: int = 3, retailers: List[RetailerConfig] = None,
+                                    product_code: str = None) -> AsyncIterator[Tuple[str, Optional[Dict]]]:
+        """Search retailers concurrently, yielding (retailer name, result) as each finishes.
+        
+        Each retailer gets ``retailer_timeout`` seconds and the whole search
+        ``search_deadline`` seconds; retailers still running at the deadline
+        are cancelled and never yielded. ``result`` is None when a retailer
+        had no match, failed or timed out. Pass ``retailers`` (e.g. from
+        ``plan_retailer_search``) to search an already planned list, and
+        ``product_code`` to re-price confirmed listings for that product.
+        """
+        planned, allow_extract, allow_firecrawl = self.plan_retailer_search(max_retailers)
+        if retailers is None:
+            retailers = planned
+        if not retailers:
+            return
         
-        for retailer in retailers_to_search:
-            try:
-                retailer_result = await self._search_retailer(retailer, search_query, officeworks_price)
-                if retailer_result:
-                    results.append(retailer_result)
-                
-                # Add small delay between searches
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                print(f"Error searching {retailer.name}: {e}")
-                continue
+        search_query = self._clean_product_name(product_name)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.search_deadline
+        order = {retailer.name: index for index, retailer in enumerate(retailers)}
+        
+        tasks = {
+            asyncio.create_task(self._search_retailer_with_timeout(
+                retailer, search_query, officeworks_price, allow_extract, allow_firecrawl, product_code
+            )): retailer
+            for retailer in retailers
+        }
+        pending = set(tasks)
         
-        return results
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                # Keep configured retailer order for searches finishing together
+                for task in sorted(done, key=lambda t: order[tasks[t].name]):
+                    yield tasks[task].name, task.result()
+        finally:
+            if pending:
+                print(f"[Compare] Deadline reached, cancelling {', '.join(tasks[t].name for t in pending)}")
+            for task in pending:
+                task.cancel()
+    
+    async def _search_retailer_with_timeout(self, retailer: RetailerConfig, query: str, officeworks_price: float,
+                                            allow_extract: bool, allow_firecrawl: bool,
+                                            product_code: str = None) -> Optional[Dict]:
+        """Search one retailer, giving up after ``retailer_timeout`` seconds"""
+        try:
+            return await asyncio.wait_for(
+                self._search_retailer(retailer, query, officeworks_price, allow_extract=allow_extract,
+                                      allow_firecrawl=allow_firecrawl, product_code=product_code),
+                timeout=self.retailer_timeout
+            )
+        except asyncio.TimeoutError:
+            print(f"[Compare] {retailer.name} timed out after {self.retailer_timeout:.0f}s")
+            return None
+        except Exception as e:
+            print(f"Error searching {retailer.name}: {e}")
+            return None
     
-    async def _search_retailer(self, retailer: RetailerConfig, query: str, 
-                             officeworks_price: float) -> Optional[Dict]:
-        """Search a specific retailer for the product using Firecrawl Extract"""
+    async def _search_retailer(self, retailer: RetailerConfig, query: str, officeworks_price: float,
+                             allow_extract: bool = True, allow_firecrawl: bool = True,
+                             product_code: str = None) -> Optional[Dict]:
+        """Search a specific retailer, trying the search methods in learned order
+        
+        A confirmed listing for ``product_code`` is re-priced first; a
+        confident search match is remembered for next time.
+        """
         try:
             search_url = retailer.search_url.format(query=query.replace(' ', '+'))
             
-            # Try using Firecrawl Extract first for better structured data
-            extract_result = await self._extract_with_firecrawl(search_url, retailer, query)
-            
-            if extract_result and extract_result.get('success'):
-                products = extract_result.get('data', {}).get('products', [])
+            if product_code and self.mappings:
+                mapping = await asyncio.to_thread(self.mappings.get, product_code, retailer.name)
+                if mapping:
+                    result = await self._reprice_mapped_listing(retailer, mapping, officeworks_price, allow_firecrawl)
+                    if result:
+                        return result
+            
+            # Direct JSON is fastest and free, then Extract gives better structured
+            # data than scraping; the strategy reorders once it has learned more
+            available = set()
+            if retailer.direct_adapter and self.http_client:
+                available.add(SEARCH_METHOD_DIRECT)
+            if allow_firecrawl and self.firecrawl_client:
+                if allow_extract:
+                    available.add(SEARCH_METHOD_EXTRACT)
+                available.add(SEARCH_METHOD_SCRAPE)
+            methods = [method for method in retailer.methods if method in available]
+            if self.strategy:
+                methods = self.strategy.order_methods(retailer.name, methods)
+            
+            for method in methods:
+                await self._respect_retailer_rate_limit(retailer)
+                credit_kind = METHOD_CREDIT_KINDS.get(method)
+                if self.budget and credit_kind and not self.budget.can_spend(credit_kind):
+                    # Skipped for budget, not failed, so the strategy does not learn from it
+                    print(f"[Budget] Not enough Firecrawl credits for {method} on {retailer.name}")
+                    continue
+                started = time.perf_counter()
+                if method == SEARCH_METHOD_DIRECT:
+                    result = await self._search_with_direct(retailer, query, search_url, officeworks_price)
+                elif method == SEARCH_METHOD_EXTRACT:
+                    result = await self._search_with_extract(retailer, query, search_url, officeworks_price)
+                else:
+                    result = await self._search_with_scrape(retailer, query, search_url, officeworks_price)
                 
-                # Debug output
-                print(f"[Debug Extract] {retailer.name}: Extracted {len(products)} products using Extract")
-                for i, product in enumerate(products[:3]):
-                    print(f"[Debug Extract] Product {i+1}: {product.get('name', 'No name')[:80]}... - ${product.get('price', 'No price')}")
+                if self.strategy:
+                    await asyncio.to_thread(self.strategy.record, retailer.name, method, result is not None,
+                                            time.perf_counter() - started)
                 
-                if products:
-                    # Convert extract format to our internal format
-                    formatted_products = []
-                    for product in products:
-                        formatted_products.append({
-                            'title': product.get('name', product.get('title', '')),
-                            'price': self._parse_price(product.get('price', 0)),
-                            'url': product.get('url', search_url),
-                            'availability': product.get('availability', 'unknown'),
-                            'brand': product.get('brand', ''),
-                            'model': product.get('model', '')
-                        })
-                    
-                    # Find the best matching product
-                    best_match = self._find_best_product_match(formatted_products, query, retailer.price_match_threshold)
-                    
-                    if best_match:
-                        print(f"[Debug Extract] {retailer.name}: Found match using Extract - {best_match.get('title', 'No title')[:80]} - ${best_match.get('price')}")
-                        
-                        # Calculate price difference and match eligibility
-                        price_difference = officeworks_price - best_match['price']
-                        is_cheaper = best_match['price'] < officeworks_price
-                        
-                        return {
-                            'retailer': retailer.name,
-                            'product_name': best_match['title'],
-                            'price': best_match['price'],
-                            'url': best_match.get('url', search_url),
-                            'price_difference': abs(price_difference),
-                            'is_cheaper': is_cheaper,
-                            'potential_savings': price_difference if is_cheaper else 0,
-                            'price_match_eligible': is_cheaper and price_difference >= 0.01,
-                            'extraction_method': 'firecrawl_extract'
-                        }
-            
-            # Fallback to traditional scraping if Extract fails
-            print(f"[Debug] {retailer.name}: Extract failed, falling back to traditional scraping")
-            response = await self._scrape_with_firecrawl(search_url, retailer)
-            
-            if not response:
-                return None
-            
-            # Extract products from the response
-            products = self._extract_products_from_response(response, retailer)
-            
-            # Debug output
-            print(f"[Debug] {retailer.name}: Extracted {len(products)} products from search")
-            for i, product in enumerate(products[:3]):  # Show first 3 for debugging
-                print(f"[Debug] Product {i+1}: {product.get('title', 'No title')[:80]}... - ${product.get('price', 'No price')}")
-            
-            if not products:
-                print(f"[Debug] {retailer.name}: No products extracted from response")
-                return None
-            
-            # Find the best matching product
-            best_match = self._find_best_product_match(products, query, retailer.price_match_threshold)
-            
-            # Debug output for matching
-            if best_match:
-                print(f"[Debug] {retailer.name}: Found match - {best_match.get('title', 'No title')[:80]} - ${best_match.get('price')}")
-            else:
-                print(f"[Debug] {retailer.name}: No suitable match found from {len(products)} products")
-                print(f"[Debug] Query: '{query}', Threshold: {retailer.price_match_threshold}")
+                if result:
+                    if product_code and self.mappings and result['url'] not in (search_url, retailer.base_url):
+                        await asyncio.to_thread(self.mappings.confirm, product_code, retailer.name, result['url'],
+                                                result['product_name'], result.get('match_score'), result['price'])
+                    return result
+                print(f"[Debug] {retailer.name}: {method} found no match")
             
-            if not best_match:
-                return None
-            
-            # Check if this price offers a potential price match
-            price_difference = officeworks_price - best_match['price']
-            is_cheaper = best_match['price'] < officeworks_price
-            
-            return {
-                'retailer': retailer.name,
-                'product_name': best_match['title'],
-                'price': best_match['price'],
-                'url': best_match.get('url', search_url),
-                'price_difference': abs(price_difference),
-                'is_cheaper': is_cheaper,
-                'potential_savings': price_difference if is_cheaper else 0,
-                'price_match_eligible': is_cheaper and price_difference >= 0.01,  # At least 1 cent difference
-                'extraction_method': 'traditional_scraping'
-            }
+            return None
             
         except Exception as e:
             print(f"Error searching {retailer.name}: {e}")
             return None
     
+    async def _respect_retailer_rate_limit(self, retailer: RetailerConfig):
+        """Space requests to one retailer at least ``min_request_interval`` seconds apart"""
+        if retailer.min_request_interval <= 0:
+            return
+        lock = self._retailer_locks.setdefault(retailer.name, asyncio.Lock())
+        async with lock:
+            elapsed = time.monotonic() - self._retailer_last_request.get(retailer.name, float('-inf'))
+            if elapsed < retailer.min_request_interval:
+                await asyncio.sleep(retailer.min_request_interval - elapsed)
+            self._retailer_last_request[retailer.name] = time.monotonic()
+    
+    def _build_comparison_result(self, retailer: RetailerConfig, best_match: Dict, officeworks_price: float,
+                                 search_url: str, extraction_method: str) -> Dict:
+        """Build the comparison dict for a matched competitor listing"""
+        result = {
+            'retailer': retailer.name,
+            'product_name': best_match['title'],
+            'price': best_match['price'],
+            'url': best_match.get('url', search_url),
+        }
+        result.update(self._price_difference_fields(best_match['price'], officeworks_price))
+        result['extraction_method'] = extraction_method
+        result['match_score'] = best_match.get('match_score')
+        result['match_method'] = best_match.get('match_method')
+        return result
+    
+    async def _reprice_mapped_listing(self, retailer: RetailerConfig, mapping: Dict, officeworks_price: float,
+                                      allow_firecrawl: bool) -> Optional[Dict]:
+        """Read the current price from a remembered competitor product page.
+        
+        Retailers with a direct adapter fetch the page directly (free) and
+        scrape it only if that finds nothing. Returns None (so the retailer is searched instead) when
+        the page is gone or no longer shows the mapped product.
+        """
+        product_code, url = mapping['product_code'], mapping['url']
+        products: List[Dict] = []
+        attempted = False
+        
+        if retailer.direct_adapter and self.http_client:
+            attempted = True
+            await self._respect_retailer_rate_limit(retailer)
+            status, body = await self.http_client.fetch(url)
+            if status in (404, 410):
+                await asyncio.to_thread(self.mappings.drop, product_code, retailer.name, f"listing returned {status}")
+                return None
+            if body:
+                products = retailer.direct_adapter.parse_products(body, retailer.base_url)
+        
+        if not products and allow_firecrawl and self.firecrawl_client:
+            attempted = True
+            await self._respect_retailer_rate_limit(retailer)
+            response = await self._scrape_with_firecrawl(url, retailer)
+            if response and response.get('status_code') in (404, 410):
+                await asyncio.to_thread(self.mappings.drop, product_code, retailer.name, f"listing returned {response['status_code']}")
+                return None
+            if response and response.get('success'):
+                products = self._extract_products_from_response(response, retailer)
+        
+        if not attempted:
+            return None
+        
+        best_match = self._find_best_product_match(products, mapping['matched_title'], retailer.price_match_threshold)
+        if not best_match or best_match['match_score'] < self.mappings.min_score:
+            await asyncio.to_thread(self.mappings.failed, product_code, retailer.name, "mapped product not found on page")
+            return None
+        
+        print(f"[Mapping] {retailer.name}: Re-priced {mapping['matched_title'][:60]} - ${best_match['price']}")
+        await asyncio.to_thread(self.mappings.repriced, product_code, retailer.name, best_match['price'])
+        best_match['url'] = url
+        return self._build_comparison_result(retailer, best_match, officeworks_price, url, 'mapped_listing')
+    
+    def _price_difference_fields(self, price: float, officeworks_price: float) -> Dict:
+        """Savings fields for a competitor price, relative to the Officeworks price"""
+        # Check if this price offers a potential price match
+        price_difference = officeworks_price - price
+        is_cheaper = price < officeworks_price
+        
+        return {
+            'price_difference': abs(price_difference),
+            'is_cheaper': is_cheaper,
+            'potential_savings': price_difference if is_cheaper else 0,
+            'price_match_eligible': is_cheaper and price_difference >= 0.01,  # At least 1 cent difference
+        }
+    
+    async def _search_with_direct(self, retailer: RetailerConfig, query: str, search_url: str,
+                                  officeworks_price: float) -> Optional[Dict]:
+        """Search a retailer through its direct JSON adapter, skipping Firecrawl entirely"""
+        products = await retailer.direct_adapter.search(self.http_client, retailer.search_url, query, retailer.base_url)
+        if not products:
+            return None
+        
+        products = self._deduplicate_products(products)
+        print(f"[Debug Direct] {retailer.name}: Parsed {len(products)} products from embedded JSON")
+        
+        best_match = self._find_best_product_match(products, query, retailer.price_match_threshold)
+        if not best_match:
+            return None
+        
+        print(f"[Debug Direct] {retailer.name}: Found match - {best_match.get('title', 'No title')[:80]} - ${best_match.get('price')}")
+        return self._build_comparison_result(retailer, best_match, officeworks_price, search_url, 'direct_json')
+    
+    async def _search_with_extract(self, retailer: RetailerConfig, query: str, search_url: str,
+                                   officeworks_price: float) -> Optional[Dict]:
+        """Search a retailer using Firecrawl Extract structured data"""
+        extract_result = await self._extract_with_firecrawl(search_url, retailer, query)
+        
+        if not extract_result or not extract_result.get('success'):
+            return None
+        
+        products = extract_result.get('data', {}).get('products', [])
+        
+        # Debug output
+        print(f"[Debug Extract] {retailer.name}: Extracted {len(products)} products using Extract")
+        for i, product in enumerate(products[:3]):
+            print(f"[Debug Extract] Product {i+1}: {product.get('name', 'No name')[:80]}... - ${product.get('price', 'No price')}")
+        
+        if not products:
+            return None
+        
+        formatted_products = self._format_extract_products(products, search_url)
+        
+        # Find the best matching product
+        best_match = self._find_best_product_match(formatted_products, query, retailer.price_match_threshold)
+        
+        if not best_match:
+            return None
+        
+        print(f"[Debug Extract] {retailer.name}: Found match using Extract - {best_match.get('title', 'No title')[:80]} - ${best_match.get('price')}")
+        return self._build_comparison_result(retailer, best_match, officeworks_price, search_url, 'firecrawl_extract')
+    
+    def _format_extract_products(self, products: List[Dict], search_url: str) -> List[Dict]:
+        """Convert Firecrawl Extract products to our internal format"""
+        formatted_products = []
+        for product in products:
+            formatted_products.append({
+                'title': product.get('name', product.get('title', '')),
+                'price': self._parse_price(product.get('price', 0)),
+                'url': product.get('url', search_url),
+                'availability': product.get('availability', 'unknown'),
+                'brand': product.get('brand', ''),
+                'model': product.get('model', ''),
+                'gtin': product.get('gtin', '')
+            })
+        return formatted_products
+    
+    async def _search_with_scrape(self, retailer: RetailerConfig, query: str, search_url: str,
+                                  officeworks_price: float) -> Optional[Dict]:
+        """Search a retailer by scraping its search page and parsing markdown/HTML"""
+        response = await self._scrape_with_firecrawl(search_url, retailer)
+        
+        if not response:
+            return None
+        
+        # Extract products from the response
+        products = self._extract_products_from_response(response, retailer)
+        
+        # Debug output
+        print(f"[Debug] {retailer.name}: Extracted {len(products)} products from search")
+        for i, product in enumerate(products[:3]):  # Show first 3 for debugging
+            print(f"[Debug] Product {i+1}: {product.get('title', 'No title')[:80]}... - ${product.get('price', 'No price')}")
+        
+        if not products:
+            print(f"[Debug] {retailer.name}: No products extracted from response")
+            return None
+        
+        # Find the best matching product
+        best_match = self._find_best_product_match(products, query, retailer.price_match_threshold)
+        
+        # Debug output for matching
+        if best_match:
+            print(f"[Debug] {retailer.name}: Found match - {best_match.get('title', 'No title')[:80]} - ${best_match.get('price')}")
+        else:
+            print(f"[Debug] {retailer.name}: No suitable match found from {len(products)} products")
+            print(f"[Debug] Query: '{query}', Threshold: {retailer.price_match_threshold}")
+            return None
+        
+        return self._build_comparison_result(retailer, best_match, officeworks_price, search_url, 'traditional_scraping')
+    
     async def _extract_with_firecrawl(self, url: str, retailer: RetailerConfig, query: str) -> Optional[Dict]:
         """Use Firecrawl Extract to get structured product data"""
         try:
@@ -301,7 +479,8 @@ class PriceComparison:
                                 "url": {"type": "string", "description": "Product page URL"},
                                 "availability": {"type": "string", "description": "Stock availability status"},
                                 "brand": {"type": "string", "description": "Product brand"},
-                                "model": {"type": "string", "description": "Product model number"}
+                                "model": {"type": "string", "description": "Product model number"},
+                                "gtin": {"type": "string", "description": "Barcode (GTIN/EAN/UPC) if shown"}
                             },
                             "required": ["name", "price"]
                         }
@@ -327,9 +506,16 @@ class PriceComparison:
                 Extract the product name, price (as a number without currency symbols), product URL, availability status, brand, and model if available.
                 Return up to 10 most relevant products."""
             
+            if self.budget and not self.budget.can_spend('extract'):
+                print(f"[Budget] Not enough Firecrawl credits for Extract on {retailer.name}")
+                return None
+            
             # Use the extract_products method from firecrawl integration
             result = await self.firecrawl_client.extract_products(url, prompt=prompt, schema=product_schema)
             
+            if self.budget and result and result.get('success'):
+                await asyncio.to_thread(self.budget.record, 'extract', retailer.name)
+            
             return result
             
         except Exception as e:
@@ -355,8 +541,7 @@ class PriceComparison:
                     price_str = price_str[4:].strip()
                 
                 # Extract just the number
-                import re
-                price_match = re.search(r'(\d+(?:\.\d{2})?)', price_str)
+                price_match = PRICE_NUMBER_PATTERN.search(price_str)
                 if price_match:
                     return float(price_match.group(1))
             
@@ -375,7 +560,15 @@ class PriceComparison:
             # Note: Scraping options are now configured globally in the Firecrawl client
             # The scrape_url method only takes the URL as an argument
             
+            if self.budget and not self.budget.can_spend('scrape'):
+                print(f"[Budget] Not enough Firecrawl credits to scrape {retailer.name}")
+                return None
+            
             response = await self.firecrawl_client.scrape_url(url)
+            
+            if self.budget and response and response.get('success'):
+                await asyncio.to_thread(self.budget.record, 'scrape', retailer.name)
+            
             return response
             
         except Exception as e:
@@ -414,209 +607,55 @@ class PriceComparison:
         return deduplicated
     
     def _extract_from_markdown(self, markdown: str, retailer: RetailerConfig) -> List[Dict]:
-        """Extract products from markdown content"""
-        products = []
-        
+        """Extract products from markdown content in a single tokenizing pass"""
         try:
-            # Enhanced price patterns to catch more formats
-            price_patterns = [
-                r'\$(\d+(?:,\d{3})*(?:\.\d{2})?)',  # $99.99, $1,999.99 format
-                r'(\d+(?:,\d{3})*(?:\.\d{2})?)\s*dollars?',  # 99.99 dollars format
-                r'AUD\s*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)',  # AUD $99.99 format
-                r'Price:?\s*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)',  # Price: $99.99
-                r'(\d+(?:,\d{3})*(?:\.\d{2})?)\s*AUD',  # 99.99 AUD
-                r'From\s*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)',  # From $99.99
-                r'Now\s*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)',  # Now $99.99
-            ]
-            
-            lines = markdown.split('\n')
-            current_product = {}
-            products_found = []
-            
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Look for product titles in various formats
-                title_found = False
-                
-                # Headers (## ### etc)
-                if re.match(r'^#{1,6}\s+', line) and len(line) > 15:
-                    title = re.sub(r'^#{1,6}\s+', '', line).strip()
-                    title = re.sub(r'[*\[\]]+', '', title).strip()
-                    if len(title) > 8:
-                        current_product['title'] = title
-                        title_found = True
-                
-                # Bold text **text**
-                elif '**' in line and len(line) > 15:
-                    # Extract text between ** markers
-                    bold_matches = re.findall(r'\*\*([^*]+)\*\*', line)
-                    for bold_text in bold_matches:
-                        if len(bold_text) > 8:
-                            current_product['title'] = bold_text.strip()
-                            title_found = True
-                            break
-                
-                # Link text [text](url) - sometimes product names are in links
-                elif '[' in line and '](' in line:
-                    link_matches = re.findall(r'\[([^\]]+)\]\([^)]+\)', line)
-                    for link_text in link_matches:
-                        if len(link_text) > 8 and not link_text.lower().startswith(('http', 'www', 'click', 'view', 'see')):
-                            current_product['title'] = link_text.strip()
-                            title_found = True
-                            break
-                
-                # Lines that look like product names (no special formatting)
-                elif not title_found and 20 <= len(line) <= 150:
-                    # Check if it contains product-like words
-                    product_indicators = ['router', 'mesh', 'wifi', 'wireless', 'system', 'pack', 'kit', 
-                                        'laptop', 'tablet', 'phone', 'headphones', 'camera', 'monitor']
-                    if any(indicator in line.lower() for indicator in product_indicators):
-                        current_product['title'] = line.strip()
-                        title_found = True
-                
-                # Look for prices in the current line and nearby lines
-                for pattern in price_patterns:
-                    price_matches = re.findall(pattern, line, re.IGNORECASE)
-                    for price_str in price_matches:
-                        try:
-                            # Remove commas and convert to float
-                            clean_price = price_str.replace(',', '')
-                            price = float(clean_price)
-                            if 5 <= price <= 15000:  # Reasonable price range
-                                current_product['price'] = price
-                                
-                                # If we have a title, save the product
-                                if 'title' in current_product:
-                                    product_to_save = current_product.copy()
-                                    products_found.append(product_to_save)
-                                    current_product = {}
-                                    break
-                        except ValueError:
-                            continue
-                
-                # Look for URLs
-                url_matches = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', line)
-                for text, url in url_matches:
-                    if retailer.base_url in url or 'product' in url.lower():
-                        full_url = url if url.startswith('http') else retailer.base_url + url
-                        current_product['url'] = full_url
-            
-            # Also try to extract products from table-like structures
-            table_products = self._extract_from_table_structure(markdown, retailer)
-            products_found.extend(table_products)
-            
-            # Remove duplicates based on title similarity
-            unique_products = []
-            for product in products_found:
-                is_duplicate = False
-                for existing in unique_products:
-                    if self._titles_similar(product.get('title', ''), existing.get('title', '')):
-                        is_duplicate = True
-                        break
-                if not is_duplicate:
-                    unique_products.append(product)
-                        
+            return extract_markdown_products(markdown, retailer.base_url, max_products=15)
         except Exception as e:
             print(f"Error parsing markdown: {e}")
-        
-        return unique_products[:15]  # Increased limit for better results
+            return []
     
-    def _extract_from_table_structure(self, markdown: str, retailer: RetailerConfig) -> List[Dict]:
-        """Extract products from table-like markdown structures"""
-        products = []
+    def _extract_from_html(self, html: str, retailer: RetailerConfig) -> List[Dict]:
+        """Extract products from HTML, reading title, price and link from the same product card.
         
+        Falls back to regex scanning when the page has no recognisable cards.
+        """
         try:
-            # Look for pipe-separated tables
-            lines = markdown.split('\n')
-            for line in lines:
-                if '|' in line and len(line.split('|')) >= 3:
-                    parts = [part.strip() for part in line.split('|') if part.strip()]
-                    
-                    # Try to identify which part is the product name and which is the price
-                    for i, part in enumerate(parts):
-                        # Check if this part looks like a price
-                        price_match = re.search(r'\$?(\d+(?:,\d{3})*(?:\.\d{2})?)', part)
-                        if price_match:
-                            try:
-                                price = float(price_match.group(1).replace(',', ''))
-                                if 5 <= price <= 15000:
-                                    # Look for a product name in other parts
-                                    for j, other_part in enumerate(parts):
-                                        if i != j and len(other_part) > 10 and not re.search(r'\$\d', other_part):
-                                            products.append({
-                                                'title': other_part.strip(),
-                                                'price': price,
-                                                'url': retailer.base_url
-                                            })
-                                            break
-                            except ValueError:
-                                continue
-                                
+            products = extract_products_from_dom(html, retailer.plan)
+            if products:
+                for product in products:
+                    product['url'] = self._build_absolute_url(product['url'], retailer.base_url) if product['url'] else retailer.base_url
+                return products
         except Exception as e:
-            print(f"Error parsing table structure: {e}")
-        
-        return products
-    
-    def _titles_similar(self, title1: str, title2: str) -> bool:
-        """Check if two titles are similar enough to be considered duplicates"""
-        if not title1 or not title2:
-            return False
-        
-        # Simple similarity check
-        words1 = set(title1.lower().split())
-        words2 = set(title2.lower().split())
-        
-        # If they share more than 70% of words, consider them similar
-        if len(words1) > 0 and len(words2) > 0:
-            overlap = len(words1.intersection(words2))
-            similarity = overlap / min(len(words1), len(words2))
-            return similarity > 0.7
+            print(f"Error parsing HTML structure: {e}")
         
-        return False
+        return self._extract_from_html_regex(html, retailer)
     
-    def _extract_from_html(self, html: str, retailer: RetailerConfig) -> List[Dict]:
-        """Extract products from HTML content using retailer specific selectors."""
+    def _extract_from_html_regex(self, html: str, retailer: RetailerConfig) -> List[Dict]:
+        """Extract products by scanning HTML with regexes built from the retailer selectors."""
         products: List[Dict] = []
 
         try:
-            price_patterns = [
-                r'class="[^"]*price[^"]*"[^>]*>\s*\$?([\d,.]+)',
-                r'data-price="([\d,.]+)"',
-                r'\$\s*([\d,.]+)'
-            ]
-            price_patterns.extend(self._selectors_to_regex(retailer.price_selectors, capture='price'))
-
-            title_patterns = [
-                r'<h[1-6][^>]*>([^<]+)</h[1-6]>',
-                r'class="[^"]*title[^"]*"[^>]*>([^<]+)<',
-                r'class="[^"]*name[^"]*"[^>]*>([^<]+)<'
-            ]
-            title_patterns.extend(self._selectors_to_regex(retailer.title_selectors, capture='text'))
-
-            link_patterns = self._selectors_to_regex(retailer.link_selectors, capture='link')
+            plan = retailer.plan
 
             all_prices: List[float] = []
-            for pattern in price_patterns:
-                prices = re.findall(pattern, html, re.IGNORECASE)
+            for pattern in plan.price_patterns:
+                prices = pattern.findall(html)
                 for price_str in prices:
                     parsed_price = self._parse_price(price_str)
                     if 1 <= parsed_price <= 10000:
                         all_prices.append(parsed_price)
 
             all_titles: List[str] = []
-            for pattern in title_patterns:
-                titles = re.findall(pattern, html, re.IGNORECASE)
+            for pattern in plan.title_patterns:
+                titles = pattern.findall(html)
                 for title in titles:
-                    clean_title = re.sub(r'<[^>]+>', '', title).strip()
+                    clean_title = TAG_PATTERN.sub('', title).strip()
                     if clean_title and len(clean_title) > 5:
                         all_titles.append(clean_title)
 
             all_links: List[str] = []
-            for pattern in link_patterns:
-                links = re.findall(pattern, html, re.IGNORECASE)
+            for pattern in plan.link_patterns:
+                links = pattern.findall(html)
                 for link in links:
                     if isinstance(link, tuple):
                         link = link[-1]
@@ -638,53 +677,6 @@ class PriceComparison:
 
         return products[:5]
 
-    def _selectors_to_regex(self, selectors: List[str], capture: str) -> List[str]:
-        """Convert CSS-like selectors into lightweight regex patterns."""
-        patterns: List[str] = []
-
-        for selector in selectors or []:
-            selector = selector.strip()
-            if not selector:
-                continue
-
-            if selector.startswith('[') and '=' in selector:
-                attr, _, remainder = selector[1:-1].partition('=')
-                attr = attr.strip()
-                cleaned = remainder.strip()
-                value = cleaned.strip('"').strip("'")
-                if capture == 'price':
-                    patterns.append(rf'{attr}\s*=\s*"{re.escape(value)}"[^>]*>[^$]*\$?([\d,.]+)')
-                elif capture == 'link':
-                    patterns.append(rf'{attr}\s*=\s*"{re.escape(value)}"[^>]*href="([^"]+)"')
-                else:
-                    patterns.append(rf'{attr}\s*=\s*"{re.escape(value)}"[^>]*>([^<]+)<')
-                continue
-
-            tag = '[^>]*'
-            class_name = ''
-            if '.' in selector:
-                parts = selector.split('.')
-                if parts[0]:
-                    tag = parts[0]
-                class_name = parts[-1]
-            elif selector.startswith('.'):  # pure class selector
-                class_name = selector[1:]
-            else:
-                tag = selector
-
-            class_pattern = r''
-            if class_name:
-                class_pattern = rf'class="[^"]*{re.escape(class_name)}[^"]*"'
-
-            if capture == 'price':
-                patterns.append(rf'<{tag}[^>]*{class_pattern}[^>]*>[^$]*\$?([\d,.]+)')
-            elif capture == 'link':
-                patterns.append(rf'<{tag}[^>]*{class_pattern}[^>]*href="([^"]+)"')
-            else:
-                patterns.append(rf'<{tag}[^>]*{class_pattern}[^>]*>([^<]+)<')
-
-        return patterns
-
     def _build_absolute_url(self, candidate_url: str, base_url: str) -> str:
         """Ensure URLs are absolute for downstream Discord embeds."""
         if candidate_url.startswith('http'):
@@ -719,117 +711,54 @@ class PriceComparison:
         return deduped
     
     def _normalize_text(self, text: str) -> str:
-        if not text:
-            return ""
-        normalized = re.sub(r'[^a-z0-9]+', ' ', text.lower())
-        return ' '.join(normalized.split())
-
-    def _calculate_match_score(self, query_normalized: str, product: Dict,
-                               key_terms: List[str], query_words: set) -> float:
-        title = product.get('title', '')
-        normalized_title = self._normalize_text(title)
-        if not normalized_title:
-            return 0.0
-
-        title_words = set(normalized_title.split())
-        price = self._parse_price(product.get('price', 0))
-
-        score = 0.0
-
-        # Overall similarity between normalized strings
-        if query_normalized:
-            similarity_ratio = SequenceMatcher(None, query_normalized, normalized_title).ratio()
-            score += similarity_ratio * 0.35
-
-        # Key term coverage (brands, tech keywords, model numbers)
-        if key_terms:
-            matches = sum(1 for term in key_terms if term in normalized_title)
-            score += (matches / len(key_terms)) * 0.2
-
-        # Word overlap
-        if query_words:
-            overlap = len(query_words.intersection(title_words)) / len(query_words)
-            score += overlap * 0.25
-
-        # Partial matches for specs/model numbers
-        if query_words:
-            partial_matches = 0
-            for query_word in query_words:
-                if len(query_word) < 3:
-                    continue
-                for title_word in title_words:
-                    if query_word in title_word or title_word in query_word:
-                        partial_matches += 1
-                        break
-            score += (partial_matches / len(query_words)) * 0.1
-
-        # Number alignment (capacities, model numbers)
-        query_numbers = re.findall(r'\d+', query_normalized)
-        title_numbers = re.findall(r'\d+', normalized_title)
-        if query_numbers:
-            number_matches = len(set(query_numbers).intersection(set(title_numbers)))
-            score += (number_matches / len(query_numbers)) * 0.05
-
-        # Bonus for explicit brand/model metadata when provided
-        product_brand = self._normalize_text(product.get('brand', ''))
-        if product_brand and product_brand in query_normalized:
-            score += 0.03
-
-        product_model = self._normalize_text(product.get('model', ''))
-        if product_model and product_model in query_normalized:
-            score += 0.03
-
-        # Price sanity check to avoid zero-value matches
-        if 1 <= price <= 10000:
-            score += 0.02
-
-        # Reasonable title length tends to indicate a proper listing
-        title_length = len(title_words)
-        if 3 <= title_length <= 15:
-            score += 0.02
-
-        return min(score, 1.0)
-
-    def _find_best_product_match(self, products: List[Dict], query: str,
-                               threshold: float) -> Optional[Dict]:
-        """Find the best matching product from search results using fuzzy matching"""
-        if not products:
-            return None
+        return normalize_text(text)
 
+    def _match_query(self, query: str) -> MatchQuery:
         query_normalized = self._normalize_text(query)
-        query_words = set(query_normalized.split())
-        key_terms = self._extract_key_terms(query_normalized)
+        return MatchQuery(query_normalized, self._extract_key_terms(query_normalized))
 
-        candidate_scores: List[Tuple[float, float, Dict]] = []
+    def _match_candidates(self, products: List[Dict]) -> List[MatchCandidate]:
+        """Parse prices and tokenize titles once, skipping products without a usable price"""
+        candidates: List[MatchCandidate] = []
         for product in products:
             price = self._parse_price(product.get('price'))
             if price <= 0:
                 continue
-
             product['price'] = price
-            score = self._calculate_match_score(query_normalized, product, key_terms, query_words)
-            if score <= 0:
-                continue
-
-            candidate_scores.append((score, price, product))
+            candidates.append(build_candidate(product, price))
+        return candidates
 
-        if not candidate_scores:
-            return None
-
-        # Prioritise the most similar product, break ties by lowest price.
-        candidate_scores.sort(key=lambda item: (-item[0], item[1]))
+    def _rank_products(self, products: List[Dict], query: str) -> List[Tuple[float, float, Dict]]:
+        """Score every product against the query; (score, price, product) best first, ties by lowest price"""
+        return self._match_query(query).rank(self._match_candidates(products))
 
-        min_score = max(threshold, 0.2)
-        for score, _, product in candidate_scores:
-            if score >= min_score:
-                return product
+    def _identifier_pool(self, candidates: List[MatchCandidate], query: str) -> Tuple[str, List[MatchCandidate]]:
+        """Candidates to score for a query: exact GTIN/model hits, else those not contradicting it"""
+        index = IdentifierIndex((candidate.identifiers, candidate) for candidate in candidates)
+        return index.resolve(extract_identifiers(query))
 
-        # Fall back to a slightly more permissive threshold if nothing met the requirement
-        for score, _, product in candidate_scores:
-            if score >= 0.15:
-                return product
+    def _find_best_product_match(self, products: List[Dict], query: str,
+                               threshold: float) -> Optional[Dict]:
+        """Find the best matching product from search results.
+
+        Listings sharing a GTIN or model number with the query are looked
+        up first and only those are scored. Otherwise listings whose model
+        number or storage capacity contradicts the query are dropped before
+        fuzzy matching. The thresholds only ever pick the top ranked
+        product, so the fuzzy ratio is computed just for candidates that
+        could still rank first.
+        """
+        if not products:
+            return None
 
-        return candidate_scores[0][2] if candidate_scores else None
+        method, pool = self._identifier_pool(self._match_candidates(products), query)
+        best = self._match_query(query).best(pool)
+        if not best:
+            return None
+        score, _, product = best
+        product['match_score'] = 1.0 if method == MATCH_GTIN else score
+        product['match_method'] = method
+        return product
     
     def _extract_key_terms(self, query: str) -> List[str]:
         """Extract key terms (brands, model numbers, important features) from query"""
@@ -888,8 +817,12 @@ class PriceComparison:
         return ' '.join(words[:8])  # Limit to 8 most relevant words
     
     def create_comparison_embed(self, product_name: str, officeworks_price: float, 
-                              comparisons: List[Dict]) -> discord.Embed:
-        """Create a Discord embed showing price comparisons"""
+                              comparisons: List[Dict], pending_retailers: List[str] = None) -> discord.Embed:
+        """Create a Discord embed showing price comparisons
+        
+        ``pending_retailers`` lists retailers still being searched, for
+        progressive updates while a comparison is running.
+        """
         
         # Filter to only show retailers with better prices or close matches
         relevant_comparisons = [
@@ -910,9 +843,10 @@ class PriceComparison:
             )
             embed.add_field(
                 name="Status",
-                value=f"{SUCCESS} Best price found!",
+                value=f"{PROCESSING} Still searching..." if pending_retailers else f"{SUCCESS} Best price found!",
                 inline=True
             )
+            self._add_pending_field(embed, pending_retailers)
             return embed
         
         # Sort by potential savings (highest first)
@@ -943,6 +877,10 @@ class PriceComparison:
             # Add extraction method indicator for enhanced results
             if comp.get('extraction_method') == 'firecrawl_extract':
                 value += "\n🔍 AI Enhanced"
+            elif comp.get('extraction_method') == 'direct_json':
+                value += "\n⚡ Direct"
+            elif comp.get('extraction_method') == 'mapped_listing':
+                value += "\n📌 Saved listing"
             
             embed.add_field(
                 name=f"{EXTERNAL_LINK} {comp['retailer']}",
@@ -959,10 +897,30 @@ class PriceComparison:
                 inline=False
             )
         
-        embed.set_footer(text="Prices may vary. Check retailer websites for current pricing.")
-        embed.timestamp = datetime.now(timezone.utc)
+        self._add_pending_field(embed, pending_retailers)
+        
+        cached_at = min((comp['cached_at'] for comp in comparisons if comp.get('cached_at')), default=None)
+        if cached_at:
+            embed.set_footer(text="Cached results. Prices may vary. Check retailer websites for current pricing.")
+            embed.timestamp = cached_at
+        else:
+            embed.set_footer(text="Prices may vary. Check retailer websites for current pricing.")
+            embed.timestamp = datetime.now(timezone.utc)
         
         return embed
+    
+    def _add_pending_field(self, embed: discord.Embed, pending_retailers: Optional[List[str]]):
+        if pending_retailers:
+            embed.add_field(
+                name=f"{PROCESSING} Still Searching",
+                value=", ".join(pending_retailers),
+                inline=False
+            )
+
+    async def close(self):
+        """Release pooled HTTP connections"""
+        if self.http_client:
+            await self.http_client.close()
 
 # Initialize a global instance (will be configured with Firecrawl in bot)
 price_comparison = PriceComparison()
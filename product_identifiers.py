@@ -0,0 +1,113 @@
+import re
+from collections import defaultdict
+from typing import Dict, Generic, Iterable, List, NamedTuple, Tuple, TypeVar
+
+GTIN_PATTERN = re.compile(r'(?<!\d)(\d{8}|\d{12,14})(?!\d)')
+CAPACITY_PATTERN = re.compile(r'(?<![\w.])(\d+(?:\.\d+)?)\s?(gb|tb)\b', re.IGNORECASE)
+TOKEN_PATTERN = re.compile(r'[A-Za-z0-9][A-Za-z0-9\-/.]*[A-Za-z0-9]')
+# Region/packaging suffix on part numbers, e.g. the "/A" in Apple's MXN73X/A
+REGION_SUFFIX_PATTERN = re.compile(r'/[A-Za-z]{1,2}$')
+# Letters-and-digits tokens that are measurements or counts rather than model numbers
+UNIT_TOKEN_PATTERN = re.compile(
+    r'^\d+(?:\.\d+)?(?:gb|tb|mb|w|mah|hz|khz|ghz|mm|cm|m|inch|in|mp|k|v|st|nd|rd|th|pk|pack|x|pcs|l|ml|kg|g)$'
+)
+MIN_MODEL_LENGTH = 5  # Shorter codes (A17, X50, S9) name chips or product lines shared by many listings
+
+MATCH_GTIN = 'gtin'
+MATCH_MODEL = 'model'
+MATCH_FUZZY = 'fuzzy'
+
+T = TypeVar('T')
+
+class ProductIdentifiers(NamedTuple):
+    """Exact identifiers found in a product record or listing"""
+    gtins: frozenset
+    models: frozenset
+    capacities: frozenset
+
+    def conflicts_with(self, other: 'ProductIdentifiers') -> bool:
+        """Both name a model number or a storage capacity and none agree (a 128GB query, a 256GB listing)"""
+        if self.models and other.models and self.models.isdisjoint(other.models):
+            return True
+        return bool(self.capacities and other.capacities and self.capacities.isdisjoint(other.capacities))
+
+def _gtin_is_valid(digits: str) -> bool:
+    total = sum(int(digit) * (3 if index % 2 == 0 else 1) for index, digit in enumerate(reversed(digits[:-1])))
+    return (10 - total % 10) % 10 == int(digits[-1])
+
+def normalize_gtin(value: str) -> str:
+    """GTIN-8/12/13/14 padded to 14 digits, or '' when it is not a valid GTIN"""
+    digits = re.sub(r'\D', '', str(value or ''))
+    if len(digits) not in (8, 12, 13, 14) or not _gtin_is_valid(digits):
+        return ''
+    return digits.zfill(14)
+
+def normalize_model(token: str) -> str:
+    """Model number in comparable form, or '' when the token is not model-like"""
+    token = REGION_SUFFIX_PATTERN.sub('', token.strip())
+    if UNIT_TOKEN_PATTERN.match(token.lower().replace('-', '')):
+        return ''
+    model = re.sub(r'[^A-Za-z0-9]', '', token).upper()
+    if len(model) < MIN_MODEL_LENGTH or model.isdigit() or model.isalpha():
+        return ''
+    return model
+
+def _capacity(value: str, unit: str) -> str:
+    number = float(value)
+    return f"{int(number) if number.is_integer() else number}{unit.upper()}"
+
+def extract_identifiers(text: str, model: str = '', gtin: str = '') -> ProductIdentifiers:
+    """GTINs, model numbers and storage capacities in a title, plus explicit model/GTIN fields"""
+    text = text or ''
+    gtins = {normalize_gtin(match) for match in GTIN_PATTERN.findall(text)}
+    gtins.add(normalize_gtin(gtin))
+    models = {normalize_model(token) for token in TOKEN_PATTERN.findall(text)}
+    if model:
+        models.add(normalize_model(model))
+    capacities = {_capacity(value, unit) for value, unit in CAPACITY_PATTERN.findall(text)}
+    gtins.discard('')
+    models.discard('')
+    return ProductIdentifiers(frozenset(gtins), frozenset(models), frozenset(capacities))
+
+def product_identifiers(product: Dict) -> ProductIdentifiers:
+    """Identifiers of a listing dict (title plus any model/GTIN fields from structured data)"""
+    return extract_identifiers(product.get('title', ''), product.get('model', ''), product.get('gtin', ''))
+
+class IdentifierIndex(Generic[T]):
+    """Hash index from GTIN and model number to the items carrying them"""
+
+    def __init__(self, items: Iterable[Tuple[ProductIdentifiers, T]] = ()):
+        self.items: List[Tuple[ProductIdentifiers, T]] = []
+        self._by_gtin: Dict[str, List[T]] = defaultdict(list)
+        self._by_model: Dict[str, List[T]] = defaultdict(list)
+        for identifiers, item in items:
+            self.add(identifiers, item)
+
+    def add(self, identifiers: ProductIdentifiers, item: T):
+        self.items.append((identifiers, item))
+        for gtin in identifiers.gtins:
+            self._by_gtin[gtin].append(item)
+        for model in identifiers.models:
+            self._by_model[model].append(item)
+
+    def _lookup(self, table: Dict[str, List[T]], keys: Iterable[str]) -> List[T]:
+        """Items under any of the keys, in insertion order"""
+        found = {id(item) for key in keys for item in table.get(key, ())}
+        if not found:
+            return []
+        return [item for _, item in self.items if id(item) in found]
+
+    def resolve(self, query: ProductIdentifiers) -> Tuple[str, List[T]]:
+        """Pick the pool a query should be scored against.
+
+        Returns ('gtin', items) or ('model', items) when the query's
+        identifiers hit the index, otherwise ('fuzzy', items) with every
+        item whose model number or capacity contradicts the query removed.
+        """
+        hits = self._lookup(self._by_gtin, query.gtins)
+        if hits:
+            return MATCH_GTIN, hits
+        hits = self._lookup(self._by_model, query.models)
+        if hits:
+            return MATCH_MODEL, hits
+        return MATCH_FUZZY, [item for identifiers, item in self.items if not query.conflicts_with(identifiers)]
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from bulk_add import PRODUCT_URL_PREFIX, entry_to_code
+from database import Database
+from officeworks_api import OfficeworksAPI
+
+PRODUCT_INFO_TTL = 300  # Seconds a fetched product is reused by /add
+MAX_CACHED_PRODUCTS = 1000
+_LOOKUP_CANCELLED = object()  # Result of a shared lookup whose owning task was cancelled
+
+def url_key(url: str) -> str:
+    """Cache key for a pasted URL: no query string, fragment, trailing slash or case differences"""
+    return url.strip().split('?')[0].split('#')[0].rstrip('/').lower()
+
+class ProductResolver:
+    """Turns a pasted URL or code into product info with at most one API call.
+
+    Codes are parsed from URLs offline. URLs resolved before are remembered
+    in the product_urls table, so a known URL is accepted even when the API
+    is unreachable (its price is filled in by the next price check). Fetched
+    product info is kept in memory for ``ttl`` seconds, and concurrent
+    lookups of one code share a single request.
+    """
+
+    def __init__(self, api: OfficeworksAPI, database: Database, ttl: float = PRODUCT_INFO_TTL,
+                 max_entries: int = MAX_CACHED_PRODUCTS):
+        self.api = api
+        self.database = database
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._info: 'OrderedDict[str, Tuple[float, Dict]]' = OrderedDict()  # code -> (expires at, info)
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def parse(self, url: str = None, product_code: str = None) -> Tuple[Optional[str], Optional[Dict]]:
+        """(product code, remembered product for the URL), without any network call.
+
+        The code is None if the input is not an Officeworks product URL or a
+        plausible product code.
+        """
+        if url:
+            if not url.strip().lower().startswith(PRODUCT_URL_PREFIX):
+                return None, None
+            known = self.database.get_url_code(url_key(url))
+            if known:
+                return known['product_code'], known
+            return entry_to_code(url, self.api), None
+        if product_code:
+            return entry_to_code(product_code, self.api), None
+        return None, None
+
+    def cached(self, product_code: str) -> Optional[Dict]:
+        """Product info fetched within the last ``ttl`` seconds, or None"""
+        entry = self._info.get(product_code)
+        if entry and entry[0] > time.monotonic():
+            self._info.move_to_end(product_code)
+            return entry[1]
+        return None
+
+    async def fetch(self, product_code: str) -> Optional[Dict]:
+        """Product info from the cache or one API request; failed lookups are not cached"""
+        info = self.cached(product_code)
+        if info is not None:
+            return info
+        pending = self._pending.get(product_code)
+        if pending is not None:
+            # Shielded so a cancelled waiter does not cancel the shared lookup
+            info = await asyncio.shield(pending)
+            if info is _LOOKUP_CANCELLED:
+                return await self.fetch(product_code)
+            return info
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[product_code] = future
+        info = _LOOKUP_CANCELLED
+        try:
+            info = await asyncio.to_thread(self.api.get_product_info, product_code)
+        except Exception as e:
+            print(f"Error fetching product {product_code}: {e}")
+            info = None
+        finally:
+            # Always settle the future; if this task was cancelled, waiters look the code up themselves
+            del self._pending[product_code]
+            future.set_result(info)
+        if info:
+            self._info[product_code] = (time.monotonic() + self.ttl, info)
+            self._info.move_to_end(product_code)
+            while len(self._info) > self.max_entries:
+                self._info.popitem(last=False)
+        return info
+
+    def remember(self, url: str, product_code: str, info: Dict):
+        """Record the product a pasted URL resolved to"""
+        self.database.save_url_code(url_key(url), product_code, info.get('name'), info.get('url'))
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:141.0) Gecko/20100101 Firefox/141.0",
+    "Accept": "text/html,application/json;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-AU,en;q=0.5",
+}
+
+JSON_LD_PATTERN = re.compile(
+    r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL
+)
+NEXT_DATA_PATTERN = re.compile(
+    r'<script[^>]+id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL
+)
+
+NAME_KEYS = ('name', 'title', 'productName', 'displayName')
+PRICE_KEYS = ('price', 'salePrice', 'currentPrice', 'finalPrice', 'lowPrice', 'priceValue')
+URL_KEYS = ('url', 'canonicalUrl', 'productUrl', 'href', 'link', 'slug')
+MODEL_KEYS = ('model', 'mpn', 'sku', 'modelNumber')
+GTIN_KEYS = ('gtin13', 'gtin', 'gtin12', 'gtin14', 'ean', 'upc')
+
+class PooledHTTPClient:
+    """Shared aiohttp session for direct retailer requests.
+
+    The session (and its connection pool) is created lazily on first use and
+    reused for every request made from the same event loop.
+    """
+
+    def __init__(self, timeout: float = 5.0, limit: int = 20, headers: Dict[str, str] = None):
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.limit = limit
+        self.headers = headers or DEFAULT_HEADERS
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.limit, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, headers=self.headers)
+            self._loop = loop
+        return self._session
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        """GET a URL and return the body, or None on any failure"""
+        _, body = await self.fetch(url)
+        return body
+
+    async def fetch(self, url: str) -> Tuple[Optional[int], Optional[str]]:
+        """GET a URL and return (status, body); body is None unless the status is 200.
+
+        The status is None when the request itself failed.
+        """
+        try:
+            async with self._get_session().get(url) as response:
+                if response.status != 200:
+                    print(f"[Direct] {url} returned status {response.status}")
+                    return response.status, None
+                return response.status, await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[Direct] Request error for {url}: {e}")
+            return None, None
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+class EmbeddedJSONAdapter:
+    """Direct search adapter reading product JSON without a headless render.
+
+    Fetches the retailer's search page (or a JSON search endpoint when
+    ``url_template`` is given) and reads products from JSON-LD blocks,
+    ``__NEXT_DATA__`` or the raw JSON body, mapped to the internal product
+    dict format used by PriceComparison.
+    """
+
+    def __init__(self, url_template: str = None, max_products: int = 30):
+        self.url_template = url_template
+        self.max_products = max_products
+
+    def build_url(self, search_url_template: str, query: str) -> str:
+        template = self.url_template or search_url_template
+        return template.format(query=query.replace(' ', '+'))
+
+    async def search(self, http_client, search_url_template: str, query: str, base_url: str) -> Optional[List[Dict]]:
+        body = await http_client.fetch_text(self.build_url(search_url_template, query))
+        if not body:
+            return None
+        return self.parse_products(body, base_url)
+
+    def parse_products(self, body: str, base_url: str) -> List[Dict]:
+        """Parse products from an HTML page with embedded JSON, or a JSON body"""
+        documents = []
+        stripped = body.lstrip()
+        if stripped.startswith(('{', '[')):
+            documents.append(self._loads(stripped))
+        else:
+            documents.extend(self._loads(block) for block in JSON_LD_PATTERN.findall(body))
+            next_data = NEXT_DATA_PATTERN.search(body)
+            if next_data:
+                documents.append(self._loads(next_data.group(1)))
+
+        products: List[Dict] = []
+        for document in documents:
+            for candidate in self._iter_product_dicts(document):
+                product = self._to_product(candidate, base_url)
+                if product:
+                    products.append(product)
+                    if len(products) >= self.max_products:
+                        return products
+        return products
+
+    @staticmethod
+    def _loads(text: str):
+        try:
+            return json.loads(text.strip())
+        except (ValueError, TypeError):
+            return None
+
+    def _iter_product_dicts(self, node, depth: int = 0) -> Iterator[Dict]:
+        """Walk a JSON document yielding dicts that look like product listings"""
+        if depth > 12 or node is None:
+            return
+        if isinstance(node, list):
+            for item in node:
+                yield from self._iter_product_dicts(item, depth + 1)
+            return
+        if not isinstance(node, dict):
+            return
+
+        if self._looks_like_product(node):
+            yield node
+            return
+
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                yield from self._iter_product_dicts(value, depth + 1)
+
+    @staticmethod
+    def _looks_like_product(node: Dict) -> bool:
+        node_type = node.get('@type')
+        if node_type == 'Product' or (isinstance(node_type, list) and 'Product' in node_type):
+            return True
+        has_name = any(isinstance(node.get(key), str) for key in NAME_KEYS)
+        has_price = any(key in node for key in PRICE_KEYS) or isinstance(node.get('offers'), (dict, list))
+        return has_name and has_price
+
+    def _to_product(self, node: Dict, base_url: str) -> Optional[Dict]:
+        title = next((node[key] for key in NAME_KEYS if isinstance(node.get(key), str)), '')
+        price = self._find_price(node)
+        if not title or price is None or price <= 0:
+            return None
+
+        url = next((node[key] for key in URL_KEYS if isinstance(node.get(key), str) and node[key]), '')
+        brand = node.get('brand', '')
+        if isinstance(brand, dict):
+            brand = brand.get('name', '')
+
+        return {
+            'title': title.strip(),
+            'price': price,
+            'url': self._absolute_url(url, base_url) if url else base_url,
+            'availability': self._find_availability(node),
+            'brand': brand if isinstance(brand, str) else '',
+            'model': next((str(node[key]) for key in MODEL_KEYS if node.get(key)), ''),
+            'gtin': next((str(node[key]) for key in GTIN_KEYS if node.get(key)), ''),
+        }
+
+    def _find_price(self, node: Dict) -> Optional[float]:
+        for key in PRICE_KEYS:
+            if key in node:
+                price = self._coerce_price(node[key])
+                if price is not None:
+                    return price
+
+        offers = node.get('offers')
+        if isinstance(offers, list):
+            prices = [self._find_price(offer) for offer in offers if isinstance(offer, dict)]
+            prices = [price for price in prices if price is not None]
+            return min(prices) if prices else None
+        if isinstance(offers, dict):
+            return self._find_price(offers)
+        return None
+
+    def _coerce_price(self, value) -> Optional[float]:
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            match = re.search(r'\d+(?:,\d{3})*(?:\.\d+)?', value)
+            return float(match.group(0).replace(',', '')) if match else None
+        if isinstance(value, dict):
+            for key in ('value', 'amount', 'current', 'price'):
+                if key in value:
+                    return self._coerce_price(value[key])
+        return None
+
+    @staticmethod
+    def _find_availability(node: Dict) -> str:
+        offers = node.get('offers')
+        if isinstance(offers, list) and offers:
+            offers = offers[0]
+        availability = offers.get('availability') if isinstance(offers, dict) else node.get('availability')
+        if isinstance(availability, str):
+            return availability.rsplit('/', 1)[-1]
+        return 'unknown'
+
+    @staticmethod
+    def _absolute_url(url: str, base_url: str) -> str:
+        if url.startswith('http'):
+            return url
+        if url.startswith('//'):
+            return f'https:{url}'
+        return f"{base_url.rstrip('/')}/{url.lstrip('/')}"
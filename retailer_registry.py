@@ -0,0 +1,211 @@
+import asyncio
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from retailer_adapters import EmbeddedJSONAdapter
+from extraction_plan import compile_extraction_plan
+from html_extractor import CSSSelector
+
+# Search methods a retailer can be queried with (see RetailerStrategy)
+SEARCH_METHOD_DIRECT = 'direct'
+SEARCH_METHOD_EXTRACT = 'extract'
+SEARCH_METHOD_SCRAPE = 'scrape'
+SEARCH_METHODS = (SEARCH_METHOD_DIRECT, SEARCH_METHOD_EXTRACT, SEARCH_METHOD_SCRAPE)
+
+# Direct adapters a retailer definition can name
+DIRECT_ADAPTERS = {
+    'embedded_json': EmbeddedJSONAdapter,
+}
+
+DEFAULT_RETAILERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'retailers.json')
+
+class RetailerConfig:
+    """Configuration for a specific retailer"""
+    def __init__(self, name: str, base_url: str, search_url: str, price_selectors: List[str],
+                 title_selectors: List[str], link_selectors: List[str] = None,
+                 price_match_threshold: float = 0.95, direct_adapter: EmbeddedJSONAdapter = None,
+                 card_selectors: List[str] = None, methods: List[str] = None,
+                 min_request_interval: float = 0.0, compare: bool = True):
+        self.name = name
+        self.base_url = base_url
+        self.search_url = search_url
+        self.price_selectors = price_selectors
+        self.title_selectors = title_selectors
+        self.link_selectors = link_selectors or []
+        self.price_match_threshold = price_match_threshold
+        self.direct_adapter = direct_adapter  # Optional JSON fast path that skips Firecrawl
+        self.card_selectors = card_selectors  # Product card containers; derived from link_selectors if None
+        self.methods = list(methods or SEARCH_METHODS)  # Allowed search methods, in default order
+        self.min_request_interval = min_request_interval  # Seconds between requests to this retailer
+        self.compare = compare  # False for Officeworks itself
+        # Selectors compiled once; rebuild the plan if the selectors are changed later
+        self.plan = compile_extraction_plan(self.price_selectors, self.title_selectors, self.link_selectors,
+                                            self.card_selectors)
+
+class RetailerRegistryError(ValueError):
+    """Raised when a retailer definitions file is missing, malformed or invalid"""
+    def __init__(self, path: str, problems: List[str]):
+        self.path = path
+        self.problems = problems
+        super().__init__(f"{path}: " + "; ".join(problems))
+
+def _check_selectors(entry: Dict, field: str, problems: List[str], prefix: str, required: bool = True):
+    value = entry.get(field)
+    if value is None and not required:
+        return
+    if not isinstance(value, list) or not value or not all(isinstance(item, str) and item.strip() for item in value):
+        problems.append(f"{prefix}: '{field}' must be a non-empty list of strings")
+        return
+    for selector in value:
+        try:
+            CSSSelector(selector)
+        except ValueError as e:
+            problems.append(f"{prefix}: {field} {e}")
+
+def _validate_entry(key: str, entry, problems: List[str]):
+    prefix = f"retailer '{key}'"
+    if not isinstance(entry, dict):
+        problems.append(f"{prefix}: definition must be an object")
+        return
+    for field in ('name', 'base_url', 'search_url'):
+        if not isinstance(entry.get(field), str) or not entry[field].strip():
+            problems.append(f"{prefix}: '{field}' is required")
+    for field in ('base_url', 'search_url'):
+        if isinstance(entry.get(field), str) and not entry[field].startswith(('http://', 'https://')):
+            problems.append(f"{prefix}: '{field}' must be an http(s) URL")
+    if isinstance(entry.get('search_url'), str) and '{query}' not in entry['search_url']:
+        problems.append(f"{prefix}: 'search_url' must contain {{query}}")
+    _check_selectors(entry, 'price_selectors', problems, prefix)
+    _check_selectors(entry, 'title_selectors', problems, prefix)
+    _check_selectors(entry, 'link_selectors', problems, prefix, required=False)
+    _check_selectors(entry, 'card_selectors', problems, prefix, required=False)
+
+    threshold = entry.get('price_match_threshold', 0.95)
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not 0 <= threshold <= 1:
+        problems.append(f"{prefix}: 'price_match_threshold' must be between 0 and 1")
+    interval = entry.get('min_request_interval', 0)
+    if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval < 0:
+        problems.append(f"{prefix}: 'min_request_interval' must be a number of seconds >= 0")
+    adapter = entry.get('direct_adapter')
+    if adapter is not None and adapter not in DIRECT_ADAPTERS:
+        problems.append(f"{prefix}: unknown 'direct_adapter' {adapter!r} (known: {', '.join(DIRECT_ADAPTERS)})")
+    methods = entry.get('methods')
+    if methods is not None:
+        if not isinstance(methods, list) or not methods or any(method not in SEARCH_METHODS for method in methods):
+            problems.append(f"{prefix}: 'methods' must be a non-empty list of {', '.join(SEARCH_METHODS)}")
+        elif SEARCH_METHOD_DIRECT in methods and adapter is None:
+            problems.append(f"{prefix}: method 'direct' needs a 'direct_adapter'")
+    for field in ('compare', 'enabled'):
+        if field in entry and not isinstance(entry[field], bool):
+            problems.append(f"{prefix}: '{field}' must be true or false")
+
+def _build_config(entry: Dict) -> RetailerConfig:
+    adapter = entry.get('direct_adapter')
+    return RetailerConfig(
+        name=entry['name'],
+        base_url=entry['base_url'],
+        search_url=entry['search_url'],
+        price_selectors=entry['price_selectors'],
+        title_selectors=entry['title_selectors'],
+        link_selectors=entry.get('link_selectors'),
+        price_match_threshold=entry.get('price_match_threshold', 0.95),
+        direct_adapter=DIRECT_ADAPTERS[adapter]() if adapter else None,
+        card_selectors=entry.get('card_selectors'),
+        methods=entry.get('methods'),
+        min_request_interval=entry.get('min_request_interval', 0.0),
+        compare=entry.get('compare', True),
+    )
+
+def parse_retailer_definitions(data, path: str = '<retailers>') -> Dict[str, RetailerConfig]:
+    """Validate retailer definitions and compile them into RetailerConfigs.
+
+    Every problem in the file is reported together in one
+    RetailerRegistryError. Selectors are parsed here, so a selector the
+    HTML extractor does not support fails the load instead of being
+    skipped at search time. Retailers with ``"enabled": false`` are
+    validated but left out.
+    """
+    retailers = data.get('retailers') if isinstance(data, dict) else None
+    if not isinstance(retailers, dict) or not retailers:
+        raise RetailerRegistryError(path, ["expected an object with a non-empty 'retailers' object"])
+
+    problems: List[str] = []
+    names = set()
+    for key, entry in retailers.items():
+        _validate_entry(key, entry, problems)
+        name = entry.get('name') if isinstance(entry, dict) else None
+        if name in names:
+            problems.append(f"retailer '{key}': duplicate name {name!r}")
+        names.add(name)
+    if problems:
+        raise RetailerRegistryError(path, problems)
+
+    return {key: _build_config(entry) for key, entry in retailers.items() if entry.get('enabled', True)}
+
+def load_retailer_definitions(path: str = DEFAULT_RETAILERS_PATH) -> Dict[str, RetailerConfig]:
+    """Load and compile the retailer definitions file"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except OSError as e:
+        raise RetailerRegistryError(path, [f"cannot read file: {e}"])
+    except json.JSONDecodeError as e:
+        raise RetailerRegistryError(path, [f"invalid JSON: {e}"])
+    return parse_retailer_definitions(data, path)
+
+class RetailerRegistry:
+    """Hot reload of the retailer definitions file into a PriceComparison.
+
+    A reload builds a complete new retailer dict and swaps it in with a
+    single assignment, so a comparison sees either the old or the new
+    registry and never a mix. Searches already running keep the
+    RetailerConfig objects they started with. An invalid file is rejected
+    and the current retailers stay in place.
+    """
+
+    def __init__(self, comparison, path: str = DEFAULT_RETAILERS_PATH):
+        self.comparison = comparison
+        self.path = path
+        self._mtime = self._current_mtime()
+        self.last_error: Optional[str] = None
+        self.reloads = 0
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self) -> Tuple[bool, str]:
+        """Load the file and swap it in; returns (success, message)"""
+        self._mtime = self._current_mtime()
+        try:
+            retailers = load_retailer_definitions(self.path)
+        except RetailerRegistryError as e:
+            self.last_error = str(e)
+            print(f"[Retailers] Reload rejected, keeping {len(self.comparison.retailers)} retailers: {e}")
+            return False, self.last_error
+
+        self.comparison.retailers = retailers
+        self.last_error = None
+        self.reloads += 1
+        message = f"Loaded {len(retailers)} retailers: {', '.join(r.name for r in retailers.values())}"
+        print(f"[Retailers] {message}")
+        return True, message
+
+    def reload_if_changed(self) -> Optional[Tuple[bool, str]]:
+        """Reload when the file's modification time changed; None when it has not"""
+        mtime = self._current_mtime()
+        if mtime is None or mtime == self._mtime:
+            return None
+        return self.reload()
+
+    async def watch(self, interval: float = 30.0):
+        """Poll the file for changes until cancelled; reading and parsing it runs in a worker thread"""
+        print(f"[Retailers] Watching {self.path} every {interval:.0f}s")
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                print(f"[Retailers] Error checking {self.path}: {e}")
@@ -0,0 +1,98 @@
+import random
+from typing import Dict, List, Optional
+
+class MethodStats:
+    """Exponentially weighted success rate and latency for one retailer/method pair"""
+    def __init__(self, attempts: int = 0, success_rate: float = 0.5, avg_latency: float = 0.0):
+        self.attempts = attempts
+        self.success_rate = success_rate
+        self.avg_latency = avg_latency
+
+    def update(self, success: bool, latency: float, alpha: float):
+        if self.attempts == 0:
+            self.success_rate = 1.0 if success else 0.0
+            self.avg_latency = latency
+        else:
+            self.success_rate += alpha * ((1.0 if success else 0.0) - self.success_rate)
+            self.avg_latency += alpha * (latency - self.avg_latency)
+        self.attempts += 1
+
+    def expected_cost(self) -> float:
+        """Expected seconds spent per successful result (lower is better)"""
+        return max(self.avg_latency, 0.001) / max(self.success_rate, 0.01)
+
+class RetailerStrategy:
+    """Learns, per retailer, which search method (extract or scrape) to try first.
+
+    Statistics are exponentially weighted so the order adapts when a site
+    changes, and persisted through the database so they survive restarts.
+    The losing method is still probed first on a small fraction of searches
+    to notice when it starts working again.
+    """
+
+    def __init__(self, database=None, explore_rate: float = 0.1, min_samples: int = 3,
+                 alpha: float = 0.2, rng: Optional[random.Random] = None):
+        self.database = database
+        self.explore_rate = explore_rate
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self.rng = rng or random.Random()
+        self.stats: Dict[str, Dict[str, MethodStats]] = {}
+        self._load()
+
+    def _load(self):
+        if not self.database:
+            return
+        for row in self.database.get_retailer_method_stats():
+            self.stats.setdefault(row['retailer'], {})[row['method']] = MethodStats(
+                row['attempts'], row['success_rate'], row['avg_latency']
+            )
+
+    def get_stats(self, retailer: str, method: str) -> MethodStats:
+        return self.stats.setdefault(retailer, {}).setdefault(method, MethodStats())
+
+    def order_methods(self, retailer: str, methods: List[str]) -> List[str]:
+        """Order methods for a search, best expected cost first.
+
+        Methods with ``min_samples`` attempts are ranked by expected cost.
+        Searches stop at the first success, so a method behind a working one
+        may never get samples; methods without enough samples keep their
+        configured order, after the proven methods that mostly succeed and
+        ahead of those that mostly fail. New retailers therefore start with
+        the configured order.
+        """
+        if len(methods) < 2:
+            return list(methods)
+
+        proven = sorted(
+            (method for method in methods if self.get_stats(retailer, method).attempts >= self.min_samples),
+            key=lambda method: self.get_stats(retailer, method).expected_cost()
+        )
+        untried = [method for method in methods if method not in proven]
+        working = [method for method in proven if self.get_stats(retailer, method).success_rate >= 0.5]
+        failing = [method for method in proven if method not in working]
+        ranked = working + untried + failing
+        if not proven:
+            return ranked
+        if self.rng.random() < self.explore_rate:
+            # Probe a losing method first so a recovered path gets noticed
+            probe = self.rng.choice(ranked[1:])
+            ranked.remove(probe)
+            ranked.insert(0, probe)
+        return ranked
+
+    def record(self, retailer: str, method: str, success: bool, latency: float):
+        """Record the outcome of a search attempt"""
+        stats = self.get_stats(retailer, method)
+        stats.update(success, latency, self.alpha)
+        if self.database:
+            self.database.save_retailer_method_stats(
+                retailer, method, stats.attempts, stats.success_rate, stats.avg_latency
+            )
+
+    def describe(self, retailer: str) -> str:
+        """Short human readable summary of a retailer's learned stats"""
+        parts = []
+        for method, stats in sorted(self.stats.get(retailer, {}).items()):
+            parts.append(f"{method}: {stats.success_rate:.0%} ok, {stats.avg_latency:.1f}s ({stats.attempts})")
+        return ", ".join(parts) if parts else "no data"
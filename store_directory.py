@@ -0,0 +1,129 @@
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+import discord
+from store_search import StoreSearchIndex
+from store_geo import ResolvedLocation, StoreLocator
+
+DEFAULT_STORES_PATH = 'responses/allstores.md'
+MAX_SELECT_OPTIONS = 25  # Discord's limit on options in one select menu
+
+def normalize_store_key(text: str) -> str:
+    """Lowercase a store name or suburb and collapse punctuation, so 'Hunter St,' and 'hunter st' agree"""
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', (text or '').lower()).split())
+
+def build_store_option(store: Dict) -> discord.SelectOption:
+    """Create the Discord select option for one store"""
+    store_id = store['storeId']
+    suburb = store.get('suburb', '')
+    postcode = store.get('postcode', '')
+    suburb_postcode = f"{suburb}, {postcode}".strip(', ')
+    description = f"{suburb_postcode} - ID: {store_id}" if suburb_postcode else f"ID: {store_id}"
+    return discord.SelectOption(
+        label=store.get('store', 'Unknown Store'),
+        value=store_id,
+        description=description
+    )
+
+class StoreDirectory:
+    """Officeworks stores indexed once at load.
+
+    Holds the stores by ID, per-state tuples, the select options for each
+    state and normalised name/suburb keys, so lookups are dict hits and
+    store views reuse the same options instead of rebuilding them. Free-text
+    search goes through a StoreSearchIndex and nearest-store lookups through
+    a StoreLocator, both built at the same time.
+    """
+
+    def __init__(self, stores: Iterable[Dict] = ()):
+        self.stores: Tuple[Dict, ...] = tuple(store for store in stores if store.get('storeId'))
+        self._by_id: Dict[str, Dict] = {}
+        self._by_state: Dict[str, Tuple[Dict, ...]] = {}
+        self._by_name: Dict[str, Tuple[Dict, ...]] = {}
+        self._by_suburb: Dict[str, Tuple[Dict, ...]] = {}
+        self._options: Dict[str, discord.SelectOption] = {}
+        self._state_options: Dict[str, Tuple[discord.SelectOption, ...]] = {}
+
+        by_state: Dict[str, List[Dict]] = {}
+        by_name: Dict[str, List[Dict]] = {}
+        by_suburb: Dict[str, List[Dict]] = {}
+        for store in self.stores:
+            store_id = store['storeId']
+            self._by_id[store_id.upper()] = store
+            self._options[store_id] = build_store_option(store)
+            by_state.setdefault(store.get('state'), []).append(store)
+            by_name.setdefault(normalize_store_key(store.get('store')), []).append(store)
+            by_suburb.setdefault(normalize_store_key(store.get('suburb')), []).append(store)
+
+        self._by_state = {state: tuple(stores) for state, stores in by_state.items()}
+        self._by_name = {key: tuple(stores) for key, stores in by_name.items() if key}
+        self._by_suburb = {key: tuple(stores) for key, stores in by_suburb.items() if key}
+        self._state_options = {
+            state: tuple(self._options[store['storeId']] for store in stores[:MAX_SELECT_OPTIONS])
+            for state, stores in self._by_state.items()
+        }
+        self.search_index = StoreSearchIndex(self.stores)
+        self.locator = StoreLocator(self.stores)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_STORES_PATH) -> 'StoreDirectory':
+        """Build the directory from the stores JSON file; empty if it cannot be read"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(data.get('stores', []))
+        except Exception as e:
+            print(f"Warning: Could not load stores data: {e}")
+            return cls()
+
+    def __len__(self) -> int:
+        return len(self.stores)
+
+    def get(self, store_id: str) -> Optional[Dict]:
+        """Store by ID (case-insensitive), or None"""
+        return self._by_id.get((store_id or '').strip().upper())
+
+    def in_state(self, state: str) -> Tuple[Dict, ...]:
+        """Stores in a state, in file order"""
+        return self._by_state.get(state, ())
+
+    def by_name(self, name: str) -> Tuple[Dict, ...]:
+        """Stores whose name matches exactly after normalisation"""
+        return self._by_name.get(normalize_store_key(name), ())
+
+    def by_suburb(self, suburb: str) -> Tuple[Dict, ...]:
+        """Stores in a suburb, matched after normalisation"""
+        return self._by_suburb.get(normalize_store_key(suburb), ())
+
+    def search(self, query: str, state: str = None, limit: int = MAX_SELECT_OPTIONS) -> List[Dict]:
+        """Stores matching free text (name, suburb, postcode, address or ID), best first"""
+        return self.search_index.search(query, state, limit)
+
+    def resolve_location(self, query: str) -> Optional[ResolvedLocation]:
+        """Coordinates for "lat, lon", a postcode or a suburb/store name"""
+        return self.locator.resolve(query, self)
+
+    def nearest(self, latitude: float, longitude: float, k: int = 5) -> List[Tuple[float, Dict]]:
+        """The k closest stores as (distance in km, store), nearest first"""
+        return self.locator.nearest(latitude, longitude, k)
+
+    def state_counts(self) -> Dict[str, int]:
+        """Number of stores in each state"""
+        return {state: len(stores) for state, stores in self._by_state.items()}
+
+    def state_options(self, state: str) -> List[discord.SelectOption]:
+        """Select options for the first stores in a state, built at load"""
+        return list(self._state_options.get(state, ()))
+
+    def options_for(self, stores: Iterable[Dict]) -> List[discord.SelectOption]:
+        """Select options for any list of stores (e.g. search results), reusing the prebuilt ones"""
+        options = []
+        for store in stores:
+            option = self._options.get(store.get('storeId'))
+            if option is None and store.get('storeId'):
+                option = build_store_option(store)
+            if option is not None:
+                options.append(option)
+            if len(options) == MAX_SELECT_OPTIONS:
+                break
+        return options
@@ -0,0 +1,164 @@
+import heapq
+import math
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+COORDINATES_PATTERN = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*[,\s]\s*(-?\d+(?:\.\d+)?)\s*$')
+POSTCODE_PATTERN = re.compile(r'^\s*(\d{4})\s*$')
+MAX_POSTCODE_GAP = 20  # Nearby postcode numbers are close on the ground; beyond this the guess is too rough
+
+Point = Tuple[float, float, float]
+
+class ResolvedLocation(NamedTuple):
+    """Coordinates a location query resolved to, and how"""
+    latitude: float
+    longitude: float
+    label: str
+
+def _unit_vector(latitude: float, longitude: float) -> Point:
+    """Point on the unit sphere; straight-line distance between these orders like great-circle distance"""
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def store_coordinates(store: Dict) -> Optional[Tuple[float, float]]:
+    """(latitude, longitude) parsed from a store record, or None when missing or invalid"""
+    try:
+        latitude, longitude = float(store['latitude']), float(store['longitude'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or (latitude == 0 and longitude == 0):
+        return None
+    return latitude, longitude
+
+class _KDNode:
+    __slots__ = ('point', 'item', 'axis', 'left', 'right')
+
+    def __init__(self, point: Point, item, axis: int, left, right):
+        self.point = point
+        self.item = item
+        self.axis = axis
+        self.left = left
+        self.right = right
+
+class KDTree:
+    """Static 3-d tree over points on the unit sphere, built once with median splits"""
+
+    def __init__(self, entries: Iterable[Tuple[Point, object]]):
+        entries = list(entries)
+        self.size = len(entries)
+        self._root = self._build(entries, 0)
+
+    def _build(self, entries: List[Tuple[Point, object]], depth: int) -> Optional[_KDNode]:
+        if not entries:
+            return None
+        axis = depth % 3
+        entries.sort(key=lambda entry: entry[0][axis])
+        middle = len(entries) // 2
+        point, item = entries[middle]
+        return _KDNode(point, item, axis, self._build(entries[:middle], depth + 1),
+                       self._build(entries[middle + 1:], depth + 1))
+
+    def nearest(self, point: Point, k: int = 1) -> List[Tuple[float, object]]:
+        """The k items closest to point as (squared distance, item), nearest first"""
+        if k <= 0:
+            return []
+        best: List[Tuple[float, int, object]] = []  # Max-heap on distance via negation
+        counter = 0
+
+        def visit(node: Optional[_KDNode]):
+            nonlocal counter
+            if node is None:
+                return
+            distance = sum((a - b) ** 2 for a, b in zip(point, node.point))
+            if len(best) < k:
+                heapq.heappush(best, (-distance, counter, node.item))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, counter, node.item))
+            counter += 1
+
+            delta = point[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if delta < 0 else (node.right, node.left)
+            visit(near)
+            # Only cross the splitting plane if a closer point could be on the other side
+            if len(best) < k or delta * delta < -best[0][0]:
+                visit(far)
+
+        visit(self._root)
+        return [(-distance, item) for distance, _, item in sorted(best, key=lambda entry: (-entry[0], entry[1]))]
+
+class StoreLocator:
+    """Nearest-store lookups over store coordinates, using a k-d tree built at load"""
+
+    def __init__(self, stores: Iterable[Dict]):
+        entries = []
+        self._by_postcode: Dict[str, List[Tuple[float, float]]] = {}
+        for store in stores:
+            coordinates = store_coordinates(store)
+            if coordinates is None:
+                continue
+            entries.append((_unit_vector(*coordinates), (coordinates, store)))
+            postcode = str(store.get('postcode') or '')
+            if postcode.isdigit():
+                self._by_postcode.setdefault(postcode, []).append(coordinates)
+        self._tree = KDTree(entries)
+        self._postcodes = sorted(self._by_postcode)
+
+    def __len__(self) -> int:
+        return self._tree.size
+
+    def nearest(self, latitude: float, longitude: float, k: int = 5) -> List[Tuple[float, Dict]]:
+        """The k stores closest to a point as (distance in km, store), nearest first"""
+        results = []
+        for _, ((store_lat, store_lon), store) in self._tree.nearest(_unit_vector(latitude, longitude), k):
+            results.append((haversine_km(latitude, longitude, store_lat, store_lon), store))
+        return results
+
+    def locate_postcode(self, postcode: str) -> Optional[ResolvedLocation]:
+        """Coordinates for a postcode from the stores in it, or from the nearest-numbered postcode nearby"""
+        if postcode in self._by_postcode:
+            closest = postcode
+        else:
+            number = int(postcode)
+            candidates = [code for code in self._postcodes
+                          if code[0] == postcode[0] and abs(int(code) - number) <= MAX_POSTCODE_GAP]
+            if not candidates:
+                return None
+            closest = min(candidates, key=lambda code: (abs(int(code) - number), code))
+        points = self._by_postcode[closest]
+        latitude = sum(lat for lat, _ in points) / len(points)
+        longitude = sum(lon for _, lon in points) / len(points)
+        label = f"postcode {postcode}" if closest == postcode else f"postcode {postcode} (near {closest})"
+        return ResolvedLocation(latitude, longitude, label)
+
+    def resolve(self, query: str, directory=None) -> Optional[ResolvedLocation]:
+        """Turn "lat, lon", a postcode or a suburb/store name into coordinates.
+
+        Postcodes and suburbs are resolved from the store records themselves
+        (there is no gazetteer), so a postcode with no store in it is placed
+        at the closest-numbered postcode that has one.
+        """
+        match = COORDINATES_PATTERN.match(query or '')
+        if match:
+            latitude, longitude = float(match.group(1)), float(match.group(2))
+            if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+                return ResolvedLocation(latitude, longitude, f"{latitude:.4f}, {longitude:.4f}")
+            return None
+
+        match = POSTCODE_PATTERN.match(query or '')
+        if match:
+            return self.locate_postcode(match.group(1))
+
+        if directory is not None:
+            for store in directory.search(query, limit=1):
+                coordinates = store_coordinates(store)
+                if coordinates:
+                    label = f"{store.get('suburb') or store.get('store')} {store.get('state', '')}".strip()
+                    return ResolvedLocation(coordinates[0], coordinates[1], label)
+        return None
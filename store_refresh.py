@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from config import AUSTRALIAN_STATES
+from officeworks_api import OfficeworksAPI
+from store_directory import DEFAULT_STORES_PATH, StoreDirectory
+
+# Store fields kept in the snapshot; stock levels in the API response are product-specific
+SNAPSHOT_FIELDS = ('storeId', 'store', 'address', 'suburb', 'postcode', 'state', 'phone', 'latitude', 'longitude')
+SNAPSHOT_VERSION = 1
+MIN_KEPT_FRACTION = 0.5  # Refuse a refresh that would drop more than half the stores (likely an API fault)
+
+class StoreDiff(NamedTuple):
+    """Store IDs added, removed and changed between two store lists"""
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self) -> str:
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed"
+
+def compact_store(store: Dict) -> Dict:
+    """Only the fields the store directory uses"""
+    return {field: store.get(field) for field in SNAPSHOT_FIELDS}
+
+def diff_stores(old: Iterable[Dict], new: Iterable[Dict]) -> StoreDiff:
+    """Compare two store lists by storeId on the snapshot fields"""
+    old_by_id = {store['storeId']: compact_store(store) for store in old}
+    new_by_id = {store['storeId']: compact_store(store) for store in new}
+    return StoreDiff(
+        added=sorted(set(new_by_id) - set(old_by_id)),
+        removed=sorted(set(old_by_id) - set(new_by_id)),
+        changed=sorted(store_id for store_id in set(old_by_id) & set(new_by_id)
+                       if old_by_id[store_id] != new_by_id[store_id]),
+    )
+
+def write_snapshot(path: str, stores: Iterable[Dict], fetched_at: datetime = None):
+    """Write stores as compact JSON, replacing the old snapshot only once the new one is complete"""
+    data = {
+        'version': SNAPSHOT_VERSION,
+        'fetched_at': (fetched_at or datetime.now(timezone.utc)).isoformat(),
+        'stores': [compact_store(store) for store in stores],
+    }
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+def read_snapshot_time(path: str) -> Optional[datetime]:
+    """When the snapshot was fetched, or None if there is no readable snapshot"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return datetime.fromisoformat(json.load(f)['fetched_at'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+def load_store_directory(snapshot_path: str = None, fallback_path: str = DEFAULT_STORES_PATH) -> StoreDirectory:
+    """Cold-start directory: the latest snapshot if there is one, else the bundled store list"""
+    if snapshot_path and os.path.exists(snapshot_path):
+        directory = StoreDirectory.load(snapshot_path)
+        if directory:
+            print(f"Loaded {len(directory)} stores from snapshot {snapshot_path}")
+            return directory
+    return StoreDirectory.load(fallback_path)
+
+class StoreRefresher:
+    """Periodic refresh of the bot's store directory from the Officeworks API.
+
+    Every state's store list is fetched concurrently and diffed against the
+    current directory. When something changed, a new StoreDirectory is built
+    and assigned to ``bot.store_directory`` in one step, so commands see
+    either the old or the new stores, and a compact snapshot is written for
+    the next cold start. States whose request fails keep their current
+    stores.
+    """
+
+    def __init__(self, bot, api: OfficeworksAPI, snapshot_path: str, interval_hours: float = 24):
+        self.bot = bot
+        self.api = api
+        self.snapshot_path = snapshot_path
+        self.interval_hours = interval_hours
+        self.scheduler = AsyncIOScheduler()
+        self.is_running = False
+        self.last_run: Optional[datetime] = None
+        self.last_diff: Optional[StoreDiff] = None
+        self.last_error: Optional[str] = None
+
+    def start(self):
+        """Start the refresh scheduler, refreshing straight away if the snapshot is missing or stale"""
+        if not self.is_running:
+            fetched_at = read_snapshot_time(self.snapshot_path)
+            age = (datetime.now(timezone.utc) - fetched_at).total_seconds() if fetched_at else None
+            stale = age is None or age > self.interval_hours * 3600
+            # An explicit next_run_time of None would add the job paused, so only pass it to run now
+            run_now = {'next_run_time': datetime.now(timezone.utc)} if stale else {}
+            self.scheduler.add_job(
+                self.refresh,
+                IntervalTrigger(hours=self.interval_hours),
+                id='store_refresh',
+                replace_existing=True,
+                **run_now
+            )
+            self.scheduler.start()
+            self.is_running = True
+            print(f"Store refresher started (every {self.interval_hours:g} hours)")
+
+    def stop(self):
+        """Stop the refresh scheduler"""
+        if self.is_running:
+            self.scheduler.shutdown()
+            self.is_running = False
+            print("Store refresher stopped")
+
+    async def fetch_all(self) -> Dict[str, Optional[List[Dict]]]:
+        """Store records for every state, fetched concurrently; None for states that failed"""
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.api.get_store_records, state) for state in AUSTRALIAN_STATES),
+            return_exceptions=True
+        )
+        fetched = {}
+        for state, result in zip(AUSTRALIAN_STATES, results):
+            if isinstance(result, Exception):
+                print(f"Error fetching stores for {state}: {result}")
+                result = None
+            fetched[state] = result
+        return fetched
+
+    def merge(self, current: StoreDirectory, fetched: Dict[str, Optional[List[Dict]]]) -> List[Dict]:
+        """New store list: fetched states replace their stores, failed states keep the current ones"""
+        stores: Dict[str, Dict] = {}
+        for state in AUSTRALIAN_STATES:
+            records = fetched.get(state)
+            if records is None:
+                records = current.in_state(state)
+            for store in records:
+                stores.setdefault(store['storeId'], compact_store(store))
+        return list(stores.values())
+
+    async def refresh(self) -> Optional[StoreDiff]:
+        """Fetch, diff and swap in the latest store list; returns the diff, or None if nothing was applied"""
+        try:
+            print(f"Starting store refresh at {datetime.now(timezone.utc)}")
+            current = self.bot.store_directory
+            fetched = await self.fetch_all()
+            failed = [state for state, records in fetched.items() if records is None]
+            if len(failed) == len(fetched):
+                self.last_error = "all store list requests failed"
+                print(f"Store refresh failed: {self.last_error}")
+                return None
+
+            stores = self.merge(current, fetched)
+            if len(current) and len(stores) < len(current) * MIN_KEPT_FRACTION:
+                self.last_error = f"refresh returned {len(stores)} stores, expected about {len(current)}"
+                print(f"Store refresh rejected: {self.last_error}")
+                return None
+
+            diff = diff_stores(current.stores, stores)
+            self.last_diff = diff
+            self.last_error = None
+            if diff:
+                directory = await asyncio.to_thread(StoreDirectory, stores)
+                self.bot.store_directory = directory
+                print(f"Store directory updated: {diff.summary()}")
+            else:
+                print("Store directory unchanged")
+            if failed:
+                print(f"Kept previous stores for {', '.join(failed)}")
+            await asyncio.to_thread(write_snapshot, self.snapshot_path, stores)
+            return diff
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Error in store refresh: {e}")
+            return None
+        finally:
+            self.last_run = datetime.now(timezone.utc)
+
+    def describe(self) -> str:
+        """One-line summary for /status"""
+        last_run = self.last_run.strftime('%Y-%m-%d %H:%M UTC') if self.last_run else "not yet run"
+        result = f"; {self.last_diff.summary()}" if self.last_diff is not None else ""
+        error = f"; last error: {self.last_error}" if self.last_error else ""
+        return f"{len(self.bot.store_directory)} stores, every {self.interval_hours:g}h; last run {last_run}{result}{error}"
@@ -0,0 +1,129 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Searchable store fields and how much a hit in each counts towards the rank
+FIELD_WEIGHTS = {
+    'storeId': 4.0,
+    'store': 3.0,
+    'suburb': 2.0,
+    'postcode': 2.0,
+    'address': 1.0,
+}
+PREFIX_FACTOR = 0.75  # A word prefix ("bour" for "bourke") counts less than the whole word
+MIN_TRIGRAM_COVERAGE = 0.5  # Share of the query's trigrams a store needs to match without a prefix hit
+TRIGRAM_WEIGHT = 2.0
+
+def normalize_search_text(text) -> str:
+    """Lowercase, with punctuation turned into spaces and whitespace collapsed"""
+    text = ''.join(char if char.isalnum() else ' ' for char in str(text or '').lower())
+    return ' '.join(text.split())
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of each word, padded so word starts and ends count"""
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class _TrieNode:
+    __slots__ = ('children', 'prefix_of', 'word_of')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.prefix_of: Dict[int, float] = {}  # store -> best field weight of a word under this node
+        self.word_of: Dict[int, float] = {}  # store -> best field weight of a word ending here
+
+class StoreSearchIndex:
+    """Ranked store search over name, suburb, postcode, address and store ID.
+
+    Every word of every field goes into a prefix trie, so each query word
+    is matched as a word or word prefix with one walk down the trie. Word
+    trigrams are kept in postings lists for typo tolerance: a store that
+    misses a query word can still match if it shares enough of the query's
+    trigrams. Field weights rank store ID and name hits above address hits.
+    """
+
+    def __init__(self, stores: Iterable[Dict] = ()):
+        self.stores: List[Dict] = list(stores)
+        self._root = _TrieNode()
+        self._trigrams: Dict[str, List[int]] = defaultdict(list)
+        for doc, store in enumerate(self.stores):
+            grams = set()
+            for field, weight in FIELD_WEIGHTS.items():
+                text = normalize_search_text(store.get(field))
+                for word in text.split():
+                    self._insert(word, doc, weight)
+                grams |= trigrams(text)
+            for gram in grams:
+                self._trigrams[gram].append(doc)
+
+    def _insert(self, word: str, doc: int, weight: float):
+        node = self._root
+        for char in word:
+            node = node.children.setdefault(char, _TrieNode())
+            if node.prefix_of.get(doc, 0) < weight:
+                node.prefix_of[doc] = weight
+        if node.word_of.get(doc, 0) < weight:
+            node.word_of[doc] = weight
+
+    def _find(self, word: str) -> Optional[_TrieNode]:
+        node = self._root
+        for char in word:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _word_scores(self, word: str) -> Dict[int, float]:
+        """Stores with a word equal to or starting with this query word"""
+        node = self._find(word)
+        if node is None:
+            return {}
+        scores = {doc: weight * PREFIX_FACTOR for doc, weight in node.prefix_of.items()}
+        for doc, weight in node.word_of.items():
+            scores[doc] = max(scores[doc], weight)
+        return scores
+
+    def _trigram_coverage(self, text: str) -> Dict[int, float]:
+        """Share of the query's trigrams each store contains"""
+        grams = trigrams(text)
+        counts: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for doc in self._trigrams.get(gram, ()):
+                counts[doc] += 1
+        return {doc: count / len(grams) for doc, count in counts.items()} if grams else {}
+
+    def search_scored(self, query: str, state: str = None, limit: int = 25) -> List[Tuple[float, Dict]]:
+        """(score, store) pairs for a query, best first"""
+        text = normalize_search_text(query)
+        if not text:
+            return []
+
+        # Every query word must hit a word or word prefix for a prefix match
+        prefix_scores: Optional[Dict[int, float]] = None
+        for word in text.split():
+            word_scores = self._word_scores(word)
+            if prefix_scores is None:
+                prefix_scores = word_scores
+            else:
+                prefix_scores = {doc: score + word_scores[doc] for doc, score in prefix_scores.items()
+                                 if doc in word_scores}
+            if not prefix_scores:
+                break
+
+        scores = dict(prefix_scores or {})
+        for doc, coverage in self._trigram_coverage(text).items():
+            if doc in scores or coverage >= MIN_TRIGRAM_COVERAGE:
+                scores[doc] = scores.get(doc, 0.0) + coverage * TRIGRAM_WEIGHT
+
+        ranked = [
+            (score, self.stores[doc]) for doc, score in scores.items()
+            if state is None or self.stores[doc].get('state') == state
+        ]
+        ranked.sort(key=lambda item: (-item[0], item[1].get('store', '')))
+        return ranked[:limit]
+
+    def search(self, query: str, state: str = None, limit: int = 25) -> List[Dict]:
+        """Stores matching a query, best first"""
+        return [store for _, store in self.search_scored(query, state, limit)]
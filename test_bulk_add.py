@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk adding products with /addmany
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+from bulk_add import bulk_add_products, collect_codes, parse_bulk_csv, parse_bulk_text
+from database import PRODUCT_ADDED, PRODUCT_ALREADY_TRACKED, PRODUCT_REACTIVATED, Database
+from officeworks_api import OfficeworksAPI
+
+PRODUCTS = {
+    'ipdmw128g': {'name': 'iPad mini Wi-Fi 128GB Space Grey', 'url': '/p/ipdmw128g', 'price': 797.00},
+    'penblue10': {'name': 'Bic Cristal Pen Blue 10 Pack', 'url': '/p/penblue10', 'price': 4.50},
+    'papa4500': {'name': 'Reflex A4 Copy Paper 500 Sheets', 'url': '/p/papa4500', 'price': 7.00},
+}
+
+class FakeAPI(OfficeworksAPI):
+    """OfficeworksAPI answering product lookups from PRODUCTS, recording calls and peak concurrency"""
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get_product_info(self, product_code):
+        with self._lock:
+            self.calls.append(product_code)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return PRODUCTS.get(product_code)
+
+def test_parsing():
+    """Entries split on separators; CSV files use the code column"""
+    print("🧪 Testing entry parsing...")
+    assert parse_bulk_text("ipdmw128g, penblue10;PAPA4500\nabc") == ['ipdmw128g', 'penblue10', 'PAPA4500', 'abc']
+    assert parse_bulk_text(None) == []
+    assert parse_bulk_csv("name,code\niPad,ipdmw128g\nPen,penblue10\n\n") == ['ipdmw128g', 'penblue10']
+    assert parse_bulk_csv("ipdmw128g,iPad\npenblue10,Pen\n") == ['ipdmw128g', 'penblue10']
+    print("   ✓ Text and CSV entries")
+
+    api = OfficeworksAPI()
+    entries = [
+        'https://www.officeworks.com.au/shop/officeworks/p/ipad-mini-a17-pro-ipdmw128g?cm=123#reviews',
+        'IPDMW128G',
+        'penblue10',
+        'https://example.com/p/not-officeworks-abc',
+        'not/a/code',
+        'papa4500',
+    ]
+    codes, invalid, skipped = collect_codes(entries, api, limit=2)
+    assert codes == ['ipdmw128g', 'penblue10']
+    assert invalid == ['https://example.com/p/not-officeworks-abc', 'not/a/code']
+    assert skipped == ['papa4500']
+    print("   ✓ URLs and codes normalised, duplicates dropped, limit applied")
+
+def test_bulk_add():
+    """Lookups run concurrently, once per code, and every outcome is reported"""
+    print("🧪 Testing bulk add...")
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        db = Database(os.path.join(tmp, 'bulk.db'))
+        db.add_user(1, 'user1')
+        db.add_product(1, 'penblue10', 'Bic Cristal Pen Blue 10 Pack', None, 4.50)
+        db.add_product(1, 'papa4500', 'Reflex A4 Copy Paper 500 Sheets', None, 7.00)
+        db.remove_product(1, 'papa4500')
+
+        api = FakeAPI()
+        entries = ['ipdmw128g', 'IPDMW128G', 'penblue10', 'papa4500', 'missing1', 'bad code!']
+        started = time.perf_counter()
+        result = asyncio.run(bulk_add_products(db, api, 1, entries, concurrency=5))
+        elapsed = time.perf_counter() - started
+
+        assert sorted(api.calls) == ['ipdmw128g', 'missing1', 'papa4500', 'penblue10']
+        assert api.peak > 1 and elapsed < api.delay * 3
+        assert [p['product_code'] for p in result.added] == ['ipdmw128g']
+        assert [p['product_code'] for p in result.reactivated] == ['papa4500']
+        assert result.already_tracked == ['penblue10']
+        assert result.not_found == ['missing1']
+        assert result.invalid == ['bad code!']
+        assert db.get_user_product(1, 'ipdmw128g')['current_price'] == 797.00
+        assert db.get_user_product(1, 'papa4500') is not None
+        assert db.count_user_products(1) == 3
+
+        # Codes the caller already knows are tracked are not fetched again
+        api = FakeAPI(delay=0)
+        result = asyncio.run(bulk_add_products(db, api, 1, ['ipdmw128g', 'penblue10'], tracked={'ipdmw128g', 'penblue10'}))
+        assert api.calls == [] and result.already_tracked == ['ipdmw128g', 'penblue10']
+    print("   ✓ Concurrent lookups, one per code")
+    print("   ✓ Added, reactivated, already tracked, not found and invalid reported")
+
+def test_add_products_outcomes():
+    """add_products reports each outcome and writes everything in one transaction"""
+    print("🧪 Testing add_products...")
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        db = Database(os.path.join(tmp, 'bulk.db'))
+        db.add_user(1, 'user1')
+        db.add_product(1, 'PENBLUE10', 'Bic Cristal Pen Blue 10 Pack', None, 4.50)
+        products = [{'product_code': code, 'product_name': info['name'], 'product_url': info['url'],
+                     'current_price': info['price']} for code, info in PRODUCTS.items()]
+        outcomes = db.add_products(1, products)
+        assert outcomes == {'ipdmw128g': PRODUCT_ADDED, 'penblue10': PRODUCT_ALREADY_TRACKED, 'papa4500': PRODUCT_ADDED}
+        db.remove_product(1, 'ipdmw128g')
+        assert db.add_products(1, products[:1]) == {'ipdmw128g': PRODUCT_REACTIVATED}
+
+        # A failing row rolls back the whole batch
+        assert db.add_products(2, [{'product_code': 'new1'}, {'product_name': 'no code'}]) == {}
+        assert db.count_user_products(2) == 0
+    print("   ✓ Outcomes reported and failed batches rolled back")
+
+if __name__ == "__main__":
+    test_parsing()
+    test_bulk_add()
+    test_add_products_outcomes()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared comparison result cache
+"""
+
+import asyncio
+import contextlib
+import io
+import time
+
+from comparison_cache import ComparisonCache
+from firecrawl_budget import FirecrawlBudget
+from firecrawl_stub import FirecrawlStub
+from price_comparison import PriceComparison
+
+QUERY = 'iPad mini (A17 Pro) 8.3" WiFi 128GB Space Grey'
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def _without_rate_limits(comparison):
+    """The offline fixtures need no pacing between requests to one retailer"""
+    for retailer in comparison.retailers.values():
+        retailer.min_request_interval = 0
+    return comparison
+
+def _make_comparison(stub, clock=None, budget=None):
+    comparison = _without_rate_limits(PriceComparison(firecrawl_client=stub, budget=budget))
+    comparison.cache = ComparisonCache(ttl=60, stale_ttl=300, clock=clock or time.monotonic)
+    return comparison
+
+def _run(coro):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(coro)
+
+def test_hits_rebased_to_caller_price():
+    """A repeat comparison is served from cache with savings against the new price"""
+    print("🧪 Testing cache hits...")
+    stub = FirecrawlStub()
+    comparison = _make_comparison(stub)
+
+    async def scenario():
+        first = await comparison.search_all_retailers(QUERY, 797.00)
+        calls = len(stub.calls)
+        second = await comparison.search_all_retailers(QUERY.lower() + '  ', 700.00)
+        return first, second, calls
+
+    first, second, calls = _run(scenario())
+    assert len(stub.calls) == calls, "cached comparison hit the network"
+    assert [r['price'] for r in second] == [r['price'] for r in first]
+    for result in second:
+        assert result['cached_at'] is not None
+        assert result['is_cheaper'] == (result['price'] < 700.00)
+        assert result['potential_savings'] == (700.00 - result['price'] if result['is_cheaper'] else 0)
+    assert all('cached_at' not in r for r in first)
+    assert comparison.cache.stats()['hits'] == 1
+    print(f"   ✓ {len(second)} results served from cache")
+
+def test_stale_served_while_refreshing():
+    """Stale results return instantly and a background refresh replaces them"""
+    print("🧪 Testing stale-while-revalidate...")
+    clock = FakeClock()
+    stub = FirecrawlStub(latency=0.2)
+    comparison = _make_comparison(stub, clock)
+
+    async def scenario():
+        await comparison.search_all_retailers(QUERY, 797.00)
+        calls = len(stub.calls)
+        clock.now += 120  # past the TTL, inside the stale window
+        started = time.perf_counter()
+        stale = await comparison.search_all_retailers(QUERY, 797.00)
+        elapsed = time.perf_counter() - started
+        refreshing = len(comparison.cache._inflight)
+        await asyncio.sleep(0.5)
+        key = comparison.comparison_cache_key(QUERY, comparison.plan_retailer_search(3)[0])
+        return stale, elapsed, refreshing, calls, comparison.cache.get(key)
+
+    stale, elapsed, refreshing, calls, (entry, fresh) = _run(scenario())
+    assert stale and elapsed < 0.1, f"stale results waited for the search ({elapsed:.2f}s)"
+    assert refreshing == 1
+    assert len(stub.calls) > calls
+    assert entry is not None and fresh
+    print(f"   ✓ Stale results in {elapsed * 1000:.1f}ms, refreshed in the background")
+
+def test_concurrent_searches_share_one_flight():
+    """Identical comparisons started together run a single search"""
+    print("🧪 Testing single-flight dedupe...")
+    stub = FirecrawlStub(latency=0.1)
+    comparison = _make_comparison(stub)
+
+    async def scenario():
+        return await asyncio.gather(*(comparison.search_all_retailers(QUERY, price) for price in (797.00, 700.00, 900.00)))
+
+    results = _run(scenario())
+    solo_stub = FirecrawlStub(latency=0.1)
+    _run(_without_rate_limits(PriceComparison(firecrawl_client=solo_stub)).search_all_retailers(QUERY, 797.00))
+    assert len(stub.calls) == len(solo_stub.calls)
+    assert comparison.cache.stats()['shared_searches'] == 2
+    assert [r['price'] for r in results[1]] == [r['price'] for r in results[0]]
+    assert all(r['is_cheaper'] == (r['price'] < 700.00) for r in results[1])
+    print(f"   ✓ 3 comparisons, {len(stub.calls)} stub calls")
+
+def test_cache_only_budget_serves_old_results():
+    """With live searches paused by the budget, the latest cached results are still shown"""
+    print("🧪 Testing cache-only budget mode...")
+    clock = FakeClock()
+    budget = FirecrawlBudget(None, daily_budget=1000, monthly_budget=0, user_daily_quota=0,
+                             credit_costs={'scrape': 1, 'extract': 5})
+    stub = FirecrawlStub()
+    comparison = _make_comparison(stub, clock, budget)
+
+    async def scenario():
+        await comparison.search_all_retailers(QUERY, 797.00)
+        budget.daily_spent = budget.daily_budget
+        clock.now += 10000  # long past the stale window
+        calls = len(stub.calls)
+        results = await comparison.search_all_retailers(QUERY, 797.00)
+        return results, calls
+
+    results, calls = _run(scenario())
+    assert results and len(stub.calls) == calls
+    assert all(r.get('cached_at') for r in results)
+    print(f"   ✓ {len(results)} cached results served with the budget exhausted")
+
+if __name__ == "__main__":
+    test_hits_rebased_to_caller_price()
+    test_stale_served_while_refreshing()
+    test_concurrent_searches_share_one_flight()
+    test_cache_only_budget_serves_old_results()
+    print("\n✅ All tests passed!")
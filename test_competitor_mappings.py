@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for re-pricing confirmed competitor listings
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from competitor_mappings import CompetitorMappings
+from database import Database
+from firecrawl_stub import FirecrawlStub
+from price_comparison import PriceComparison
+
+QUERY = 'iPad mini (A17 Pro) 8.3" WiFi 128GB Space Grey'
+CODE = 'ipadmini17sg'
+JB_URL = 'https://www.jbhifi.com.au/products/apple-ipad-mini-8-3-inch-wi-fi-128gb-space-grey-a17-pro'
+HN_URL = 'https://www.harveynorman.com.au/apple-ipad-mini-a17-pro-8-3-inch-wi-fi-128gb-space-grey.html'
+GG_URL = 'https://www.thegoodguys.com.au/apple-ipad-mini-wi-fi-128gb-space-grey-a17-pro-mxn73xa'
+
+def _without_rate_limits(comparison):
+    """The offline fixtures need no pacing between requests to one retailer"""
+    for retailer in comparison.retailers.values():
+        retailer.min_request_interval = 0
+    return comparison
+
+def _setup(tmp):
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = Database(os.path.join(tmp, 'mappings.db'))
+    stub = FirecrawlStub()
+    comparison = _without_rate_limits(PriceComparison(firecrawl_client=stub, http_client=stub))
+    comparison.mappings = CompetitorMappings(db)
+    return db, stub, comparison
+
+def _compare(comparison, product_code=CODE):
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = asyncio.run(comparison.search_all_retailers(QUERY, 797.00, product_code=product_code))
+    return {result['retailer']: result for result in results}
+
+def test_confirmed_matches_are_repriced():
+    """A second comparison re-prices mapped listings; a 404 falls back to search"""
+    print("🧪 Testing mapped listing re-pricing...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db, stub, comparison = _setup(tmp)
+
+        first = _compare(comparison)
+        assert all(result['match_score'] >= 0.6 for result in first.values())
+        assert db.get_competitor_mapping(CODE, 'JB Hi-Fi')['url'] == JB_URL
+        assert db.get_competitor_mapping(CODE, 'Harvey Norman')['url'] == HN_URL
+        assert _compare(comparison, product_code=None)  # no code, nothing new stored
+        stub.calls.clear()
+
+        second = _compare(comparison)
+        assert second['JB Hi-Fi']['extraction_method'] == 'mapped_listing'
+        assert second['JB Hi-Fi']['price'] == 729.00 and second['JB Hi-Fi']['url'] == JB_URL
+        assert second['Harvey Norman']['extraction_method'] == 'mapped_listing'
+        assert second['Harvey Norman']['price'] == 759.00
+        assert not any(call['kind'] == 'extract' for call in stub.calls)
+
+        # The Good Guys listing has no recorded page (404): searched again and re-confirmed
+        assert second['The Good Guys']['extraction_method'] == 'direct_json'
+        assert any(call['url'] == GG_URL for call in stub.calls)
+        assert db.get_competitor_mapping(CODE, 'JB Hi-Fi')['last_price'] == 729.00
+    print("   ✓ Saved listings re-priced, missing listing searched")
+
+def test_stale_mapping_searches_again():
+    """Mappings older than the max age are ignored until the search confirms them again"""
+    print("🧪 Testing stale mappings...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db, stub, comparison = _setup(tmp)
+        _compare(comparison)
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute('UPDATE competitor_mappings SET verified_at = ?',
+                         (datetime.now(timezone.utc) - timedelta(days=30),))
+        stub.calls.clear()
+
+        results = _compare(comparison)
+        assert results['JB Hi-Fi']['extraction_method'] == 'direct_json'
+        assert not any(call['url'] == JB_URL for call in stub.calls)
+        verified = CompetitorMappings._parse_time(db.get_competitor_mapping(CODE, 'JB Hi-Fi')['verified_at'])
+        assert datetime.now(timezone.utc) - verified < timedelta(minutes=1)
+    print("   ✓ Stale mapping refreshed by search")
+
+def test_repeated_failures_drop_mapping():
+    """A page that stops showing the mapped product is dropped after repeated failures"""
+    print("🧪 Testing failing mappings...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db, stub, comparison = _setup(tmp)
+        mappings = comparison.mappings
+        db.save_competitor_mapping(CODE, 'JB Hi-Fi', JB_URL, 'Sony WH-1000XM5 Wireless Headphones', 0.9, 549.0)
+        assert not mappings.confirm(CODE, 'JB Hi-Fi', JB_URL, 'Weak match', 0.3, 10.0)
+
+        retailer = comparison.retailers['jb_hifi']
+        for attempt in range(mappings.max_failures):
+            mapping = mappings.get(CODE, 'JB Hi-Fi')
+            assert mapping is not None
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = asyncio.run(comparison._reprice_mapped_listing(retailer, mapping, 797.00, True))
+            assert result is None
+        assert db.get_competitor_mapping(CODE, 'JB Hi-Fi') is None
+    print(f"   ✓ Dropped after {mappings.max_failures} failures")
+
+if __name__ == "__main__":
+    test_confirmed_matches_are_repriced()
+    test_stale_mapping_searches_again()
+    test_repeated_failures_drop_mapping()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for background competitor price tracking
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from competitor_tracker import CompetitorTracker
+from database import Database
+from firecrawl_budget import FirecrawlBudget
+from firecrawl_stub import FirecrawlStub
+from price_comparison import PriceComparison
+
+QUERY = 'iPad mini (A17 Pro) 8.3" WiFi 128GB Space Grey'
+CODE = 'IPADMINI17SG'
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.embeds = []
+
+    async def send(self, embed=None):
+        self.embeds.append(embed)
+
+class FakeBot:
+    def __init__(self):
+        self.users = {}
+
+    def get_user(self, user_id):
+        return self.users.setdefault(user_id, FakeUser(user_id))
+
+def _without_rate_limits(comparison):
+    """The offline fixtures need no pacing between requests to one retailer"""
+    for retailer in comparison.retailers.values():
+        retailer.min_request_interval = 0
+    return comparison
+
+def _setup(tmp, budget=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = Database(os.path.join(tmp, 'tracker.db'))
+        for user_id in (1, 2, 3):
+            db.add_user(user_id, f"user{user_id}")
+            db.add_product(user_id, CODE if user_id != 3 else CODE.lower(), QUERY, None, 797.00)
+        db.add_product(3, 'penblue10', 'Bic Cristal Pen Blue 10 Pack', None, 4.50)
+    stub = FirecrawlStub()
+    comparison = _without_rate_limits(PriceComparison(firecrawl_client=stub, http_client=stub, budget=budget))
+    tracker = CompetitorTracker(FakeBot(), db, comparison, batch_size=5, delay=0)
+    return db, stub, tracker
+
+def _run(coro):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(coro)
+
+def test_prioritised_by_subscribers():
+    """Products with the most subscribers are checked first and not again until due"""
+    print("🧪 Testing batch priority...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db, stub, tracker = _setup(tmp)
+        tracker.batch_size = 1
+        products = db.get_most_tracked_products(5, datetime.now(timezone.utc))
+        assert [p['product_code'] for p in products] == [CODE.lower(), 'penblue10']
+        assert products[0]['subscribers'] == 3
+
+        assert _run(tracker.refresh_batch()) == 1
+        latest = db.get_latest_competitor_prices(CODE)
+        assert latest and all(row['officeworks_price'] == 797.00 for row in latest.values())
+
+        # The checked product is not due again, so the next run moves on to the pen
+        stub.calls.clear()
+        assert _run(tracker.refresh_batch()) == 1
+        assert all('ipad' not in call['url'].lower() for call in stub.calls)
+    print(f"   ✓ {len(latest)} competitor prices stored for the most-tracked product")
+
+def test_unmatched_product_not_repeated():
+    """A product with no competitor matches is marked checked, so the next run moves on"""
+    print("🧪 Testing products without matches...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db, stub, tracker = _setup(tmp)
+        tracker.batch_size = 1
+
+        # Every retailer lookup fails, so the most-tracked product finds no rivals
+        stub.failure_rates = dict.fromkeys(stub.failure_rates, 1.0)
+        assert _run(tracker.refresh_batch()) == 1
+        assert not db.get_latest_competitor_prices(CODE)
+
+        stub.failure_rates = dict.fromkeys(stub.failure_rates, 0.0)
+        stub.calls.clear()
+        assert _run(tracker.refresh_batch()) == 1
+        assert all('ipad' not in call['url'].lower() for call in stub.calls)
+        assert any('pen' in call['url'].lower() for call in stub.calls), "the next product should be picked"
+    print("   ✓ Unmatched product waits until it is due again")
+
+def test_unpriced_products_skipped():
+    """Products without an Officeworks price never take a slot in the batch"""
+    print("🧪 Testing unpriced products...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db, stub, tracker = _setup(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for user_id in (1, 2, 3, 4):
+                db.add_user(user_id, f"user{user_id}")
+                db.add_product(user_id, 'noprice1', 'Quibbleflux Hyperwidget Deluxe', None, None)
+        products = db.get_most_tracked_products(2, datetime.now(timezone.utc))
+        assert [p['product_code'] for p in products] == [CODE.lower(), 'penblue10']
+    print("   ✓ Batch filled with priced products")
+
+def test_undercut_alerts_sent_once():
+    """Subscribers are told about a cheaper rival once, and again only if it drops further"""
+    print("🧪 Testing undercut alerts...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db, stub, tracker = _setup(tmp)
+        product = db.get_most_tracked_products(1, datetime.now(timezone.utc))[0]
+
+        results = _run(tracker.check_product(product))
+        cheaper = [r for r in results if r['price_match_eligible']]
+        assert cheaper, "fixtures should include a cheaper rival"
+        users = tracker.bot.users
+        assert sorted(users) == [1, 2, 3]
+        assert all(len(user.embeds) == 1 for user in users.values())
+        embed = users[1].embeds[0]
+        assert 'Price Match' in embed.title and CODE in embed.description
+
+        _run(tracker.check_product(product))
+        assert all(len(user.embeds) == 1 for user in users.values()), "same undercut alerted twice"
+
+        # A previous check at a higher rival price makes the same price a further drop
+        rival = cheaper[0]
+        db.save_competitor_prices(CODE, 797.00, [dict(rival, price=rival['price'] + 20)])
+        _run(tracker.check_product(product))
+        assert all(len(user.embeds) == 2 for user in users.values())
+    print(f"   ✓ {len(cheaper)} cheaper rivals alerted to 3 subscribers once")
+
+def test_budget_share_respected():
+    """No products are checked once the tracker's share of the credit budget is used"""
+    print("🧪 Testing budget limits...")
+    budget = FirecrawlBudget(None, daily_budget=100, monthly_budget=0, user_daily_quota=0,
+                             credit_costs={'scrape': 1, 'extract': 5})
+    with tempfile.TemporaryDirectory() as tmp:
+        db, stub, tracker = _setup(tmp, budget)
+        budget.daily_spent = 60
+        assert _run(tracker.refresh_batch()) == 0
+        assert not stub.calls
+
+        budget.daily_spent = 0
+        tracker.max_credits_per_run = 0
+        assert _run(tracker.refresh_batch()) == 0
+        assert not db.get_latest_competitor_prices(CODE)
+    print("   ✓ Runs stop at the budget share and per-run credit cap")
+
+if __name__ == "__main__":
+    test_prioritised_by_subscribers()
+    test_unmatched_product_not_repeated()
+    test_unpriced_products_skipped()
+    test_undercut_alerts_sent_once()
+    test_budget_share_respected()
+    print("\n✅ All tests passed!")
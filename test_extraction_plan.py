@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for precompiled retailer extraction plans
+"""
+
+import re
+
+from bench_comparison import run_parse_benchmark
+from extraction_plan import ExtractionPlan, selectors_to_regex
+from firecrawl_stub import FirecrawlStub
+from price_comparison import PriceComparison
+
+def test_plans_compiled_once():
+    """Every retailer carries an immutable plan of compiled patterns"""
+    print("🧪 Testing extraction plans...")
+    comparison = PriceComparison()
+
+    for retailer in comparison.retailers.values():
+        plan = retailer.plan
+        assert isinstance(plan, ExtractionPlan)
+        assert all(isinstance(p, re.Pattern) for p in plan.price_patterns + plan.title_patterns + plan.link_patterns)
+        assert len(plan.price_patterns) == 3 + len(retailer.price_selectors)
+        assert len(plan.link_patterns) == len(retailer.link_selectors)
+        try:
+            plan.price_patterns = ()
+            assert False, "plan should be immutable"
+        except AttributeError:
+            pass
+    print(f"   ✓ {len(comparison.retailers)} plans compiled")
+
+def test_selector_patterns_match_legacy_form():
+    """Untagged selectors match exactly what the old '<[^>]*[^>]*' form matched"""
+    print("🧪 Testing selector regex equivalence on saved pages...")
+    stub = FirecrawlStub()
+    selectors = ['.price-current', '.price .now', '.product-item a', 'h2.product-name', '[data-testid="price"]']
+
+    for capture in ('price', 'text', 'link'):
+        for pattern in selectors_to_regex(selectors, capture):
+            legacy = pattern.replace('<[^>]*', '<[^>]*[^>]*', 1) if pattern.startswith('<[^>]*') else pattern
+            for entry in stub.entries:
+                if not entry.get('html'):
+                    continue
+                html = stub._read_payload(entry['html'])
+                assert re.findall(pattern, html, re.I) == re.findall(legacy, html, re.I), pattern
+    print("   ✓ Same matches as before")
+
+def test_parse_benchmark_runs():
+    """The parse micro-benchmark times every saved page"""
+    print("🧪 Testing parse benchmark...")
+    rows = run_parse_benchmark(iterations=2)
+    assert len(rows) == 6
+    assert all(row['products'] > 0 and row['per_page'] > 0 for row in rows)
+    print(f"   ✓ {len(rows)} pages timed")
+
+if __name__ == "__main__":
+    test_plans_compiled_once()
+    test_selector_patterns_match_legacy_form()
+    test_parse_benchmark_runs()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for Firecrawl credit accounting and budget-aware throttling
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import bot
+from bot import ComparisonQuotaError, OfficeworksBot
+from comparison_cache import ComparisonCache
+from database import Database
+from firecrawl_budget import FirecrawlBudget, MODE_NORMAL, MODE_SCRAPE_ONLY, MODE_REDUCED, MODE_CACHE_ONLY
+from firecrawl_stub import FirecrawlStub
+from price_comparison import PriceComparison
+
+class FakeMessage:
+    async def edit(self, content=None, embed=None):
+        pass
+
+def _make_budget(db, daily=100, monthly=1000, quota=2):
+    return FirecrawlBudget(db, daily_budget=daily, monthly_budget=monthly, user_daily_quota=quota,
+                           credit_costs={'scrape': 1, 'extract': 5})
+
+def test_budget_accounting_and_policy():
+    """Credits are persisted and the degrade policy tightens as budgets run out"""
+    print("🧪 Testing Firecrawl budget accounting...")
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(os.path.join(tmp, 'budget.db'))
+        budget = _make_budget(db, daily=20)
+
+        assert budget.policy().mode == MODE_NORMAL
+        for _ in range(3):
+            budget.record('extract', 'JB Hi-Fi')
+        budget.record('scrape', 'JB Hi-Fi')
+        assert budget.daily_spent == 16
+        assert budget.policy().mode == MODE_SCRAPE_ONLY
+
+        budget.record('scrape')
+        budget.record('scrape')
+        assert budget.policy().mode == MODE_REDUCED
+        assert not budget.can_spend('extract')
+
+        budget.record('scrape')
+        budget.record('scrape')
+        assert budget.policy().mode == MODE_CACHE_ONLY
+
+        # Totals survive a restart
+        reloaded = _make_budget(db, daily=20)
+        assert reloaded.daily_spent == 20 and reloaded.monthly_spent == 20
+        print(f"   ✓ {reloaded.describe_usage()}")
+
+def test_user_quota():
+    """Per-user comparison quotas are enforced"""
+    print("🧪 Testing per-user comparison quotas...")
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(os.path.join(tmp, 'quota.db'))
+        budget = _make_budget(db, quota=2)
+
+        assert budget.check_user_quota(1) == (True, 2)
+        budget.record_user_comparison(1, 'compare')
+        budget.record_user_comparison(1, 'check_competitors')
+        assert budget.check_user_quota(1) == (False, 0)
+        assert budget.check_user_quota(2) == (True, 2)
+        print("   ✓ Quotas enforced per user")
+
+        # Concurrent claims cannot both take the last slot
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            claims = list(pool.map(lambda _: budget.claim_user_comparison(3, 'compare'), range(8)))
+        assert sorted(allowed for allowed, _ in claims) == [False] * 6 + [True] * 2
+        assert budget.check_user_quota(3) == (False, 0)
+        print("   ✓ Concurrent claims stay within the quota")
+
+def test_cached_comparisons_not_charged():
+    """Only a live search uses up quota; cached answers are free even at the limit"""
+    print("🧪 Testing quota charging...")
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(os.path.join(tmp, 'charge.db'))
+        budget = _make_budget(db, daily=1000, quota=1)
+        comparison = PriceComparison(firecrawl_client=FirecrawlStub(), budget=budget)
+        comparison.cache = ComparisonCache()
+        officeworks_bot = OfficeworksBot.__new__(OfficeworksBot)
+        status_msg = FakeMessage()
+        query = 'iPad mini A17 Pro 128GB'
+
+        original, bot.price_comparison = bot.price_comparison, comparison
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                first = asyncio.run(officeworks_bot.run_comparison(status_msg, query, 797.00, user_id=1, source='compare'))
+                assert budget.check_user_quota(1) == (False, 0)
+                cached = asyncio.run(officeworks_bot.run_comparison(status_msg, query, 789.00, user_id=1, source='compare'))
+                try:
+                    asyncio.run(officeworks_bot.run_comparison(status_msg, 'Bic Cristal Pen', 4.50,
+                                                               user_id=1, source='compare'))
+                    assert False, "a new live search should be refused"
+                except ComparisonQuotaError as exc:
+                    assert 'limit of 1' in str(exc)
+        finally:
+            bot.price_comparison = original
+        assert first and len(cached) == len(first)
+        assert db.count_user_comparisons_since(1, datetime(2000, 1, 1)) == 1
+        print("   ✓ Cache hits free, live searches charged")
+
+def test_scrape_only_skips_extract():
+    """A scrape-only policy never calls Extract and charges scrape credits"""
+    print("🧪 Testing scrape-only degrade mode...")
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(os.path.join(tmp, 'degrade.db'))
+        budget = _make_budget(db, daily=14)
+        budget.record('extract')
+        budget.record('extract')
+        for _ in range(3):
+            budget.record('scrape')
+        assert budget.policy().mode == MODE_REDUCED
+
+        stub = FirecrawlStub()
+        comparison = PriceComparison(firecrawl_client=stub, budget=budget)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = asyncio.run(comparison.search_all_retailers('iPad mini A17 Pro 128GB', 797.00))
+
+        assert [call['kind'] for call in stub.calls] == ['scrape']
+        assert len(results) == 1 and results[0]['extraction_method'] == 'traditional_scraping'
+        assert budget.daily_spent == 14
+        print("   ✓ Extract skipped, retailers reduced")
+
+def test_rollover_without_queries():
+    """A new day starts from zero without querying the database on the hot path"""
+    print("🧪 Testing budget rollover...")
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(os.path.join(tmp, 'rollover.db'))
+        budget = _make_budget(db, daily=20)
+        budget.record('extract')
+        budget.record('extract')
+
+        db.get_firecrawl_credits_since = None  # Any query from here on would fail
+        budget._day_key = budget._day_key - timedelta(days=1)
+        assert budget.can_spend('extract')
+        assert budget.daily_spent == 0 and budget.monthly_spent == 10
+        assert budget.policy().mode == MODE_NORMAL
+        print("   ✓ Daily total reset in memory")
+
+if __name__ == "__main__":
+    test_budget_accounting_and_policy()
+    test_user_quota()
+    test_cached_comparisons_not_charged()
+    test_scrape_only_skips_extract()
+    test_rollover_without_queries()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for DOM-based HTML product extraction
+"""
+
+import os
+
+from bench_comparison import LARGE_PAGE_CARD, run_html_benchmark
+from extraction_plan import compile_extraction_plan
+from html_extractor import CSSSelector, extract_products_from_dom, parse_html
+from price_comparison import price_comparison
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'firecrawl')
+
+def _load(filename: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, filename), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def test_css_selectors():
+    """Descendant, child, attribute and case-insensitive selectors"""
+    print("🧪 Testing CSS selectors...")
+    root = parse_html(
+        '<div class="card"><h3 class="Product-Title">Widget</h3>'
+        '<section><span class="price">$10</span></section>'
+        '<a data-testid="product-link" href="/widget">Go</a></div>'
+    )
+    found = lambda selector: [element.text() for element in CSSSelector(selector).select(root)]
+
+    assert found('.card .price') == ['$10']
+    assert found('.card > .price') == []
+    assert found('.card > section > .price') == ['$10']
+    assert found('[data-testid="product-link"]') == ['Go']
+    assert found('[class*="title"]') == []
+    assert found('[class*="title" i]') == ['Widget']
+    assert found('h3, .price') == ['Widget', '$10']
+    print("   ✓ Selectors matched")
+
+def test_fixture_cards_aligned():
+    """Each product's title, price and link come from the same card"""
+    print("🧪 Testing card extraction on saved pages...")
+    jb = price_comparison._extract_from_html(_load('jb_hifi_search.html'), price_comparison.retailers['jb_hifi'])
+    assert len(jb) == 4
+    assert jb[0]['title'] == 'Apple iPad mini 8.3-inch Wi-Fi 128GB (Space Grey) [A17 Pro]'
+    assert jb[0]['price'] == 749.0
+    assert jb[0]['url'].endswith('/products/apple-ipad-mini-8-3-inch-wi-fi-128gb-space-grey-a17-pro')
+    assert jb[3]['title'] == 'Apple Pencil Pro' and jb[3]['price'] == 199.0
+
+    harvey = price_comparison._extract_from_html(_load('harvey_norman_search.html'),
+                                                 price_comparison.retailers['harvey_norman'])
+    assert len(harvey) == 4
+    assert harvey[0]['price'] == 768.0  # special price, not the struck-through old price
+
+    good_guys = price_comparison._extract_from_html(_load('good_guys_search.html'),
+                                                    price_comparison.retailers['good_guys'])
+    assert [product['price'] for product in good_guys] == [749.0, 749.0, 899.0, 129.0]
+    assert all(product['url'].startswith('https://www.thegoodguys.com.au/') for product in good_guys)
+    print("   ✓ 12 products with matching title, price and link")
+
+def test_innermost_card_and_early_stop():
+    """Nested cards yield the inner listing; large pages stop at the cap"""
+    print("🧪 Testing nested cards and early stop...")
+    plan = compile_extraction_plan(['.price'], ['.title'], ['.tile a'], card_selectors=['.tile'])
+    nested = ('<div class="tile"><h2 class="title">Category banner heading</h2>'
+              '<div class="tile"><span class="title">Inner Product Name</span><span class="price">$42.00</span>'
+              '<a href="/inner">View</a></div></div>')
+    products = extract_products_from_dom(nested, plan)
+    assert products == [{'title': 'Inner Product Name', 'price': 42.0, 'url': '/inner'}], products
+
+    retailer = price_comparison.retailers['jb_hifi']
+    html = '<html><body>' + ''.join(LARGE_PAGE_CARD.format(i=i, price=50 + i) for i in range(5000)) + '</body></html>'
+    products = extract_products_from_dom(html, retailer.plan, max_products=15)
+    assert len(products) == 15
+    print("   ✓ Inner card chosen, stopped after 15 of 5000 cards")
+
+def test_regex_fallback():
+    """Pages without recognisable cards still go through the regex scan"""
+    print("🧪 Testing regex fallback...")
+    plan = compile_extraction_plan(['.price'], ['.title'], ['.tile a'], card_selectors=['.tile'])
+    assert extract_products_from_dom('<p>No products here</p>', plan) == []
+
+    retailer = price_comparison.retailers['good_guys']
+    html = '<h2>Samsung Galaxy Tab S9 FE</h2> only $549.00 today'
+    products = price_comparison._extract_from_html(html, retailer)
+    assert products and products[0]['price'] == 549.0, products
+    print("   ✓ Regex fallback used")
+
+def test_benchmark_runs():
+    """The HTML benchmark suite compares both extractors"""
+    print("🧪 Testing HTML benchmark...")
+    rows = run_html_benchmark(iterations=2, large_cards=200)
+    assert rows and all(row['dom_products'] > 0 for row in rows)
+    print(f"   ✓ Benchmarked {len(rows)} pages")
+
+if __name__ == "__main__":
+    test_css_selectors()
+    test_fixture_cards_aligned()
+    test_innermost_card_and_early_stop()
+    test_regex_fallback()
+    test_benchmark_runs()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the event loop lag monitor and for keeping blocking calls off the loop
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from database import Database
+from loop_monitor import LagHistogram, LoopLagMonitor
+from officeworks_api import OfficeworksAPI
+from price_checker import PriceChecker
+
+BLOCK_SECONDS = 0.3
+
+class SlowAPI(OfficeworksAPI):
+    """OfficeworksAPI whose product lookups block like a slow network request"""
+    def get_product_info(self, product_code):
+        time.sleep(BLOCK_SECONDS)
+        return {'name': 'iPad mini Wi-Fi 128GB Space Grey', 'url': '/p/ipdmw128g', 'price': 789.00}
+
+def blocking_handler():
+    time.sleep(BLOCK_SECONDS)
+
+def test_histogram():
+    """Samples land in buckets and percentiles report bucket upper bounds"""
+    print("🧪 Testing lag histogram...")
+    histogram = LagHistogram()
+    assert histogram.percentile(99) == 0.0 and histogram.describe() == "no samples"
+    for lag in [0.2] * 98 + [30, 7000]:
+        histogram.add(lag)
+    assert histogram.percentile(50) == 1
+    assert histogram.percentile(99) == 50
+    assert histogram.percentile(100) == 7000
+    assert histogram.buckets() == [('<=1ms', 98), ('<=50ms', 1), ('>5000ms', 1)]
+    print("   ✓ Buckets and percentiles")
+
+def test_blocking_call_reported():
+    """A callback that blocks the loop shows up as lag, with its stack logged"""
+    print("🧪 Testing slow callback detection...")
+    monitor = LoopLagMonitor(interval=0.05, slow_callback=0.1, target=0.05)
+    output = io.StringIO()
+
+    async def run():
+        with contextlib.redirect_stdout(output):
+            monitor.start()
+            await asyncio.sleep(0.1)
+            blocking_handler()
+            await asyncio.sleep(0.1)
+            monitor.stop()
+
+    asyncio.run(run())
+    window = monitor.take_window()
+    assert window.max_ms >= BLOCK_SECONDS * 1000 * 0.8
+    assert not monitor.within_target(window)
+    assert monitor.slow_callbacks == 1
+    assert 'blocking_handler' in monitor.last_stall
+    assert 'Event loop blocked' in output.getvalue()
+    print("   ✓ Stall measured and blocking stack captured")
+
+def test_offloaded_work_within_target():
+    """Manual price checks run the API and database off the loop, so lag stays under target"""
+    print("🧪 Testing offloaded price checks...")
+    monitor = LoopLagMonitor(interval=0.02, slow_callback=0.1, target=0.05)
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        db = Database(os.path.join(tmp, 'lag.db'))
+        db.add_user(1, 'user1')
+        db.add_product(1, 'ipdmw128g', 'iPad mini Wi-Fi 128GB Space Grey', None, 797.00)
+        checker = PriceChecker(None, db, SlowAPI())
+
+        async def run():
+            monitor.start()
+            results = await asyncio.gather(*(checker.check_product_now('ipdmw128g', 1) for _ in range(3)))
+            monitor.stop()
+            return results
+
+        results = asyncio.run(run())
+    assert all(result['new_price'] == 789.00 for result in results)
+    window = monitor.take_window()
+    assert window.count >= 5
+    assert monitor.within_target(window), window.describe()
+    assert monitor.slow_callbacks == 0
+    print(f"   ✓ Lag within target ({window.describe()})")
+
+if __name__ == "__main__":
+    test_histogram()
+    test_blocking_call_reported()
+    test_offloaded_work_within_target()
+    print("\n✅ All tests passed!")
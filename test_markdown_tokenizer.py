@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass markdown tokenizer
+"""
+
+from bench_comparison import run_markdown_recall
+from markdown_tokenizer import (TOKEN_LINK, TOKEN_PRICE, TOKEN_ROW, TOKEN_TITLE,
+                                extract_markdown_products, tokenize_markdown)
+
+def test_tokens_in_document_order():
+    """Headings, links, bold text, prices and table rows become typed tokens"""
+    print("🧪 Testing markdown tokens...")
+    markdown = (
+        "## Apple AirPods Pro (2nd generation)\n"
+        "Was $399.00 Now $349.00\n"
+        "[View product](/airpods-pro-2)\n"
+        "| [ ] | Beats Studio Buds + Wireless Earbuds | $199.00 |\n"
+    )
+    tokens = list(tokenize_markdown(markdown))
+    assert [token.kind for token in tokens] == [TOKEN_TITLE, TOKEN_PRICE, TOKEN_PRICE, TOKEN_LINK, TOKEN_ROW]
+    assert tokens[0].text == 'Apple AirPods Pro (2nd generation)'
+    assert (tokens[1].label, tokens[1].price) == ('was', 399.0)
+    assert (tokens[2].label, tokens[2].price) == ('now', 349.0)
+    assert tokens[4].text == 'Beats Studio Buds + Wireless Earbuds' and tokens[4].price == 199.0
+
+    products = extract_markdown_products(markdown, 'https://example.com.au')
+    assert products == [
+        {'title': 'Apple AirPods Pro (2nd generation)', 'price': 349.0,
+         'url': 'https://example.com.au/airpods-pro-2'},
+        {'title': 'Beats Studio Buds + Wireless Earbuds', 'price': 199.0},
+    ], products
+    print("   ✓ Tokens and products assembled")
+
+def test_corpus_recall():
+    """Every expected product in the saved markdown corpus is extracted"""
+    print("🧪 Testing recall on the markdown corpus...")
+    rows = run_markdown_recall()
+    for row in rows:
+        assert row['found'] == row['expected'], row
+    print(f"   ✓ {sum(row['found'] for row in rows)} products recalled across {len(rows)} pages")
+
+def test_stops_at_product_cap():
+    """Long result pages stop tokenizing once the cap is reached"""
+    print("🧪 Testing early stop...")
+    markdown = "".join(f"### Example Brand Model {i} Wireless Headphones\n\n${50 + i}.00\n" for i in range(1000))
+    products = extract_markdown_products(markdown, 'https://example.com', max_products=15)
+    assert len(products) == 15
+    assert products[-1]['title'] == 'Example Brand Model 14 Wireless Headphones'
+
+    seen = []
+    for token in tokenize_markdown(markdown):
+        seen.append(token)
+        if len(seen) == 4:
+            break
+    assert len(seen) == 4  # tokenizer is lazy; nothing past the break is scanned
+    print("   ✓ Stopped at 15 products")
+
+if __name__ == "__main__":
+    test_tokens_in_document_order()
+    test_corpus_recall()
+    test_stops_at_product_cap()
+    print("\n✅ All tests passed!")
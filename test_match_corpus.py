@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Test script for the recorded payload corpus benchmark
+"""
+
+from bench_comparison import generate_dedupe_products, run_corpus_benchmark, run_dedupe_benchmark
+
+def test_corpus_picks_labelled_listings():
+    """Every listing labelled in match_corpus.json is picked from every payload that contains it"""
+    print("🧪 Testing precision@1 on the recorded corpus...")
+    rows = run_corpus_benchmark(iterations=1)
+    assert {row['kind'] for row in rows} == {'markdown', 'html', 'extract', 'direct'}
+    assert all(row['products'] and row['cases'] for row in rows)
+    wrong = [miss for row in rows for miss in row['misses'] if miss[1] is not None]
+    assert not wrong, wrong
+    cases = sum(row['cases'] for row in rows)
+    correct = sum(row['correct'] for row in rows)
+    print(f"   ✓ All labelled listings found; precision@1 {correct}/{cases} including unsold products")
+
+def test_dedupe_benchmark():
+    """Reformatted duplicates collapse to one listing each"""
+    print("🧪 Testing dedupe benchmark...")
+    products, unique = generate_dedupe_products(2000, seed=3)
+    assert unique < len(products)
+    result = run_dedupe_benchmark(2000, seed=3)
+    assert result['kept'] == result['unique'] == unique
+    print(f"   ✓ {result['products']} listings deduplicated to {result['kept']}")
+
+if __name__ == "__main__":
+    test_corpus_picks_labelled_listings()
+    test_dedupe_benchmark()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched product matching engine
+"""
+
+import re
+from difflib import SequenceMatcher
+
+from bench_comparison import MATCH_QUERIES, generate_match_candidates, run_match_benchmark
+from match_engine import MatchQuery, build_candidate, normalize_text
+from price_comparison import PriceComparison
+
+def reference_score(query_normalized, product, key_terms, query_words):
+    """The per-product scorer the engine replaced, kept to check scores are unchanged"""
+    normalized_title = normalize_text(product.get('title', ''))
+    if not normalized_title:
+        return 0.0
+    title_words = set(normalized_title.split())
+    score = 0.0
+    if query_normalized:
+        score += SequenceMatcher(None, query_normalized, normalized_title).ratio() * 0.35
+    if key_terms:
+        score += (sum(1 for term in key_terms if term in normalized_title) / len(key_terms)) * 0.2
+    if query_words:
+        score += len(query_words.intersection(title_words)) / len(query_words) * 0.25
+        partial_matches = 0
+        for query_word in query_words:
+            if len(query_word) < 3:
+                continue
+            if any(query_word in title_word or title_word in query_word for title_word in title_words):
+                partial_matches += 1
+        score += (partial_matches / len(query_words)) * 0.1
+    query_numbers = re.findall(r'\d+', query_normalized)
+    if query_numbers:
+        title_numbers = set(re.findall(r'\d+', normalized_title))
+        score += (len(set(query_numbers).intersection(title_numbers)) / len(query_numbers)) * 0.05
+    brand = normalize_text(product.get('brand', ''))
+    if brand and brand in query_normalized:
+        score += 0.03
+    model = normalize_text(product.get('model', ''))
+    if model and model in query_normalized:
+        score += 0.03
+    if 1 <= product['price'] <= 10000:
+        score += 0.02
+    if 3 <= len(title_words) <= 15:
+        score += 0.02
+    return min(score, 1.0)
+
+def test_scores_match_reference():
+    """Batched scores equal the original scorer for every candidate"""
+    print("🧪 Testing scores against the reference scorer...")
+    comparison = PriceComparison()
+    products = generate_match_candidates(2000, seed=7)
+    products.append({'title': 'Apple iPad mini', 'price': 799.0, 'brand': 'Apple', 'model': 'A17 Pro'})
+    for query in MATCH_QUERIES:
+        query_normalized = normalize_text(query)
+        key_terms = comparison._extract_key_terms(query_normalized)
+        engine = MatchQuery(query_normalized, key_terms)
+        for product in products:
+            expected = reference_score(query_normalized, product, key_terms, set(query_normalized.split()))
+            assert engine.score(build_candidate(product, product['price'])) == expected, product
+    print(f"   ✓ {len(products) * len(MATCH_QUERIES)} scores identical")
+
+def test_best_is_top_of_ranking():
+    """Pruned best-match search returns the first product of the ranking of its identifier pool"""
+    print("🧪 Testing best match against the full ranking...")
+    comparison = PriceComparison()
+    for seed in range(5):
+        products = generate_match_candidates(1000, seed=seed)
+        # Exact duplicates with different prices exercise the lowest-price tie break
+        products += [dict(product, price=product['price'] - 1) for product in products[:50]]
+        for query in MATCH_QUERIES:
+            ranked = comparison._rank_products(products, query)
+            assert ranked == sorted(ranked, key=lambda item: (-item[0], item[1]))
+            _, pool = comparison._identifier_pool(comparison._match_candidates(products), query)
+            expected = comparison._match_query(query).rank(pool)[0][2]
+            assert comparison._find_best_product_match(products, query, 0.3) is expected
+    assert comparison._find_best_product_match([], 'anything', 0.3) is None
+    assert comparison._find_best_product_match([{'title': 'Free sample', 'price': 0}], 'sample', 0.3) is None
+    print("   ✓ Best match agrees with the ranking")
+
+def test_match_benchmark():
+    """The match suite scores the requested number of candidates per query"""
+    print("🧪 Testing match benchmark...")
+    rows = run_match_benchmark(candidates=10000, queries=MATCH_QUERIES[:1])
+    assert rows[0]['candidates'] == 10000 and rows[0]['agrees']
+    print(f"   ✓ 10k candidates: best match in {rows[0]['best_time'] * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    test_scores_match_reference()
+    test_best_is_top_of_ranking()
+    test_match_benchmark()
+    print("\n✅ All tests passed!")
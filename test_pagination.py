@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for keyset-paginated product lists and paged store lists
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+
+from bot import PRODUCTS_PER_PAGE, ProductListView, StoreListView
+from database import Database
+from store_directory import StoreDirectory
+
+class FakeBot:
+    def __init__(self, database):
+        self.database = database
+
+def _database(tmp, count):
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = Database(os.path.join(tmp, 'pages.db'))
+        db.add_user(1, 'user1')
+        for i in range(count):
+            db.add_product(1, f"code{i:03d}", f"Product {i}", None, 10.0 + i)
+    return db
+
+def test_keyset_pages():
+    """Pages follow each other by id with no gaps or repeats, forwards and backwards"""
+    print("🧪 Testing keyset queries...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _database(tmp, 23)
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.remove_product(1, 'code004')
+        assert db.count_user_products(1) == 22
+
+        codes, page = [], db.get_user_products_page(1, 5)
+        while page:
+            codes.extend(p['product_code'] for p in page)
+            last_page = page
+            page = db.get_user_products_page(1, 5, after_id=page[-1]['id'])
+        assert codes == [f"code{i:03d}" for i in range(23) if i != 4]
+        assert len(last_page) == 2
+
+        previous = db.get_user_products_page(1, 5, before_id=last_page[0]['id'])
+        assert [p['product_code'] for p in previous] == codes[15:20]
+        assert db.get_user_products_page(2, 5) == []
+    print(f"   ✓ {len(codes)} products paged")
+
+def test_product_list_view():
+    """The view loads one page per button press and disables buttons at the ends"""
+    print("🧪 Testing product list view...")
+
+    async def run(db):
+        view = ProductListView(FakeBot(db), 1, db.count_user_products(1))
+        first = view.first_page()
+        assert view.page_count == 3 and view.previous_button.disabled and not view.next_button.disabled
+        assert len(first.fields) == PRODUCTS_PER_PAGE and first.fields[0].name == '1. CODE000'
+        second = view.turn(1)
+        assert second.fields[0].name == '6. CODE005' and not view.previous_button.disabled
+        third = view.turn(1)
+        assert len(third.fields) == 1 and view.next_button.disabled
+        assert 'Page 3 of 3' in third.footer.text
+        assert view.turn(-1).fields[0].name == '6. CODE005'
+
+        # Everything removed while the list was open: back to the first page
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(5, 11):
+                db.remove_product(1, f"code{i:03d}")
+        assert view.turn(1).fields[0].name == '1. CODE000' and view.page == 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(_database(tmp, 11)))
+    print("   ✓ Pages rendered on demand")
+
+def test_store_list_view():
+    """Every store in a state is reachable, ten at a time"""
+    print("🧪 Testing store list view...")
+
+    async def run():
+        stores = StoreDirectory.load().in_state('NSW')
+        view = StoreListView(1, 'NSW stores', stores)
+        seen = [field.name for field in view.first_page().fields]
+        while not view.next_button.disabled:
+            seen.extend(field.name for field in view.turn(1).fields)
+        assert len(seen) == len(stores) and view.page == view.page_count - 1
+        assert view.stores is stores
+        return len(stores)
+
+    count = asyncio.run(run())
+    print(f"   ✓ {count} stores across pages")
+
+if __name__ == "__main__":
+    test_keyset_pages()
+    test_product_list_view()
+    test_store_list_view()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent retailer searches with deadlines
+"""
+
+import asyncio
+import contextlib
+import io
+import time
+
+from firecrawl_stub import FirecrawlStub
+from price_comparison import PriceComparison
+
+QUERY = 'iPad mini (A17 Pro) 8.3" WiFi 128GB Space Grey'
+
+class SlowRetailerStub(FirecrawlStub):
+    """Fixture stub with a fixed delay per retailer domain"""
+    def __init__(self, delays, **kwargs):
+        super().__init__(**kwargs)
+        self.delays = delays
+
+    async def _simulate_call(self, kind: str, url: str) -> bool:
+        delay = next((seconds for domain, seconds in self.delays.items() if domain in url), 0.0)
+        self.calls.append({'kind': kind, 'url': url, 'delay': delay, 'failed': False})
+        await asyncio.sleep(delay)
+        return True
+
+async def _collect(comparison: PriceComparison):
+    return [item async for item in comparison.iter_retailer_results(QUERY, 797.00)]
+
+def _without_rate_limits(comparison):
+    """The offline fixtures need no pacing between requests to one retailer"""
+    for retailer in comparison.retailers.values():
+        retailer.min_request_interval = 0
+    return comparison
+
+def _run(coro):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(coro)
+
+def test_retailers_searched_concurrently():
+    """Total latency tracks the slowest retailer, not the sum of all of them"""
+    print("🧪 Testing concurrent retailer search...")
+    comparison = _without_rate_limits(PriceComparison(firecrawl_client=FirecrawlStub(latency=0.2)))
+
+    started = time.perf_counter()
+    results = _run(comparison.search_all_retailers(QUERY, 797.00))
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 3, results
+    assert elapsed < 0.5, f"searches ran sequentially ({elapsed:.2f}s)"
+    print(f"   ✓ 3 retailers in {elapsed:.2f}s")
+
+def test_results_stream_in_completion_order():
+    """Fast retailers are yielded before slow ones finish"""
+    print("🧪 Testing progressive results...")
+    stub = SlowRetailerStub({'jbhifi': 0.3, 'harveynorman': 0.0, 'thegoodguys': 0.1})
+    comparison = _without_rate_limits(PriceComparison(firecrawl_client=stub))
+
+    names = [name for name, result in _run(_collect(comparison)) if result]
+    assert names == ['Harvey Norman', 'The Good Guys', 'JB Hi-Fi'], names
+    print(f"   ✓ Order: {', '.join(names)}")
+
+def test_retailer_timeout_and_deadline():
+    """Slow retailers time out individually; the overall deadline cancels the rest"""
+    print("🧪 Testing per-retailer timeout and overall deadline...")
+    stub = SlowRetailerStub({'jbhifi': 5.0, 'harveynorman': 0.0, 'thegoodguys': 5.0})
+    comparison = _without_rate_limits(PriceComparison(firecrawl_client=stub))
+
+    comparison.retailer_timeout = 0.1
+    items = _run(_collect(comparison))
+    assert [name for name, result in items if result] == ['Harvey Norman']
+    assert sorted(name for name, result in items if not result) == ['JB Hi-Fi', 'The Good Guys']
+
+    comparison.retailer_timeout = 10.0
+    comparison.search_deadline = 0.2
+    started = time.perf_counter()
+    items = _run(_collect(comparison))
+    assert [name for name, _ in items] == ['Harvey Norman']
+    assert time.perf_counter() - started < 1.0
+    print("   ✓ Timeouts and deadline enforced")
+
+if __name__ == "__main__":
+    test_retailers_searched_concurrently()
+    test_results_stream_in_completion_order()
+    test_retailer_timeout_and_deadline()
+    print("\n✅ All tests passed!")
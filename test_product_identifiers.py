@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for exact identifier matching ahead of fuzzy scoring
+"""
+
+from product_identifiers import (MATCH_FUZZY, MATCH_GTIN, MATCH_MODEL, IdentifierIndex, extract_identifiers,
+                                 normalize_gtin)
+from price_comparison import PriceComparison
+
+def test_extract_identifiers():
+    """Model numbers, capacities and valid GTINs are found; sizes and chip names are not models"""
+    print("🧪 Testing identifier extraction...")
+    ids = extract_identifiers('Apple iPad mini (A17 Pro) 8.3-inch Wi-Fi 128GB MXN73X/A 0195949713262')
+    assert ids.models == {'MXN73X'}
+    assert ids.capacities == {'128GB'}
+    assert ids.gtins == {'00195949713262'}
+    assert extract_identifiers('Sony WH-1000XM5 Wireless Headphones').models == {'WH1000XM5'}
+    assert not extract_identifiers('TP-Link Deco X50 Mesh WiFi 6 3 Pack 20W USB-C').models
+    assert extract_identifiers('Samsung T7 Portable SSD 1TB', model='MU-PC1T0T/WW').models == {'MUPC1T0T'}
+    assert normalize_gtin('195949713262') == normalize_gtin('0195949713262')
+    assert normalize_gtin('0195949713261') == ''  # Bad check digit
+    print("   ✓ Identifiers extracted")
+
+def test_index_resolution():
+    """GTIN hits beat model hits; otherwise contradicting capacities and models are dropped"""
+    print("🧪 Testing identifier index...")
+    listings = ['iPad mini 128GB Space Grey', 'iPad mini 256GB Blue', 'iPad mini Case', 'Sony WH-1000XM4 Black']
+    index = IdentifierIndex((extract_identifiers(title), title) for title in listings)
+    index.add(extract_identifiers('iPad mini', gtin='0195949713262'), 'iPad mini (barcode)')
+
+    assert index.resolve(extract_identifiers('x 0195949713262')) == (MATCH_GTIN, ['iPad mini (barcode)'])
+    assert index.resolve(extract_identifiers('Sony WH1000XM4')) == (MATCH_MODEL, ['Sony WH-1000XM4 Black'])
+    method, pool = index.resolve(extract_identifiers('iPad mini 128GB Purple'))
+    assert method == MATCH_FUZZY and 'iPad mini 256GB Blue' not in pool and 'iPad mini Case' in pool
+    _, pool = index.resolve(extract_identifiers('Sony WH-1000XM5 Headphones'))
+    assert 'Sony WH-1000XM4 Black' not in pool
+    print("   ✓ Exact hits first, contradicting listings dropped")
+
+def test_comparison_prefers_exact_identifiers():
+    """The matcher picks the listing with the query's model number over a closer-worded one"""
+    print("🧪 Testing exact matches in PriceComparison...")
+    comparison = PriceComparison()
+    products = [
+        {'title': 'Sony WH-1000XM5 Wireless Noise Cancelling Headphones Black', 'price': 499.0},
+        {'title': 'Sony Wireless Noise Cancelling Headphones Black', 'price': 549.0, 'model': 'WH-1000XM4'},
+        {'title': 'Sony Headphones', 'price': 449.0, 'gtin': '4548736132610'},
+    ]
+    best = comparison._find_best_product_match([dict(p) for p in products], 'sony wh-1000xm4 wireless headphones', 0.3)
+    assert best['price'] == 549.0 and best['match_method'] == MATCH_MODEL
+    best = comparison._find_best_product_match([dict(p) for p in products], 'sony headphones 4548736132610', 0.3)
+    assert best['price'] == 449.0 and best['match_method'] == MATCH_GTIN and best['match_score'] == 1.0
+    wrong_size = [{'title': 'Apple iPad mini Wi-Fi 256GB Blue', 'price': 899.0}]
+    assert comparison._find_best_product_match(wrong_size, 'apple ipad mini wifi 128gb blue', 0.3) is None
+    print("   ✓ Model and GTIN hits chosen, wrong capacity rejected")
+
+if __name__ == "__main__":
+    test_extract_identifiers()
+    test_index_resolution()
+    test_comparison_prefers_exact_identifiers()
+    print("\n✅ All tests passed!")
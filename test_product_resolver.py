@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the one-round-trip /add path: offline parsing, cached lookups and the atomic upsert
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+from database import PRODUCT_ADDED, PRODUCT_ALREADY_TRACKED, PRODUCT_REACTIVATED, Database
+from officeworks_api import OfficeworksAPI
+from product_resolver import ProductResolver, url_key
+
+URL = 'https://www.officeworks.com.au/shop/officeworks/p/ipad-mini-a17-pro-8-3-wifi-128gb-space-grey-ipdmw128g'
+INFO = {'name': 'iPad mini Wi-Fi 128GB Space Grey', 'url': '/p/ipdmw128g', 'price': 797.00}
+
+class FakeAPI(OfficeworksAPI):
+    """OfficeworksAPI that knows one product and counts lookups"""
+    def __init__(self, delay=0.0, online=True):
+        super().__init__()
+        self.delay = delay
+        self.online = online
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_product_info(self, product_code):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if not self.online:
+            return None
+        return dict(INFO) if product_code == 'ipdmw128g' else None
+
+def _database(tmp):
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = Database(os.path.join(tmp, 'resolver.db'))
+        db.add_user(1, 'user1')
+    return db
+
+def test_parse_offline():
+    """Codes come from the URL or the code itself, with no API call"""
+    print("🧪 Testing offline parsing...")
+    with tempfile.TemporaryDirectory() as tmp:
+        api = FakeAPI()
+        resolver = ProductResolver(api, _database(tmp))
+        assert resolver.parse(URL) == ('ipdmw128g', None)
+        assert resolver.parse(URL + '/?cm_mmc=abc#reviews') == ('ipdmw128g', None)
+        assert resolver.parse(product_code='IPDMW128G') == ('ipdmw128g', None)
+        assert resolver.parse('https://example.com/p/thing-abc123') == (None, None)
+        assert resolver.parse(product_code='not a code') == (None, None)
+        assert api.calls == 0
+        assert url_key(URL.upper() + '/?x=1') == URL.lower()
+    print("   ✓ URLs and codes parsed without the network")
+
+def test_fetch_cached():
+    """Concurrent lookups share one request, and results are reused until they expire"""
+    print("🧪 Testing cached lookups...")
+    with tempfile.TemporaryDirectory() as tmp:
+        api = FakeAPI(delay=0.05)
+        resolver = ProductResolver(api, _database(tmp), ttl=60)
+
+        async def run():
+            results = await asyncio.gather(*(resolver.fetch('ipdmw128g') for _ in range(5)))
+            assert all(result['price'] == 797.00 for result in results)
+            assert api.calls == 1
+            assert (await resolver.fetch('ipdmw128g'))['name'] == INFO['name']
+            assert api.calls == 1
+            assert await resolver.fetch('missing1') is None
+            assert await resolver.fetch('missing1') is None
+            assert api.calls == 3  # Failed lookups are retried
+
+        asyncio.run(run())
+        resolver.ttl = 0
+        resolver._info.clear()
+        asyncio.run(resolver.fetch('ipdmw128g'))
+        asyncio.run(resolver.fetch('ipdmw128g'))
+        assert api.calls == 5
+    print("   ✓ One request per code while cached")
+
+def test_cancelled_lookup():
+    """Waiters on a lookup whose owner is cancelled get a result instead of hanging"""
+    print("🧪 Testing cancelled lookups...")
+    with tempfile.TemporaryDirectory() as tmp:
+        api = FakeAPI(delay=0.05)
+        resolver = ProductResolver(api, _database(tmp))
+
+        async def run():
+            owner = asyncio.create_task(resolver.fetch('ipdmw128g'))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(resolver.fetch('ipdmw128g'))
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            info = await asyncio.wait_for(waiter, timeout=1)
+            assert owner.cancelled()
+            assert info['price'] == 797.00
+            assert not resolver._pending
+
+        asyncio.run(run())
+        assert api.calls == 2
+    print("   ✓ Waiters retry the lookup themselves")
+
+def test_remembered_urls():
+    """A URL resolved once is known without the API, even when it is down"""
+    print("🧪 Testing remembered URLs...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _database(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            resolver = ProductResolver(FakeAPI(), db)
+            resolver.remember(URL, 'ipdmw128g', INFO)
+            offline = ProductResolver(FakeAPI(online=False), db)
+            code, known = offline.parse(URL + '?utm_source=share')
+        assert code == 'ipdmw128g'
+        assert known == {'product_code': 'ipdmw128g', 'product_name': INFO['name'], 'product_url': INFO['url']}
+        assert asyncio.run(offline.fetch(code)) is None
+    print("   ✓ URL to code mapping persisted")
+
+def test_upsert_outcomes():
+    """upsert_product tells new, reactivated and already tracked products apart"""
+    print("🧪 Testing product upsert...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _database(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert db.upsert_product(1, 'ipdmw128g', INFO['name'], INFO['url'], 797.00) == PRODUCT_ADDED
+            assert db.upsert_product(1, 'IPDMW128G', INFO['name'], INFO['url'], 797.00) == PRODUCT_ALREADY_TRACKED
+            db.remove_product(1, 'ipdmw128g')
+            assert db.upsert_product(1, 'ipdmw128g', INFO['name'], INFO['url'], 789.00) == PRODUCT_REACTIVATED
+            assert db.get_user_product(1, 'ipdmw128g')['current_price'] == 789.00
+            assert db.count_user_products(1) == 1
+            assert db.add_product(1, 'ipdmw128g') is False
+    print("   ✓ Added, reactivated and already tracked outcomes")
+
+if __name__ == "__main__":
+    test_parse_offline()
+    test_fetch_cached()
+    test_cancelled_lookup()
+    test_remembered_urls()
+    test_upsert_outcomes()
+    print("\n✅ All tests passed!")
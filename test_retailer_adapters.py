@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the direct JSON retailer adapters
+"""
+
+import asyncio
+import contextlib
+import io
+
+from firecrawl_stub import FirecrawlStub
+from price_comparison import PriceComparison
+from retailer_adapters import EmbeddedJSONAdapter
+
+def test_parse_json_ld_item_list():
+    """JSON-LD ItemList/Product blocks map to internal product dicts"""
+    print("🧪 Testing JSON-LD parsing...")
+    stub = FirecrawlStub()
+    body = stub._read_payload('jb_hifi_direct.html')
+    products = EmbeddedJSONAdapter().parse_products(body, 'https://www.jbhifi.com.au')
+
+    assert len(products) == 3, products
+    first = products[0]
+    assert first['price'] == 749.0
+    assert first['url'] == 'https://www.jbhifi.com.au/products/apple-ipad-mini-8-3-inch-wi-fi-128gb-space-grey-a17-pro'
+    assert first['brand'] == 'Apple' and first['model'] == 'MXN73X/A' and first['gtin'] == '0195949713262'
+    assert first['availability'] == 'InStock'
+    assert products[2]['price'] == 199.0
+    print(f"   ✓ Parsed {len(products)} products")
+
+def test_parse_next_data_and_raw_json():
+    """__NEXT_DATA__ blobs and raw JSON endpoint bodies are both understood"""
+    print("🧪 Testing __NEXT_DATA__ and JSON body parsing...")
+    stub = FirecrawlStub()
+    adapter = EmbeddedJSONAdapter()
+    products = adapter.parse_products(stub._read_payload('good_guys_direct.html'), 'https://www.thegoodguys.com.au')
+    assert [p['price'] for p in products] == [749.0, 749.0, 899.0, 129.0]
+    assert products[0]['url'].startswith('https://www.thegoodguys.com.au/apple-ipad-mini')
+
+    raw = '{"hits": [{"title": "Sony WH-1000XM5", "salePrice": "$499.00", "url": "/sony-wh1000xm5"}]}'
+    products = adapter.parse_products(raw, 'https://example.com')
+    assert products == [{
+        'title': 'Sony WH-1000XM5', 'price': 499.0, 'url': 'https://example.com/sony-wh1000xm5',
+        'availability': 'unknown', 'brand': '', 'model': '', 'gtin': ''
+    }]
+    print("   ✓ Both formats parsed")
+
+def test_direct_path_skips_firecrawl():
+    """Retailers with embedded JSON never touch Firecrawl; others fall back"""
+    print("🧪 Testing direct fast path in searches...")
+    stub = FirecrawlStub()
+    comparison = PriceComparison(firecrawl_client=stub, http_client=stub)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        good_guys = asyncio.run(comparison._search_retailer(
+            comparison.retailers['good_guys'], 'ipad mini a17 pro 128gb', 797.00))
+        harvey = asyncio.run(comparison._search_retailer(
+            comparison.retailers['harvey_norman'], 'ipad mini a17 pro 128gb', 797.00))
+
+    assert good_guys['extraction_method'] == 'direct_json' and good_guys['price'] == 749.0
+    assert harvey['extraction_method'] == 'firecrawl_extract'
+    assert [call['kind'] for call in stub.calls] == ['direct', 'direct', 'extract']
+    print("   ✓ Direct results served without Firecrawl")
+
+if __name__ == "__main__":
+    test_parse_json_ld_item_list()
+    test_parse_next_data_and_raw_json()
+    test_direct_path_skips_firecrawl()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for the retailer definitions file and hot reload
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+
+from price_comparison import PriceComparison
+from retailer_registry import (DEFAULT_RETAILERS_PATH, RetailerRegistry, RetailerRegistryError,
+                               load_retailer_definitions, parse_retailer_definitions)
+
+def _definitions():
+    with open(DEFAULT_RETAILERS_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write(path, data, bump=0):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(data if isinstance(data, str) else json.dumps(data))
+    # Make sure the watcher sees a new modification time even on coarse filesystem clocks
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump * 1_000_000_000))
+
+def test_shipped_definitions_load():
+    """retailers.json compiles into the retailers PriceComparison searches"""
+    print("🧪 Testing shipped retailer definitions...")
+    retailers = load_retailer_definitions()
+    assert list(retailers) == ['jb_hifi', 'harvey_norman', 'good_guys', 'officeworks']
+    assert not retailers['officeworks'].compare
+    for key in ('jb_hifi', 'harvey_norman', 'good_guys'):
+        retailer = retailers[key]
+        assert retailer.direct_adapter is not None and retailer.plan.css_prices
+        assert retailer.methods == ['direct', 'extract', 'scrape']
+        assert retailer.min_request_interval >= 1.0, f"{key} ships without a rate limit"
+    searched, _, _ = PriceComparison(firecrawl_client=object()).plan_retailer_search(10)
+    assert [r.name for r in searched] == ['JB Hi-Fi', 'Harvey Norman', 'The Good Guys']
+    print(f"   ✓ {len(retailers)} retailers loaded")
+
+def test_invalid_definitions_rejected():
+    """Every problem in a file is reported together"""
+    print("🧪 Testing validation...")
+    data = _definitions()
+    jb = data['retailers']['jb_hifi']
+    jb['search_url'] = 'https://www.jbhifi.com.au/search'
+    jb['methods'] = ['direct', 'carrier-pigeon']
+    jb['price_selectors'].append('.price:hover')
+    data['retailers']['good_guys']['price_match_threshold'] = 3
+    data['retailers']['copy'] = dict(data['retailers']['harvey_norman'])
+    try:
+        parse_retailer_definitions(data)
+    except RetailerRegistryError as e:
+        problems = e.problems
+    else:
+        raise AssertionError("invalid definitions were accepted")
+    assert len(problems) == 5, problems
+    assert any('{query}' in problem for problem in problems)
+    assert any(':hover' in problem for problem in problems)
+    assert any('duplicate name' in problem for problem in problems)
+    print(f"   ✓ {len(problems)} problems reported")
+
+def test_hot_reload_swaps_atomically():
+    """Edits are swapped in whole, bad edits are rejected and searches keep their retailers"""
+    print("🧪 Testing hot reload...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'retailers.json')
+        data = _definitions()
+        _write(path, data)
+        comparison = PriceComparison(retailers_path=path)
+        registry = RetailerRegistry(comparison, path)
+        planned = list(comparison.retailers.values())
+        assert registry.reload_if_changed() is None
+
+        data['retailers']['good_guys']['enabled'] = False
+        data['retailers']['jb_hifi']['price_match_threshold'] = 0.5
+        _write(path, data, bump=1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            success, _ = registry.reload_if_changed()
+        assert success and 'good_guys' not in comparison.retailers
+        assert comparison.retailers['jb_hifi'].price_match_threshold == 0.5
+        assert planned[0].price_match_threshold == 0.3  # Objects held by a running search are untouched
+
+        current = comparison.retailers
+        _write(path, '{"retailers": {', bump=2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            success, message = registry.reload_if_changed()
+        assert not success and 'invalid JSON' in message
+        assert comparison.retailers is current and registry.last_error
+    print("   ✓ Valid edit swapped in, broken edit rejected")
+
+def test_watch_reloads_off_the_loop():
+    """The file watcher picks up edits and parses them in a worker thread"""
+    print("🧪 Testing the file watcher...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'retailers.json')
+        data = _definitions()
+        _write(path, data)
+        comparison = PriceComparison(retailers_path=path)
+        registry = RetailerRegistry(comparison, path)
+        reload_threads = []
+        reload = registry.reload
+        registry.reload = lambda: reload_threads.append(threading.get_ident()) or reload()
+
+        async def edit_while_watching():
+            watcher = asyncio.create_task(registry.watch(0.01))
+            data['retailers']['good_guys']['enabled'] = False
+            _write(path, data, bump=1)
+            for _ in range(200):
+                await asyncio.sleep(0.01)
+                if registry.reloads:
+                    break
+            watcher.cancel()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(edit_while_watching())
+        assert registry.reloads == 1 and 'good_guys' not in comparison.retailers
+        assert reload_threads and threading.get_ident() not in reload_threads
+    print("   ✓ Edit reloaded in a worker thread")
+
+def test_min_request_interval():
+    """Requests to a retailer with a rate limit are spaced out"""
+    print("🧪 Testing per-retailer rate limits...")
+    comparison = PriceComparison()
+    retailer = comparison.retailers['jb_hifi']
+    retailer.min_request_interval = 0.1
+
+    async def three_requests():
+        started = time.perf_counter()
+        await asyncio.gather(*(comparison._respect_retailer_rate_limit(retailer) for _ in range(3)))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(three_requests())
+    assert elapsed >= 0.2, elapsed
+    print(f"   ✓ 3 requests took {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    test_shipped_definitions_load()
+    test_invalid_definitions_rejected()
+    test_hot_reload_swaps_atomically()
+    test_watch_reloads_off_the_loop()
+    test_min_request_interval()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the learned extract-vs-scrape retailer strategy
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import random
+import tempfile
+
+from database import Database
+from firecrawl_budget import FirecrawlBudget
+from firecrawl_stub import FirecrawlStub
+from price_comparison import PriceComparison, SEARCH_METHOD_DIRECT, SEARCH_METHOD_EXTRACT, SEARCH_METHOD_SCRAPE
+from retailer_strategy import RetailerStrategy
+
+METHODS = [SEARCH_METHOD_EXTRACT, SEARCH_METHOD_SCRAPE]
+
+def _without_rate_limits(comparison):
+    """The offline fixtures need no pacing between requests to one retailer"""
+    for retailer in comparison.retailers.values():
+        retailer.min_request_interval = 0
+    return comparison
+
+def test_order_adapts_and_persists():
+    """A failing extract path drops behind scraping and the stats survive a restart"""
+    print("🧪 Testing strategy ordering...")
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(os.path.join(tmp, 'strategy.db'))
+        strategy = RetailerStrategy(db, explore_rate=0.0)
+
+        # Default order until there is enough data
+        assert strategy.order_methods('JB Hi-Fi', METHODS) == METHODS
+
+        for _ in range(5):
+            strategy.record('JB Hi-Fi', SEARCH_METHOD_EXTRACT, False, 8.0)
+            strategy.record('JB Hi-Fi', SEARCH_METHOD_SCRAPE, True, 3.0)
+        assert strategy.order_methods('JB Hi-Fi', METHODS) == [SEARCH_METHOD_SCRAPE, SEARCH_METHOD_EXTRACT]
+
+        reloaded = RetailerStrategy(db, explore_rate=0.0)
+        assert reloaded.order_methods('JB Hi-Fi', METHODS) == [SEARCH_METHOD_SCRAPE, SEARCH_METHOD_EXTRACT]
+        print(f"   ✓ {reloaded.describe('JB Hi-Fi')}")
+
+def test_failing_first_of_three_methods():
+    """A first method that always fails drops behind the one that works, even if the third is never tried"""
+    print("🧪 Testing three-method ordering...")
+    strategy = RetailerStrategy(explore_rate=0.0)
+    methods = [SEARCH_METHOD_DIRECT, SEARCH_METHOD_EXTRACT, SEARCH_METHOD_SCRAPE]
+    outcomes = {SEARCH_METHOD_DIRECT: False, SEARCH_METHOD_EXTRACT: True, SEARCH_METHOD_SCRAPE: True}
+
+    firsts = []
+    for _ in range(50):
+        order = strategy.order_methods('JB Hi-Fi', methods)
+        firsts.append(order[0])
+        for method in order:
+            strategy.record('JB Hi-Fi', method, outcomes[method], 2.0)
+            if outcomes[method]:
+                break
+
+    assert firsts[:3] == [SEARCH_METHOD_DIRECT] * 3
+    assert firsts[3:] == [SEARCH_METHOD_EXTRACT] * 47
+    assert strategy.get_stats('JB Hi-Fi', SEARCH_METHOD_SCRAPE).attempts == 0
+    assert strategy.order_methods('JB Hi-Fi', methods) == [SEARCH_METHOD_EXTRACT, SEARCH_METHOD_SCRAPE,
+                                                           SEARCH_METHOD_DIRECT]
+    print("   ✓ Failing direct tried only during warm-up")
+
+def test_exploration_probes_losing_method():
+    """The losing method is occasionally tried first"""
+    print("🧪 Testing exploration...")
+    strategy = RetailerStrategy(explore_rate=0.2, rng=random.Random(7))
+    for _ in range(5):
+        strategy.record('Harvey Norman', SEARCH_METHOD_EXTRACT, False, 8.0)
+        strategy.record('Harvey Norman', SEARCH_METHOD_SCRAPE, True, 3.0)
+
+    firsts = [strategy.order_methods('Harvey Norman', METHODS)[0] for _ in range(500)]
+    probes = firsts.count(SEARCH_METHOD_EXTRACT)
+    assert 50 <= probes <= 150, probes
+    print(f"   ✓ Extract probed first on {probes}/500 searches")
+
+def test_search_skips_failing_extract():
+    """Once learned, searches go straight to scraping for a retailer whose extract fails"""
+    print("🧪 Testing learned order in searches...")
+    stub = FirecrawlStub(extract_failure_rate=1.0)
+    strategy = RetailerStrategy(explore_rate=0.0)
+    comparison = _without_rate_limits(PriceComparison(firecrawl_client=stub, strategy=strategy))
+    retailer = comparison.retailers['good_guys']
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(6):
+            result = asyncio.run(comparison._search_retailer(retailer, 'ipad mini a17 pro 128gb', 797.00))
+            assert result and result['extraction_method'] == 'traditional_scraping'
+
+    kinds = [call['kind'] for call in stub.calls]
+    # Three warm-up searches try extract first, the rest go straight to scrape
+    assert kinds.count('extract') == 3 and kinds.count('scrape') == 6, kinds
+    print("   ✓ Extract skipped after warm-up")
+
+def test_budget_skips_not_recorded():
+    """Attempts the credit budget did not allow are skipped without counting as method failures"""
+    print("🧪 Testing budget-skipped attempts...")
+    budget = FirecrawlBudget(None, daily_budget=3, monthly_budget=0, user_daily_quota=0,
+                             credit_costs={'scrape': 1, 'extract': 5})
+    stub = FirecrawlStub()
+    strategy = RetailerStrategy(explore_rate=0.0)
+    comparison = _without_rate_limits(PriceComparison(firecrawl_client=stub, budget=budget, strategy=strategy))
+    retailer = comparison.retailers['good_guys']
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(2):
+            result = asyncio.run(comparison._search_retailer(retailer, 'ipad mini a17 pro 128gb', 797.00))
+            assert result and result['extraction_method'] == 'traditional_scraping'
+
+    assert [call['kind'] for call in stub.calls] == ['scrape', 'scrape']
+    assert strategy.get_stats(retailer.name, SEARCH_METHOD_EXTRACT).attempts == 0
+    assert strategy.get_stats(retailer.name, SEARCH_METHOD_SCRAPE).success_rate == 1.0
+    print("   ✓ Extract skipped for budget, not learned as failing")
+
+if __name__ == "__main__":
+    test_order_adapts_and_persists()
+    test_failing_first_of_three_methods()
+    test_exploration_probes_losing_method()
+    test_search_skips_failing_extract()
+    test_budget_skips_not_recorded()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the indexed store directory
+"""
+
+import contextlib
+import io
+import json
+
+from config import AUSTRALIAN_STATES
+from store_directory import MAX_SELECT_OPTIONS, StoreDirectory, normalize_store_key
+
+def _stores():
+    with open('responses/allstores.md', 'r', encoding='utf-8') as f:
+        return json.load(f)['stores']
+
+def test_lookups_match_linear_scans():
+    """Indexed lookups return the same stores as filtering the raw list"""
+    print("🧪 Testing store lookups...")
+    stores = _stores()
+    directory = StoreDirectory.load()
+    assert len(directory) == len(stores)
+    for state in AUSTRALIAN_STATES:
+        assert list(directory.in_state(state)) == [s for s in stores if s['state'] == state]
+    for store in stores:
+        assert directory.get(store['storeId']) is directory.get(store['storeId'].lower())
+        assert directory.get(store['storeId'])['store'] == store['store']
+        assert store['storeId'] in {s['storeId'] for s in directory.by_name(store['store'])}
+    assert directory.get('W000') is None and directory.in_state('XX') == ()
+    assert normalize_store_key('Hunter St,') == 'hunter st'
+    assert [s['storeId'] for s in directory.by_name('hunter st')] == ['W253']
+    assert len(directory.by_suburb('SYDNEY')) > 1
+    assert sum(directory.state_counts().values()) == len(stores)
+    print(f"   ✓ {len(directory)} stores indexed")
+
+def test_options_built_once():
+    """Views get the prebuilt select options rather than new ones"""
+    print("🧪 Testing prebuilt select options...")
+    directory = StoreDirectory.load()
+    nsw = directory.state_options('NSW')
+    assert len(nsw) == MAX_SELECT_OPTIONS < len(directory.in_state('NSW'))
+    assert all(a is b for a, b in zip(nsw, directory.state_options('NSW')))
+    assert nsw is not directory.state_options('NSW')  # Each select gets its own list
+    assert [o.value for o in nsw] == [s['storeId'] for s in directory.in_state('NSW')[:MAX_SELECT_OPTIONS]]
+    hunter = directory.options_for(directory.by_name('Hunter St'))
+    assert hunter[0] is directory.options_for([directory.get('W253')])[0]
+    assert hunter[0].description == 'Sydney, 2000 - ID: W253'
+    print("   ✓ Options shared across views")
+
+def test_missing_file():
+    """An unreadable stores file gives an empty directory"""
+    print("🧪 Testing missing stores file...")
+    with contextlib.redirect_stdout(io.StringIO()):
+        directory = StoreDirectory.load('responses/missing.json')
+    assert not directory and directory.state_options('VIC') == []
+    print("   ✓ Empty directory")
+
+if __name__ == "__main__":
+    test_lookups_match_linear_scans()
+    test_options_built_once()
+    test_missing_file()
+    print("\n✅ All tests passed!")
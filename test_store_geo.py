@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test script for nearest-store lookups
+"""
+
+import random
+
+from store_directory import StoreDirectory
+from store_geo import KDTree, StoreLocator, haversine_km, store_coordinates
+
+def test_kd_tree_matches_brute_force():
+    """The k-d tree returns the same stores, in the same order, as sorting every store by distance"""
+    print("🧪 Testing k-d tree against brute force...")
+    directory = StoreDirectory.load()
+    assert len(directory.locator) == len(directory)
+    rng = random.Random(7)
+    for _ in range(300):
+        lat, lon, k = rng.uniform(-44, -10), rng.uniform(112, 154), rng.randint(1, 10)
+        brute = sorted(directory.stores, key=lambda store: haversine_km(lat, lon, *store_coordinates(store)))[:k]
+        nearest = directory.nearest(lat, lon, k)
+        assert [store['storeId'] for _, store in nearest] == [store['storeId'] for store in brute]
+        assert [km for km, _ in nearest] == sorted(km for km, _ in nearest)
+    assert KDTree([]).nearest((0, 0, 1), 3) == []
+    print("   ✓ 300 random queries agree")
+
+def test_resolve_locations():
+    """Postcodes, suburbs and coordinates resolve to sensible places"""
+    print("🧪 Testing location resolution...")
+    directory = StoreDirectory.load()
+    cbd = directory.resolve_location('3000')
+    assert cbd.label == 'postcode 3000'
+    assert {store['storeId'] for _, store in directory.nearest(cbd.latitude, cbd.longitude, 3)} == {'W346', 'W311', 'W320'}
+    assert directory.resolve_location('2001').label == 'postcode 2001 (near 2000)'
+    assert directory.resolve_location('9999') is None
+    hobart = directory.resolve_location('hobart')
+    assert directory.nearest(hobart.latitude, hobart.longitude, 1)[0][1]['state'] == 'TAS'
+    point = directory.resolve_location('-12.45, 130.84')
+    distance, store = directory.nearest(point.latitude, point.longitude, 1)[0]
+    assert store['storeId'] == 'W801' and distance < 1
+    assert directory.resolve_location('-120, 10') is None
+    assert len(StoreLocator([{'storeId': 'X', 'latitude': None, 'longitude': '1'}])) == 0
+    print("   ✓ Postcode, suburb and coordinate queries resolved")
+
+if __name__ == "__main__":
+    test_kd_tree_matches_brute_force()
+    test_resolve_locations()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the background store list refresh
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+
+from store_directory import StoreDirectory
+from store_refresh import StoreRefresher, diff_stores, load_store_directory, read_snapshot_time
+
+def _stores():
+    with open('responses/allstores.md', 'r', encoding='utf-8') as f:
+        return json.load(f)['stores']
+
+class FakeAPI:
+    """Serves store lists per state; states in `failing` return None like a failed request"""
+    def __init__(self, stores, failing=()):
+        self.stores = stores
+        self.failing = set(failing)
+        self.calls = []
+
+    def get_store_records(self, state):
+        self.calls.append(state)
+        if state in self.failing:
+            return None
+        return [dict(store) for store in self.stores if store['state'] == state]
+
+class FakeBot:
+    def __init__(self, directory):
+        self.store_directory = directory
+
+def _refresh(refresher):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(refresher.refresh())
+
+def test_diff():
+    """Added, removed and changed stores are reported by ID"""
+    print("🧪 Testing store diff...")
+    old = _stores()
+    new = [dict(store) for store in old if store['storeId'] != 'W801']
+    new[0]['phone'] = '(02) 0000 0000'
+    new.append(dict(old[0], storeId='W999'))
+    diff = diff_stores(old, new)
+    assert diff.added == ['W999'] and diff.removed == ['W801'] and diff.changed == [new[0]['storeId']]
+    assert not diff_stores(old, [dict(store, quantity=9) for store in old])  # Stock fields are ignored
+    print(f"   ✓ {diff.summary()}")
+
+def test_refresh_swaps_and_snapshots():
+    """A changed store list is swapped in whole and saved for the next cold start"""
+    print("🧪 Testing refresh and snapshot...")
+    stores = _stores()
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, 'stores_snapshot.json')
+        bot = FakeBot(StoreDirectory(stores))
+        original = bot.store_directory
+        updated = [dict(store) for store in stores]
+        updated[0]['phone'] = '(08) 0000 0000'
+        api = FakeAPI(updated + [dict(stores[1], storeId='W999', store='New Store')])
+        refresher = StoreRefresher(bot, api, snapshot)
+
+        diff = _refresh(refresher)
+        assert sorted(api.calls) == sorted({store['state'] for store in stores})
+        assert diff.added == ['W999'] and diff.changed == [stores[0]['storeId']]
+        assert bot.store_directory is not original and original.get('W999') is None
+        assert bot.store_directory.get('W999')['store'] == 'New Store'
+        assert read_snapshot_time(snapshot) is not None
+        with open(snapshot, 'r', encoding='utf-8') as f:
+            assert 'stockLevel' not in f.read()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            cold = load_store_directory(snapshot)
+        assert len(cold) == len(stores) + 1 and cold.get('W999')
+
+        # Nothing changed: the directory object is kept
+        current = bot.store_directory
+        assert not _refresh(refresher) and bot.store_directory is current
+    print("   ✓ Directory swapped and snapshot written")
+
+def test_failed_states_kept():
+    """States whose request fails keep their stores, and a collapse in store count is rejected"""
+    print("🧪 Testing partial failures...")
+    stores = _stores()
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, 'stores_snapshot.json')
+        bot = FakeBot(StoreDirectory(stores))
+        refresher = StoreRefresher(bot, FakeAPI([s for s in stores if s['state'] != 'NSW'], failing={'NSW'}), snapshot)
+        assert not _refresh(refresher)
+        assert len(bot.store_directory.in_state('NSW')) == len([s for s in stores if s['state'] == 'NSW'])
+
+        original = bot.store_directory
+        refresher.api = FakeAPI([s for s in stores if s['state'] in ('NT', 'TAS')])
+        assert _refresh(refresher) is None and bot.store_directory is original
+        assert 'expected about' in refresher.last_error
+
+        refresher.api = FakeAPI(stores, failing=set(s['state'] for s in stores))
+        assert _refresh(refresher) is None and bot.store_directory is original
+    print("   ✓ Failed states kept, bad refresh rejected")
+
+if __name__ == "__main__":
+    test_diff()
+    test_refresh_swaps_and_snapshots()
+    test_failed_states_kept()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the ranked store search index
+"""
+
+import asyncio
+import time
+
+from bot import OfficeworksBot
+from store_directory import StoreDirectory
+from store_search import StoreSearchIndex, trigrams
+
+def _ids(stores):
+    return [store['storeId'] for store in stores]
+
+def test_prefix_and_field_matches():
+    """Word prefixes match across name, suburb, postcode, address and store ID"""
+    print("🧪 Testing prefix search...")
+    directory = StoreDirectory.load()
+    assert _ids(directory.search('bourke'))[0] == 'W346'
+    assert _ids(directory.search('bour st', 'VIC'))[0] == 'W346'
+    assert _ids(directory.search('Hunter St,'))[0] == 'W253'
+    assert _ids(directory.search('w253'))[0] == 'W253'
+    assert set(_ids(directory.search('3000'))[:3]) == {'W346', 'W311', 'W320'}
+    assert _ids(directory.search('greenway'))[0] == 'W263'  # Suburb of the Tuggeranong store
+    assert all(store['state'] == 'NSW' for store in directory.search('park', 'NSW'))
+    assert directory.search('') == [] and directory.search('zzzz') == []
+    print("   ✓ Prefix matches ranked first")
+
+def test_typo_tolerance():
+    """Misspelt words still find the store through shared trigrams"""
+    print("🧪 Testing typo tolerance...")
+    directory = StoreDirectory.load()
+    assert _ids(directory.search('tugeranong')) == ['W263']
+    assert 'W253' in _ids(directory.search('sydny'))
+    assert 'W346' in _ids(directory.search('melborne'))
+    assert trigrams('ab') == {' ab', 'ab '}
+    print("   ✓ Misspellings matched")
+
+def test_ranking_and_speed():
+    """Store ID and name hits outrank address hits, and lookups are well under a millisecond"""
+    print("🧪 Testing ranking and speed...")
+    index = StoreSearchIndex([
+        {'storeId': 'W1', 'store': 'Richmond', 'suburb': 'Richmond', 'postcode': '3121', 'address': '1 Main St', 'state': 'VIC'},
+        {'storeId': 'W2', 'store': 'Hawthorn', 'suburb': 'Hawthorn', 'postcode': '3122', 'address': '2 Richmond Rd', 'state': 'VIC'},
+    ])
+    scored = index.search_scored('richmond')
+    assert [store['storeId'] for _, store in scored] == ['W1', 'W2'] and scored[0][0] > scored[1][0]
+
+    directory = StoreDirectory.load()
+    queries = ['bourke', 'hunter st', 'w3', 'sydny', 'park', '2000', 'castle hill', 'chadstone']
+    started = time.perf_counter()
+    for _ in range(50):
+        for query in queries:
+            directory.search(query)
+    per_query = (time.perf_counter() - started) / (50 * len(queries))
+    assert per_query < 0.001, per_query
+    print(f"   ✓ {per_query * 1e6:.0f}µs per query")
+
+def test_typed_store_asks_to_pick():
+    """Typed /setup text lists the matching stores to pick from instead of saving the top hit"""
+    print("🧪 Testing typed store choices...")
+    officeworks_bot = OfficeworksBot.__new__(OfficeworksBot)
+    officeworks_bot.store_directory = StoreDirectory.load()
+
+    async def run():
+        assert officeworks_bot.get_store_by_id('w263')['storeId'] == 'W263'
+        embed, view, error = officeworks_bot.store_matches_response('melborne')
+        assert error is None and len(embed.fields) == 5
+        options = [option.value for option in view.children[0].options]
+        assert 'W346' in options and len(options) == 5
+        assert officeworks_bot.store_matches_response('zzzz')[2].startswith("No store found")
+
+    asyncio.run(run())
+    print("   ✓ Matches offered as a store picker")
+
+if __name__ == "__main__":
+    test_prefix_and_field_matches()
+    test_typo_tolerance()
+    test_ranking_and_speed()
+    test_typed_store_asks_to_pick()
+    print("\n✅ All tests passed!")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for tracked-product autocomplete and direct product lookups
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import threading
+
+from database import Database
+from user_product_cache import UserProductCache
+
+class CountingDatabase(Database):
+    """Database that counts product-name queries, to prove autocomplete is served from memory"""
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.name_queries = 0
+        self.query_threads = []
+
+    def get_active_product_names(self, user_id=None):
+        self.name_queries += 1
+        self.query_threads.append(threading.get_ident())
+        return super().get_active_product_names(user_id)
+
+def _setup(tmp):
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = CountingDatabase(os.path.join(tmp, 'cache.db'))
+        for user_id in (1, 2):
+            db.add_user(user_id, f"user{user_id}")
+        db.add_product(1, 'ipdmw128g', 'iPad mini Wi-Fi 128GB Space Grey', None, 797.00)
+        db.add_product(1, 'penblue10', 'Bic Cristal Pen Blue 10 Pack', None, 4.50)
+        db.add_product(1, 'PAPA4500', 'Reflex A4 Copy Paper 500 Sheets', None, 7.00)
+        db.add_product(2, 'penblue10', 'Bic Cristal Pen Blue 10 Pack', None, 4.50)
+    return db
+
+def test_direct_lookup():
+    """get_user_product finds one active product, ignoring case"""
+    print("🧪 Testing direct product lookup...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _setup(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert db.get_user_product(1, 'PENBLUE10')['product_name'] == 'Bic Cristal Pen Blue 10 Pack'
+            assert db.get_user_product(1, 'papa4500')['current_price'] == 7.00
+            assert db.get_user_product(2, 'ipdmw128g') is None
+            db.remove_product(1, 'penblue10')
+            assert db.get_user_product(1, 'penblue10') is None
+    print("   ✓ Lookups by user and code")
+
+def test_suggestions_from_memory():
+    """After warming, suggestions and add/remove updates never query the database"""
+    print("🧪 Testing autocomplete cache...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _setup(tmp)
+        cache = UserProductCache(db)
+        with contextlib.redirect_stdout(io.StringIO()):
+            cache.warm()
+        queries = db.name_queries
+
+        assert [code for code, _ in cache.suggest(1, 'pen')] == ['penblue10']
+        assert [code for code, _ in cache.suggest(1, 'Pack')] == ['penblue10']
+        assert [code for code, _ in cache.suggest(1, 'PA')][0] == 'PAPA4500'  # Code prefixes before name matches
+        assert [code for code, _ in cache.suggest(1, 'ipad grey')] == ['ipdmw128g']
+        assert len(cache.suggest(1, '')) == 3 and cache.suggest(3, 'pen') == []
+
+        cache.product_added(1, 'stapler1', 'Rexel Stapler')
+        cache.product_added(3, 'penblack', 'Bic Pen Black')  # A new user, known to have no other products
+        cache.product_removed(1, 'penblue10')
+        assert [code for code, _ in cache.suggest(1, 'pen')] == []
+        assert cache.has(1, 'STAPLER1') and cache.has(3, 'penblack')
+        assert db.name_queries == queries
+
+        # An invalidated user is reloaded from the database once
+        cache.invalidate(1)
+        assert cache.has(1, 'penblue10') and not cache.has(1, 'stapler1')
+        cache.suggest(1, 'p')
+        assert db.name_queries == queries + 1
+    print("   ✓ Suggestions served from memory")
+
+def test_cold_users_loaded_on_demand():
+    """Without warming, each user is loaded once on first use"""
+    print("🧪 Testing cold cache...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _setup(tmp)
+        cache = UserProductCache(db, max_users=1)
+        assert [code for code, _ in cache.suggest(2, '')] == ['penblue10']
+        assert len(cache.codes(1)) == 3
+        cache.suggest(1, 'pen')
+        assert db.name_queries == 2
+        cache.suggest(2, 'pen')  # Evicted by user 1, so loaded again
+        assert db.name_queries == 3
+    print("   ✓ Users loaded once and evicted past max_users")
+
+def test_load_user_off_the_loop():
+    """Handlers load a missing user in a worker thread, then suggest from memory"""
+    print("🧪 Testing loads from the event loop...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _setup(tmp)
+        cache = UserProductCache(db)
+
+        async def autocomplete(user_id, current):
+            await cache.load_user(user_id)
+            return cache.suggest(user_id, current)
+
+        loop_thread = threading.get_ident()
+        assert [code for code, _ in asyncio.run(autocomplete(2, 'pen'))] == ['penblue10']
+        assert asyncio.run(autocomplete(2, 'bic')) and db.name_queries == 1
+        cache.invalidate(2)
+        asyncio.run(autocomplete(2, ''))
+        assert db.name_queries == 2
+        assert loop_thread not in db.query_threads
+    print("   ✓ Database read in a worker thread")
+
+if __name__ == "__main__":
+    test_direct_lookup()
+    test_suggestions_from_memory()
+    test_cold_users_loaded_on_demand()
+    test_load_user_off_the_loop()
+    print("\n✅ All tests passed!")
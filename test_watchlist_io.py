@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for watchlist export and import
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+
+from database import Database
+from officeworks_api import OfficeworksAPI
+from watchlist_io import export_to_file, import_watchlist, read_records, write_export
+
+PRODUCTS = {
+    'ipdmw128g': {'name': 'iPad mini Wi-Fi 128GB Space Grey', 'url': '/p/ipdmw128g', 'price': 797.00},
+    'penblue10': {'name': 'Bic Cristal Pen Blue 10 Pack', 'url': '/p/penblue10', 'price': 4.50},
+}
+
+class FakeAPI(OfficeworksAPI):
+    """OfficeworksAPI answering product lookups from PRODUCTS"""
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def get_product_info(self, product_code):
+        self.calls.append(product_code)
+        return PRODUCTS.get(product_code)
+
+def _source_db(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        db = Database(path)
+        db.add_user(1, 'user1')
+        db.add_user(2, 'user2')
+        db.add_product(1, 'ipdmw128g', 'iPad mini Wi-Fi 128GB Space Grey', '/p/ipdmw128g', 799.00)
+        db.add_product(1, 'penblue10', 'Bic Cristal Pen Blue 10 Pack', '/p/penblue10', 4.50)
+        db.add_product(2, 'penblue10', 'Bic Cristal Pen Blue 10 Pack', '/p/penblue10', 4.50)
+        product = db.get_user_product(1, 'ipdmw128g')
+        db.update_product_price(product['id'], 797.00)
+        db.add_notification(1, product['id'], 799.00, 797.00)
+    return db
+
+def _import(db, api, content, fmt, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(import_watchlist(db, api, read_records(io.StringIO(content, newline=''), fmt), **kwargs))
+
+def test_export():
+    """Exports hold one user's records, or everyone's, in both formats"""
+    print("🧪 Testing export...")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _source_db(os.path.join(tmp, 'source.db'))
+        records = db.iter_export_records(1)
+        assert next(records) == {'type': 'user', 'user_id': 1, 'username': 'user1',
+                                 'preferred_state': None, 'preferred_store_id': None}
+        records.close()
+
+        output = io.StringIO()
+        counts = write_export(db.iter_export_records(1), output, 'jsonl')
+        assert counts == {'user': 1, 'product': 2, 'price': 1, 'notification': 1}
+        assert all(line.startswith('{"type":') for line in output.getvalue().splitlines())
+
+        export_file, counts, size = export_to_file(db, 'csv')
+        content = export_file.read().decode('utf-8')
+        export_file.close()
+        assert counts == {'user': 2, 'product': 3, 'price': 1, 'notification': 1}
+        assert size == len(content.encode('utf-8'))
+        assert content.splitlines()[0].startswith('type,user_id,username')
+        assert len(content.splitlines()) == 1 + sum(counts.values())
+    print("   ✓ Records read lazily")
+    print("   ✓ JSON lines and CSV exports")
+
+def test_round_trip():
+    """A user's export imports into another database, for another user, in either format"""
+    print("🧪 Testing import round trip...")
+    with tempfile.TemporaryDirectory() as tmp:
+        source = _source_db(os.path.join(tmp, 'source.db'))
+        for fmt in ('jsonl', 'csv'):
+            output = io.StringIO()
+            write_export(source.iter_export_records(1), output, fmt)
+            with contextlib.redirect_stdout(io.StringIO()):
+                target = Database(os.path.join(tmp, f'target-{fmt}.db'))
+                target.add_user(9, 'user9')
+            api = FakeAPI()
+            result = _import(target, api, output.getvalue(), fmt, user_id=9, batch_size=1)
+            assert (result.users, result.products, result.prices, result.notifications) == (0, 2, 1, 1)
+            assert sorted(api.calls) == ['ipdmw128g', 'penblue10']
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert target.get_user_product(9, 'ipdmw128g')['current_price'] == 797.00
+                assert target.count_user_products(9) == 2
+
+            # Importing the same file again adds nothing
+            result = _import(target, FakeAPI(), output.getvalue(), fmt, user_id=9)
+            assert (result.products, result.prices, result.notifications) == (0, 0, 0)
+    print("   ✓ JSON lines and CSV imports, repeat imports are harmless")
+
+def test_import_validation():
+    """Unknown codes, unreadable lines and products over the limit are reported, not imported"""
+    print("🧪 Testing import validation...")
+    content = '\n'.join([
+        '{"type":"product","user_id":5,"product_code":"IPDMW128G","product_name":"iPad"}',
+        '{"type":"product","user_id":5,"product_code":"missing1"}',
+        '{"type":"price","user_id":5,"product_code":"missing1","price":1.0,"timestamp":"2026-01-01 00:00:00"}',
+        'not json',
+        '{"type":"product","user_id":5}',
+        '{"type":"product","user_id":5,"product_code":"penblue10"}',
+        '{"type":"user","user_id":5,"username":"someone"}',
+    ])
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(os.path.join(tmp, 'target.db'))
+            db.add_user(1, 'user1')
+        result = _import(db, FakeAPI(), content, 'jsonl', user_id=1, max_products=2)
+        assert result.products == 1 and result.prices == 0
+        assert result.not_found == ['missing1']
+        assert result.invalid == 3  # Bad JSON, missing code and the user record
+        assert result.skipped == 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert db.get_user_product(1, 'ipdmw128g') is not None
+            assert db.get_user(5) is None
+
+        # The admin import keeps user IDs and restores users
+        result = _import(db, None, content, 'jsonl', validate=False)
+        assert result.users == 1 and result.products == 3 and result.prices == 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert db.get_user(5)['username'] == 'someone'
+    print("   ✓ Unknown codes dropped with their history")
+    print("   ✓ Imports into /import are limited to the importing user")
+
+def test_import_mixed_case_codes():
+    """Codes stored in their typed case before imports lowercased them are matched, not duplicated"""
+    print("🧪 Testing import into mixed-case codes...")
+    content = '\n'.join([
+        '{"type":"product","user_id":1,"product_code":"ipdmw128g","is_active":1}',
+        '{"type":"product","user_id":1,"product_code":"penblue10","is_active":1}',
+        '{"type":"price","user_id":1,"product_code":"ipdmw128g","price":789.0,"timestamp":"2026-01-01 00:00:00"}',
+    ])
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = Database(os.path.join(tmp, 'target.db'))
+            db.add_user(1, 'user1')
+            db.add_product(1, 'IPDMW128G', 'iPad mini Wi-Fi 128GB Space Grey', '/p/ipdmw128g', 797.00)
+            db.add_product(1, 'PenBlue10', 'Bic Cristal Pen Blue 10 Pack', '/p/penblue10', 4.50)
+            db.remove_product(1, 'PenBlue10')
+        result = _import(db, None, content, 'jsonl', validate=False)
+        assert result.products == 1 and result.prices == 1  # The pen is reactivated
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert db.count_user_products(1) == 2
+            assert db.get_user_product(1, 'ipdmw128g')['product_code'] == 'IPDMW128G'
+            assert db.get_user_product(1, 'penblue10')['product_code'] == 'PenBlue10'
+    print("   ✓ Existing rows reused whatever their case")
+
+if __name__ == "__main__":
+    test_export()
+    test_round_trip()
+    test_import_validation()
+    test_import_mixed_case_codes()
+    print("\n✅ All tests passed!")
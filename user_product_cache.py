@@ -0,0 +1,101 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from database import Database
+
+class UserProductCache:
+    """Per-user product codes and names, kept in memory for autocomplete.
+
+    Autocomplete must answer within Discord's 3-second window, so
+    suggestions come from this cache rather than SQLite. ``warm`` loads
+    every user's active products with one query at startup; a user not
+    seen yet is loaded on first use, which handlers on the event loop do
+    with ``await load_user`` so the read runs in a worker thread. Commands
+    that add or remove products call ``product_added``/``product_removed``
+    so entries never go stale, and ``invalidate`` drops a user to be
+    reloaded after bulk changes.
+    """
+
+    def __init__(self, database: Database, max_users: int = 5000):
+        self.database = database
+        self.max_users = max_users
+        self._users: 'OrderedDict[int, Dict[str, Tuple[str, str]]]' = OrderedDict()  # code.lower() -> (code, name)
+        self._complete = False  # True while every user with products is in the cache
+        self._stale = set()  # Invalidated users to reload even while the cache is complete
+
+    def warm(self):
+        """Load every user's active products in one query"""
+        users: Dict[int, Dict[str, Tuple[str, str]]] = {}
+        for user_id, code, name in self.database.get_active_product_names():
+            users.setdefault(user_id, {})[code.lower()] = (code, name or '')
+        self._users = OrderedDict(users)
+        self._complete = len(users) <= self.max_users
+        self._stale.clear()
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        print(f"Product autocomplete cache warmed for {len(users)} users")
+
+    def _needs_load(self, user_id: int) -> bool:
+        """Whether the user's products have to be read from the database"""
+        return user_id not in self._users and (not self._complete or user_id in self._stale)
+
+    def _load(self, user_id: int) -> Dict[str, Tuple[str, str]]:
+        return {code.lower(): (code, name or '') for _, code, name in self.database.get_active_product_names(user_id)}
+
+    def _store(self, user_id: int, entries: Dict[str, Tuple[str, str]]):
+        self._users[user_id] = entries
+        self._stale.discard(user_id)
+        if len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+            self._complete = False
+
+    def _entries(self, user_id: int) -> Dict[str, Tuple[str, str]]:
+        entries = self._users.get(user_id)
+        if entries is None:
+            entries = self._load(user_id) if self._needs_load(user_id) else {}
+            self._store(user_id, entries)
+        else:
+            self._users.move_to_end(user_id)
+        return entries
+
+    async def load_user(self, user_id: int):
+        """Make sure a user's products are in memory, reading SQLite in a worker thread if needed"""
+        if not self._needs_load(user_id):
+            return
+        entries = await asyncio.to_thread(self._load, user_id)
+        if self._needs_load(user_id):
+            self._store(user_id, entries)
+
+    def codes(self, user_id: int) -> List[Tuple[str, str]]:
+        """(product_code, product_name) for every product the user tracks"""
+        return list(self._entries(user_id).values())
+
+    def has(self, user_id: int, product_code: str) -> bool:
+        return (product_code or '').lower() in self._entries(user_id)
+
+    def suggest(self, user_id: int, current: str, limit: int = 25) -> List[Tuple[str, str]]:
+        """Tracked products matching what the user has typed: code prefixes first, then name matches"""
+        entries = self._entries(user_id)
+        current = (current or '').strip().lower()
+        if not current:
+            return list(entries.values())[:limit]
+        prefix = [entry for key, entry in entries.items() if key.startswith(current)]
+        words = current.split()
+        named = [entry for key, entry in entries.items()
+                 if not key.startswith(current) and all(word in entry[1].lower() for word in words)]
+        return (prefix + named)[:limit]
+
+    def product_added(self, user_id: int, product_code: str, product_name: Optional[str]):
+        """Record a newly tracked product for a user whose entry is loaded"""
+        if user_id in self._users or (self._complete and user_id not in self._stale):
+            self._entries(user_id)[product_code.lower()] = (product_code, product_name or '')
+
+    def product_removed(self, user_id: int, product_code: str):
+        """Forget a product the user stopped tracking"""
+        if user_id in self._users:
+            self._users[user_id].pop(product_code.lower(), None)
+
+    def invalidate(self, user_id: int):
+        """Forget a user's products; they are reloaded from the database on next use"""
+        self._users.pop(user_id, None)
+        self._stale.add(user_id)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Watchlist import and export.
+
+Exports stream users, tracked products, price history and notifications
+out of the database as JSON lines or CSV, one record per line, reading
+each table by cursor iteration. Imports read the same records line by line,
+check product codes against the Officeworks API concurrently and write them
+in batches with executemany. Used by /export and /import, and as an admin
+CLI for the whole database:
+
+    python watchlist_io.py export --output backup.jsonl
+    python watchlist_io.py export --user 123456789 --format csv --output watchlist.csv
+    python watchlist_io.py import backup.jsonl --no-validate
+"""
+
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import json
+import sys
+import tempfile
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from bulk_add import PRODUCT_CODE_PATTERN, resolve_products
+from database import Database
+from officeworks_api import OfficeworksAPI
+
+EXPORT_FORMATS = ('jsonl', 'csv')
+RECORD_TYPES = ('user', 'product', 'price', 'notification')
+RECORD_FIELDS = {
+    'user': ('user_id', 'username', 'preferred_state', 'preferred_store_id'),
+    'product': ('user_id', 'product_code', 'product_name', 'product_url', 'current_price', 'lowest_price',
+                'is_active', 'last_checked', 'created_at'),
+    'price': ('user_id', 'product_code', 'price', 'timestamp'),
+    'notification': ('user_id', 'product_code', 'old_price', 'new_price', 'sent_at'),
+}
+# One CSV layout for every record type; columns a type does not use are left empty
+CSV_FIELDS = ('type', 'user_id', 'username', 'preferred_state', 'preferred_store_id', 'product_code',
+              'product_name', 'product_url', 'current_price', 'lowest_price', 'is_active', 'last_checked',
+              'created_at', 'price', 'timestamp', 'old_price', 'new_price', 'sent_at')
+INTEGER_FIELDS = ('user_id', 'is_active')
+FLOAT_FIELDS = ('current_price', 'lowest_price', 'price', 'old_price', 'new_price')
+REQUIRED_FIELDS = {
+    'user': ('user_id',),
+    'product': ('user_id', 'product_code'),
+    'price': ('user_id', 'product_code', 'price'),
+    'notification': ('user_id', 'product_code', 'old_price', 'new_price'),
+}
+IMPORT_BATCH_SIZE = 500
+SPOOL_MAX_BYTES = 1024 * 1024  # Exports larger than this are spooled to disk rather than memory
+
+class ImportResult(NamedTuple):
+    """Rows written and entries rejected by an import"""
+    users: int
+    products: int
+    prices: int
+    notifications: int
+    invalid: int  # Unreadable lines and records with missing or malformed fields
+    not_found: List[str]  # Product codes the API does not know
+    skipped: int  # Products over the import limit
+    failed_batches: int
+
+def export_format_for(filename: str) -> str:
+    """'csv' for .csv files, otherwise JSON lines"""
+    return 'csv' if (filename or '').lower().endswith('.csv') else 'jsonl'
+
+def write_export(records: Iterable[Dict], fp, fmt: str = 'jsonl') -> Dict[str, int]:
+    """Write records to a text file as they are read; returns how many of each type were written"""
+    counts = {record_type: 0 for record_type in RECORD_TYPES}
+    if fmt == 'csv':
+        writer = csv.DictWriter(fp, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            counts[record['type']] += 1
+    else:
+        for record in records:
+            fp.write(json.dumps(record, separators=(',', ':')) + '\n')
+            counts[record['type']] += 1
+    return counts
+
+def export_to_file(database: Database, fmt: str = 'jsonl', user_id: int = None) -> Tuple[BinaryIO, Dict[str, int], int]:
+    """Export into a spooled temporary file; returns (file rewound to the start, counts, size in bytes)"""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    text = io.TextIOWrapper(spool, encoding='utf-8', newline='')
+    counts = write_export(database.iter_export_records(user_id), text, fmt)
+    text.flush()
+    text.detach()
+    size = spool.tell()
+    spool.seek(0)
+    return spool, counts, size
+
+def _coerce(record: Dict) -> Dict:
+    """CSV cells are strings: empty cells become None and numeric columns numbers"""
+    coerced = {}
+    for field, value in record.items():
+        if value == '' or value is None:
+            value = None
+        elif field in INTEGER_FIELDS:
+            value = int(float(value))
+        elif field in FLOAT_FIELDS:
+            value = float(value)
+        coerced[field] = value
+    return coerced
+
+def read_records(lines: Iterable[str], fmt: str = 'jsonl') -> Iterator[Optional[Dict]]:
+    """Parse records one line at a time; yields None for a line that cannot be read"""
+    if fmt == 'csv':
+        for row in csv.DictReader(lines):
+            try:
+                yield _coerce(row)
+            except (TypeError, ValueError):
+                yield None
+        return
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            yield _coerce(record) if isinstance(record, dict) else None
+        except (TypeError, ValueError):
+            yield None
+
+def normalize_record(record: Optional[Dict], user_id: int = None) -> Optional[Tuple[str, Tuple]]:
+    """(record type, row for Database.import_records), or None if the record is unusable.
+
+    With ``user_id`` every record is assigned to that user and user records
+    are dropped, so a user importing a file can only change their own list.
+    """
+    if not record or record.get('type') not in RECORD_TYPES:
+        return None
+    record_type = record['type']
+    if user_id is not None:
+        if record_type == 'user':
+            return None
+        record = dict(record, user_id=user_id)
+    if any(record.get(field) is None for field in REQUIRED_FIELDS[record_type]):
+        return None
+    if record_type == 'user':
+        record.setdefault('username', None)
+        record['username'] = record['username'] or str(record['user_id'])
+    else:
+        code = str(record['product_code']).strip().lower()
+        if not PRODUCT_CODE_PATTERN.match(code):
+            return None
+        record['product_code'] = code
+        if record_type == 'product' and record.get('is_active') is None:
+            record['is_active'] = 1
+    return record_type, tuple(record.get(field) for field in RECORD_FIELDS[record_type])
+
+async def import_watchlist(database: Database, api: Optional[OfficeworksAPI], records: Iterable[Optional[Dict]],
+                           user_id: int = None, validate: bool = True, batch_size: int = IMPORT_BATCH_SIZE,
+                           concurrency: int = 5, max_products: int = None) -> ImportResult:
+    """Import records in batches, checking unseen product codes against the API concurrently.
+
+    Each batch is written in one transaction, products first, so price
+    history and notifications attach to products earlier in the file.
+    Products whose code the API does not know are dropped along with their
+    history. ``max_products`` caps the distinct products accepted.
+    """
+    batches: Dict[str, List[Tuple]] = {record_type: [] for record_type in RECORD_TYPES}
+    written = {record_type: 0 for record_type in RECORD_TYPES}
+    valid_codes: Dict[str, bool] = {}  # Codes already checked against the API this import
+    accepted = set()  # (user_id, product_code) of products kept so far
+    not_found: List[str] = []
+    invalid = skipped = failed = 0
+
+    async def flush():
+        nonlocal failed
+        products = batches['product']
+        if validate and api is not None:
+            unchecked = list(dict.fromkeys(row[1] for row in products if row[1] not in valid_codes))
+            resolved = await resolve_products(api, unchecked, concurrency)
+            for code in unchecked:
+                valid_codes[code] = bool(resolved[code])
+                if not resolved[code]:
+                    not_found.append(code)
+            products = [row for row in products if valid_codes[row[1]]]
+        counts = await asyncio.to_thread(
+            database.import_records, batches['user'], products, batches['price'], batches['notification']
+        )
+        if counts is None:
+            failed += 1
+        else:
+            for record_type, count in counts.items():
+                written[record_type] += count
+        for batch in batches.values():
+            batch.clear()
+
+    for record in records:
+        normalized = normalize_record(record, user_id)
+        if normalized is None:
+            invalid += 1
+            continue
+        record_type, row = normalized
+        if record_type == 'product':
+            key = (row[0], row[1])
+            if key not in accepted:
+                if max_products is not None and len(accepted) >= max_products:
+                    skipped += 1
+                    continue
+                accepted.add(key)
+        batches[record_type].append(row)
+        if len(batches[record_type]) >= batch_size:
+            await flush()
+    if any(batches.values()):
+        await flush()
+
+    return ImportResult(written['user'], written['product'], written['price'], written['notification'],
+                        invalid, not_found, skipped, failed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help='Export watchlists, price history and notifications')
+    export_parser.add_argument('--user', type=int, help='Only export this Discord user ID')
+    export_parser.add_argument('--format', choices=EXPORT_FORMATS, help='Output format (default: from --output, else jsonl)')
+    export_parser.add_argument('--output', default='-', help='File to write, or - for stdout')
+    import_parser = subparsers.add_parser('import', help='Import a JSON lines or CSV export')
+    import_parser.add_argument('path', help='File to import')
+    import_parser.add_argument('--user', type=int, help='Assign every record to this Discord user ID')
+    import_parser.add_argument('--format', choices=EXPORT_FORMATS, help='Input format (default: from the file name)')
+    import_parser.add_argument('--no-validate', action='store_true', help='Skip checking product codes against the API')
+    import_parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Records per transaction')
+    import_parser.add_argument('--concurrency', type=int, default=5, help='Product code checks in flight at once')
+    parser.add_argument('--database', help='Database file (default: DATABASE_PATH)')
+    args = parser.parse_args()
+
+    # The database logs setup to stdout, which may be the export itself
+    with contextlib.redirect_stdout(sys.stderr):
+        database = Database(args.database)
+
+    if args.command == 'export':
+        fmt = args.format or export_format_for(args.output)
+        if args.output == '-':
+            counts = write_export(database.iter_export_records(args.user), sys.stdout, fmt)
+        else:
+            with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                counts = write_export(database.iter_export_records(args.user), f, fmt)
+        summary = ', '.join(f"{count} {record_type} records" for record_type, count in counts.items())
+        print(f"Exported {summary}", file=sys.stderr)
+    else:
+        fmt = args.format or export_format_for(args.path)
+        with open(args.path, 'r', encoding='utf-8-sig', newline='') as f:
+            result = asyncio.run(import_watchlist(
+                database, OfficeworksAPI(), read_records(f, fmt), user_id=args.user,
+                validate=not args.no_validate, batch_size=args.batch_size, concurrency=args.concurrency
+            ))
+        print(f"Imported {result.users} users, {result.products} products, {result.prices} price history "
+              f"entries and {result.notifications} notifications")
+        if result.invalid:
+            print(f"Skipped {result.invalid} unreadable or incomplete records")
+        if result.not_found:
+            print(f"Product codes not found: {', '.join(result.not_found)}")
+        if result.failed_batches:
+            print(f"{result.failed_batches} batches failed and were rolled back")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()